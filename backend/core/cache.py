@@ -0,0 +1,703 @@
+"""
+Caching primitives.
+
+- TTLCache: in-process cache with TTL expiry and version-based invalidation
+- CacheBackend implementations (memory / disk / Redis protocol) behind
+  SharedCache, which adds versioned namespaces and stampede protection so
+  every gunicorn worker sees the same cached scan results and aggregates.
+"""
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import struct
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory cache.
+    
+    Every entry is stamped with the cache version at write time. Calling
+    bump_version() makes all existing entries stale at once without having
+    to walk the dictionary, which is how writers signal "the data changed".
+    
+    Usage:
+        cache = TTLCache(default_ttl=60)
+        tickers = cache.get_or_load('tickers', load_tickers)
+        cache.bump_version()  # after an ingest
+    """
+    
+    _MISSING = object()
+    
+    def __init__(self, default_ttl: float = 60.0, max_entries: int = 1024):
+        """
+        Initialize cache.
+        
+        Args:
+            default_ttl: Seconds an entry stays fresh when no ttl is given
+            max_entries: Upper bound on stored keys (oldest entries evicted first)
+        """
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, int, Any]] = {}
+        self._version = 0
+        self._lock = threading.RLock()
+        self._load_locks: Dict[Hashable, threading.Lock] = {}
+    
+    @property
+    def version(self) -> int:
+        """Current cache version."""
+        return self._version
+    
+    def bump_version(self) -> int:
+        """
+        Invalidate every entry by moving to a new version.
+        
+        Returns:
+            The new version number
+        """
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            return self._version
+    
+    def set_version(self, version: int) -> bool:
+        """
+        Adopt an externally tracked version (e.g. a counter stored in the DB).
+        
+        Args:
+            version: Version number observed at the source of truth
+        
+        Returns:
+            True if the version changed and entries were invalidated
+        """
+        with self._lock:
+            if version == self._version:
+                return False
+            self._version = version
+            self._entries.clear()
+            return True
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a fresh value.
+        
+        Args:
+            key: Cache key
+            default: Value returned on miss or expiry
+        
+        Returns:
+            Cached value or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, version, value = entry
+            if version != self._version or expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+            return value
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value.
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Seconds until expiry (defaults to default_ttl)
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                # dicts keep insertion order, so the first key is the oldest
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = (time.monotonic() + ttl, self._version, value)
+    
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Return the cached value or compute it with loader().
+        
+        Concurrent callers missing on the same key wait for a single load
+        instead of all hitting the database.
+        
+        Args:
+            key: Cache key
+            loader: Zero-argument callable producing the value
+            ttl: Seconds until expiry (defaults to default_ttl)
+        
+        Returns:
+            Cached or freshly loaded value
+        """
+        value = self.get(key, self._MISSING)
+        if value is not self._MISSING:
+            return value
+        
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        
+        with load_lock:
+            # Another thread may have filled the entry while we waited
+            value = self.get(key, self._MISSING)
+            if value is not self._MISSING:
+                return value
+            value = loader()
+            self.set(key, value, ttl)
+            return value
+    
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """
+        Drop one entry, or everything when key is None.
+        
+        Args:
+            key: Cache key to drop
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+
+# ============================================================================
+# SHARED CACHE BACKENDS
+# ============================================================================
+
+class CacheBackend(ABC):
+    """
+    Minimal byte-oriented key/value store.
+    
+    The method set mirrors the Redis commands SharedCache needs
+    (GET, SET EX, SET NX EX, DEL, INCR) so any backend can stand in for Redis.
+    
+    Attributes:
+        errors: Exception types meaning "backend unavailable"; SharedCache
+            degrades to uncached operation on these instead of failing
+    """
+    
+    errors: Tuple[type, ...] = (OSError,)
+    
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the stored bytes or None."""
+        pass
+    
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Store bytes, expiring after ttl seconds (None = no expiry)."""
+        pass
+    
+    @abstractmethod
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        """Store only if the key is absent. Returns True if stored."""
+        pass
+    
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove a key if present."""
+        pass
+    
+    @abstractmethod
+    def incr(self, key: str) -> int:
+        """Atomically increment an integer counter and return the new value."""
+        pass
+
+
+class MemoryBackend(CacheBackend):
+    """
+    Per-process backend (default, and for single-worker development).
+    
+    Keys orphaned by bump() and one-off request keys are never read again,
+    so writers sweep expired entries at most every sweep_interval seconds
+    and evict the oldest expiring entry beyond max_entries. Entries without
+    a ttl (namespace versions) are only evicted when nothing else is left.
+    """
+    
+    def __init__(self, sweep_interval: float = 60, max_entries: int = 10000):
+        self.sweep_interval = sweep_interval
+        self.max_entries = max_entries
+        self._next_sweep = 0.0
+        self._data: Dict[str, Tuple[Optional[float], bytes]] = {}
+        self._lock = threading.Lock()
+    
+    def _alive(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at < time.time():
+            del self._data[key]
+            return None
+        return value
+    
+    def _put(self, key: str, value: bytes, ttl: Optional[float]) -> None:
+        """Store under the lock, sweeping and evicting first."""
+        if time.monotonic() >= self._next_sweep:
+            self._next_sweep = time.monotonic() + self.sweep_interval
+            self._sweep()
+        if key not in self._data and len(self._data) >= self.max_entries:
+            # dicts keep insertion order, so the first expiring key is the oldest
+            oldest = next((k for k, (expires_at, _) in self._data.items() if expires_at is not None),
+                          next(iter(self._data)))
+            del self._data[oldest]
+        self._data[key] = (time.time() + ttl if ttl else None, value)
+    
+    def _sweep(self) -> int:
+        now = time.time()
+        expired = [k for k, (expires_at, _) in self._data.items() if expires_at is not None and expires_at < now]
+        for key in expired:
+            del self._data[key]
+        return len(expired)
+    
+    def sweep(self) -> int:
+        """
+        Delete expired entries.
+        
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            return self._sweep()
+    
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._alive(key)
+    
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._put(key, value, ttl)
+    
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        with self._lock:
+            if self._alive(key) is not None:
+                return False
+            self._put(key, value, ttl)
+            return True
+    
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value = int(self._alive(key) or 0) + 1
+            self._put(key, str(value).encode(), None)
+            return value
+
+
+class DiskBackend(CacheBackend):
+    """
+    Directory-backed store shared by all processes on one host.
+    
+    Each key is a file holding an 8-byte expiry timestamp followed by the
+    payload. Writes go through a temp file + rename so readers never see
+    partial data; add/incr hold an fcntl lock on one of a fixed pool of lock
+    files. Writers sweep expired entries (orphaned by bump()) at most every
+    sweep_interval seconds, so the directory does not grow without bound.
+    """
+    
+    _HEADER = struct.Struct('>d')  # expiry (unix time, 0 = never)
+    
+    def __init__(self, directory: str, sweep_interval: float = 60):
+        self.directory = directory
+        self.sweep_interval = sweep_interval
+        self._next_sweep = 0.0
+        os.makedirs(os.path.join(directory, 'locks'), exist_ok=True)
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest())
+    
+    def _lock_path(self, key: str) -> str:
+        # 256 lock files striped by key hash instead of one per key
+        return os.path.join(self.directory, 'locks', hashlib.sha1(key.encode()).hexdigest()[:2])
+    
+    def _decode(self, raw: bytes) -> Optional[bytes]:
+        if len(raw) < self._HEADER.size:
+            return None
+        (expires_at,) = self._HEADER.unpack_from(raw)
+        if expires_at and expires_at < time.time():
+            return None
+        return raw[self._HEADER.size:]
+    
+    def _encode(self, value: bytes, ttl: Optional[float]) -> bytes:
+        return self._HEADER.pack(time.time() + ttl if ttl else 0.0) + value
+    
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), 'rb') as f:
+                return self._decode(f.read())
+        except FileNotFoundError:
+            return None
+    
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(self._encode(value, ttl))
+        os.replace(tmp_path, path)
+        
+        if time.monotonic() >= self._next_sweep:
+            self._next_sweep = time.monotonic() + self.sweep_interval
+            self.sweep()
+    
+    def sweep(self) -> int:
+        """
+        Delete expired entries, temp files left by dead writers and per-key
+        lock files of the old layout.
+        
+        Returns:
+            Number of files removed
+        """
+        now = time.time()
+        removed = 0
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                try:
+                    if entry.name.endswith('.tmp'):
+                        stale = entry.stat().st_mtime < now - 3600
+                    elif entry.name.endswith('.lock'):
+                        stale = True
+                    else:
+                        with open(entry.path, 'rb') as f:
+                            header = f.read(self._HEADER.size)
+                        (expires_at,) = self._HEADER.unpack(header) if len(header) == self._HEADER.size else (now - 1,)
+                        stale = bool(expires_at) and expires_at < now
+                    if stale:
+                        os.remove(entry.path)
+                        removed += 1
+                except FileNotFoundError:
+                    continue  # Swept or replaced by another process meanwhile
+        return removed
+    
+    def _locked_update(self, key: str, update: Callable[[Optional[bytes]], Optional[bytes]]) -> Optional[bytes]:
+        """Read-modify-write under an exclusive lock; update returns the new file content or None to keep."""
+        fd = os.open(self._lock_path(key), os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            current = self.get(key)
+            new_raw = update(current)
+            if new_raw is not None:
+                path = self._path(key)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(new_raw)
+                os.replace(tmp_path, path)
+            return current
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+    
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        stored = []
+        
+        def update(current):
+            if current is not None:
+                return None
+            stored.append(True)
+            return self._encode(value, ttl)
+        
+        self._locked_update(key, update)
+        return bool(stored)
+    
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+    
+    def incr(self, key: str) -> int:
+        result = []
+        
+        def update(current):
+            result.append(int(current or 0) + 1)
+            return self._encode(str(result[0]).encode(), None)
+        
+        self._locked_update(key, update)
+        return result[0]
+
+
+class RedisBackend(CacheBackend):
+    """
+    Redis-protocol backend shared by every worker and cron process.
+    
+    Accepts any redis-py compatible client, so tests and local development
+    can pass a stand-in such as fakeredis.FakeRedis() instead of a server.
+    """
+    
+    def __init__(self, client=None, url: Optional[str] = None):
+        if client is None:
+            import redis  # Optional dependency, only needed for CACHE_BACKEND=redis
+            # Short timeouts: an unreachable server should degrade to uncached, not hang requests
+            client = redis.Redis.from_url(url, socket_connect_timeout=2, socket_timeout=2)
+        self.client = client
+        try:
+            from redis.exceptions import RedisError
+            self.errors = (RedisError, OSError)
+        except ImportError:
+            pass
+    
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(key)
+    
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self.client.set(key, value, px=int(ttl * 1000) if ttl else None)
+    
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        return bool(self.client.set(key, value, nx=True, px=int(ttl * 1000) if ttl else None))
+    
+    def delete(self, key: str) -> None:
+        self.client.delete(key)
+    
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(key))
+
+
+# ============================================================================
+# SHARED CACHE
+# ============================================================================
+
+class SharedCache:
+    """
+    JSON value cache with versioned namespaces and stampede protection.
+    
+    Keys are built as "<prefix>:<namespace>:v<version>:<digest>". bump()
+    increments the namespace version, which orphans every key written under
+    the old version (they expire through their TTL) — no key scans needed.
+    
+    Usage:
+        cache = get_cache()
+        summary = cache.get_or_compute('performance', {'days': 30}, compute_summary, ttl=300)
+        cache.bump('performance')  # after new performance rows are written
+    """
+    
+    def __init__(self, backend: CacheBackend, prefix: str = 'bist', default_ttl: float = 300,
+                 lock_timeout: float = 60, wait_timeout: float = 30, poll_interval: float = 0.05):
+        """
+        Initialize shared cache.
+        
+        Args:
+            backend: Storage backend
+            prefix: Key prefix (lets several deployments share one Redis)
+            default_ttl: Seconds a value lives when no ttl is given
+            lock_timeout: Seconds a recompute lock is held before it expires
+            wait_timeout: Seconds other callers wait for the lock holder's result
+            poll_interval: Seconds between polls while waiting
+        """
+        self.backend = backend
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+    
+    def _safe(self, operation: Callable[[], Any], default: Any = None) -> Any:
+        """Run a backend call; if the backend is down, log it and return default."""
+        try:
+            return operation()
+        except self.backend.errors as e:
+            logger.warning(f"Cache backend unavailable, continuing uncached: {e}")
+            return default
+    
+    def version(self, namespace: str) -> int:
+        """Current version of a namespace."""
+        raw = self._safe(lambda: self.backend.get(f"{self.prefix}:ns:{namespace}"))
+        return int(raw) if raw else 0
+    
+    def bump(self, namespace: str) -> int:
+        """Invalidate every key in a namespace. Returns the new version (0 if the backend is down)."""
+        return self._safe(lambda: self.backend.incr(f"{self.prefix}:ns:{namespace}"), 0)
+    
+    def bump_symbols(self, namespace: str, symbols: Iterable[str]) -> None:
+        """Invalidate only the keys of `symbols` in a namespace (see cached_json's symbol_arg)."""
+        for symbol in symbols:
+            self.bump(f"{namespace}:{symbol.upper()}")
+    
+    def make_key(self, namespace: str, key: Any) -> str:
+        """Build the versioned backend key for any JSON-serializable key."""
+        digest = hashlib.sha1(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+        return f"{self.prefix}:{namespace}:v{self.version(namespace)}:{digest}"
+    
+    def get(self, namespace: str, key: Any) -> Any:
+        """Return the cached value or None."""
+        full_key = self.make_key(namespace, key)
+        raw = self._safe(lambda: self.backend.get(full_key))
+        return json.loads(raw) if raw is not None else None
+    
+    def set(self, namespace: str, key: Any, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a JSON-serializable value."""
+        self._store(self.make_key(namespace, key), value, ttl)
+    
+    def _store(self, full_key: str, value: Any, ttl: Optional[float]) -> None:
+        raw = json.dumps(value, default=str).encode()
+        self._safe(lambda: self.backend.set(full_key, raw, self.default_ttl if ttl is None else ttl))
+    
+    def get_or_compute(self, namespace: str, key: Any, compute: Callable[[], Any],
+                       ttl: Optional[float] = None) -> Any:
+        """
+        Return the cached value, computing it at most once across workers.
+        
+        The first caller to miss takes a short-lived lock and computes; the
+        others poll for its result instead of running the same expensive
+        query. If the lock holder dies or is too slow, waiters compute
+        themselves after wait_timeout. With the backend down every caller
+        computes directly.
+        
+        Args:
+            namespace: Cache namespace (unit of invalidation)
+            key: JSON-serializable key within the namespace
+            compute: Zero-argument callable returning a JSON-serializable value
+            ttl: Seconds until expiry (defaults to default_ttl)
+        
+        Returns:
+            Cached or freshly computed value
+        """
+        full_key = self.make_key(namespace, key)
+        raw = self._safe(lambda: self.backend.get(full_key))
+        if raw is not None:
+            return json.loads(raw)
+        
+        lock_key = f"{full_key}:lock"
+        locked = self._safe(lambda: self.backend.add(lock_key, b'1', self.lock_timeout))
+        if locked is None:
+            return compute()  # Backend down: nothing to share the result through
+        if locked:
+            try:
+                value = compute()
+                self._store(full_key, value, ttl)
+                return value
+            finally:
+                self._safe(lambda: self.backend.delete(lock_key))
+        
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            raw = self._safe(lambda: self.backend.get(full_key))
+            if raw is not None:
+                return json.loads(raw)
+            if self._safe(lambda: self.backend.get(lock_key)) is None:
+                break  # Holder failed without storing a value (or the backend went down)
+        
+        value = compute()
+        self._store(full_key, value, ttl)
+        return value
+
+
+_shared_cache: Optional[SharedCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def create_backend(kind: str) -> CacheBackend:
+    """
+    Create a backend by name ('memory', 'disk' or 'redis').
+    
+    Falls back to the memory backend if Redis is requested but the client
+    library is not installed.
+    """
+    from backend.core.config import CACHE_URL, CACHE_DIR
+    
+    if kind == 'redis':
+        try:
+            return RedisBackend(url=CACHE_URL)
+        except ImportError:
+            print("⚠️  CACHE_BACKEND=redis but 'redis' package is not installed, using memory cache")
+            return MemoryBackend()
+    if kind == 'disk':
+        return DiskBackend(CACHE_DIR)
+    return MemoryBackend()
+
+
+def get_cache() -> SharedCache:
+    """Process-wide SharedCache configured from CACHE_BACKEND."""
+    global _shared_cache
+    
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                from backend.core.config import CACHE_BACKEND, CACHE_DEFAULT_TTL
+                _shared_cache = SharedCache(create_backend(CACHE_BACKEND), default_ttl=CACHE_DEFAULT_TTL)
+    return _shared_cache
+
+
+def set_cache(cache: Optional[SharedCache]) -> None:
+    """Replace the process-wide cache (e.g. SharedCache(RedisBackend(fakeredis.FakeRedis())) in tests)."""
+    global _shared_cache
+    _shared_cache = cache
+
+
+class _UncacheableResponse(Exception):
+    """Carries a non-200 view response out of get_or_compute without caching it."""
+    
+    def __init__(self, response):
+        self.response = response
+
+
+def cached_json(namespace: str, ttl: Optional[float] = None, symbol_arg: Optional[str] = None,
+                unless: Optional[Callable[[], bool]] = None):
+    """
+    Cache a Flask view's 200 JSON body in the shared cache.
+    
+    The key is the request path, query string and JSON body. Error
+    responses are passed through untouched and never cached. Views of a
+    single symbol name the URL variable in symbol_arg, so that
+    cache.bump_symbols(namespace, [symbol]) invalidates just that symbol.
+    Requests for which unless() returns True (e.g. ones with side effects)
+    always run the view.
+    
+    Usage:
+        @screener_bp.route('/performance/summary', methods=['GET'])
+        @cached_json('performance', ttl=300)
+        def get_performance_summary():
+            ...
+    
+    Args:
+        namespace: Cache namespace bumped by the writers of the underlying data
+        ttl: Seconds until expiry (defaults to the cache's default_ttl)
+        symbol_arg: URL variable holding the symbol (e.g. 'symbol')
+        unless: Zero-argument predicate evaluated inside the request
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            from flask import request, jsonify
+            
+            if unless is not None and unless():
+                return view(*args, **kwargs)
+            
+            key = {
+                'path': request.path,
+                'args': sorted(request.args.items(multi=True)),
+                'body': request.get_json(silent=True) if request.method != 'GET' else None
+            }
+            if symbol_arg:
+                symbol = str(request.view_args.get(symbol_arg, '')).upper()
+                key['symbol_version'] = get_cache().version(f"{namespace}:{symbol}")
+            
+            def compute():
+                response = view(*args, **kwargs)
+                body, status = response if isinstance(response, tuple) else (response, 200)
+                if status != 200:
+                    raise _UncacheableResponse(response)
+                return body.get_json()
+            
+            try:
+                payload = get_cache().get_or_compute(namespace, key, compute, ttl)
+            except _UncacheableResponse as e:
+                return e.response
+            
+            return jsonify(payload), 200
+        
+        return wrapper
+    
+    return decorator
@@ -10,8 +10,8 @@ DB_PASS = os.getenv('DB_PASS', '')
 DB_HOST = os.getenv('DB_HOST', 'localhost')
 DB_NAME = os.getenv('DB_NAME', 'trading_db')
 
-# SQLAlchemy Connection String
-DB_CONNECTION_STR = f'postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}/{DB_NAME}'
+# SQLAlchemy Connection String (DATABASE_URL overrides, e.g. a SQLite file for benchmarks)
+DB_CONNECTION_STR = os.getenv('DATABASE_URL') or f'postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}/{DB_NAME}'
 
 # Log Directory
 LOG_DIR = os.path.join(os.path.dirname(__file__), 'logs')
@@ -34,3 +34,25 @@ SCAN_AFTER_UPDATE = os.getenv('SCAN_AFTER_UPDATE', 'true').lower() == 'true'
 # Logging
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 
+
+# Shared Cache Configuration
+# CACHE_BACKEND: 'memory' (per process), 'disk' (per host) or 'redis' (shared by all workers)
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory').lower()
+CACHE_URL = os.getenv('CACHE_URL', 'redis://localhost:6379/0')
+CACHE_DIR = os.getenv('CACHE_DIR', os.path.join(os.path.dirname(__file__), 'cache_data'))
+CACHE_DEFAULT_TTL = int(os.getenv('CACHE_DEFAULT_TTL', '300'))
+
+# Memory-mapped float32 market panel (see backend/modules/market_data/panel_file.py)
+PANEL_FILE = os.getenv('PANEL_FILE', os.path.join(os.path.dirname(__file__), 'panel_data', 'market_panel.bin'))
+
+# Scans read stored indicators (see backend/modules/market_data/indicator_store.py)
+SCAN_USE_INDICATOR_STORE = os.getenv('SCAN_USE_INDICATOR_STORE', 'true').lower() == 'true'
+
+
+# SQL Query Profiler (see backend/core/query_profiler.py)
+SQL_SLOW_MS = float(os.getenv('SQL_SLOW_MS', '200'))
+SQL_EXPLAIN_SLOW = os.getenv('SQL_EXPLAIN_SLOW', 'false').lower() == 'true'
+SQL_N_PLUS_ONE = int(os.getenv('SQL_N_PLUS_ONE', '10'))
+
+# Admin endpoints (/api/admin/*) are disabled unless a token is set
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
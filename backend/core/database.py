@@ -17,8 +17,8 @@ DB_PASS = os.getenv('DB_PASS', '')
 DB_HOST = os.getenv('DB_HOST', 'localhost')
 DB_NAME = os.getenv('DB_NAME', 'trading_db')
 
-# SQLAlchemy Connection String
-DB_CONNECTION_STR = f'postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}/{DB_NAME}'
+# SQLAlchemy Connection String (DATABASE_URL overrides, e.g. a SQLite file for benchmarks)
+DB_CONNECTION_STR = os.getenv('DATABASE_URL') or f'postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}/{DB_NAME}'
 
 # Create engine
 engine = create_engine(
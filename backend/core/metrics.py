@@ -0,0 +1,234 @@
+"""
+Prometheus metrics for scans and market data updates.
+
+Two sources are rendered by GET /metrics (text exposition format 0.0.4):
+
+- The in-process registry: scan stage/symbol latency histograms and
+  signal counters of scans served by this API process
+- Last-run summaries in the shared cache: scans and updates run by cron
+  (pipeline, run_scan.py, updater) publish their stage timings there, so
+  the API can expose them as gauges (shared across processes with the
+  redis or disk cache backend)
+
+Usage:
+    with recording() as recorder:
+        signals = engine.run_scan_batch()
+    record_scan('XTUMYV27Strategy', recorder, signals.signal_type)
+"""
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from backend.core.timing import LatencyHistogram, StageRecorder
+
+# Shared-cache namespace and lifetime of the last-run summaries
+LAST_RUN_NAMESPACE = 'metrics'
+LAST_RUN_TTL = 7 * 24 * 3600
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """
+    Thread-safe counters, gauges and latency histograms keyed by name and labels.
+    
+    Histograms reuse LatencyHistogram buckets (recorded in ms, exported in seconds).
+    """
+    
+    def __init__(self):
+        self.help: Dict[str, Tuple[str, str]] = {}
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.gauges: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, LatencyHistogram]] = {}
+        self._lock = threading.Lock()
+    
+    def _declare(self, name: str, kind: str, help_text: str) -> None:
+        self.help.setdefault(name, (kind, help_text))
+    
+    def inc(self, metric: str, value: float = 1, help_text: str = '', **labels: Any) -> None:
+        with self._lock:
+            self._declare(metric, 'counter', help_text)
+            series = self.counters.setdefault(metric, {})
+            key = _labels(labels)
+            series[key] = series.get(key, 0) + value
+    
+    def set(self, metric: str, value: float, help_text: str = '', **labels: Any) -> None:
+        with self._lock:
+            self._declare(metric, 'gauge', help_text)
+            self.gauges.setdefault(metric, {})[_labels(labels)] = value
+    
+    def observe(self, metric: str, ms: float, help_text: str = '', **labels: Any) -> None:
+        with self._lock:
+            self._declare(metric, 'histogram', help_text)
+            self.histograms.setdefault(metric, {}).setdefault(_labels(labels), LatencyHistogram()).record(ms)
+    
+    def merge(self, metric: str, hist: LatencyHistogram, help_text: str = '', **labels: Any) -> None:
+        """Add a whole histogram (e.g. one StageRecorder stage) to a series."""
+        with self._lock:
+            self._declare(metric, 'histogram', help_text)
+            self.histograms.setdefault(metric, {}).setdefault(_labels(labels), LatencyHistogram()).merge(hist)
+    
+    def render(self) -> str:
+        """Prometheus text exposition of every series."""
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(self.help):
+                kind, help_text = self.help[name]
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == 'histogram':
+                    for labels, hist in sorted(self.histograms.get(name, {}).items()):
+                        lines.extend(_render_histogram(name, labels, hist))
+                else:
+                    series = (self.counters if kind == 'counter' else self.gauges).get(name, {})
+                    for labels, value in sorted(series.items()):
+                        lines.append(f"{name}{_format_labels(labels)} {_number(value)}")
+        return '\n'.join(lines) + '\n' if lines else ''
+
+
+def _render_histogram(name: str, labels: Labels, hist: LatencyHistogram) -> List[str]:
+    lines = []
+    cumulative = 0
+    for bound, n in zip(LatencyHistogram.BOUNDS, hist.counts):
+        cumulative += n
+        lines.append(f"{name}_bucket{_format_labels(labels, ('le', f'{bound / 1000:g}'))} {cumulative}")
+    lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {hist.count}")
+    lines.append(f"{name}_sum{_format_labels(labels)} {_number(hist.total / 1000)}")
+    lines.append(f"{name}_count{_format_labels(labels)} {hist.count}")
+    return lines
+
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Process-wide registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = MetricsRegistry()
+    return _registry
+
+
+def _publish_last_run(kind: str, name: str, summary: Dict[str, Any]) -> None:
+    from backend.core.cache import get_cache
+    
+    try:
+        get_cache().set(LAST_RUN_NAMESPACE, [kind, name], {'finished_at': time.time(), **summary}, LAST_RUN_TTL)
+    except Exception:
+        # Metrics must never break a scan or an update
+        pass
+
+
+def record_scan(strategy: str, recorder: StageRecorder, signal_types: Iterable[str],
+                status: str = 'ok', publish: bool = True) -> None:
+    """
+    Add one scan's spans and signal counts to the registry.
+    
+    Args:
+        strategy: Strategy name (label)
+        recorder: Recorder that was active during the scan
+        signal_types: Signal type of every signal found
+        status: 'ok' or 'error'
+        publish: Also store the summary as the strategy's last run in the shared cache
+    """
+    registry = get_metrics()
+    by_type = Counter(signal_types)
+    
+    registry.inc('bist_scans_total', help_text='Scans run', strategy=strategy, status=status)
+    for name, hist in recorder.stages.items():
+        if name == 'symbol':
+            registry.merge('bist_scan_symbol_seconds', hist,
+                           'Per-symbol scan time (symbol-by-symbol strategies)', strategy=strategy)
+        else:
+            registry.merge('bist_scan_stage_seconds', hist, 'Scan time per stage', strategy=strategy, stage=name)
+    for signal_type, n in by_type.items():
+        registry.inc('bist_scan_signals_total', n, 'Signals found', strategy=strategy, signal_type=signal_type)
+    for name, n in recorder.counters.items():
+        registry.inc('bist_scan_items_total', n, 'Items processed by scans', strategy=strategy, item=name)
+    
+    if publish:
+        _publish_last_run('scan', strategy, {**recorder.summary(), 'status': status, 'signals': dict(by_type)})
+
+
+def record_update(recorder: StageRecorder, stats: Optional[Dict[str, int]], status: str = 'ok') -> None:
+    """
+    Add a market data update run to the registry and publish it as the last update.
+    
+    Args:
+        recorder: Recorder that was active during run_daily_update
+        stats: {'updated', 'skipped', 'errors'} (None if the update aborted)
+        status: 'ok' or 'error'
+    """
+    registry = get_metrics()
+    registry.inc('bist_updates_total', help_text='Market data update runs', status=status)
+    for name, hist in recorder.stages.items():
+        if name == 'symbol':
+            registry.merge('bist_update_symbol_seconds', hist, 'Per-symbol update time')
+        else:
+            registry.merge('bist_update_stage_seconds', hist, 'Update time per stage', stage=name)
+    
+    _publish_last_run('update', 'daily', {**recorder.summary(), 'status': status, 'symbols': stats or {}})
+
+
+def _last_run_lines() -> List[str]:
+    """Gauges for the last published scan/update runs (possibly from other processes)."""
+    from backend.core.cache import get_cache
+    from backend.modules.screener.strategies import StrategyRegistry
+    
+    cache = get_cache()
+    runs = [('update', 'daily')] + [('scan', name) for name in StrategyRegistry.names()]
+    
+    gauges = MetricsRegistry()
+    for kind, name in runs:
+        try:
+            run = cache.get(LAST_RUN_NAMESPACE, [kind, name])
+        except Exception:
+            run = None
+        if not run:
+            continue
+        
+        labels = {'kind': kind, 'name': name}
+        gauges.set('bist_last_run_timestamp_seconds', run['finished_at'],
+                   'Unix time the last run finished', **labels)
+        gauges.set('bist_last_run_success', int(run.get('status') == 'ok'),
+                   '1 if the last run succeeded', **labels)
+        gauges.set('bist_last_run_duration_seconds', run['elapsed_ms'] / 1000,
+                   'Wall time of the last run', **labels)
+        for stage, stats in run.get('stages', {}).items():
+            gauges.set('bist_last_run_stage_seconds', stats['total_ms'] / 1000,
+                       'Total time per stage in the last run', stage=stage, **labels)
+        for signal_type, n in run.get('signals', {}).items():
+            gauges.set('bist_last_run_signals', n, 'Signals found in the last scan',
+                       signal_type=signal_type, **labels)
+        for result, n in run.get('symbols', {}).items():
+            gauges.set('bist_last_run_symbols', n, 'Symbols per result in the last update',
+                       result=result, **labels)
+    
+    return gauges.render().splitlines()
+
+
+def render_prometheus() -> str:
+    """Body of GET /metrics."""
+    text = get_metrics().render()
+    lines = _last_run_lines()
+    return text + ('\n'.join(lines) + '\n' if lines else '')
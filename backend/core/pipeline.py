@@ -0,0 +1,264 @@
+"""
+Minimal DAG pipeline runner.
+
+Stages declare their upstream stages; each stage starts as soon as all of
+its upstreams have finished, independent stages run in parallel threads.
+Every finished stage is checkpointed (status, duration, JSON result) to
+<checkpoint_dir>/<run_key>.json, so rerunning the same key skips work that
+already succeeded and only retries what failed or never ran.
+
+Usage:
+    pipeline = Pipeline([
+        Stage('ingest', ingest),
+        Stage('validate', validate, depends=('ingest',)),
+        Stage('scan', scan, depends=('validate',)),
+    ], checkpoint_dir='logs/pipeline')
+    report = pipeline.run('2025-12-08')
+
+Stage functions take a PipelineContext and return a JSON-serializable
+result (kept in the checkpoint and visible to downstream stages).
+"""
+import fcntl
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+SUCCESS = 'success'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+
+@dataclass
+class Stage:
+    """
+    One pipeline step.
+    
+    Args:
+        name: Unique stage name
+        func: Callable(PipelineContext) -> JSON-serializable result
+        depends: Names of upstream stages
+        retries: Extra attempts after a failure
+        retry_delay: Seconds between attempts
+    """
+    name: str
+    func: Callable[['PipelineContext'], Any]
+    depends: Sequence[str] = ()
+    retries: int = 0
+    retry_delay: float = 60.0
+
+
+@dataclass
+class PipelineContext:
+    """What a stage sees: the run key, shared params and upstream results."""
+    run_key: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    results: Dict[str, Any] = field(default_factory=dict)
+
+
+class Pipeline:
+    """
+    Runs stages in dependency order with checkpoints.
+    
+    Args:
+        stages: Stage definitions (any order)
+        checkpoint_dir: Directory for <run_key>.json checkpoints (None = no checkpoints)
+        max_workers: Parallel stage limit
+    """
+    
+    def __init__(self, stages: Iterable[Stage], checkpoint_dir: Optional[str] = None, max_workers: int = 4):
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage '{stage.name}'")
+            self.stages[stage.name] = stage
+        
+        for stage in self.stages.values():
+            unknown = [d for d in stage.depends if d not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stages {unknown}")
+        
+        self.order = self._topological_order()
+        self.checkpoint_dir = checkpoint_dir
+        self.max_workers = max_workers
+    
+    def _topological_order(self) -> List[str]:
+        order: List[str] = []
+        state: Dict[str, int] = {}
+        
+        def visit(name: str, path: List[str]) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Pipeline has a cycle: {' -> '.join(path + [name])}")
+            state[name] = 1
+            for upstream in self.stages[name].depends:
+                visit(upstream, path + [name])
+            state[name] = 2
+            order.append(name)
+        
+        for name in self.stages:
+            visit(name, [])
+        return order
+    
+    def downstream(self, names: Iterable[str]) -> Set[str]:
+        """The given stages plus everything that (transitively) depends on them."""
+        selected = set(names)
+        for name in self.order:
+            if any(d in selected for d in self.stages[name].depends):
+                selected.add(name)
+        return selected
+    
+    def _checkpoint_path(self, run_key: str) -> Optional[str]:
+        if not self.checkpoint_dir:
+            return None
+        return os.path.join(self.checkpoint_dir, f"{run_key}.json")
+    
+    def load_checkpoint(self, run_key: str) -> Dict[str, Any]:
+        """Stage records of a previous run ({} if none)."""
+        path = self._checkpoint_path(run_key)
+        if not path or not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f).get('stages', {})
+    
+    def _save_checkpoint(self, run_key: str, records: Dict[str, Any]) -> None:
+        path = self._checkpoint_path(run_key)
+        if not path:
+            return
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump({'run_key': run_key, 'stages': records}, f, indent=2, default=str)
+        os.replace(tmp, path)
+    
+    def run(
+        self,
+        run_key: str,
+        params: Optional[Dict[str, Any]] = None,
+        force: Iterable[str] = (),
+        only: Optional[Iterable[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run the pipeline for one key (e.g. the session date).
+        
+        Args:
+            run_key: Checkpoint key
+            params: Shared parameters exposed as context.params
+            force: Stages to rerun even if checkpointed (their downstream reruns too)
+            only: Restrict the run to these stages (upstream results come from the checkpoint;
+                a stage whose upstream was never checkpointed is skipped)
+        
+        Returns:
+            {'run_key', 'status', 'elapsed_s', 'stages': {name: record}}
+        """
+        lock_file = None
+        if self.checkpoint_dir:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            lock_file = open(os.path.join(self.checkpoint_dir, f"{run_key}.lock"), 'w')
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                raise RuntimeError(f"Pipeline run '{run_key}' is already in progress")
+        
+        try:
+            return self._run(run_key, params or {}, set(force), set(only) if only is not None else None)
+        finally:
+            if lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                lock_file.close()
+    
+    def _run(self, run_key: str, params: Dict[str, Any], force: Set[str],
+             only: Optional[Set[str]]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        records = self.load_checkpoint(run_key)
+        for record in records.values():
+            record.pop('cached', None)
+        rerun = self.downstream(force)
+        context = PipelineContext(run_key, params)
+        
+        done: Set[str] = set()
+        unavailable: Set[str] = set()  # Left out by `only` and never checkpointed: no result
+        pending: List[str] = []
+        for name in self.order:
+            record = records.get(name)
+            checkpointed = record and record['status'] == SUCCESS and name not in rerun
+            if checkpointed:
+                context.results[name] = record.get('result')
+                record['cached'] = True
+                done.add(name)
+            elif only is not None and name not in only:
+                unavailable.add(name)
+            else:
+                pending.append(name)
+        
+        for name in pending:
+            records.pop(name, None)
+        
+        running: Dict[Future, str] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                for name in list(pending):
+                    upstream = self.stages[name].depends
+                    blocked = [d for d in upstream if records.get(d, {}).get('status') in (FAILED, SKIPPED)]
+                    absent = [d for d in upstream if d in unavailable]
+                    if blocked or absent:
+                        pending.remove(name)
+                        reason = f"upstream {blocked} did not succeed" if blocked else f"upstream {absent} not checkpointed"
+                        records[name] = {'status': SKIPPED, 'reason': reason}
+                        done.add(name)
+                        self._save_checkpoint(run_key, records)
+                    elif all(d in done for d in upstream):
+                        pending.remove(name)
+                        running[executor.submit(self._execute, self.stages[name], context)] = name
+                
+                if not running:
+                    continue
+                
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    records[name] = record = future.result()
+                    if record['status'] == SUCCESS:
+                        context.results[name] = record.get('result')
+                    self._save_checkpoint(run_key, records)
+                    done.add(name)
+        
+        statuses = {r['status'] for r in records.values()}
+        return {
+            'run_key': run_key,
+            'status': FAILED if FAILED in statuses or SKIPPED in statuses else SUCCESS,
+            'elapsed_s': round(time.perf_counter() - started, 3),
+            'stages': {name: records[name] for name in self.order if name in records}
+        }
+    
+    @staticmethod
+    def _execute(stage: Stage, context: PipelineContext) -> Dict[str, Any]:
+        started_at = datetime.now().isoformat(timespec='seconds')
+        start = time.perf_counter()
+        
+        for attempt in range(1, stage.retries + 2):
+            try:
+                result = stage.func(context)
+                return {
+                    'status': SUCCESS,
+                    'started_at': started_at,
+                    'duration_s': round(time.perf_counter() - start, 3),
+                    'attempts': attempt,
+                    'result': result
+                }
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                if attempt <= stage.retries:
+                    time.sleep(stage.retry_delay)
+        
+        return {
+            'status': FAILED,
+            'started_at': started_at,
+            'duration_s': round(time.perf_counter() - start, 3),
+            'attempts': attempt,
+            'error': error
+        }
@@ -0,0 +1,381 @@
+"""
+SQL query profiler.
+
+SQLAlchemy cursor events time every statement on every engine. Each
+statement is reduced to a fingerprint (literals, bind parameters, IN lists
+and multi-row VALUES collapsed), so `WHERE symbol = 'THYAO'` and
+`WHERE symbol = 'ASELS'` aggregate together.
+
+- Per scope (one Flask request, or a `with profile_queries()` block in a
+  script): every statement with duration and row count; fingerprints run
+  N_PLUS_ONE_THRESHOLD+ times in one scope are flagged as N+1 patterns
+- Process-wide: count / total / max time / rows per fingerprint, served
+  by GET /api/admin/queries
+- Statements slower than SQL_SLOW_MS go to the 'bist.sql' logger, with
+  their EXPLAIN plan when SQL_EXPLAIN_SLOW=true; plans are also available
+  on demand through the admin endpoint
+
+Durations cover cursor.execute(); with psycopg2 that includes receiving
+the result set, with lazily-fetching drivers (SQLite) it does not.
+
+Usage:
+    install_query_profiler()                    # once per process (create_app does it)
+    with profile_queries() as scope:
+        update_performance()
+    scope.report()['n_plus_one']
+"""
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('bist.sql')
+
+# Statements kept per scope and fingerprints kept per process
+MAX_SCOPE_STATEMENTS = 500
+MAX_FINGERPRINTS = 2000
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAM = re.compile(r"%\(\w+\)s|%s|\$\d+|\?|(?<![:\w]):\w+")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_ROW = r"\(\s*\?(?:\s*,\s*\?)*\s*\)"
+_VALUES = re.compile(rf"\bVALUES\s*{_ROW}(?:\s*,\s*{_ROW})+", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+
+def normalize_sql(statement: str) -> str:
+    """Statement with literals and parameters replaced by '?' and lists collapsed."""
+    sql = _STRING.sub('?', statement)
+    sql = _PARAM.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (?...)', sql)
+    sql = _VALUES.sub('VALUES (?...)...', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def fingerprint_id(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+@dataclass
+class QueryRecord:
+    """One executed statement."""
+    fingerprint: str
+    sql: str
+    duration_ms: float
+    rows: int
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'fingerprint': self.fingerprint,
+            'sql': self.sql,
+            'duration_ms': round(self.duration_ms, 3),
+            'rows': self.rows
+        }
+
+
+@dataclass
+class FingerprintStats:
+    """Process-wide aggregate for one fingerprint."""
+    fingerprint: str
+    sql: str
+    sample: str
+    sample_params: Any = None
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    rows: int = 0
+    slow: int = 0
+    n_plus_one: int = 0
+    last_seen: Optional[str] = None
+    endpoints: Dict[str, int] = field(default_factory=dict)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'fingerprint': self.fingerprint,
+            'sql': self.sql,
+            'count': self.count,
+            'total_ms': round(self.total_ms, 3),
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else None,
+            'max_ms': round(self.max_ms, 3),
+            'rows': self.rows,
+            'slow': self.slow,
+            'n_plus_one': self.n_plus_one,
+            'last_seen': self.last_seen,
+            'endpoints': dict(sorted(self.endpoints.items(), key=lambda kv: -kv[1])[:10])
+        }
+
+
+class QueryScope:
+    """Statements executed inside one request or profile_queries() block."""
+    
+    def __init__(self, label: str = ''):
+        self.label = label
+        self.records: List[QueryRecord] = []
+        self.counts: Dict[str, int] = {}
+        self.statements = 0
+        self.total_ms = 0.0
+        self.started = time.perf_counter()
+    
+    def add(self, record: QueryRecord) -> None:
+        self.statements += 1
+        self.total_ms += record.duration_ms
+        self.counts[record.fingerprint] = self.counts.get(record.fingerprint, 0) + 1
+        if len(self.records) < MAX_SCOPE_STATEMENTS:
+            self.records.append(record)
+    
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """Fingerprints run at least `threshold` times (N+1 candidates)."""
+        return {fp: n for fp, n in self.counts.items() if n >= threshold}
+    
+    def report(self, threshold: Optional[int] = None) -> Dict[str, Any]:
+        threshold = threshold or get_query_profiler().n_plus_one_threshold
+        sql = {record.fingerprint: record.sql for record in self.records}
+        return {
+            'label': self.label,
+            'statements': self.statements,
+            'total_ms': round(self.total_ms, 3),
+            'elapsed_ms': round((time.perf_counter() - self.started) * 1000, 3),
+            'n_plus_one': [
+                {'fingerprint': fp, 'count': n, 'sql': sql.get(fp)}
+                for fp, n in sorted(self.repeated(threshold).items(), key=lambda kv: -kv[1])
+            ],
+            'queries': [record.to_dict() for record in self.records]
+        }
+
+
+_scope: ContextVar[Optional[QueryScope]] = ContextVar('query_scope', default=None)
+_suppressed: ContextVar[bool] = ContextVar('query_profiler_suppressed', default=False)
+
+
+class QueryProfiler:
+    """
+    Process-wide statement statistics fed by SQLAlchemy cursor events.
+    
+    Args:
+        slow_ms: Statements at or above this duration are logged
+        explain_slow: Log the EXPLAIN plan of slow SELECTs
+        n_plus_one_threshold: Same fingerprint this many times in one scope = N+1
+    """
+    
+    def __init__(self, slow_ms: float = 200.0, explain_slow: bool = False, n_plus_one_threshold: int = 10):
+        self.slow_ms = slow_ms
+        self.explain_slow = explain_slow
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.stats: Dict[str, FingerprintStats] = {}
+        self.incidents: Deque[Dict[str, Any]] = deque(maxlen=100)
+        self.dropped = 0
+        self.since = datetime.now().isoformat(timespec='seconds')
+        self._lock = threading.Lock()
+    
+    def record(self, conn, statement: str, parameters: Any, duration_ms: float, rows: int) -> None:
+        normalized = normalize_sql(statement)
+        fp = fingerprint_id(normalized)
+        scope = _scope.get()
+        slow = duration_ms >= self.slow_ms
+        
+        with self._lock:
+            stats = self.stats.get(fp)
+            if stats is None:
+                if len(self.stats) >= MAX_FINGERPRINTS:
+                    self.dropped += 1
+                else:
+                    stats = self.stats[fp] = FingerprintStats(fp, normalized, statement)
+            if stats is not None:
+                stats.count += 1
+                stats.total_ms += duration_ms
+                stats.max_ms = max(stats.max_ms, duration_ms)
+                stats.rows += max(rows, 0)
+                stats.last_seen = datetime.now().isoformat(timespec='seconds')
+                if scope and scope.label:
+                    stats.endpoints[scope.label] = stats.endpoints.get(scope.label, 0) + 1
+                if slow or stats.sample_params is None:
+                    # Keep the slowest-looking sample for on-demand EXPLAIN
+                    stats.sample, stats.sample_params = statement, parameters
+                if slow:
+                    stats.slow += 1
+        
+        if scope is not None:
+            scope.add(QueryRecord(fp, normalized, duration_ms, rows))
+        
+        if slow:
+            where = f" [{scope.label}]" if scope and scope.label else ''
+            logger.warning(f"Slow query {duration_ms:.1f} ms{where} ({fp}): {normalized[:500]}")
+            if self.explain_slow and _EXPLAINABLE.match(statement):
+                try:
+                    plan = explain_statement(conn.engine, statement, parameters)
+                    logger.warning(f"EXPLAIN {fp}:\n" + '\n'.join(plan))
+                except Exception as e:
+                    logger.warning(f"EXPLAIN {fp} failed: {e}")
+    
+    def finish_scope(self, scope: QueryScope) -> Dict[str, int]:
+        """Flag N+1 fingerprints of a finished scope; returns them."""
+        repeated = scope.repeated(self.n_plus_one_threshold)
+        if not repeated:
+            return repeated
+        
+        with self._lock:
+            for fp, n in repeated.items():
+                if fp in self.stats:
+                    self.stats[fp].n_plus_one += 1
+                self.incidents.append({
+                    'at': datetime.now().isoformat(timespec='seconds'),
+                    'scope': scope.label,
+                    'fingerprint': fp,
+                    'count': n
+                })
+        for fp, n in repeated.items():
+            sql = self.stats[fp].sql if fp in self.stats else ''
+            logger.warning(f"N+1 suspect{f' [{scope.label}]' if scope.label else ''}: "
+                           f"{n}x ({fp}) {sql[:300]}")
+        return repeated
+    
+    def top(self, limit: int = 20, sort: str = 'total_ms') -> List[Dict[str, Any]]:
+        """Fingerprints ordered by total_ms, count, max_ms, slow or n_plus_one (descending)."""
+        with self._lock:
+            rows = [stats.to_dict() for stats in self.stats.values()]
+        return sorted(rows, key=lambda row: row.get(sort) or 0, reverse=True)[:limit]
+    
+    def get(self, fp: str) -> Optional[FingerprintStats]:
+        with self._lock:
+            return self.stats.get(fp)
+    
+    def reset(self) -> None:
+        with self._lock:
+            self.stats.clear()
+            self.incidents.clear()
+            self.dropped = 0
+            self.since = datetime.now().isoformat(timespec='seconds')
+
+
+def explain_statement(engine: Engine, statement: str, parameters: Any = None,
+                      analyze: bool = False) -> List[str]:
+    """
+    EXPLAIN plan lines of a SELECT/WITH statement (never run for writes).
+    
+    Args:
+        engine: Engine to run EXPLAIN on
+        statement: SQL as sent to the driver
+        parameters: Driver parameters of the statement
+        analyze: EXPLAIN ANALYZE on PostgreSQL (executes the query)
+    """
+    if not _EXPLAINABLE.match(statement):
+        raise ValueError("Only SELECT/WITH statements can be explained")
+    
+    if engine.dialect.name == 'postgresql':
+        prefix = 'EXPLAIN (ANALYZE, BUFFERS) ' if analyze else 'EXPLAIN '
+    elif engine.dialect.name == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN '
+    else:
+        prefix = 'EXPLAIN '
+    
+    token = _suppressed.set(True)
+    try:
+        with engine.connect() as conn:
+            rows = conn.exec_driver_sql(prefix + statement, parameters or ()).fetchall()
+    finally:
+        _suppressed.reset(token)
+    return [' | '.join(str(value) for value in row) for row in rows]
+
+
+_profiler: Optional[QueryProfiler] = None
+_install_lock = threading.Lock()
+
+
+def get_query_profiler() -> QueryProfiler:
+    """Process-wide profiler configured from SQL_SLOW_MS / SQL_EXPLAIN_SLOW / SQL_N_PLUS_ONE."""
+    global _profiler
+    if _profiler is None:
+        with _install_lock:
+            if _profiler is None:
+                from backend.core.config import SQL_EXPLAIN_SLOW, SQL_N_PLUS_ONE, SQL_SLOW_MS
+                _profiler = QueryProfiler(SQL_SLOW_MS, SQL_EXPLAIN_SLOW, SQL_N_PLUS_ONE)
+    return _profiler
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_start')
+    if not starts:
+        return
+    duration_ms = (time.perf_counter() - starts.pop()) * 1000
+    if _suppressed.get():
+        return
+    try:
+        rows = cursor.rowcount if cursor.rowcount is not None else -1
+        get_query_profiler().record(conn, statement, parameters, duration_ms, rows)
+    except Exception as e:
+        # Profiling must never break a query
+        logger.debug(f"Query profiler error: {e}")
+
+
+def install_query_profiler() -> QueryProfiler:
+    """Listen to cursor events of every engine in this process (idempotent)."""
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    return get_query_profiler()
+
+
+@contextmanager
+def profile_queries(label: str = '') -> Iterator[QueryScope]:
+    """Collect the statements of the enclosed block into a QueryScope (and flag N+1 on exit)."""
+    install_query_profiler()
+    scope = QueryScope(label)
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+        get_query_profiler().finish_scope(scope)
+
+
+def init_app(app) -> None:
+    """
+    Profile every request of a Flask app.
+    
+    Adds Server-Timing (db time) and X-Query-Count headers to responses.
+    """
+    from flask import g, request
+    
+    install_query_profiler()
+    
+    @app.before_request
+    def _start_query_scope():
+        scope = QueryScope(f"{request.method} {request.url_rule.rule if request.url_rule else request.path}")
+        g.query_scope = (scope, _scope.set(scope))
+    
+    @app.after_request
+    def _query_headers(response):
+        scope, _ = g.get('query_scope', (None, None))
+        if scope is not None:
+            response.headers['X-Query-Count'] = str(scope.statements)
+            response.headers['Server-Timing'] = f'db;dur={scope.total_ms:.1f};desc="{scope.statements} queries"'
+        return response
+    
+    @app.teardown_request
+    def _finish_query_scope(exc):
+        scope, token = g.pop('query_scope', (None, None))
+        if scope is None:
+            return
+        try:
+            _scope.reset(token)
+        except ValueError:
+            # Streamed responses finish in another context
+            pass
+        get_query_profiler().finish_scope(scope)
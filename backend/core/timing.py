@@ -0,0 +1,230 @@
+"""
+Latency measurement primitives.
+
+- LatencyHistogram: fixed log-scale buckets (ms), cheap to record into and
+  to merge, with bucket-interpolated percentiles
+- StageRecorder: named stage histograms plus throughput counters, used by
+  the replay harness to profile scan -> save -> notify runs
+- recording()/span(): make a recorder active for the current context so
+  code deep in the call stack (strategies, loaders) can add spans without
+  having the recorder passed in; spans are no-ops when nothing records
+"""
+import bisect
+import heapq
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class LatencyHistogram:
+    """
+    Latency histogram with fixed bucket upper bounds in milliseconds.
+    
+    Bounds double from 0.05 ms to ~26 s; the last bucket is open-ended.
+    
+    Usage:
+        hist = LatencyHistogram()
+        hist.record(12.5)
+        hist.percentile(99)
+    """
+    
+    BOUNDS: List[float] = [0.05 * 2 ** i for i in range(20)]
+    
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+    
+    def record(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(self.BOUNDS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.min = ms if self.min is None else min(self.min, ms)
+        self.max = ms if self.max is None else max(self.max, ms)
+    
+    def merge(self, other: 'LatencyHistogram') -> None:
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        for attr, pick in (('min', min), ('max', max)):
+            values = [v for v in (getattr(self, attr), getattr(other, attr)) if v is not None]
+            setattr(self, attr, pick(values) if values else None)
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Estimated q-th percentile (linear within the bucket, clamped to min/max).
+        
+        Args:
+            q: Percentile in [0, 100]
+        
+        Returns:
+            Milliseconds, or None if nothing was recorded
+        """
+        if not self.count:
+            return None
+        
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.BOUNDS[i - 1] if i > 0 else 0.0
+                upper = self.BOUNDS[i] if i < len(self.BOUNDS) else self.max
+                value = lower + (upper - lower) * max(rank - seen, 0) / n
+                return min(max(value, self.min), self.max)
+            seen += n
+        return self.max
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary plus non-empty buckets as {"le_<bound>": count}."""
+        def ms(value):
+            return round(value, 3) if value is not None else None
+        
+        buckets = {}
+        for i, n in enumerate(self.counts):
+            if n:
+                label = f"le_{self.BOUNDS[i]:g}" if i < len(self.BOUNDS) else 'le_inf'
+                buckets[label] = n
+        
+        return {
+            'count': self.count,
+            'total_ms': ms(self.total),
+            'mean_ms': ms(self.total / self.count) if self.count else None,
+            'min_ms': ms(self.min),
+            'p50_ms': ms(self.percentile(50)),
+            'p90_ms': ms(self.percentile(90)),
+            'p99_ms': ms(self.percentile(99)),
+            'max_ms': ms(self.max),
+            'buckets': buckets
+        }
+
+
+class StageRecorder:
+    """
+    Per-stage latency histograms and throughput counters.
+    
+    Usage:
+        recorder = StageRecorder()
+        with recorder.stage('scan'):
+            run_scan()
+        recorder.count('signals', 38)
+        report = recorder.report()
+    """
+    
+    # Slowest items (e.g. symbols) kept per stage
+    SLOWEST = 10
+    
+    def __init__(self):
+        self.stages: Dict[str, LatencyHistogram] = {}
+        self.counters: Dict[str, int] = {}
+        self.slowest: Dict[str, List[Tuple[float, str]]] = {}
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+    
+    def record(self, stage: str, ms: float, item: Optional[str] = None) -> None:
+        """Record a duration; with `item`, also keep it if it is among the stage's slowest."""
+        with self._lock:
+            self.stages.setdefault(stage, LatencyHistogram()).record(ms)
+            if item is not None:
+                heap = self.slowest.setdefault(stage, [])
+                if len(heap) < self.SLOWEST:
+                    heapq.heappush(heap, (ms, item))
+                elif ms > heap[0][0]:
+                    heapq.heapreplace(heap, (ms, item))
+    
+    @contextmanager
+    def stage(self, name: str, item: Optional[str] = None) -> Iterator[None]:
+        """Time the enclosed block into the `name` histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000, item)
+    
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+    
+    def report(self) -> Dict[str, Any]:
+        """Elapsed time, counters, per-second throughput and stage histograms."""
+        elapsed = time.perf_counter() - self.started
+        return {
+            'elapsed_s': round(elapsed, 3),
+            'counters': dict(self.counters),
+            'throughput_per_s': {
+                name: round(n / elapsed, 2) if elapsed > 0 else None
+                for name, n in self.counters.items()
+            },
+            'stages': {name: hist.to_dict() for name, hist in self.stages.items()}
+        }
+    
+    def summary(self) -> Dict[str, Any]:
+        """Compact report for API responses: stage totals and percentiles, counters, slowest items."""
+        def ms(value):
+            return round(value, 3) if value is not None else None
+        
+        with self._lock:
+            stages = {
+                name: {
+                    'count': hist.count,
+                    'total_ms': ms(hist.total),
+                    'p50_ms': ms(hist.percentile(50)),
+                    'p99_ms': ms(hist.percentile(99)),
+                    'max_ms': ms(hist.max)
+                }
+                for name, hist in self.stages.items()
+            }
+            slowest = {
+                name: [{'item': item, 'ms': ms(value)} for value, item in sorted(heap, reverse=True)]
+                for name, heap in self.slowest.items()
+            }
+        
+        return {
+            'elapsed_ms': ms((time.perf_counter() - self.started) * 1000),
+            'stages': stages,
+            'counters': dict(self.counters),
+            'slowest': slowest
+        }
+
+
+_active: ContextVar[Optional[StageRecorder]] = ContextVar('active_stage_recorder', default=None)
+
+
+@contextmanager
+def recording(recorder: Optional[StageRecorder] = None) -> Iterator[StageRecorder]:
+    """
+    Make `recorder` (or a new one) the target of span()/count() in this context.
+    
+    Usage:
+        with recording() as recorder:
+            with span('load'):
+                df = load()
+        recorder.summary()
+    """
+    recorder = recorder or StageRecorder()
+    token = _active.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def span(name: str, item: Optional[str] = None) -> Iterator[None]:
+    """Time the block into the active recorder's `name` stage (no-op without one)."""
+    recorder = _active.get()
+    if recorder is None:
+        yield
+        return
+    with recorder.stage(name, item):
+        yield
+
+
+def count(name: str, n: int = 1) -> None:
+    """Add to a counter of the active recorder (no-op without one)."""
+    recorder = _active.get()
+    if recorder is not None:
+        recorder.count(name, n)
@@ -5,12 +5,14 @@ from flask import Flask, jsonify
 from flask_cors import CORS
 import os
 
-# Import blueprints
-from backend.modules.screener.routes import screener_bp
-from backend.modules.market_data.routes import market_data_bp
-
 def create_app():
     """Application factory pattern."""
+    # Blueprints are imported here so importing this module stays cheap
+    from backend.modules.screener.routes import screener_bp
+    from backend.modules.market_data.routes import market_data_bp
+    from backend.modules.admin.routes import admin_bp
+    from backend.core import query_profiler
+    
     app = Flask(__name__)
     
     # CORS configuration
@@ -29,6 +31,10 @@ def create_app():
     # Register blueprints
     app.register_blueprint(screener_bp)
     app.register_blueprint(market_data_bp)
+    app.register_blueprint(admin_bp)
+    
+    # Per-request SQL statistics, slow-query log and N+1 detection
+    query_profiler.init_app(app)
     
     # Health check endpoint
     @app.route('/api/health', methods=['GET'])
@@ -40,6 +46,14 @@ def create_app():
             'version': '1.0.0'
         }), 200
     
+    # Prometheus metrics endpoint
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """Scan and update timings in Prometheus text format."""
+        from backend.core.metrics import render_prometheus
+        
+        return render_prometheus(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+    
     # Root endpoint
     @app.route('/', methods=['GET'])
     def root():
@@ -49,6 +63,7 @@ def create_app():
             'version': '1.0.0',
             'endpoints': {
                 'health': '/api/health',
+                'metrics': '/metrics',
                 'screener': '/api/screener/*',
                 'market_data': '/api/market-data/*'
             }
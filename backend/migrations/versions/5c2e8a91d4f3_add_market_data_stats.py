@@ -0,0 +1,39 @@
+"""add_market_data_stats
+
+Revision ID: 5c2e8a91d4f3
+Revises: 07b4f1e3a6d6
+Create Date: 2025-12-15 10:42:18.114305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e8a91d4f3'
+down_revision: Union[str, None] = '07b4f1e3a6d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Single-row table kept up to date by the updater instead of COUNT(*) per request
+    op.create_table('market_data_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('data_points', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('latest_date', sa.DateTime(), nullable=True),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.PrimaryKeyConstraint('id')
+    )
+    
+    # Backfill from the existing history (one-time full count)
+    op.execute("""
+        INSERT INTO market_data_stats (id, data_points, latest_date, version)
+        SELECT 1, COUNT(*), MAX(date), 1 FROM market_data
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('market_data_stats')
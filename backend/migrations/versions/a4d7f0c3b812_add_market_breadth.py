@@ -0,0 +1,40 @@
+"""add_market_breadth
+
+Revision ID: a4d7f0c3b812
+Revises: 5c2e8a91d4f3
+Create Date: 2025-12-16 21:05:47.530912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d7f0c3b812'
+down_revision: Union[str, None] = '5c2e8a91d4f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('market_breadth',
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('symbols', sa.Integer(), nullable=False),
+        sa.Column('advancing', sa.Integer(), nullable=False),
+        sa.Column('declining', sa.Integer(), nullable=False),
+        sa.Column('unchanged', sa.Integer(), nullable=False),
+        sa.Column('ad_line', sa.Integer(), nullable=True),
+        sa.Column('above_ema50', sa.Integer(), nullable=True),
+        sa.Column('pct_above_ema50', sa.Numeric(precision=5, scale=2), nullable=True),
+        sa.Column('new_highs', sa.Integer(), nullable=True),
+        sa.Column('new_lows', sa.Integer(), nullable=True),
+        sa.Column('avg_adx', sa.Numeric(precision=5, scale=2), nullable=True),
+        sa.Column('avg_rsi', sa.Numeric(precision=5, scale=2), nullable=True),
+        sa.Column('computed_at', sa.DateTime(), nullable=True, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.PrimaryKeyConstraint('date')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('market_breadth')
@@ -0,0 +1,30 @@
+"""add_universe_membership
+
+Revision ID: a6c94e1f7d23
+Revises: f3a8d61c2b94
+Create Date: 2025-12-22 16:48:03.215977
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c94e1f7d23'
+down_revision: Union[str, None] = 'f3a8d61c2b94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('universe_membership',
+        sa.Column('symbol', sa.String(length=20), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('end_date', sa.Date(), nullable=True),
+        sa.PrimaryKeyConstraint('symbol', 'start_date')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('universe_membership')
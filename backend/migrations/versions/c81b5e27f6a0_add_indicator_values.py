@@ -0,0 +1,33 @@
+"""add_indicator_values
+
+Revision ID: c81b5e27f6a0
+Revises: a4d7f0c3b812
+Create Date: 2025-12-17 23:18:02.947116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81b5e27f6a0'
+down_revision: Union[str, None] = 'a4d7f0c3b812'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('indicator_values',
+        sa.Column('symbol', sa.String(length=20), nullable=False),
+        sa.Column('indicator', sa.String(length=100), nullable=False),
+        sa.Column('date', sa.DateTime(), nullable=False),
+        sa.Column('value', sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint('symbol', 'indicator', 'date')
+    )
+    op.create_index('idx_indicator_values_indicator_date', 'indicator_values', ['indicator', 'date'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_indicator_values_indicator_date', table_name='indicator_values')
+    op.drop_table('indicator_values')
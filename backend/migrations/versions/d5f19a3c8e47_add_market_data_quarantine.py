@@ -0,0 +1,35 @@
+"""add_market_data_quarantine
+
+Revision ID: d5f19a3c8e47
+Revises: c81b5e27f6a0
+Create Date: 2025-12-19 21:42:10.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f19a3c8e47'
+down_revision: Union[str, None] = 'c81b5e27f6a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('market_data_quarantine',
+        sa.Column('symbol', sa.String(length=20), nullable=False),
+        sa.Column('date', sa.DateTime(), nullable=False),
+        sa.Column('rule', sa.String(length=30), nullable=False),
+        sa.Column('severity', sa.String(length=10), nullable=False),
+        sa.Column('value', sa.Float(), nullable=True),
+        sa.Column('detected_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('symbol', 'date', 'rule')
+    )
+    op.create_index('idx_quarantine_date', 'market_data_quarantine', ['date'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_quarantine_date', table_name='market_data_quarantine')
+    op.drop_table('market_data_quarantine')
@@ -0,0 +1,52 @@
+"""add_corporate_actions
+
+Revision ID: e2b7c40d9f15
+Revises: d5f19a3c8e47
+Create Date: 2025-12-21 14:05:37.582913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7c40d9f15'
+down_revision: Union[str, None] = 'd5f19a3c8e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('corporate_actions',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('symbol', sa.String(length=20), nullable=False),
+        sa.Column('ex_date', sa.Date(), nullable=False),
+        sa.Column('action_type', sa.String(length=20), nullable=False),
+        sa.Column('ratio', sa.Float(), nullable=True),
+        sa.Column('amount', sa.Float(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('source', sa.String(length=20), nullable=False),
+        sa.Column('note', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('symbol', 'ex_date', 'action_type', name='uq_corporate_actions')
+    )
+    op.create_index('idx_corporate_actions_status', 'corporate_actions', ['status'])
+    op.create_table('adjustment_factors',
+        sa.Column('symbol', sa.String(length=20), nullable=False),
+        sa.Column('ex_date', sa.Date(), nullable=False),
+        sa.Column('price_factor', sa.Float(), nullable=False),
+        sa.Column('volume_factor', sa.Float(), nullable=False),
+        sa.Column('cum_price_factor', sa.Float(), nullable=False),
+        sa.Column('cum_volume_factor', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('symbol', 'ex_date')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('adjustment_factors')
+    op.drop_index('idx_corporate_actions_status', table_name='corporate_actions')
+    op.drop_table('corporate_actions')
@@ -0,0 +1,38 @@
+"""add_ticker_changes
+
+Revision ID: f3a8d61c2b94
+Revises: e2b7c40d9f15
+Create Date: 2025-12-22 09:31:12.760354
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a8d61c2b94'
+down_revision: Union[str, None] = 'e2b7c40d9f15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('ticker_changes',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('symbol', sa.String(length=20), nullable=False),
+        sa.Column('change_type', sa.String(length=20), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=True),
+        sa.Column('type', sa.String(length=50), nullable=True),
+        sa.Column('detail', sa.String(length=255), nullable=True),
+        sa.Column('changed_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_ticker_changes_symbol', 'ticker_changes', ['symbol', 'changed_at'])
+    op.create_index('idx_ticker_changes_changed_at', 'ticker_changes', ['changed_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_ticker_changes_changed_at', table_name='ticker_changes')
+    op.drop_index('idx_ticker_changes_symbol', table_name='ticker_changes')
+    op.drop_table('ticker_changes')
@@ -0,0 +1,203 @@
+"""
+REST API routes for operators (query profiler, corporate actions).
+
+Every endpoint requires the X-Admin-Token header to match ADMIN_TOKEN;
+without ADMIN_TOKEN configured the endpoints answer 404.
+"""
+from flask import Blueprint, jsonify, request
+from datetime import date
+from typing import Literal, Optional
+from pydantic import BaseModel, Field, ValidationError
+import hmac
+import traceback
+
+from backend.core.config import ADMIN_TOKEN
+from backend.core.query_profiler import explain_statement, get_query_profiler
+
+SORT_KEYS = ('total_ms', 'count', 'max_ms', 'mean_ms', 'slow', 'n_plus_one', 'rows')
+
+
+class CorporateActionRequest(BaseModel):
+    """Request model for POST /api/admin/corporate-actions"""
+    symbol: str = Field(..., min_length=1, max_length=20)
+    ex_date: date
+    action_type: Literal['split', 'bonus', 'rights', 'dividend']
+    ratio: Optional[float] = Field(default=None, gt=0, description="Shares after / shares before")
+    amount: Optional[float] = Field(default=None, ge=0, description="Subscription price or cash per share (TL)")
+    status: Literal['confirmed', 'suggested'] = 'confirmed'
+    note: Optional[str] = Field(default=None, max_length=255)
+
+
+class ActionStatusRequest(BaseModel):
+    """Request model for POST /api/admin/corporate-actions/<id>/status"""
+    status: Literal['confirmed', 'suggested', 'rejected']
+
+# Create blueprint
+admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
+
+
+@admin_bp.before_request
+def require_admin_token():
+    if not ADMIN_TOKEN:
+        return jsonify({'error': 'Not found'}), 404
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+        return jsonify({'error': 'Forbidden'}), 403
+    return None
+
+
+@admin_bp.route('/queries', methods=['GET'])
+def list_queries():
+    """
+    Top query fingerprints of this process.
+    
+    GET /api/admin/queries?sort=total_ms&limit=20
+    
+    Query params:
+        sort: total_ms (default), count, max_ms, mean_ms, slow, n_plus_one, rows
+        limit: Number of fingerprints (default: 20, max: 200)
+    
+    Returns:
+        {
+            "since": "2025-12-12T10:00:00",
+            "slow_ms": 200.0,
+            "n_plus_one_threshold": 10,
+            "fingerprints": [{"fingerprint": "3f2a...", "sql": "SELECT ... WHERE symbol = ?",
+                              "count": 1200, "total_ms": 5400.2, "max_ms": 80.1, ...}],
+            "n_plus_one_incidents": [{"at": "...", "scope": "GET /api/screener/signals",
+                                      "fingerprint": "3f2a...", "count": 50}]
+        }
+    """
+    sort = request.args.get('sort', 'total_ms', type=str)
+    if sort not in SORT_KEYS:
+        return jsonify({'error': f"sort must be one of {list(SORT_KEYS)}"}), 400
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 200)
+    
+    profiler = get_query_profiler()
+    return jsonify({
+        'since': profiler.since,
+        'slow_ms': profiler.slow_ms,
+        'n_plus_one_threshold': profiler.n_plus_one_threshold,
+        'fingerprints_tracked': len(profiler.stats),
+        'fingerprints_dropped': profiler.dropped,
+        'fingerprints': profiler.top(limit, sort),
+        'n_plus_one_incidents': list(profiler.incidents)[::-1]
+    }), 200
+
+
+@admin_bp.route('/queries/<fingerprint>', methods=['GET'])
+def get_query(fingerprint: str):
+    """
+    One fingerprint, optionally with the EXPLAIN plan of its sample statement.
+    
+    GET /api/admin/queries/3f2a9c01d4e5?explain=1&analyze=0
+    
+    Query params:
+        explain: 1 to run EXPLAIN on the sample (SELECT/WITH only)
+        analyze: 1 for EXPLAIN ANALYZE on PostgreSQL (runs the query)
+    """
+    stats = get_query_profiler().get(fingerprint)
+    if stats is None:
+        return jsonify({'error': f'Fingerprint "{fingerprint}" not found'}), 404
+    
+    result = {**stats.to_dict(), 'sample': stats.sample}
+    if request.args.get('explain', 0, type=int):
+        from backend.core.database import engine
+        
+        try:
+            result['plan'] = explain_statement(engine, stats.sample, stats.sample_params,
+                                               analyze=bool(request.args.get('analyze', 0, type=int)))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        except Exception as e:
+            return jsonify({'error': 'EXPLAIN failed', 'details': str(e), 'traceback': traceback.format_exc()}), 500
+    
+    return jsonify(result), 200
+
+
+@admin_bp.route('/queries/reset', methods=['POST'])
+def reset_queries():
+    """Clear the collected statistics (POST /api/admin/queries/reset)."""
+    get_query_profiler().reset()
+    return jsonify({'message': 'Query statistics cleared'}), 200
+
+
+@admin_bp.route('/corporate-actions', methods=['GET'])
+def list_corporate_actions():
+    """
+    Recorded corporate actions, newest ex-date first.
+    
+    GET /api/admin/corporate-actions?symbol=THYAO&status=suggested
+    """
+    from backend.modules.market_data.corporate_actions import list_actions
+    
+    actions = list_actions(request.args.get('symbol', type=str), request.args.get('status', type=str))
+    return jsonify({'actions': actions, 'count': len(actions)}), 200
+
+
+@admin_bp.route('/corporate-actions', methods=['POST'])
+def create_corporate_action():
+    """
+    Record a corporate action; confirmed actions re-adjust the symbol right away.
+    
+    POST /api/admin/corporate-actions
+    Body:
+        {"symbol": "THYAO", "ex_date": "2025-06-10", "action_type": "bonus", "ratio": 2.0}
+    """
+    from backend.modules.market_data.corporate_actions import add_action
+    
+    try:
+        body = CorporateActionRequest(**(request.get_json(silent=True) or {}))
+    except ValidationError as e:
+        return jsonify({'error': 'Invalid request data', 'details': e.errors()}), 400
+    
+    try:
+        action = add_action(body.symbol, body.ex_date, body.action_type, body.ratio, body.amount,
+                            status=body.status, note=body.note)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
+    
+    return jsonify(action), 201
+
+
+@admin_bp.route('/corporate-actions/<int:action_id>/status', methods=['POST'])
+def set_corporate_action_status(action_id: int):
+    """
+    Confirm or reject an action (e.g. a detected suggestion).
+    
+    POST /api/admin/corporate-actions/12/status
+    Body:
+        {"status": "confirmed"}
+    """
+    from backend.modules.market_data.corporate_actions import set_status
+    
+    try:
+        body = ActionStatusRequest(**(request.get_json(silent=True) or {}))
+    except ValidationError as e:
+        return jsonify({'error': 'Invalid request data', 'details': e.errors()}), 400
+    
+    try:
+        action = set_status(action_id, body.status)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
+    
+    if action is None:
+        return jsonify({'error': f'Corporate action {action_id} not found'}), 404
+    return jsonify(action), 200
+
+
+@admin_bp.route('/corporate-actions/detect', methods=['POST'])
+def detect_corporate_actions():
+    """
+    Store gap-detected splits/bonus issues as suggestions.
+    
+    POST /api/admin/corporate-actions/detect?days=250
+    """
+    from backend.modules.market_data.corporate_actions import suggest_actions
+    
+    days = min(max(request.args.get('days', 250, type=int), 1), 3650)
+    suggested = suggest_actions(days)
+    return jsonify({'suggested': suggested, 'count': len(suggested)}), 200
@@ -0,0 +1,333 @@
+"""
+Walk-forward and purged k-fold evaluation of XTUMY V27 parameters.
+
+Each fold picks the best parameter set of a grid on its train sessions and
+reports how that choice did on its unseen test sessions, so the numbers are
+out-of-sample instead of fitted to all of history:
+
+    grid = parameter_grid({'pullPct': [1.0, 1.5, 2.0], 'volMult': [0.5, 0.8]})
+    report = evaluate(panel, grid, walk_forward_folds(len(sessions_of(panel)), 500, 60))
+
+A signal fired on session t is labelled with the symbol's forward gains
+after 1, 3 and 5 sessions (the 1d/3d/7d horizons of signal_performance), so
+a train label can reach into the test window: train sessions within `purge`
+sessions before a test window are dropped, and with k-fold also `embargo`
+sessions after it (their indicators saw the test bars, so the embargo
+defaults to the longest indicator lookback of the grid, see max_lookback()).
+
+All indicators are causal, so one IndicatorContext over the full history
+serves every fold: indicators are computed once, signals once per parameter
+set (XTUMYV27Strategy.signal_history) and folds only slice the results.
+
+Usage:
+    python scripts/walk_forward.py --grid pullPct=1,1.5,2 --grid volMult=0.5,0.8
+"""
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from backend.modules.market_data.panel import SymbolPanel
+from backend.modules.screener import indicators
+from backend.modules.screener.strategies.xtumy_v27 import (
+    SIGNAL_TYPES, XTUMYV27Parameters, XTUMYV27Strategy
+)
+
+logger = logging.getLogger(__name__)
+
+# Forward horizons in sessions, keyed like signal_performance's gain_1d/3d/7d
+HORIZONS = {'1d': 1, '3d': 3, '7d': 5}
+
+# Resistance rejections are sell-side: never used to score a parameter set
+BUY_TYPES = tuple(t for t in SIGNAL_TYPES if t != 'DİRENÇ REDDİ')
+
+
+@dataclass
+class Fold:
+    """Session positions (indexes into sessions_of(panel)) of one split."""
+    index: int
+    train: np.ndarray
+    test: np.ndarray
+    
+    def describe(self, sessions: np.ndarray) -> Dict[str, Any]:
+        def span(positions):
+            if not len(positions):
+                return {'start': None, 'end': None, 'sessions': 0}
+            return {'start': str(sessions[positions[0]]), 'end': str(sessions[positions[-1]]),
+                    'sessions': int(len(positions))}
+        return {'fold': self.index, 'train': span(self.train), 'test': span(self.test)}
+
+
+def walk_forward_folds(n_sessions: int, train_size: int, test_size: int, step: Optional[int] = None,
+                       anchored: bool = False, purge: int = max(HORIZONS.values())) -> List[Fold]:
+    """
+    Rolling (or anchored) train windows, each followed by its test window.
+    
+    Args:
+        n_sessions: Sessions in the panel
+        train_size: Train sessions per fold (the minimum when anchored)
+        test_size: Test sessions per fold
+        step: Sessions between fold starts (default: test_size, non-overlapping tests)
+        anchored: Train from the first session instead of a rolling window
+        purge: Sessions left out between train and test
+    
+    Returns:
+        Folds in time order; no embargo is needed since train precedes test
+    """
+    step = step or test_size
+    folds = []
+    test_start = train_size + purge
+    while test_start + test_size <= n_sessions:
+        train_end = test_start - purge
+        train_start = 0 if anchored else train_end - train_size
+        folds.append(Fold(len(folds), np.arange(train_start, train_end),
+                          np.arange(test_start, test_start + test_size)))
+        test_start += step
+    return folds
+
+
+def purged_kfold(n_sessions: int, k: int, purge: int = max(HORIZONS.values()),
+                 embargo: Optional[int] = None) -> List[Fold]:
+    """
+    k contiguous test blocks; the rest is train, purged and embargoed.
+    
+    Args:
+        n_sessions: Sessions in the panel
+        k: Number of folds
+        purge: Train sessions dropped before each test block
+        embargo: Train sessions dropped after each test block (default: purge;
+            pass max_lookback(grid) so no train indicator saw test bars)
+    
+    Returns:
+        Folds in block order
+    """
+    if k < 2:
+        raise ValueError("k-fold needs at least 2 folds")
+    embargo = purge if embargo is None else embargo
+    bounds = np.linspace(0, n_sessions, k + 1).astype(int)
+    positions = np.arange(n_sessions)
+    folds = []
+    for i in range(k):
+        start, end = bounds[i], bounds[i + 1]
+        train = positions[(positions < start - purge) | (positions >= end + embargo)]
+        folds.append(Fold(i, train, positions[start:end]))
+    return folds
+
+
+def max_lookback(grid: Iterable[XTUMYV27Parameters]) -> int:
+    """Longest indicator lookback (sessions) of any parameter set in the grid."""
+    return max(
+        sum(value for name, value in spec.params if name in ('length', 'period') and isinstance(value, int))
+        for params in grid for spec in indicators.xtumy_specs(params).values()
+    )
+
+
+def parameter_grid(values: Dict[str, Sequence[Any]],
+                   base: Optional[XTUMYV27Parameters] = None) -> List[XTUMYV27Parameters]:
+    """
+    Every combination of the given parameter values (validated).
+    
+    Args:
+        values: Parameter name -> candidate values
+        base: Parameters for everything not in `values` (default: the defaults)
+    """
+    base = base or XTUMYV27Parameters()
+    names = list(values)
+    return [
+        XTUMYV27Parameters(**{**base.model_dump(), **dict(zip(names, combo))})
+        for combo in itertools.product(*(values[name] for name in names))
+    ]
+
+
+def sessions_of(panel: SymbolPanel) -> np.ndarray:
+    """Sorted datetime64[D] dates with at least one bar."""
+    return np.unique(panel.dates[panel.valid].astype('datetime64[D]'))
+
+
+def forward_gains(panel: SymbolPanel) -> Dict[str, np.ndarray]:
+    """Per horizon, % gain from each bar's close to the symbol's close h bars later (NaN if none yet)."""
+    close = panel.fields['close']
+    gains = {}
+    for name, h in HORIZONS.items():
+        ahead = np.full(close.shape, np.nan)
+        ahead[:-h] = close[h:]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            gains[name] = (ahead / close - 1) * 100
+    return gains
+
+
+class SignalHistoryCache:
+    """
+    Signal samples per parameter set over the full history, shared by folds.
+    
+    get() is thread-safe: each parameter set is evaluated once, and a fold
+    asking for one that another fold is computing waits for it.
+    """
+    
+    def __init__(self, panel: SymbolPanel, grid: Iterable[XTUMYV27Parameters],
+                 ctx: Optional[indicators.IndicatorContext] = None):
+        self.panel = panel
+        self.ctx = ctx or indicators.IndicatorContext(panel.frames())
+        self.sessions = sessions_of(panel)
+        
+        # Session position of every cell (-1 where there is no bar)
+        days = panel.dates.astype('datetime64[D]')
+        self.positions = np.where(panel.valid, np.searchsorted(self.sessions, days), -1)
+        self.gains = forward_gains(panel)
+        
+        # IndicatorContext is not thread-safe: fill it here, workers only read
+        for params in grid:
+            self.ctx.compute(indicators.xtumy_specs(params).values())
+        
+        self._samples: Dict[str, pd.DataFrame] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, params: XTUMYV27Parameters) -> pd.DataFrame:
+        """
+        Returns:
+            DataFrame [session, signal_type, gain_1d, gain_3d, gain_7d], one row per signal
+        """
+        key = params.model_dump_json()
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            if key not in self._samples:
+                self._samples[key] = self._compute(params)
+            return self._samples[key]
+    
+    def _compute(self, params: XTUMYV27Parameters) -> pd.DataFrame:
+        fired = XTUMYV27Strategy.signal_history(self.panel, [params], self.ctx)[0]
+        rows, cols = fired['row'], fired['col']
+        samples = pd.DataFrame({
+            'session': self.positions[rows, cols],
+            'signal_type': np.asarray(SIGNAL_TYPES, dtype=object)[fired['kind']]
+        })
+        for name, gains in self.gains.items():
+            samples[f'gain_{name}'] = gains[rows, cols]
+        return samples
+
+
+def signal_stats(samples: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Per signal type counts, average gain and win rate per horizon (get_performance_summary's shape)."""
+    out = []
+    for signal_type in SIGNAL_TYPES:
+        group = samples[samples['signal_type'] == signal_type]
+        if group.empty:
+            continue
+        performance = {}
+        for name in HORIZONS:
+            gains = group[f'gain_{name}'].dropna()
+            wins = int((gains > 0).sum())
+            performance[name] = {
+                'tracked': int(len(gains)),
+                'avg_gain': round(float(gains.mean()), 2) if len(gains) else None,
+                'win_rate': round(wins / len(gains) * 100, 1) if len(gains) else None,
+                'wins': wins
+            }
+        out.append({'signal_type': signal_type, 'total_signals': int(len(group)), 'performance': performance})
+    return out
+
+
+def score(samples: pd.DataFrame, objective: str, min_signals: int) -> Optional[float]:
+    """Mean buy-signal gain at the objective horizon (None below min_signals)."""
+    gains = samples.loc[samples['signal_type'].isin(BUY_TYPES), f'gain_{objective}'].dropna()
+    if len(gains) < min_signals:
+        return None
+    return float(gains.mean())
+
+
+def _concat(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    if not frames:
+        return pd.DataFrame(columns=['session', 'signal_type', *(f'gain_{h}' for h in HORIZONS)])
+    return pd.concat(frames, ignore_index=True)
+
+
+def _varied(grid: List[XTUMYV27Parameters]) -> List[str]:
+    """Parameter names whose value differs across the grid."""
+    dumps = [params.model_dump() for params in grid]
+    return [name for name in dumps[0] if len({d[name] for d in dumps}) > 1]
+
+
+def evaluate(panel: SymbolPanel, grid: List[XTUMYV27Parameters], folds: List[Fold],
+             objective: str = '7d', min_signals: int = 30, max_workers: int = 4,
+             ctx: Optional[indicators.IndicatorContext] = None) -> Dict[str, Any]:
+    """
+    Select parameters on each fold's train sessions and score them on its test sessions.
+    
+    Args:
+        panel: Market panel covering every fold
+        grid: Candidate parameter sets
+        folds: Splits from walk_forward_folds() or purged_kfold()
+        objective: Horizon key the selection maximizes
+        min_signals: Train buy signals a parameter set needs to be eligible
+        max_workers: Folds evaluated in parallel
+        ctx: Optional IndicatorContext over panel.frames()
+    
+    Returns:
+        Dict with per-fold choices and out-of-sample stats, plus the
+        out_of_sample and in_sample stats over all folds
+    """
+    if not grid:
+        raise ValueError("parameter grid is empty")
+    if objective not in HORIZONS:
+        raise ValueError(f"objective must be one of {list(HORIZONS)}")
+    
+    started = time.perf_counter()
+    cache = SignalHistoryCache(panel, grid, ctx)
+    sessions = cache.sessions
+    varied = _varied(grid) or list(grid[0].model_dump())
+    
+    def run(fold: Fold) -> Dict[str, Any]:
+        # Start each fold at a different grid entry so parallel folds fill the cache instead of waiting
+        offset = fold.index % len(grid)
+        best, best_score, best_train = 0, None, None
+        for i in list(range(offset, len(grid))) + list(range(offset)):
+            samples = cache.get(grid[i])
+            train = samples[samples['session'].isin(fold.train)]
+            value = score(train, objective, min_signals)
+            if value is not None and (best_score is None or (value, -i) > (best_score, -best)):
+                best, best_score, best_train = i, value, train
+        
+        samples = cache.get(grid[best])
+        if best_train is None:
+            best_train = samples[samples['session'].isin(fold.train)]
+        test = samples[samples['session'].isin(fold.test)]
+        return {
+            **fold.describe(sessions),
+            'params': {name: getattr(grid[best], name) for name in varied},
+            'train_score': round(best_score, 2) if best_score is not None else None,
+            'oos': signal_stats(test),
+            '_train': best_train,
+            '_test': test
+        }
+    
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        results = list(executor.map(run, folds))
+    
+    in_sample = _concat([r.pop('_train') for r in results])
+    out_of_sample = _concat([r.pop('_test') for r in results])
+    unselected = sum(r['train_score'] is None for r in results)
+    if unselected:
+        logger.warning(f"{unselected} fold(s) had no parameter set with {min_signals}+ train signals, "
+                       f"fell back to the first grid entry")
+    
+    return {
+        'sessions': {'start': str(sessions[0]) if len(sessions) else None,
+                     'end': str(sessions[-1]) if len(sessions) else None,
+                     'count': int(len(sessions))},
+        'symbols': panel.n_symbols,
+        'grid_size': len(grid),
+        'objective': objective,
+        'horizons': HORIZONS,
+        'folds': results,
+        'out_of_sample': signal_stats(out_of_sample),
+        'in_sample': signal_stats(in_sample),
+        'elapsed_seconds': round(time.perf_counter() - started, 3)
+    }
@@ -173,6 +173,10 @@ class BISTCalendar:
             
             conn.commit()
         
+        # Bellekteki işlem günü takvimini yeniden yüklet
+        from backend.modules.market_data.trading_calendar import reset_trading_calendar
+        reset_trading_calendar()
+        
         print(f"✓ {len(holidays)} tatil günü veritabanına kaydedildi.")
         logging.info(f"{len(holidays)} holidays saved to database.")
     
@@ -184,27 +188,9 @@ class BISTCalendar:
         if check_date is None:
             check_date = datetime.now().date()
         
-        # Hafta sonu kontrolü
-        if check_date.weekday() >= 5:  # 5=Cumartesi, 6=Pazar
-            return False, None
-        
-        # Veritabanından kontrol et
-        query = text("SELECT status, closing_time FROM bist_holidays WHERE holiday_date = :date")
-        with self.engine.connect() as conn:
-            result = conn.execute(query, {'date': check_date}).fetchone()
-        
-        if result is None:
-            # Tatil değil, normal açık
-            return True, time(18, 10)  # Normal kapanış: 18:10
-        
-        status, closing_time = result
-        
-        if status == 'KAPALI':
-            return False, None
-        elif status == 'YARIM_GUN':
-            return True, closing_time  # 13:00 gibi
-        else:
-            return True, time(18, 10)
+        # Takvim süreç başına bir kez yüklenir; her çağrı bellekte ikili arama
+        from backend.modules.market_data.trading_calendar import get_trading_calendar
+        return get_trading_calendar().is_market_open(check_date)
     
     def update_calendar(self, year=2025):
         """Yıllık takvimi güncelle"""
@@ -0,0 +1,232 @@
+"""
+Market breadth engine.
+
+Computes market-wide metrics for every session in one vectorized pass over
+the SymbolPanel, reusing the XTUMY indicator implementation:
+advancing/declining counts, % of symbols above EMA50, new 144-bar highs
+and lows (wall_top / wall_low), average ADX and RSI.
+
+Usage:
+    python -m backend.modules.market_data.breadth --days 30
+"""
+import argparse
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from backend.core.cache import get_cache
+from backend.core.database import engine
+from backend.modules.market_data.panel import SymbolPanel, load_panel
+from backend.modules.screener.indicators import xtumy_indicators
+
+# Calendar days loaded in front of the requested window so EMA50 and the
+# 144-bar walls are warmed up on the first stored date
+WARMUP_DAYS = 250
+
+BREADTH_COLUMNS = [
+    'symbols', 'advancing', 'declining', 'unchanged', 'ad_line',
+    'above_ema50', 'pct_above_ema50', 'new_highs', 'new_lows', 'avg_adx', 'avg_rsi'
+]
+
+
+def compute_breadth(panel: SymbolPanel, params=None) -> pd.DataFrame:
+    """
+    Compute breadth metrics for every date present in the panel.
+    
+    Args:
+        panel: Market panel
+        params: XTUMYV27Parameters (defaults used when None)
+    
+    Returns:
+        DataFrame indexed by date with BREADTH_COLUMNS (ad_line starts at 0)
+    """
+    if params is None:
+        from backend.modules.screener.strategies.xtumy_v27 import XTUMYV27Parameters
+        params = XTUMYV27Parameters()
+    
+    if panel.n_symbols == 0:
+        return pd.DataFrame(columns=BREADTH_COLUMNS)
+    
+    f = panel.frames()
+    ind = xtumy_indicators(f['open'], f['high'], f['low'], f['close'], f['volume'], params)
+    
+    change = (f['close'] - f['close'].shift()).to_numpy()
+    # EMA50 is only meaningful once a symbol has emaLongLen bars
+    bars_seen = np.cumsum(panel.valid, axis=0)
+    ema_ready = bars_seen >= params.emaLongLen
+    
+    flags = panel.to_long({
+        'advancing': change > 0,
+        'declining': change < 0,
+        'unchanged': change == 0,
+        'ema_ready': ema_ready,
+        'above_ema50': ema_ready & (f['close'] > ind['EMA50']).to_numpy(),
+        'new_highs': (f['high'] > ind['wall_top']).to_numpy(),
+        'new_lows': (f['low'] < ind['wall_low']).to_numpy(),
+        'adx': ind['adx'].to_numpy(),
+        'rsi': ind['rsi'].to_numpy()
+    })
+    
+    grouped = flags.groupby('date', sort=True)
+    sums = grouped[['advancing', 'declining', 'unchanged', 'ema_ready', 'above_ema50',
+                    'new_highs', 'new_lows']].sum()
+    
+    result = pd.DataFrame(index=sums.index)
+    result['symbols'] = grouped.size()
+    for col in ['advancing', 'declining', 'unchanged', 'above_ema50', 'new_highs', 'new_lows']:
+        result[col] = sums[col].astype(int)
+    result['ad_line'] = (result['advancing'] - result['declining']).cumsum()
+    result['pct_above_ema50'] = (sums['above_ema50'] / sums['ema_ready'].replace(0, np.nan) * 100).round(2)
+    result['avg_adx'] = grouped['adx'].mean().round(2)
+    result['avg_rsi'] = grouped['rsi'].mean().round(2)
+    result.index = pd.to_datetime(result.index).date
+    result.index.name = 'date'
+    
+    return result[BREADTH_COLUMNS]
+
+
+def save_breadth(breadth: pd.DataFrame, db_engine=None) -> int:
+    """
+    Upsert breadth rows into market_breadth.
+    
+    Args:
+        breadth: Output of compute_breadth (ad_line already offset)
+        db_engine: Optional engine (defaults to the application engine)
+    
+    Returns:
+        Number of rows written
+    """
+    if breadth.empty:
+        return 0
+    
+    rows = breadth.reset_index()
+    # Plain Python scalars for the DB driver, NULL for NaN
+    records = rows.astype(object).where(rows.notna(), None).to_dict('records')
+    sql = text("""
+        INSERT INTO market_breadth (date, symbols, advancing, declining, unchanged, ad_line,
+                                    above_ema50, pct_above_ema50, new_highs, new_lows, avg_adx, avg_rsi)
+        VALUES (:date, :symbols, :advancing, :declining, :unchanged, :ad_line,
+                :above_ema50, :pct_above_ema50, :new_highs, :new_lows, :avg_adx, :avg_rsi)
+        ON CONFLICT (date) DO UPDATE SET
+            symbols = EXCLUDED.symbols,
+            advancing = EXCLUDED.advancing,
+            declining = EXCLUDED.declining,
+            unchanged = EXCLUDED.unchanged,
+            ad_line = EXCLUDED.ad_line,
+            above_ema50 = EXCLUDED.above_ema50,
+            pct_above_ema50 = EXCLUDED.pct_above_ema50,
+            new_highs = EXCLUDED.new_highs,
+            new_lows = EXCLUDED.new_lows,
+            avg_adx = EXCLUDED.avg_adx,
+            avg_rsi = EXCLUDED.avg_rsi,
+            computed_at = NOW()
+    """)
+    
+    with (db_engine or engine).begin() as conn:
+        conn.execute(sql, records)
+    
+    return len(records)
+
+
+def update_breadth(days: int = 30, db_engine=None) -> pd.DataFrame:
+    """
+    Recompute and store breadth for the last `days` calendar days.
+    
+    The A/D line continues from the last stored value before the window.
+    
+    Args:
+        days: Calendar days to (re)write
+        db_engine: Optional engine (defaults to the application engine)
+    
+    Returns:
+        The stored rows
+    """
+    db_engine = db_engine or engine
+    panel = load_panel(days=days + WARMUP_DAYS, db_engine=db_engine)
+    breadth = compute_breadth(panel)
+    
+    if breadth.empty:
+        return breadth
+    
+    cutoff = date.today() - timedelta(days=days)
+    breadth = breadth[breadth.index > cutoff]
+    if breadth.empty:
+        return breadth
+    
+    net = breadth['advancing'] - breadth['declining']
+    with db_engine.connect() as conn:
+        base = conn.execute(text(
+            "SELECT ad_line FROM market_breadth WHERE date < :first ORDER BY date DESC LIMIT 1"
+        ), {'first': breadth.index[0]}).scalar()
+    breadth = breadth.copy()
+    breadth['ad_line'] = net.cumsum() + int(base or 0)
+    
+    save_breadth(breadth, db_engine)
+    get_cache().bump('breadth')
+    return breadth
+
+
+def get_breadth_series(days: int = 90) -> List[Dict[str, Any]]:
+    """
+    Read stored breadth rows, oldest first.
+    
+    Args:
+        days: Calendar days to return
+    
+    Returns:
+        List of row dicts
+    """
+    query = text("""
+        SELECT date, symbols, advancing, declining, unchanged, ad_line,
+               above_ema50, pct_above_ema50, new_highs, new_lows, avg_adx, avg_rsi
+        FROM market_breadth
+        WHERE date > CURRENT_DATE - make_interval(days => :days)
+        ORDER BY date ASC
+    """)
+    
+    with engine.connect() as conn:
+        rows = conn.execute(query, {'days': days}).fetchall()
+    
+    return [_row_to_dict(row) for row in rows]
+
+
+def get_latest_breadth() -> Optional[Dict[str, Any]]:
+    """Most recent stored breadth row, or None."""
+    query = text("""
+        SELECT date, symbols, advancing, declining, unchanged, ad_line,
+               above_ema50, pct_above_ema50, new_highs, new_lows, avg_adx, avg_rsi
+        FROM market_breadth
+        ORDER BY date DESC
+        LIMIT 1
+    """)
+    
+    with engine.connect() as conn:
+        row = conn.execute(query).fetchone()
+    
+    return _row_to_dict(row) if row else None
+
+
+def _row_to_dict(row) -> Dict[str, Any]:
+    data = dict(row._mapping)
+    data['date'] = str(data['date'])
+    for key in ('pct_above_ema50', 'avg_adx', 'avg_rsi'):
+        data[key] = float(data[key]) if data[key] is not None else None
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute market breadth')
+    parser.add_argument('--days', type=int, default=30, help='Calendar days to recompute (default: 30)')
+    args = parser.parse_args()
+    
+    breadth = update_breadth(args.days)
+    print(f"✓ Stored breadth for {len(breadth)} sessions")
+    if not breadth.empty:
+        print(breadth.tail(5).to_string())
+
+
+if __name__ == '__main__':
+    main()
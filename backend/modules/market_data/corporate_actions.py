@@ -0,0 +1,516 @@
+"""
+Corporate-action adjustments.
+
+Raw market_data is never rewritten (is_adjusted stays False). Confirmed
+rows of corporate_actions are folded into adjustment_factors: one row per
+symbol and ex-date, holding the cumulative multiplier for every bar before
+that ex-date. Readers adjust lazily with apply_adjustments(), one
+merge_asof and a multiply:
+
+    adjusted price  = raw price  * cum_price_factor   (of the first ex-date after the bar)
+    adjusted volume = raw volume * cum_volume_factor
+
+Factors per action (P = last close before the ex-date):
+- split / bonus (bedelsiz): ratio = shares after / shares before -> price 1/ratio
+- rights (bedelli): ratio as above, amount = subscription price ->
+  price (P + amount * (ratio - 1)) / (ratio * P)
+- dividend: amount = cash per share -> price (P - amount) / P, volume unchanged
+
+Adding, confirming or rejecting an action only recomputes that symbol's
+factors, quarantine and stored indicators. An action confirmed ahead of its
+ex-date adjusts nothing until that day (load_factors() skips future
+ex-dates); refresh_due_actions() recomputes the symbol once it arrives and
+runs in the daily pipeline and updater. suggest_actions() looks for
+overnight gaps beyond the daily price band that persist. It stores them as
+'suggested' rows, which have no effect until confirmed.
+
+Usage:
+    python -m backend.modules.market_data.corporate_actions --detect
+    python -m backend.modules.market_data.corporate_actions --add THYAO 2025-06-10 bonus --ratio 2
+    python -m backend.modules.market_data.corporate_actions --confirm 12
+    python -m backend.modules.market_data.corporate_actions --list --status suggested
+"""
+import argparse
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, insert, text
+
+from backend.core.cache import get_cache
+from backend.core.database import engine, get_db_session
+from backend.modules.market_data.models import AdjustmentFactor, CorporateAction
+
+ACTION_TYPES = ('split', 'bonus', 'rights', 'dividend')
+STATUSES = ('confirmed', 'suggested', 'rejected')
+
+# Opening gaps outside 1/(1+band) .. (1+band) of the previous close cannot be
+# trading: BIST's daily price band is ±10%
+DETECT_BAND = 0.25
+
+
+def action_factors(action_type: str, ratio: Optional[float], amount: Optional[float],
+                   prev_close: Optional[float]) -> tuple:
+    """
+    Price and volume factor of one action.
+    
+    Raises:
+        ValueError: If the action's fields do not fit its type
+    """
+    if action_type not in ACTION_TYPES:
+        raise ValueError(f"action_type must be one of {list(ACTION_TYPES)}")
+    
+    if action_type == 'dividend':
+        if not amount or amount <= 0:
+            raise ValueError("dividend needs a positive amount (cash per share)")
+        if not prev_close or amount >= prev_close:
+            raise ValueError(f"dividend {amount} does not fit the previous close {prev_close}")
+        return (prev_close - amount) / prev_close, 1.0
+    
+    if not ratio or ratio <= 0:
+        raise ValueError(f"{action_type} needs a positive ratio (shares after / shares before)")
+    
+    if action_type == 'rights':
+        if amount is None or amount < 0:
+            raise ValueError("rights needs the subscription price as amount")
+        if not prev_close:
+            raise ValueError("rights needs a close before the ex-date")
+        price = (prev_close + amount * (ratio - 1)) / (ratio * prev_close)
+        return price, 1.0 / price
+    
+    return 1.0 / ratio, ratio
+
+
+def _in_symbols(query: str, symbols: Optional[List[str]], suffix: str = ''):
+    """text() with an optional expanding `symbol IN :symbols` filter (before `suffix`)."""
+    if symbols:
+        query += " AND symbol IN :symbols"
+    stmt = text(query + suffix)
+    return stmt.bindparams(bindparam('symbols', expanding=True)) if symbols else stmt
+
+
+def _previous_closes(actions: pd.DataFrame, db_engine) -> List[Optional[float]]:
+    """Last raw close before each action's ex-date (only rights and dividends need it)."""
+    closes = []
+    with db_engine.connect() as conn:
+        for action in actions.itertuples(index=False):
+            if action.action_type not in ('rights', 'dividend'):
+                closes.append(None)
+                continue
+            closes.append(conn.execute(text("""
+                SELECT close FROM market_data
+                WHERE symbol = :symbol AND date < :ex_date
+                ORDER BY date DESC
+                LIMIT 1
+            """), {'symbol': action.symbol, 'ex_date': action.ex_date}).scalar())
+    return [float(c) if c is not None else None for c in closes]
+
+
+def compute_factors(actions: pd.DataFrame, prev_closes: List[Optional[float]]) -> pd.DataFrame:
+    """
+    Fold confirmed actions into per-ex-date and cumulative factors.
+    
+    Args:
+        actions: Rows with symbol, ex_date, action_type, ratio, amount
+        prev_closes: Close before the ex-date, aligned with actions
+    
+    Returns:
+        DataFrame [symbol, ex_date, price_factor, volume_factor, cum_price_factor, cum_volume_factor]
+    """
+    columns = ['symbol', 'ex_date', 'price_factor', 'volume_factor', 'cum_price_factor', 'cum_volume_factor']
+    if actions.empty:
+        return pd.DataFrame(columns=columns)
+    
+    factors = [
+        action_factors(a.action_type, _value(a.ratio), _value(a.amount), close)
+        for a, close in zip(actions.itertuples(index=False), prev_closes)
+    ]
+    per_action = actions[['symbol', 'ex_date']].assign(
+        price_factor=[f[0] for f in factors],
+        volume_factor=[f[1] for f in factors]
+    )
+    
+    # Several actions on one ex-date multiply; cumulative products run from the latest ex-date back
+    by_date = per_action.groupby(['symbol', 'ex_date'], as_index=False).prod()
+    by_date = by_date.sort_values(['symbol', 'ex_date'], ascending=[True, False], ignore_index=True)
+    grouped = by_date.groupby('symbol', sort=False)
+    by_date['cum_price_factor'] = grouped['price_factor'].cumprod()
+    by_date['cum_volume_factor'] = grouped['volume_factor'].cumprod()
+    return by_date[columns].sort_values(['symbol', 'ex_date'], ignore_index=True)
+
+
+def _value(value) -> Optional[float]:
+    return None if value is None or pd.isna(value) else float(value)
+
+
+def refresh_factors(symbols: List[str], db_engine=None, derived: bool = True) -> int:
+    """
+    Recompute adjustment_factors for `symbols` from their confirmed actions.
+    
+    Args:
+        symbols: Symbols whose actions changed
+        db_engine: Optional engine (defaults to the application engine)
+        derived: Also refresh the symbols' quarantine and stored indicators
+    
+    Returns:
+        Number of factor rows written
+    """
+    db_engine = db_engine or engine
+    symbols = sorted(set(symbols))
+    if not symbols:
+        return 0
+    
+    actions = pd.read_sql(_in_symbols("""
+        SELECT symbol, ex_date, action_type, ratio, amount
+        FROM corporate_actions
+        WHERE status = 'confirmed'
+    """, symbols), db_engine, params={'symbols': symbols})
+    factors = compute_factors(actions, _previous_closes(actions, db_engine))
+    
+    records = [
+        {**row, 'ex_date': pd.Timestamp(row['ex_date']).date()}
+        for row in factors.to_dict('records')
+    ]
+    with db_engine.begin() as conn:
+        conn.execute(_in_symbols("DELETE FROM adjustment_factors WHERE 1 = 1", symbols), {'symbols': symbols})
+        if records:
+            conn.execute(insert(AdjustmentFactor), records)
+    
+    if derived:
+        _refresh_derived(symbols, db_engine)
+    get_cache().bump('scan')
+    return len(records)
+
+
+def _refresh_derived(symbols: List[str], db_engine) -> None:
+    """Quarantine and indicator values of `symbols` were computed on the old factors."""
+    from backend.modules.market_data.indicator_store import update_indicator_store
+    from backend.modules.market_data.quality import run_quality_checks
+    
+    run_quality_checks(symbols=symbols, db_engine=db_engine)
+    with db_engine.begin() as conn:
+        conn.execute(_in_symbols("DELETE FROM indicator_values WHERE 1 = 1", symbols), {'symbols': symbols})
+    update_indicator_store(symbols=symbols, db_engine=db_engine)
+    get_cache().bump_symbols('indicators', symbols)
+
+
+def refresh_due_actions(until: Optional[date] = None, after: Optional[date] = None,
+                        db_engine=None) -> List[str]:
+    """
+    Refresh symbols whose confirmed ex-dates fall in (after, until].
+    
+    Their factors only start applying on the ex-date, so the factor is
+    recomputed against the real previous close and the stored indicators
+    and quarantine, computed on unadjusted history, are rebuilt.
+    
+    Args:
+        until: Last ex-date (default: today)
+        after: Ex-dates up to this day were handled already (default: the
+            trading session before `until`)
+        db_engine: Optional engine (defaults to the application engine)
+    
+    Returns:
+        Symbols refreshed
+    """
+    from backend.modules.market_data.trading_calendar import get_trading_calendar
+    
+    db_engine = db_engine or engine
+    until = until or date.today()
+    after = after or get_trading_calendar().previous_session(until)
+    with db_engine.connect() as conn:
+        symbols = [row[0] for row in conn.execute(text("""
+            SELECT DISTINCT symbol FROM corporate_actions
+            WHERE status = 'confirmed' AND ex_date > :after AND ex_date <= :until
+        """), {'after': after, 'until': until})]
+    if symbols:
+        refresh_factors(symbols, db_engine=db_engine)
+    return sorted(symbols)
+
+
+def load_factors(symbols: Optional[List[str]] = None, db_engine=None) -> pd.DataFrame:
+    """Cumulative factors of ex-dates up to today, optionally for some symbols."""
+    query = """
+        SELECT symbol, ex_date, cum_price_factor, cum_volume_factor
+        FROM adjustment_factors
+        WHERE ex_date <= :today
+    """
+    params: Dict[str, Any] = {'today': date.today()}
+    if symbols:
+        params['symbols'] = list(symbols)
+    return pd.read_sql(_in_symbols(query, symbols, " ORDER BY symbol, ex_date"), db_engine or engine, params=params)
+
+
+def apply_adjustments(bars: pd.DataFrame, factors: Optional[pd.DataFrame] = None,
+                      db_engine=None) -> pd.DataFrame:
+    """
+    Split/dividend-adjust long OHLCV rows.
+    
+    Args:
+        bars: DataFrame with symbol, date, open, high, low, close, volume (any order)
+        factors: Output of load_factors (loaded when None)
+        db_engine: Optional engine (defaults to the application engine)
+    
+    Returns:
+        Adjusted copy of bars (bars itself if no symbol has factors)
+    """
+    if bars.empty:
+        return bars
+    if factors is None:
+        factors = load_factors(db_engine=db_engine)
+    factors = factors[factors['symbol'].isin(bars['symbol'].unique())]
+    if factors.empty:
+        return bars
+    
+    # Each bar takes the cumulative factor of the first ex-date strictly after its day
+    left = pd.DataFrame({
+        'symbol': bars['symbol'].to_numpy(),
+        'day': pd.to_datetime(bars['date']).dt.normalize().to_numpy(dtype='datetime64[ns]'),
+        'row': np.arange(len(bars))
+    }).sort_values('day', kind='stable')
+    right = pd.DataFrame({
+        'symbol': factors['symbol'].to_numpy(),
+        'day': pd.to_datetime(factors['ex_date']).to_numpy(dtype='datetime64[ns]'),
+        'price': factors['cum_price_factor'].to_numpy(dtype=float),
+        'volume': factors['cum_volume_factor'].to_numpy(dtype=float)
+    }).sort_values('day', kind='stable')
+    merged = pd.merge_asof(left, right, on='day', by='symbol', direction='forward', allow_exact_matches=False)
+    
+    price = np.ones(len(bars))
+    volume = np.ones(len(bars))
+    price[merged['row'].to_numpy()] = merged['price'].fillna(1.0).to_numpy()
+    volume[merged['row'].to_numpy()] = merged['volume'].fillna(1.0).to_numpy()
+    
+    adjusted = bars.copy()
+    for field in ('open', 'high', 'low', 'close'):
+        adjusted[field] = adjusted[field].astype(float) * price
+    adjusted['volume'] = adjusted['volume'].astype(float) * volume
+    return adjusted
+
+
+def price_factor_between(factors: pd.DataFrame, symbol: str, start: date, end: date) -> float:
+    """
+    Product of the price factors of ex-dates in (start, end].
+    
+    Multiply a raw price from `start` by this to compare it with a raw price from `end`.
+    """
+    rows = factors[factors['symbol'] == symbol]
+    if rows.empty:
+        return 1.0
+    
+    ex_dates = pd.to_datetime(rows['ex_date']).dt.date.to_numpy()
+    cumulative = rows['cum_price_factor'].to_numpy(dtype=float)
+    
+    def at(day: date) -> float:
+        # Factor of the first ex-date after `day` (rows are sorted by ex_date)
+        later = np.nonzero(ex_dates > day)[0]
+        return cumulative[later[0]] if len(later) else 1.0
+    
+    return float(at(start) / at(end))
+
+
+def detect_actions(bars: pd.DataFrame, band: float = DETECT_BAND) -> pd.DataFrame:
+    """
+    Likely splits/bonus issues: opening gaps beyond the price band that the next bar keeps.
+    
+    Args:
+        bars: Long OHLCV rows (already adjusted for confirmed actions)
+        band: Gap beyond which a move cannot be trading
+    
+    Returns:
+        DataFrame [symbol, ex_date, ratio, gap] with ratio ≈ previous close / open
+    """
+    if bars.empty:
+        return pd.DataFrame(columns=['symbol', 'ex_date', 'ratio', 'gap'])
+    
+    bars = bars.sort_values(['symbol', 'date'], kind='stable')
+    grouped = bars.groupby('symbol', sort=False)['close']
+    prev_close = grouped.shift()
+    next_close = grouped.shift(-1)
+    close = bars['close'].astype(float)
+    
+    gap = bars['open'].astype(float) / prev_close
+    low, high = 1 / (1 + band), 1 + band
+    down = (gap < low) & (close / prev_close < low) & (next_close / prev_close < low)
+    up = (gap > high) & (close / prev_close > high) & (next_close / prev_close > high)
+    hit = bars[down | up]
+    
+    return pd.DataFrame({
+        'symbol': hit['symbol'].to_numpy(),
+        'ex_date': pd.to_datetime(hit['date']).dt.date.to_numpy(),
+        # Rounded to whole-percent rates: the open only approximates the adjusted base price
+        'ratio': (prev_close / bars['open'].astype(float))[down | up].round(2).to_numpy(),
+        'gap': (gap[down | up] - 1).round(4).to_numpy()
+    })
+
+
+def suggest_actions(days: int = 250, db_engine=None) -> List[Dict[str, Any]]:
+    """
+    Store detected gaps as 'suggested' actions (ex-dates already known are skipped).
+    
+    Returns:
+        The new suggestions
+    """
+    from backend.modules.market_data.quality import load_bars
+    
+    db_engine = db_engine or engine
+    candidates = detect_actions(apply_adjustments(load_bars(days, db_engine=db_engine), db_engine=db_engine))
+    if candidates.empty:
+        return []
+    
+    with db_engine.connect() as conn:
+        known = {(row.symbol, pd.Timestamp(row.ex_date).date())
+                 for row in conn.execute(text("SELECT symbol, ex_date FROM corporate_actions")).fetchall()}
+    
+    new = [row for row in candidates.to_dict('records') if (row['symbol'], row['ex_date']) not in known]
+    if not new:
+        return []
+    
+    with get_db_session() as session:
+        session.add_all([
+            CorporateAction(symbol=row['symbol'], ex_date=row['ex_date'], action_type='split',
+                            ratio=float(row['ratio']), status='suggested', source='detected',
+                            note=f"Açılış boşluğu {row['gap']:+.1%}")
+            for row in new
+        ])
+    return [{**row, 'ex_date': str(row['ex_date'])} for row in new]
+
+
+def _validate(symbol: str, ex_date: date, action_type: str, ratio: Optional[float],
+              amount: Optional[float]) -> None:
+    """
+    action_factors() against the symbol's last close before ex_date, as
+    refresh_factors() will see it once the action is confirmed.
+    
+    Raises:
+        ValueError: If the action's fields do not fit its type or that close
+    """
+    action = pd.DataFrame([{'symbol': symbol, 'ex_date': ex_date, 'action_type': action_type}])
+    action_factors(action_type, ratio, amount, _previous_closes(action, engine)[0])
+
+
+def add_action(symbol: str, ex_date: date, action_type: str, ratio: Optional[float] = None,
+               amount: Optional[float] = None, status: str = 'confirmed', note: Optional[str] = None,
+               source: str = 'manual') -> Dict[str, Any]:
+    """
+    Record an action; confirmed actions take effect right away.
+    
+    Confirmed actions are validated against the previous close before the
+    row is written, so an action that does not fit never blocks later
+    refresh_factors() calls for the symbol.
+    
+    Raises:
+        ValueError: Invalid type/status or fields that do not fit the type
+    """
+    if status not in STATUSES:
+        raise ValueError(f"status must be one of {list(STATUSES)}")
+    if status == 'confirmed':
+        # Checked against the real previous close before anything is stored
+        _validate(symbol.upper(), ex_date, action_type, ratio, amount)
+    elif action_type == 'dividend':
+        if not amount or amount <= 0:
+            raise ValueError("dividend needs a positive amount (cash per share)")
+    else:
+        # Everything but the previous close is checked up front
+        action_factors(action_type, ratio, amount, prev_close=1.0)
+    
+    with get_db_session() as session:
+        action = CorporateAction(symbol=symbol.upper(), ex_date=ex_date, action_type=action_type,
+                                 ratio=ratio, amount=amount, status=status, source=source, note=note)
+        session.add(action)
+        session.flush()
+        result = _action_dict(action)
+    
+    if status == 'confirmed':
+        refresh_factors([result['symbol']])
+    return result
+
+
+def set_status(action_id: int, status: str) -> Optional[Dict[str, Any]]:
+    """
+    Confirm, reject or re-suggest an action; returns None if it does not exist.
+    
+    Raises:
+        ValueError: Invalid status, or a confirmation that does not fit the previous close
+    """
+    if status not in STATUSES:
+        raise ValueError(f"status must be one of {list(STATUSES)}")
+    
+    with get_db_session() as session:
+        action = session.get(CorporateAction, action_id)
+        if action is None:
+            return None
+        changed = (action.status == 'confirmed') != (status == 'confirmed')
+        if changed and status == 'confirmed':
+            _validate(action.symbol, action.ex_date, action.action_type, action.ratio, action.amount)
+        action.status = status
+        session.flush()
+        result = _action_dict(action)
+    
+    if changed:
+        refresh_factors([result['symbol']])
+    return result
+
+
+def list_actions(symbol: Optional[str] = None, status: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Actions, newest ex-date first."""
+    with get_db_session() as session:
+        query = session.query(CorporateAction)
+        if symbol:
+            query = query.filter(CorporateAction.symbol == symbol.upper())
+        if status:
+            query = query.filter(CorporateAction.status == status)
+        return [_action_dict(a) for a in query.order_by(CorporateAction.ex_date.desc(), CorporateAction.symbol)]
+
+
+def _action_dict(action: CorporateAction) -> Dict[str, Any]:
+    return {
+        'id': action.id,
+        'symbol': action.symbol,
+        'ex_date': str(action.ex_date),
+        'action_type': action.action_type,
+        'ratio': action.ratio,
+        'amount': action.amount,
+        'status': action.status,
+        'source': action.source,
+        'note': action.note
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage corporate actions and adjustment factors')
+    parser.add_argument('--detect', action='store_true', help='Store gap-detected splits as suggestions')
+    parser.add_argument('--days', type=int, default=250, help='Calendar days scanned by --detect (default: 250)')
+    parser.add_argument('--add', nargs=3, metavar=('SYMBOL', 'EX_DATE', 'TYPE'), help='Record a confirmed action')
+    parser.add_argument('--ratio', type=float, help='Shares after / shares before (split, bonus, rights)')
+    parser.add_argument('--amount', type=float, help='Subscription price (rights) or cash per share (dividend)')
+    parser.add_argument('--confirm', type=int, metavar='ID', help='Confirm a suggested action')
+    parser.add_argument('--reject', type=int, metavar='ID', help='Reject an action')
+    parser.add_argument('--refresh', nargs='+', metavar='SYMBOL', help='Recompute factors for symbols')
+    parser.add_argument('--list', action='store_true', help='List actions')
+    parser.add_argument('--status', choices=STATUSES, help='Filter for --list')
+    args = parser.parse_args()
+    
+    if args.detect:
+        found = suggest_actions(args.days)
+        print(f"✓ {len(found)} new suggestions")
+        for row in found:
+            print(f"  {row['symbol']:<8} {row['ex_date']}  ratio {row['ratio']:.4f}  gap {row['gap']:+.1%}")
+    if args.add:
+        symbol, ex_date, action_type = args.add
+        action = add_action(symbol, date.fromisoformat(ex_date), action_type, args.ratio, args.amount)
+        print(f"✓ Added #{action['id']} {action['symbol']} {action['ex_date']} {action['action_type']}")
+    for action_id, status in ((args.confirm, 'confirmed'), (args.reject, 'rejected')):
+        if action_id is not None:
+            action = set_status(action_id, status)
+            print(f"✓ #{action_id} {status}" if action else f"❌ #{action_id} not found")
+    if args.refresh:
+        print(f"✓ {refresh_factors(args.refresh)} factor rows")
+    if args.list:
+        for a in list_actions(status=args.status):
+            print(f"  #{a['id']:<5} {a['symbol']:<8} {a['ex_date']}  {a['action_type']:<8} "
+                  f"ratio={a['ratio']} amount={a['amount']}  {a['status']} ({a['source']})")
+
+
+if __name__ == '__main__':
+    main()
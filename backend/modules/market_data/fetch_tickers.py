@@ -1,7 +1,28 @@
+"""
+Haftalık BIST ticker evreni senkronizasyonu.
+
+TradingView listesi tickers tablosuyla karşılaştırılır (TRUNCATE + yeniden
+yükleme yok; CASCADE market_data geçmişini silebiliyordu):
+
+    added        yeni sembol                           -> eklenir
+    updated      isim/tip değişti                      -> yerinde güncellenir
+    reactivated  pasif sembol listede tekrar görüldü   -> is_active = TRUE
+    delisted     aktif sembol listede yok              -> is_active = FALSE (geçmiş korunur)
+
+Her değişiklik ticker_changes tablosuna yazılır ve on_universe_change() ile
+kayıtlı dinleyicilere yayınlanır. Cache ve indikatör deposu yalnızca etkilenen
+semboller için geçersiz kılınır.
+
+Usage:
+    python -m backend.modules.market_data.fetch_tickers [--dry-run] [--force]
+"""
+import argparse
 import pandas as pd
-from tradingview_screener import Query, Column
-from sqlalchemy import create_engine, text
-from datetime import datetime
+from sqlalchemy import create_engine, bindparam, insert, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
 import sys
 from pathlib import Path
 
@@ -10,72 +31,277 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from backend.core.config import DB_CONNECTION_STR, LOG_DIR
+from backend.core.cache import get_cache
+from backend.modules.market_data.models import Ticker, TickerChange
+from backend.modules.market_data.snapshot import bump_version
 import logging
 
-# Log Ayarları
-logging.basicConfig(filename=f'{LOG_DIR}/tickers.log', level=logging.INFO, 
-                    format='%(asctime)s - %(message)s')
+CHANGE_TYPES = ('added', 'updated', 'reactivated', 'delisted')
+CHANGE_COLUMNS = ['symbol', 'change_type', 'name', 'type', 'detail']
+
+# Tek seferde aktif evrenin bu oranından fazlası listeden düşüyorsa TradingView
+# yanıtı büyük ihtimalle eksiktir: senkronizasyon --force olmadan yapılmaz
+MAX_DELIST_RATIO = 0.2
+
+# Değişiklik olaylarını dinleyenler: callback(changes DataFrame)
+_listeners: List[Callable[[pd.DataFrame], None]] = []
+
+
+def setup_logging():
+    """Log ayarları (import anında değil, rutin başlarken uygulanır)"""
+    logging.basicConfig(filename=f'{LOG_DIR}/tickers.log', level=logging.INFO,
+                        format='%(asctime)s - %(message)s')
+
+
+def on_universe_change(callback: Callable[[pd.DataFrame], None]) -> Callable[[pd.DataFrame], None]:
+    """
+    Register a listener called with the change rows after every sync.
+    
+    Usable as a decorator. Listener errors are logged and do not undo the sync.
+    """
+    _listeners.append(callback)
+    return callback
+
+
+def fetch_universe() -> pd.DataFrame:
+    """BIST hisse + fon listesi (ETF hariç) -> symbol, name, type"""
+    from tradingview_screener import Query, Column
+    
+    # Type: Stock ve Fund | TypeSpecs: ETF OLMAYANLAR
+    _, df = (Query()
+        .set_markets('turkey')
+        .where(
+            Column('type').isin(['stock', 'fund']),
+            Column('exchange').isin(['BIST']),
+            Column('currency_id') == 'TRY',
+            Column('typespecs').has_none_of(['etf']),
+        )
+        .select('name', 'type', 'description')
+        .order_by('name', ascending=True)
+        .limit(3000)
+        .get_scanner_data())
+    
+    # Ticker formatı "BIST:THYAO" gelir, "THYAO" yapalım.
+    df['symbol'] = df['ticker'].str.replace('BIST:', '', regex=False)
+    return df[['symbol', 'name', 'type']].drop_duplicates('symbol')
+
+
+def load_universe(db_engine) -> pd.DataFrame:
+    """tickers tablosu -> symbol, name, type, is_active"""
+    df = pd.read_sql(text("SELECT symbol, name, type, is_active FROM tickers"), db_engine)
+    df['is_active'] = df['is_active'].astype(bool)
+    return df
 
-def update_ticker_list():
+
+def diff_universe(current: pd.DataFrame, fetched: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compare the stored universe with a freshly fetched list.
+    
+    Args:
+        current: load_universe() output
+        fetched: symbol, name, type of every listed instrument
+    
+    Returns:
+        One row per changed symbol with CHANGE_COLUMNS
+    """
+    merged = current.merge(fetched, on='symbol', how='outer', suffixes=('_old', ''), indicator=True)
+    listed = merged['_merge'] != 'left_only'
+    stored = merged['_merge'] != 'right_only'
+    active = merged['is_active'].fillna(False).astype(bool)
+    
+    renamed = merged['name_old'].fillna('') != merged['name'].fillna('')
+    retyped = merged['type_old'].fillna('') != merged['type'].fillna('')
+    
+    change = pd.Series(None, index=merged.index, dtype=object)
+    change[listed & stored & active & (renamed | retyped)] = 'updated'
+    change[listed & stored & ~active] = 'reactivated'
+    change[listed & ~stored] = 'added'
+    change[~listed & active] = 'delisted'
+    
+    both = listed & stored
+    parts = pd.DataFrame({
+        'name': ('name: ' + merged['name_old'].fillna('') + ' -> ' + merged['name'].fillna('')).where(both & renamed),
+        'type': ('type: ' + merged['type_old'].fillna('') + ' -> ' + merged['type'].fillna('')).where(both & retyped)
+    })
+    detail = ['; '.join(p for p in row if isinstance(p, str)) or None for row in parts.itertuples(index=False)]
+    
+    # Listeden düşen sembolde son bilinen isim/tip kalsın
+    merged['name'] = merged['name'].fillna(merged['name_old'])
+    merged['type'] = merged['type'].fillna(merged['type_old'])
+    
+    changes = merged.assign(change_type=change, detail=detail)
+    changes = changes.loc[changes['change_type'].notna(), CHANGE_COLUMNS].astype(object)
+    return changes.where(changes.notna(), None).sort_values('symbol').reset_index(drop=True)
+
+
+def sync_tickers(fetched: pd.DataFrame, db_engine=None, force: bool = False,
+                 dry_run: bool = False) -> pd.DataFrame:
+    """
+    Apply a fetched universe to tickers without deleting anything.
+    
+    Args:
+        fetched: symbol, name, type of every listed instrument
+        db_engine: Optional engine (defaults to DB_CONNECTION_STR)
+        force: Sync even if more than MAX_DELIST_RATIO of the active universe would be delisted
+        dry_run: Only compute the changes
+    
+    Returns:
+        The change rows (empty if nothing changed)
+    """
+    db_engine = db_engine or create_engine(DB_CONNECTION_STR)
+    current = load_universe(db_engine)
+    changes = diff_universe(current, fetched)
+    
+    if changes.empty or dry_run:
+        return changes
+    
+    delisted = changes.loc[changes['change_type'] == 'delisted', 'symbol'].tolist()
+    active = int(current['is_active'].sum())
+    if not force and active and len(delisted) > MAX_DELIST_RATIO * active:
+        raise ValueError(f"{len(delisted)}/{active} aktif sembol listeden düşüyor; "
+                         f"liste eksik olabilir (zorlamak için --force)")
+    
+    now = datetime.now()
+    listed = changes[changes['change_type'] != 'delisted']
+    upsert = sqlite_insert if db_engine.dialect.name == 'sqlite' else pg_insert
+    
+    with db_engine.begin() as conn:
+        if not listed.empty:
+            rows = listed[['symbol', 'name', 'type']].assign(is_active=True, updated_at=now)
+            stmt = upsert(Ticker).values(rows.to_dict('records'))
+            conn.execute(stmt.on_conflict_do_update(
+                index_elements=['symbol'],
+                set_={c: stmt.excluded[c] for c in ('name', 'type', 'is_active', 'updated_at')}
+            ))
+        if delisted:
+            conn.execute(
+                text("UPDATE tickers SET is_active = FALSE, updated_at = :now WHERE symbol IN :symbols")
+                .bindparams(bindparam('symbols', expanding=True)),
+                {'now': now, 'symbols': delisted}
+            )
+        conn.execute(insert(TickerChange), changes.assign(changed_at=now).to_dict('records'))
+    
+    _invalidate(changes, db_engine)
+    for listener in _listeners:
+        try:
+            listener(changes)
+        except Exception as e:
+            logging.error(f"Evren değişikliği dinleyicisi hata verdi ({listener.__name__}): {e}")
+    
+    return changes
+
+
+def _invalidate(changes: pd.DataFrame, db_engine) -> None:
+    """Only the changed symbols' cache entries and indicator values are stale."""
+    from backend.modules.market_data.universe import rebuild_membership
+    
+    # Listeleme aralıkları (universe_membership) yeni delist/relist kayıtlarıyla yeniden kurulur
+    rebuild_membership(db_engine)
+    
+    symbols = changes['symbol'].tolist()
+    cache = get_cache()
+    cache.bump_symbols('ohlcv', symbols)
+    cache.bump_symbols('indicators', symbols)
+    
+    # Scans and updates only cover active symbols
+    if changes['change_type'].isin(['added', 'reactivated', 'delisted']).any():
+        cache.bump('scan')
+    
+    # Geri dönen sembolün geçmişinde boşluk var: indikatörleri baştan hesapla
+    reactivated = changes.loc[changes['change_type'] == 'reactivated', 'symbol'].tolist()
+    if reactivated:
+        from backend.modules.market_data.indicator_store import update_indicator_store
+        
+        with db_engine.begin() as conn:
+            conn.execute(
+                text("DELETE FROM indicator_values WHERE symbol IN :symbols")
+                .bindparams(bindparam('symbols', expanding=True)),
+                {'symbols': reactivated}
+            )
+        update_indicator_store(symbols=reactivated, db_engine=db_engine)
+    
+    # Snapshot okuyucuları (API süreçleri) ticker listesini yeniden yüklesin
+    bump_version(db_engine)
+
+
+def get_ticker_changes(days: int = 90, symbol: Optional[str] = None,
+                       change_type: Optional[str] = None, limit: int = 500,
+                       db_engine=None) -> List[Dict[str, Any]]:
+    """
+    Read universe changes, newest first.
+    
+    Args:
+        days: Calendar days to return
+        symbol: Optional symbol filter
+        change_type: Optional CHANGE_TYPES filter
+        limit: Maximum rows
+        db_engine: Optional engine (defaults to the application engine)
+    
+    Returns:
+        List of row dicts
+    """
+    if db_engine is None:
+        from backend.core.database import engine as db_engine
+    
+    query = """
+        SELECT symbol, change_type, name, type, detail, changed_at
+        FROM ticker_changes
+        WHERE changed_at > :cutoff
+    """
+    params: Dict[str, Any] = {'cutoff': datetime.now() - timedelta(days=days), 'limit': limit}
+    if symbol:
+        query += " AND symbol = :symbol"
+        params['symbol'] = symbol
+    if change_type:
+        query += " AND change_type = :change_type"
+        params['change_type'] = change_type
+    query += " ORDER BY changed_at DESC, symbol LIMIT :limit"
+    
+    with db_engine.connect() as conn:
+        rows = conn.execute(text(query), params).fetchall()
+    
+    return [{**row._mapping, 'changed_at': str(row.changed_at)} for row in rows]
+
+
+def update_ticker_list(force: bool = False, dry_run: bool = False):
+    setup_logging()
     engine = create_engine(DB_CONNECTION_STR)
     logging.info("Ticker listesi güncelleme işlemi başladı.")
     print("TradingView Screener üzerinden BIST listesi çekiliyor...")
     
     try:
-        # 1. TradingView Sorgusu (Sizin belirttiğiniz kriterler)
-        # Type: Stock ve Fund | TypeSpecs: ETF OLMAYANLAR
-        query = (Query()
-            .set_markets('turkey')
-            .where(
-                Column('type').isin(['stock', 'fund']),
-                Column('exchange').isin(['BIST']),
-                Column('currency_id') == 'TRY',
-                Column('typespecs').has_none_of(['etf']),
-            )
-            .select('name', 'type', 'description')
-            .order_by('name', ascending=True)
-            .limit(3000) 
-            .get_scanner_data())
+        fetched = fetch_universe()
         
-        # Tuple döner: (count, dataframe)
-        df = query[1]
-        
-        if df.empty:
+        if fetched.empty:
             logging.warning("Liste boş döndü, işlem iptal edildi.")
             return
         
-        # 2. Veri Temizleme
-        # Ticker formatı "BIST:THYAO" gelir, "THYAO" yapalım.
-        df['ticker'] = df['ticker'].str.replace('BIST:', '', regex=False)
-        
-        # 3. Veritabanına Kayıt (Upsert Mantığı)
-        # Önce mevcut listeyi temizleyebiliriz veya üzerine yazabiliriz.
-        # Temiz bir liste için 'replace' stratejisi yerine 'upsert' daha güvenlidir ama 
-        # listeden çıkan hisseleri yönetmek için 'TRUNCATE' edip yeniden doldurmak 
-        # haftalık güncellemeler için daha temizdir.
+        changes = sync_tickers(fetched, engine, force=force, dry_run=dry_run)
+        counts = changes['change_type'].value_counts()
+        summary = ", ".join(f"{t}={int(counts.get(t, 0))}" for t in CHANGE_TYPES)
         
-        with engine.connect() as conn:
-            # Tabloyu temizle (Opsiyonel: Eski hisseleri silmek istemiyorsanız bu satırı kaldırın)
-            conn.execute(text("TRUNCATE TABLE tickers CASCADE;")) 
-            conn.commit()
-            
-        # DataFrame kolonlarını DB ile eşleştir
-        # DB: symbol, name, type
-        df_db = df[['ticker', 'name', 'type']].copy()
-        df_db.rename(columns={'ticker': 'symbol'}, inplace=True)
-        df_db['updated_at'] = datetime.now()
+        for row in changes.itertuples():
+            print(f"  {row.change_type:<12} {row.symbol:<10} {row.detail or row.name or ''}")
         
-        # Veritabanına yaz
-        df_db.to_sql('tickers', engine, if_exists='append', index=False)
-        
-        msg = f"Başarılı. Toplam {len(df_db)} adet enstrüman (Hisse + Fon) veritabanına kaydedildi."
+        prefix = "Kuru çalıştırma" if dry_run else "Başarılı"
+        msg = f"{prefix}. {len(fetched)} enstrüman (Hisse + Fon) listelendi, değişiklikler: {summary}"
         print(msg)
         logging.info(msg)
-        
+    
     except Exception as e:
         logging.error(f"Hata oluştu: {str(e)}")
         print(f"Hata: {e}")
 
-if __name__ == "__main__":
-    update_ticker_list()
 
+def main():
+    parser = argparse.ArgumentParser(description='BIST ticker evrenini TradingView listesiyle senkronize et')
+    parser.add_argument('--force', action='store_true',
+                        help='MAX_DELIST_RATIO sınırını aşan toplu delist işlemini de uygula')
+    parser.add_argument('--dry-run', action='store_true', help='Sadece değişiklikleri göster')
+    args = parser.parse_args()
+    
+    update_ticker_list(force=args.force, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
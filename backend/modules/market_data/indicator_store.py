@@ -0,0 +1,279 @@
+"""
+Precomputed indicator store.
+
+After each ingest, update_indicator_store() evaluates the configured
+indicator specs once over the whole-market SymbolPanel and appends the
+sessions that are not stored yet. Charts (API) read the values back with
+load_indicators(), and ScanEngine seeds its IndicatorContext through
+preload_context(), so scans only compute what the store does not cover.
+
+Usage:
+    python -m backend.modules.market_data.indicator_store
+    python -m backend.modules.market_data.indicator_store --spec ema:length=200
+"""
+import argparse
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from backend.core.cache import get_cache
+from backend.core.database import engine
+from backend.modules.market_data.panel import SymbolPanel, load_panel
+from backend.modules.screener.indicators import IndicatorContext, IndicatorSpec, xtumy_specs
+
+# Same window ScanEngine loads, so stored values equal scan-time values
+HISTORY_DAYS = 250
+
+SpecLike = Union[IndicatorSpec, str]
+
+logger = logging.getLogger(__name__)
+
+
+def default_specs() -> List[IndicatorSpec]:
+    """Specs behind XTUMY V27 with default parameters."""
+    from backend.modules.screener.strategies.xtumy_v27 import XTUMYV27Parameters
+    return list(dict.fromkeys(xtumy_specs(XTUMYV27Parameters()).values()))
+
+
+def _normalize(specs: Optional[List[SpecLike]]) -> List[IndicatorSpec]:
+    if not specs:
+        return default_specs()
+    return list(dict.fromkeys(IndicatorSpec.parse(s) if isinstance(s, str) else s for s in specs))
+
+
+def update_indicator_store(specs: Optional[List[SpecLike]] = None, days: int = HISTORY_DAYS,
+                           db_engine=None, symbols: Optional[List[str]] = None) -> int:
+    """
+    Compute specs over the market panel and append sessions not stored yet.
+    
+    Args:
+        specs: Indicator specs (default: XTUMY V27 defaults)
+        days: Calendar days of history loaded for the computation
+        db_engine: Optional engine (defaults to the application engine)
+        symbols: Only these symbols (None = whole market)
+    
+    Returns:
+        Number of rows inserted
+    """
+    db_engine = db_engine or engine
+    specs = _normalize(specs)
+    panel = load_panel(symbols, days=days, db_engine=db_engine)
+    
+    if panel.n_symbols == 0:
+        return 0
+    
+    # Last stored date per (indicator, symbol) inside the window
+    with db_engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT indicator, symbol, MAX(date) AS last_date
+            FROM indicator_values
+            WHERE indicator = ANY(:keys)
+              AND date > NOW() - make_interval(days => :days)
+            GROUP BY indicator, symbol
+        """), {'keys': [s.key for s in specs], 'days': days}).fetchall()
+    
+    last_dates: Dict[str, Dict[str, datetime]] = {}
+    for row in rows:
+        last_dates.setdefault(row.indicator, {})[row.symbol] = row.last_date
+    
+    ctx = IndicatorContext(panel.frames())
+    inserted = 0
+    
+    for spec in specs:
+        long = panel.to_long({'value': ctx.get(spec).to_numpy(dtype=float)})
+        long = long[long['value'].notna()]
+        
+        stored = last_dates.get(spec.key)
+        if stored:
+            cutoff = long['symbol'].map(stored)
+            long = long[cutoff.isna() | (long['date'] > cutoff)]
+        
+        if long.empty:
+            continue
+        
+        long = long.assign(indicator=spec.key)[['symbol', 'indicator', 'date', 'value']]
+        long.to_sql('indicator_values', db_engine, if_exists='append', index=False,
+                    method='multi', chunksize=5000)
+        inserted += len(long)
+    
+    if inserted:
+        get_cache().bump('indicators')
+    
+    return inserted
+
+
+def load_indicators(specs: List[SpecLike], symbols: Optional[List[str]] = None,
+                    start: Optional[datetime] = None, end: Optional[datetime] = None,
+                    db_engine=None) -> Dict[str, pd.DataFrame]:
+    """
+    Read stored indicators as wide frames.
+    
+    Args:
+        specs: Indicator specs or spec keys
+        symbols: Optional symbol filter (None = all)
+        start: Optional first date (inclusive)
+        end: Optional last date (inclusive)
+        db_engine: Optional engine (defaults to the application engine)
+    
+    Returns:
+        Dict spec key -> DataFrame (index: date, columns: symbols)
+    """
+    specs = _normalize(specs)
+    df = _load_rows(specs, symbols, start, end, db_engine)
+    
+    return {
+        spec.key: df[df['indicator'] == spec.key].pivot(index='date', columns='symbol', values='value')
+        for spec in specs
+    }
+
+
+def _load_rows(specs: List[IndicatorSpec], symbols: Optional[List[str]], start: Optional[datetime],
+               end: Optional[datetime], db_engine=None) -> pd.DataFrame:
+    """Stored rows [symbol, indicator, date, value] ordered by date."""
+    query = "SELECT symbol, indicator, date, value FROM indicator_values WHERE indicator = ANY(:keys)"
+    params: Dict[str, Any] = {'keys': [s.key for s in specs]}
+    
+    if symbols:
+        query += " AND symbol = ANY(:symbols)"
+        params['symbols'] = list(symbols)
+    if start is not None:
+        query += " AND date >= :start"
+        params['start'] = start
+    if end is not None:
+        query += " AND date <= :end"
+        params['end'] = end
+    
+    return pd.read_sql(text(query + " ORDER BY date"), db_engine or engine, params=params)
+
+
+def _warmup(spec: IndicatorSpec) -> int:
+    """Upper bound on the leading bars a spec may leave empty (its lookbacks added up)."""
+    bars = 0
+    for name, value in spec.params:
+        if name in ('length', 'period', 'offset') and isinstance(value, int):
+            bars += value
+        elif name == 'source' and isinstance(value, str) and ':' in value:
+            bars += _warmup(IndicatorSpec.parse(value))
+    return bars
+
+
+def preload_context(ctx: IndicatorContext, panel: SymbolPanel, specs: List[SpecLike],
+                    db_engine=None) -> Dict[str, int]:
+    """
+    Seed an IndicatorContext over `panel` with stored indicator values.
+    
+    A symbol's stored series is used when it has a value for every bar
+    after the spec's warm-up up to the symbol's last bar. The other symbols
+    (sessions not stored yet, new listings, specs outside the store) are
+    computed on just their columns and merged, so the context ends up with
+    the same frames it would compute, minus the work.
+    
+    Args:
+        ctx: Context built on panel.frames()
+        panel: The scanned panel
+        specs: Specs the consumer is about to read
+        db_engine: Optional engine (defaults to the application engine)
+    
+    Returns:
+        {'stored': symbol columns read from the store, 'computed': columns computed}
+    """
+    specs = list(dict.fromkeys(IndicatorSpec.parse(s) if isinstance(s, str) else s for s in specs))
+    stats = {'stored': 0, 'computed': 0}
+    if not specs or panel.n_symbols == 0:
+        return stats
+    
+    valid = panel.valid
+    rows, cols = np.nonzero(valid)
+    days = panel.dates[rows, cols].astype('datetime64[D]').astype(np.int64)
+    # One sortable integer per real bar: column, then day
+    cell_keys = cols * 1_000_000 + days
+    order = np.argsort(cell_keys)
+    cell_keys = cell_keys[order]
+    
+    start = pd.Timestamp(panel.dates[valid].min()).to_pydatetime()
+    try:
+        stored = _load_rows(specs, panel.symbols, start, None, db_engine)
+    except Exception as e:
+        logger.warning(f"Indicator store unavailable, computing every indicator: {e}")
+        return stats
+    
+    columns = {s: i for i, s in enumerate(panel.symbols)}
+    stored_cols = stored['symbol'].map(columns).to_numpy(dtype=float)
+    stored_days = pd.to_datetime(stored['date']).to_numpy(dtype='datetime64[D]').astype(np.int64)
+    stored_values = stored['value'].to_numpy(dtype=float)
+    by_spec = stored.groupby('indicator').indices
+    bars_so_far = np.cumsum(valid, axis=0)
+    
+    for spec in specs:
+        if ctx.has(spec):
+            continue
+        mine = by_spec.get(spec.key)
+        if mine is None:
+            continue  # Not a stored spec: ctx computes it on demand
+        mine = mine[~np.isnan(stored_cols[mine])]
+        
+        keys = stored_cols[mine].astype(np.int64) * 1_000_000 + stored_days[mine]
+        pos = np.minimum(np.searchsorted(cell_keys, keys), len(cell_keys) - 1)
+        hit = cell_keys[pos] == keys
+        cells = order[pos[hit]]
+        
+        values = np.full(valid.shape, np.nan)
+        values[rows[cells], cols[cells]] = stored_values[mine][hit]
+        
+        # Covered: a stored value on every bar past the warm-up, and at least one such bar
+        needed = valid & (bars_so_far > _warmup(spec))
+        covered = needed.any(axis=0) & ~(needed & np.isnan(values)).any(axis=0)
+        missing = np.flatnonzero(~covered)
+        if len(missing):
+            sub = IndicatorContext({name: frame.iloc[:, missing] for name, frame in ctx.frames.items()})
+            values[:, missing] = sub.get(spec).to_numpy(dtype=float)
+        
+        ctx.preload({spec: pd.DataFrame(values, columns=panel.symbols)})
+        stats['stored'] += int(covered.sum())
+        stats['computed'] += len(missing)
+    
+    return stats
+
+
+def get_symbol_indicators(symbol: str, specs: Optional[List[SpecLike]] = None,
+                          days: int = 90) -> Dict[str, Dict[str, list]]:
+    """
+    Stored indicator series for one symbol, shaped for chart overlays.
+    
+    Args:
+        symbol: Stock symbol
+        specs: Indicator specs or keys (default: XTUMY V27 defaults)
+        days: Calendar days to return
+    
+    Returns:
+        Dict spec key -> {"date": [...], "value": [...]}
+    """
+    start = datetime.now() - timedelta(days=days)
+    frames = load_indicators(_normalize(specs), symbols=[symbol], start=start)
+    
+    result = {}
+    for key, frame in frames.items():
+        series = frame[symbol].dropna() if symbol in frame.columns else pd.Series(dtype=float)
+        result[key] = {
+            'date': [str(d)[:10] for d in series.index],
+            'value': [round(float(v), 4) for v in series.to_numpy()]
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fill the precomputed indicator store')
+    parser.add_argument('--spec', action='append', help='Indicator spec key (repeatable, default: XTUMY V27 set)')
+    parser.add_argument('--days', type=int, default=HISTORY_DAYS, help=f'History window in days (default: {HISTORY_DAYS})')
+    args = parser.parse_args()
+    
+    inserted = update_indicator_store(args.spec, args.days)
+    print(f"✓ Stored {inserted} indicator values")
+
+
+if __name__ == '__main__':
+    main()
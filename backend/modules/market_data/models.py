@@ -1,7 +1,7 @@
 """
 Market data models for tickers and OHLCV data.
 """
-from sqlalchemy import Column, Integer, String, Numeric, BigInteger, DateTime, Boolean, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, Numeric, BigInteger, Float, Date, DateTime, Boolean, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from backend.core.database import Base
 
@@ -22,6 +22,33 @@ class Ticker(Base):
     )
 
 
+class TickerChange(Base):
+    """Universe changes recorded by the weekly ticker sync (append-only)."""
+    __tablename__ = 'ticker_changes'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    symbol = Column(String(20), nullable=False)
+    change_type = Column(String(20), nullable=False)  # 'added', 'updated', 'reactivated', 'delisted'
+    name = Column(String(255))
+    type = Column(String(50))
+    detail = Column(String(255))  # e.g. 'name: OLD -> NEW'
+    changed_at = Column(DateTime(timezone=False), default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        Index('idx_ticker_changes_symbol', 'symbol', 'changed_at'),
+        Index('idx_ticker_changes_changed_at', 'changed_at'),
+    )
+
+
+class UniverseMembership(Base):
+    """Point-in-time listing intervals [start_date, end_date) derived from market_data and ticker_changes."""
+    __tablename__ = 'universe_membership'
+    
+    symbol = Column(String(20), primary_key=True, nullable=False)
+    start_date = Column(Date, primary_key=True, nullable=False)  # First listed day (first bar or 'added')
+    end_date = Column(Date)  # First day no longer listed; NULL = still listed
+
+
 class MarketData(Base):
     """OHLCV market data."""
     __tablename__ = 'market_data'
@@ -40,3 +67,98 @@ class MarketData(Base):
         Index('idx_data_symbol', 'symbol'),
         Index('idx_data_date', 'date'),
     )
+
+
+class MarketDataStats(Base):
+    """Incrementally maintained market_data statistics (single row, id=1)."""
+    __tablename__ = 'market_data_stats'
+    
+    id = Column(Integer, primary_key=True)
+    data_points = Column(BigInteger, default=0, nullable=False)
+    latest_date = Column(DateTime(timezone=False))
+    version = Column(BigInteger, default=0, nullable=False)  # Bumped on every ingest / ticker change
+    updated_at = Column(DateTime(timezone=False), default=func.now(), onupdate=func.now())
+
+
+class MarketBreadth(Base):
+    """Daily market-wide breadth metrics (one row per session)."""
+    __tablename__ = 'market_breadth'
+    
+    date = Column(Date, primary_key=True)
+    symbols = Column(Integer, nullable=False)  # Symbols with a bar on this date
+    advancing = Column(Integer, nullable=False)
+    declining = Column(Integer, nullable=False)
+    unchanged = Column(Integer, nullable=False)
+    ad_line = Column(Integer)  # Cumulative advancing - declining
+    above_ema50 = Column(Integer)
+    pct_above_ema50 = Column(Numeric(5, 2))
+    new_highs = Column(Integer)  # High above the 144-bar wall_top
+    new_lows = Column(Integer)  # Low below the 144-bar wall_low
+    avg_adx = Column(Numeric(5, 2))
+    avg_rsi = Column(Numeric(5, 2))
+    computed_at = Column(DateTime(timezone=False), default=func.now(), onupdate=func.now())
+
+
+class MarketDataQuarantine(Base):
+    """Bars flagged by the data quality checks (one row per bar and rule)."""
+    __tablename__ = 'market_data_quarantine'
+    
+    symbol = Column(String(20), primary_key=True, nullable=False)
+    date = Column(DateTime(timezone=False), primary_key=True, nullable=False)  # market_data.date of the bar
+    rule = Column(String(30), primary_key=True, nullable=False)  # e.g. 'inconsistent_range', 'price_spike'
+    severity = Column(String(10), nullable=False)  # 'error' = skipped by scans, 'warning' = kept
+    value = Column(Float)  # z-score for spikes and outliers
+    detected_at = Column(DateTime(timezone=False), default=func.now())
+    
+    __table_args__ = (
+        Index('idx_quarantine_date', 'date'),
+    )
+
+
+class CorporateAction(Base):
+    """Splits, bonus/rights issues and dividends; confirmed rows drive the adjustment factors."""
+    __tablename__ = 'corporate_actions'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    symbol = Column(String(20), nullable=False)
+    ex_date = Column(Date, nullable=False)
+    action_type = Column(String(20), nullable=False)  # 'split', 'bonus', 'rights', 'dividend'
+    ratio = Column(Float)  # Shares after / shares before (2:1 split = 2.0, %100 bedelsiz = 2.0)
+    amount = Column(Float)  # Rights subscription price or cash dividend per share (TL)
+    status = Column(String(20), default='confirmed', nullable=False)  # 'confirmed', 'suggested', 'rejected'
+    source = Column(String(20), default='manual', nullable=False)  # 'manual', 'detected'
+    note = Column(String(255))
+    created_at = Column(DateTime(timezone=False), default=func.now())
+    updated_at = Column(DateTime(timezone=False), default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('symbol', 'ex_date', 'action_type', name='uq_corporate_actions'),
+        Index('idx_corporate_actions_status', 'status'),
+    )
+
+
+class AdjustmentFactor(Base):
+    """Cumulative adjustment factors per symbol and ex-date (derived from confirmed corporate_actions)."""
+    __tablename__ = 'adjustment_factors'
+    
+    symbol = Column(String(20), primary_key=True, nullable=False)
+    ex_date = Column(Date, primary_key=True, nullable=False)
+    price_factor = Column(Float, nullable=False)  # This ex-date's actions combined
+    volume_factor = Column(Float, nullable=False)
+    cum_price_factor = Column(Float, nullable=False)  # Multiplier for bars before ex_date (this and later ex-dates)
+    cum_volume_factor = Column(Float, nullable=False)
+    updated_at = Column(DateTime(timezone=False), default=func.now(), onupdate=func.now())
+
+
+class IndicatorValue(Base):
+    """Precomputed indicator values keyed by symbol, date and indicator spec."""
+    __tablename__ = 'indicator_values'
+    
+    symbol = Column(String(20), primary_key=True, nullable=False)
+    indicator = Column(String(100), primary_key=True, nullable=False)  # Spec key, e.g. 'ema:length=50,source=close'
+    date = Column(DateTime(timezone=False), primary_key=True, nullable=False)
+    value = Column(Float)
+    
+    __table_args__ = (
+        Index('idx_indicator_values_indicator_date', 'indicator', 'date'),
+    )
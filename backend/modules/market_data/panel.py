@@ -0,0 +1,164 @@
+"""
+Symbol panel: the whole market as wide (bar × symbol) arrays.
+
+Rows are bar offsets, right-aligned so the last row is every symbol's
+latest bar and shorter histories are padded with NaN at the top. Because
+each column is that symbol's own bar sequence, positional indicators
+(EMA, rolling windows, shift) computed column-wise on the panel give
+exactly the same values as computing them symbol by symbol.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from backend.core.database import engine
+
+
+class SymbolPanel:
+    """
+    OHLCV panel for many symbols.
+    
+    Attributes:
+        symbols: Column labels
+        dates: datetime64 array (bars × symbols), NaT where a symbol has no bar
+        fields: Dict of float64 arrays (bars × symbols) for open/high/low/close/volume
+    """
+    
+    FIELDS = ('open', 'high', 'low', 'close', 'volume')
+    
+    def __init__(self, symbols: List[str], dates: np.ndarray, fields: Dict[str, np.ndarray]):
+        self.symbols = list(symbols)
+        self.dates = dates
+        self.fields = fields
+    
+    @classmethod
+    def from_long(cls, df: pd.DataFrame) -> 'SymbolPanel':
+        """
+        Build a panel from long-format rows.
+        
+        Args:
+            df: DataFrame with columns [symbol, date, open, high, low, close, volume]
+        
+        Returns:
+            SymbolPanel (empty if df is empty)
+        """
+        if df.empty:
+            return cls([], np.empty((0, 0), dtype='datetime64[ns]'),
+                       {f: np.empty((0, 0)) for f in cls.FIELDS})
+        
+        df = df.sort_values(['symbol', 'date'], kind='stable')
+        codes, symbols = pd.factorize(df['symbol'], sort=True)
+        counts = np.bincount(codes)
+        n_bars = int(counts.max())
+        
+        # Position within each symbol, shifted so the last bar lands on the last row
+        pos = df.groupby(codes, sort=False).cumcount().to_numpy()
+        rows = n_bars - counts[codes] + pos
+        
+        dates = np.full((n_bars, len(symbols)), np.datetime64('NaT'), dtype='datetime64[ns]')
+        dates[rows, codes] = pd.to_datetime(df['date']).to_numpy(dtype='datetime64[ns]')
+        
+        fields = {}
+        for field in cls.FIELDS:
+            arr = np.full((n_bars, len(symbols)), np.nan)
+            arr[rows, codes] = df[field].to_numpy(dtype=float)
+            fields[field] = arr
+        
+        return cls(list(symbols), dates, fields)
+    
+    @property
+    def n_bars(self) -> int:
+        return self.dates.shape[0]
+    
+    @property
+    def n_symbols(self) -> int:
+        return len(self.symbols)
+    
+    @property
+    def valid(self) -> np.ndarray:
+        """Boolean mask of cells holding a real bar."""
+        return ~np.isnat(self.dates)
+    
+    def frame(self, field: str) -> pd.DataFrame:
+        """Wide DataFrame (bars × symbols) for one OHLCV field."""
+        return pd.DataFrame(self.fields[field], columns=self.symbols)
+    
+    def frames(self) -> Dict[str, pd.DataFrame]:
+        """Wide DataFrames for all OHLCV fields."""
+        return {field: self.frame(field) for field in self.FIELDS}
+    
+    def to_long(self, columns: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """
+        Flatten wide arrays back to long rows, keeping only real bars.
+        
+        Args:
+            columns: Output column name -> wide DataFrame/array aligned with this panel
+        
+        Returns:
+            DataFrame with columns [symbol, date, *columns]
+        """
+        mask = self.valid
+        rows, cols = np.nonzero(mask)
+        out = {
+            'symbol': np.asarray(self.symbols, dtype=object)[cols],
+            'date': self.dates[rows, cols]
+        }
+        for name, values in columns.items():
+            out[name] = np.asarray(values)[rows, cols]
+        return pd.DataFrame(out)
+    
+    def symbol_frame(self, symbol: str) -> pd.DataFrame:
+        """Long-format OHLCV rows for one symbol (same shape strategies receive)."""
+        col = self.symbols.index(symbol)
+        mask = self.valid[:, col]
+        data = {'symbol': symbol, 'date': self.dates[mask, col]}
+        for field in self.FIELDS:
+            data[field] = self.fields[field][mask, col]
+        return pd.DataFrame(data)
+
+
+def load_panel(symbols: Optional[List[str]] = None, days: int = 250, db_engine=None,
+               as_of: Optional[date] = None) -> SymbolPanel:
+    """
+    Load market data into a SymbolPanel with a single query.
+    
+    Args:
+        symbols: Optional list of symbols (None = whole market)
+        days: Calendar days of history to load
+        db_engine: Optional engine (defaults to the application engine)
+        as_of: Last day of the window (default: today), e.g. a backtest date
+    
+    Returns:
+        SymbolPanel
+    """
+    from backend.modules.market_data.corporate_actions import apply_adjustments
+    from backend.modules.market_data.quality import clean_bars_clause
+    from backend.modules.market_data.universe import get_membership
+    
+    # Quarantined bars are left out and prices adjusted, as in ScanEngine._load_market_data
+    query = f"""
+        SELECT symbol, date, open, high, low, close, volume
+        FROM market_data
+        WHERE date > :cutoff
+          AND {clean_bars_clause()}
+    """
+    end = datetime.combine(as_of, time.max) if as_of else datetime.now()
+    params = {'cutoff': end - timedelta(days=days)}
+    
+    if as_of:
+        query += " AND date <= :end"
+        params['end'] = end
+    
+    if symbols:
+        query += " AND symbol = ANY(:symbols)"
+        params['symbols'] = list(symbols)
+    
+    query += " ORDER BY symbol, date ASC"
+    
+    df = pd.read_sql(text(query), db_engine or engine, params=params)
+    # Bars before a symbol was listed (or after it was delisted) are masked point-in-time
+    df = get_membership(db_engine=db_engine).filter_bars(df)
+    return SymbolPanel.from_long(apply_adjustments(df, db_engine=db_engine))
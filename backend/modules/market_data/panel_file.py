@@ -0,0 +1,407 @@
+"""
+Memory-mapped market panel file.
+
+The whole market_data history as one dense float32 array
+(field × session × symbol), opened with np.memmap so notebooks, backtests
+and worker processes share the same OS pages with zero copies:
+
+    panel = PanelFile.open()                     # PANEL_FILE
+    closes = panel.frame('close')                # sessions × symbols DataFrame, no copy
+    panel.field('volume')[-1]                    # latest session across the market
+
+Bars are the ones scans see: quarantined bars dropped, listing intervals
+masked and prices split/dividend-adjusted. Cells without a bar are NaN.
+
+File layout (little endian):
+
+    0     b'BISTPNL1'
+    8     uint64  header length
+    16    uint64  n_sessions (written last on append)
+    24    JSON header: fields, symbols, capacity, offsets, factors and history digests
+    ...   datetime64[D] sessions (capacity slots)
+    ...   float32 data (len(fields), capacity, len(symbols)), page aligned
+
+append_sessions() rewrites the last REWRITE_SESSIONS sessions (late bars,
+re-run quality checks) and writes new sessions into the spare capacity in
+place, bumping n_sessions last so readers never see a half-written session.
+Everything older is fingerprinted (clean bar and quarantine counts, listing
+intervals); a changed fingerprint, new symbols, a full file or changed
+adjustment factors trigger a rebuild, which writes a new file and
+atomically replaces the old one (open readers keep mapping the old inode
+until they reopen).
+
+Usage:
+    python -m backend.modules.market_data.panel_file --build
+    python -m backend.modules.market_data.panel_file --append
+"""
+import argparse
+import hashlib
+import json
+import os
+import struct
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from backend.core.config import PANEL_FILE
+
+MAGIC = b'BISTPNL1'
+PREAMBLE = struct.Struct('<8sQQ')
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+PAGE = 4096
+
+# Spare sessions allocated on build (about a year of daily appends)
+SPARE_SESSIONS = 260
+
+# Trailing sessions re-read on every append: bars fetched a day late and
+# quarantine changes land here without a rebuild
+REWRITE_SESSIONS = 20
+
+
+def _align(offset: int, alignment: int) -> int:
+    return -(-offset // alignment) * alignment
+
+
+def load_bars(since: Optional[datetime] = None, db_engine=None) -> pd.DataFrame:
+    """
+    Clean, point-in-time, adjusted bars (optionally only from a date on).
+    
+    Args:
+        since: Only bars dated on or after this
+        db_engine: Optional engine (defaults to the application engine)
+    
+    Returns:
+        DataFrame [symbol, date, open, high, low, close, volume]
+    """
+    from backend.modules.market_data.corporate_actions import apply_adjustments
+    from backend.modules.market_data.quality import clean_bars_clause
+    from backend.modules.market_data.universe import get_membership
+    
+    if db_engine is None:
+        from backend.core.database import engine as db_engine
+    
+    query = f"""
+        SELECT symbol, date, open, high, low, close, volume
+        FROM market_data
+        WHERE {clean_bars_clause()}
+    """
+    params: Dict[str, Any] = {}
+    if since is not None:
+        query += " AND date >= :since"
+        params['since'] = since
+    
+    bars = pd.read_sql(text(query + " ORDER BY symbol, date ASC"), db_engine, params=params)
+    bars['date'] = pd.to_datetime(bars['date'])
+    bars = get_membership(db_engine=db_engine).filter_bars(bars)
+    return apply_adjustments(bars, db_engine=db_engine)
+
+
+def factors_digest(db_engine=None) -> str:
+    """Fingerprint of the adjustment factors in effect today."""
+    from backend.modules.market_data.corporate_actions import load_factors
+    
+    factors = load_factors(db_engine=db_engine)
+    return hashlib.sha1(factors.to_csv(index=False).encode()).hexdigest()
+
+
+def history_digest(before: datetime, db_engine=None) -> str:
+    """
+    Fingerprint of the bars dated before `before`: clean bar count, error
+    quarantine rows and listing intervals. A late bar, a new quarantine
+    verdict or a membership change in that range changes it.
+    """
+    from backend.modules.market_data.quality import clean_bars_clause
+    
+    if db_engine is None:
+        from backend.core.database import engine as db_engine
+    
+    with db_engine.connect() as conn:
+        bars = conn.execute(text(
+            f"SELECT COUNT(*) FROM market_data WHERE date < :before AND {clean_bars_clause()}"
+        ), {'before': before}).scalar()
+        quarantined = conn.execute(text(
+            "SELECT COUNT(*) FROM market_data_quarantine WHERE severity = 'error' AND date < :before"
+        ), {'before': before}).scalar()
+    try:
+        intervals = pd.read_sql(text(
+            "SELECT symbol, start_date, end_date FROM universe_membership ORDER BY symbol, start_date"
+        ), db_engine).to_csv(index=False)
+    except Exception:
+        intervals = ''
+    return hashlib.sha1(f"{bars}|{quarantined}|{intervals}".encode()).hexdigest()
+
+
+def _history_boundary(sessions: np.ndarray) -> datetime:
+    """First session of the trailing window append_sessions() rewrites."""
+    return pd.Timestamp(sessions[max(0, len(sessions) - REWRITE_SESSIONS)]).to_pydatetime()
+
+
+class PanelFile:
+    """
+    Read view of a panel file.
+    
+    Attributes:
+        path: File path
+        symbols: Column labels
+        fields: Field names, in data order
+        capacity: Session slots allocated in the file
+        n_sessions: Sessions written
+        header: Parsed JSON header
+    """
+    
+    def __init__(self, path: str, mode: str = 'r'):
+        self.path = path
+        self.mode = mode
+        with open(path, 'rb') as f:
+            magic, header_len, n_sessions = PREAMBLE.unpack(f.read(PREAMBLE.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a panel file")
+            self.header = json.loads(f.read(header_len))
+            self.header_len = header_len
+            self._inode = os.fstat(f.fileno()).st_ino
+        
+        self.symbols: List[str] = self.header['symbols']
+        self.fields: List[str] = self.header['fields']
+        self.capacity: int = self.header['capacity']
+        self.n_sessions = n_sessions
+        self._columns = {s: i for i, s in enumerate(self.symbols)}
+        
+        self._sessions = np.memmap(path, dtype='<M8[D]', mode=mode,
+                                   offset=self.header['sessions_offset'], shape=(self.capacity,))
+        self._data = np.memmap(path, dtype='<f4', mode=mode, offset=self.header['data_offset'],
+                               shape=(len(self.fields), self.capacity, len(self.symbols)))
+    
+    @classmethod
+    def open(cls, path: Optional[str] = None) -> 'PanelFile':
+        """Open read-only (PANEL_FILE by default)."""
+        return cls(path or PANEL_FILE)
+    
+    def refresh(self) -> int:
+        """Pick up sessions appended (or a rebuild) since open. Returns n_sessions."""
+        if os.stat(self.path).st_ino != self._inode:
+            self.close()
+            self.__init__(self.path, self.mode)
+            return self.n_sessions
+        with open(self.path, 'rb') as f:
+            self.n_sessions = PREAMBLE.unpack(f.read(PREAMBLE.size))[2]
+        return self.n_sessions
+    
+    @property
+    def sessions(self) -> np.ndarray:
+        """datetime64[D] session dates (view)."""
+        return self._sessions[:self.n_sessions]
+    
+    def field(self, name: str) -> np.ndarray:
+        """float32 sessions × symbols array for one field (view, NaN where no bar)."""
+        return self._data[self.fields.index(name), :self.n_sessions]
+    
+    def frame(self, name: str) -> pd.DataFrame:
+        """Wide DataFrame (sessions × symbols) for one field, backed by the mapping."""
+        return pd.DataFrame(self.field(name), index=pd.DatetimeIndex(self.sessions, name='date'),
+                            columns=self.symbols, copy=False)
+    
+    def symbol_frame(self, symbol: str) -> pd.DataFrame:
+        """Long-format OHLCV rows of one symbol (sessions with a bar only)."""
+        col = self._columns[symbol]
+        data = {f: self.field(f)[:, col] for f in self.fields}
+        mask = ~np.isnan(data['close'])
+        return pd.DataFrame({'symbol': symbol, 'date': self.sessions[mask],
+                             **{f: values[mask] for f, values in data.items()}})
+    
+    def close(self) -> None:
+        """Flush writes and drop the mappings (unmapped once no array views remain)."""
+        if self._data is None:
+            return
+        if self.mode != 'r':
+            self._sessions.flush()
+            self._data.flush()
+        self._sessions = self._data = None
+
+
+def _write(path: str, bars: pd.DataFrame, digest: str, spare: int, db_engine=None) -> Dict[str, Any]:
+    """Write a fresh panel file next to `path`, then atomically replace it."""
+    sessions = np.sort(bars['date'].dt.normalize().unique()).astype('datetime64[D]')
+    symbols = sorted(bars['symbol'].unique())
+    capacity = len(sessions) + spare
+    boundary = _history_boundary(sessions)
+    
+    header = {
+        'version': 1,
+        'fields': list(FIELDS),
+        'symbols': symbols,
+        'capacity': capacity,
+        'factors_digest': digest,
+        'history_before': boundary.date().isoformat(),
+        'history_digest': history_digest(boundary, db_engine),
+        'built_at': datetime.now().isoformat(timespec='seconds')
+    }
+    # Offsets depend on the header's own length: reserve room for them first
+    header.update(sessions_offset=0, data_offset=0)
+    header_len = len(json.dumps(header).encode()) + 64
+    header['sessions_offset'] = _align(PREAMBLE.size + header_len, 64)
+    header['data_offset'] = _align(header['sessions_offset'] + capacity * 8, PAGE)
+    raw = json.dumps(header).encode().ljust(header_len)
+    size = header['data_offset'] + len(FIELDS) * capacity * len(symbols) * 4
+    
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(PREAMBLE.pack(MAGIC, header_len, 0))
+        f.write(raw)
+        f.truncate(size)
+    
+    panel = PanelFile(tmp, mode='r+')
+    panel._data[:] = np.nan
+    _fill(panel, bars, 0, sessions)
+    panel.close()
+    _publish(tmp, len(sessions))
+    os.replace(tmp, path)
+    
+    return {'sessions': len(sessions), 'symbols': len(symbols), 'capacity': capacity, 'bytes': size}
+
+
+def _fill(panel: PanelFile, bars: pd.DataFrame, start: int, sessions: np.ndarray) -> None:
+    """Scatter long rows into session slots start..start + len(sessions)."""
+    rows = start + np.searchsorted(sessions, bars['date'].to_numpy(dtype='datetime64[D]'))
+    cols = bars['symbol'].map(panel._columns).to_numpy(dtype=np.int64)
+    panel._sessions[start:start + len(sessions)] = sessions
+    for i, name in enumerate(panel.fields):
+        panel._data[i, rows, cols] = bars[name].to_numpy(dtype=np.float32)
+
+
+def _rewrite(panel: PanelFile, bars: pd.DataFrame, start: int, sessions: np.ndarray) -> None:
+    """
+    Replace session slots start..start + len(sessions) with `bars`.
+    
+    The block is assembled in memory and copied per field, so cells of
+    published sessions go from the old value straight to the new one.
+    """
+    rows = np.searchsorted(sessions, bars['date'].to_numpy(dtype='datetime64[D]'))
+    cols = bars['symbol'].map(panel._columns).to_numpy(dtype=np.int64)
+    end = start + len(sessions)
+    for i, name in enumerate(panel.fields):
+        block = np.full((len(sessions), len(panel.symbols)), np.nan, dtype=np.float32)
+        block[rows, cols] = bars[name].to_numpy(dtype=np.float32)
+        panel._data[i, start:end] = block
+    panel._sessions[start:end] = sessions
+
+
+def _write_header(panel: PanelFile) -> bool:
+    """Rewrite the JSON header in place; False if it outgrew its reserved space."""
+    raw = json.dumps(panel.header).encode()
+    if len(raw) > panel.header_len:
+        return False
+    with open(panel.path, 'r+b') as f:
+        f.seek(PREAMBLE.size)
+        f.write(raw.ljust(panel.header_len))
+    return True
+
+
+def _publish(path: str, n_sessions: int) -> None:
+    """Make n_sessions visible to readers (after the data is on disk)."""
+    with open(path, 'r+b') as f:
+        f.seek(16)
+        f.write(struct.pack('<Q', n_sessions))
+
+
+def build_panel_file(path: Optional[str] = None, spare: int = SPARE_SESSIONS,
+                     db_engine=None) -> Dict[str, Any]:
+    """
+    Export the full market_data history into a new panel file.
+    
+    Args:
+        path: Output path (default: PANEL_FILE)
+        spare: Extra session slots for in-place appends
+        db_engine: Optional engine (defaults to the application engine)
+    
+    Returns:
+        {sessions, symbols, capacity, bytes}
+    """
+    bars = load_bars(db_engine=db_engine)
+    if bars.empty:
+        raise ValueError("market_data is empty, nothing to export")
+    return _write(path or PANEL_FILE, bars, factors_digest(db_engine), spare, db_engine)
+
+
+def append_sessions(path: Optional[str] = None, db_engine=None) -> Dict[str, Any]:
+    """
+    Rewrite the trailing REWRITE_SESSIONS sessions and append newer ones, in place when possible.
+    
+    Falls back to build_panel_file() when the file is missing, bars older
+    than the trailing window changed, a new symbol appears, the spare
+    capacity is used up or adjustment factors changed.
+    
+    Args:
+        path: Panel file (default: PANEL_FILE)
+        db_engine: Optional engine (defaults to the application engine)
+    
+    Returns:
+        {'appended': n, 'rewritten': n} or build_panel_file()'s summary plus 'rebuilt': reason
+    """
+    path = path or PANEL_FILE
+    if not os.path.exists(path):
+        return {**build_panel_file(path, db_engine=db_engine), 'rebuilt': 'missing'}
+    
+    panel = PanelFile(path, mode='r+')
+    try:
+        history_before = panel.header.get('history_before')
+        if panel.header['factors_digest'] != factors_digest(db_engine):
+            reason = 'factors'
+        elif not panel.n_sessions or history_before is None:
+            reason = 'history'
+        elif panel.header.get('history_digest') != history_digest(datetime.fromisoformat(history_before), db_engine):
+            reason = 'history'
+        else:
+            # Re-read from the stored boundary: everything before it matched the fingerprint
+            start = int(np.searchsorted(panel.sessions, np.datetime64(history_before, 'D')))
+            bars = load_bars(since=datetime.fromisoformat(history_before), db_engine=db_engine)
+            if bars.empty:
+                return {'appended': 0, 'rewritten': 0}
+            sessions = np.sort(bars['date'].dt.normalize().unique()).astype('datetime64[D]')
+            
+            if not bars['symbol'].isin(panel._columns.keys()).all():
+                reason = 'symbols'
+            elif start + len(sessions) > panel.capacity:
+                reason = 'capacity'
+            else:
+                appended = start + len(sessions) - panel.n_sessions
+                _rewrite(panel, bars, start, sessions)
+                total = start + len(sessions)
+                boundary = _history_boundary(panel._sessions[:total])
+                panel.header.update(history_before=boundary.date().isoformat(),
+                                    history_digest=history_digest(boundary, db_engine))
+                if not _write_header(panel):
+                    reason = 'header'
+                else:
+                    panel.close()
+                    _publish(path, total)
+                    return {'appended': appended, 'rewritten': panel.n_sessions - start}
+    finally:
+        panel.close()
+    
+    return {**build_panel_file(path, db_engine=db_engine), 'rebuilt': reason}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory-mapped float32 market panel file')
+    parser.add_argument('--path', type=str, default=PANEL_FILE, help=f'Panel file (default: {PANEL_FILE})')
+    parser.add_argument('--build', action='store_true', help='Export the full history')
+    parser.add_argument('--append', action='store_true', help='Append new sessions (rebuilds if needed)')
+    args = parser.parse_args()
+    
+    if args.build:
+        print(f"✓ built: {build_panel_file(args.path)}")
+    elif args.append:
+        print(f"✓ {append_sessions(args.path)}")
+    
+    panel = PanelFile.open(args.path)
+    print(f"{args.path}: {panel.n_sessions}/{panel.capacity} sessions × {len(panel.symbols)} symbols, "
+          f"{str(panel.sessions[0]) if panel.n_sessions else '-'} .. "
+          f"{str(panel.sessions[-1]) if panel.n_sessions else '-'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,354 @@
+"""
+Market data quality checks.
+
+After ingest, find_issues() checks every bar of the whole universe in one
+vectorized pass and the results replace the window's rows in
+market_data_quarantine.
+
+Errors: the bar is quarantined. Scans, the indicator store and breadth skip
+it, and the symbol stays in the results.
+- missing_value: NULL open/high/low/close/volume
+- non_positive: price <= 0 or volume < 0
+- inconsistent_range: high < low, or open/close outside [low, high]
+- duplicate: more than one bar for a symbol on the same day (all but the last)
+- off_calendar: bar on a weekend or a closed bist_holidays day
+- bad_print: price spike beyond the daily price band, reversed by the next bar
+
+Warnings: recorded, but the bar stays in use.
+- price_spike: log return beyond SPIKE_SIGMA rolling standard deviations
+  (splits and bonus issues also land here)
+- volume_outlier: log volume beyond VOLUME_SIGMA rolling standard deviations
+- missing_session: session without a bar between a symbol's first and last bar
+
+Usage:
+    python -m backend.modules.market_data.quality --days 250
+"""
+import argparse
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, insert, text
+
+from backend.core.cache import get_cache
+from backend.core.database import engine
+from backend.modules.market_data.models import MarketDataQuarantine
+from backend.modules.market_data.panel import SymbolPanel
+from backend.modules.market_data.trading_calendar import TradingCalendar, get_trading_calendar
+
+# Same window ScanEngine loads
+HISTORY_DAYS = 250
+
+# Rolling statistics: bars in the window and bars needed before judging
+WINDOW = 60
+MIN_PERIODS = 20
+SPIKE_SIGMA = 6.0
+VOLUME_SIGMA = 5.0
+# A spike is a bad print when the next bar takes back at least this share of it
+# and the move is larger than BIST's ±10% daily price band allows
+REVERSAL = 0.8
+MIN_BAD_PRINT = np.log(1.15)
+# Relative tolerance of the high/low range checks (rounded feed prices)
+RANGE_TOLERANCE = 1e-6
+
+ERROR = 'error'
+WARNING = 'warning'
+SEVERITY = {
+    'missing_value': ERROR,
+    'non_positive': ERROR,
+    'inconsistent_range': ERROR,
+    'duplicate': ERROR,
+    'off_calendar': ERROR,
+    'bad_print': ERROR,
+    'price_spike': WARNING,
+    'volume_outlier': WARNING,
+    'missing_session': WARNING
+}
+
+ISSUE_COLUMNS = ['symbol', 'date', 'rule', 'severity', 'value']
+
+
+def clean_bars_clause(alias: str = 'market_data') -> str:
+    """SQL condition that drops quarantined (error) bars of `alias`."""
+    return f"""NOT EXISTS (
+            SELECT 1 FROM market_data_quarantine q
+            WHERE q.symbol = {alias}.symbol AND q.date = {alias}.date AND q.severity = 'error'
+        )"""
+
+
+def find_issues(
+    bars: pd.DataFrame,
+    calendar: Optional[TradingCalendar] = None,
+    window: int = WINDOW,
+    spike_sigma: float = SPIKE_SIGMA,
+    volume_sigma: float = VOLUME_SIGMA
+) -> pd.DataFrame:
+    """
+    Check every bar of a long OHLCV frame.
+    
+    Args:
+        bars: DataFrame with symbol, date, open, high, low, close, volume
+        calendar: Trading calendar (default: get_trading_calendar())
+        window: Bars in the rolling return/volume statistics
+        spike_sigma: Return z-score that counts as a spike
+        volume_sigma: Log-volume z-score that counts as an outlier
+    
+    Returns:
+        DataFrame with ISSUE_COLUMNS, one row per flagged bar and rule
+    """
+    if bars.empty:
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
+    
+    calendar = calendar or get_trading_calendar()
+    bars = bars.sort_values(['symbol', 'date'], kind='stable').reset_index(drop=True)
+    dates = pd.to_datetime(bars['date']).to_numpy(dtype='datetime64[ns]')
+    days = dates.astype('datetime64[D]')
+    symbols = bars['symbol'].to_numpy(dtype=object)
+    
+    prices = bars[['open', 'high', 'low', 'close']].to_numpy(dtype=float)
+    open_, high, low, close = prices.T
+    volume = bars['volume'].to_numpy(dtype=float)
+    tolerance = np.abs(high) * RANGE_TOLERANCE
+    
+    with np.errstate(invalid='ignore'):
+        flags = {
+            'missing_value': np.isnan(prices).any(axis=1) | np.isnan(volume),
+            'non_positive': (prices <= 0).any(axis=1) | (volume < 0),
+            'inconsistent_range': ((high < low - tolerance) |
+                                   (high < np.maximum(open_, close) - tolerance) |
+                                   (low > np.minimum(open_, close) + tolerance)),
+            'duplicate': pd.DataFrame({'symbol': symbols, 'day': days}).duplicated(keep='last').to_numpy(),
+            'off_calendar': ~calendar.session_mask(days)
+        }
+    
+    issues = [
+        pd.DataFrame({'symbol': symbols[mask], 'date': dates[mask], 'rule': rule, 'value': np.nan})
+        for rule, mask in flags.items() if mask.any()
+    ]
+    
+    # Return and volume statistics only over bars that passed the checks above
+    usable = ~np.logical_or.reduce(list(flags.values()))
+    issues.append(_outliers(bars[usable], window, spike_sigma, volume_sigma))
+    issues.append(_missing_sessions(symbols, days, calendar))
+    
+    result = pd.concat([df for df in issues if not df.empty] or [pd.DataFrame(columns=ISSUE_COLUMNS)],
+                       ignore_index=True)
+    result['severity'] = result['rule'].map(SEVERITY)
+    return result[ISSUE_COLUMNS].sort_values(['symbol', 'date', 'rule'], ignore_index=True)
+
+
+def _outliers(bars: pd.DataFrame, window: int, spike_sigma: float, volume_sigma: float) -> pd.DataFrame:
+    """price_spike / bad_print / volume_outlier, computed column-wise on the panel."""
+    if bars.empty:
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
+    
+    panel = SymbolPanel.from_long(bars)
+    min_periods = min(MIN_PERIODS, window)
+    
+    # Statistics of the previous `window` bars, so the bar being judged is not part of them
+    log_return = np.log(panel.frame('close')).diff()
+    sigma = log_return.rolling(window, min_periods=min_periods).std().shift()
+    z_return = log_return / sigma.where(sigma > 0)
+    
+    log_volume = np.log(panel.frame('volume').where(lambda v: v > 0))
+    mean = log_volume.rolling(window, min_periods=min_periods).mean().shift()
+    std = log_volume.rolling(window, min_periods=min_periods).std().shift()
+    z_volume = (log_volume - mean) / std.where(std > 0)
+    
+    with np.errstate(invalid='ignore'):
+        spike = z_return.abs() > spike_sigma
+        next_return = log_return.shift(-1)
+        # The next bar is a spike of its own against the same sigma, in the other direction
+        reversed_ = (spike & (np.sign(next_return) == -np.sign(log_return)) &
+                     (next_return.abs() >= REVERSAL * log_return.abs()) &
+                     (next_return.abs() / sigma > spike_sigma) &
+                     (log_return.abs() > MIN_BAD_PRINT))
+        outlier = z_volume.abs() > volume_sigma
+    
+    flags = panel.to_long({
+        'z_return': z_return.to_numpy(),
+        'z_volume': z_volume.to_numpy(),
+        'bad_print': reversed_.to_numpy(),
+        'price_spike': (spike & ~reversed_).to_numpy(),
+        'volume_outlier': outlier.to_numpy()
+    })
+    
+    issues = []
+    for rule, z in (('bad_print', 'z_return'), ('price_spike', 'z_return'), ('volume_outlier', 'z_volume')):
+        hit = flags[flags[rule]]
+        issues.append(pd.DataFrame({'symbol': hit['symbol'], 'date': hit['date'],
+                                    'rule': rule, 'value': hit[z].round(2)}))
+    return pd.concat(issues, ignore_index=True)
+
+
+def _missing_sessions(symbols: np.ndarray, days: np.ndarray, calendar: TradingCalendar) -> pd.DataFrame:
+    """Calendar sessions without a bar inside each symbol's first..last bar range."""
+    present = pd.DataFrame({'symbol': symbols, 'day': days}).drop_duplicates()
+    bounds = present.groupby('symbol', sort=False)['day'].agg(['min', 'max'])
+    
+    sessions = calendar.sessions
+    lo = np.searchsorted(sessions, bounds['min'].to_numpy(dtype='datetime64[D]'))
+    hi = np.searchsorted(sessions, bounds['max'].to_numpy(dtype='datetime64[D]'), side='right')
+    n = np.maximum(hi - lo, 0)
+    if not n.sum():
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
+    
+    # Every (symbol, session) pair the symbol should have, as flat arrays
+    index = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n) + np.repeat(lo, n)
+    expected = pd.DataFrame({'symbol': np.repeat(bounds.index.to_numpy(dtype=object), n),
+                             'day': sessions[index]})
+    
+    merged = expected.merge(present, on=['symbol', 'day'], how='left', indicator=True)
+    missing = merged[merged['_merge'] == 'left_only']
+    return pd.DataFrame({'symbol': missing['symbol'].to_numpy(),
+                         'date': missing['day'].to_numpy(dtype='datetime64[ns]'),
+                         'rule': 'missing_session', 'value': np.nan})
+
+
+def load_bars(days: int = HISTORY_DAYS, symbols: Optional[List[str]] = None, db_engine=None) -> pd.DataFrame:
+    """Raw market_data rows (quarantined bars included) for the last `days` calendar days."""
+    query = """
+        SELECT symbol, date, open, high, low, close, volume
+        FROM market_data
+        WHERE date > :cutoff
+    """
+    params: Dict[str, Any] = {'cutoff': datetime.now() - timedelta(days=days)}
+    
+    if symbols:
+        query += " AND symbol IN :symbols"
+        params['symbols'] = list(symbols)
+    
+    stmt = text(query + " ORDER BY symbol, date ASC")
+    if symbols:
+        stmt = stmt.bindparams(bindparam('symbols', expanding=True))
+    return pd.read_sql(stmt, db_engine or engine, params=params)
+
+
+def save_quarantine(issues: pd.DataFrame, cutoff: datetime, symbols: Optional[List[str]] = None,
+                    db_engine=None) -> int:
+    """
+    Replace the quarantine rows after `cutoff` with `issues`.
+    
+    Args:
+        issues: Output of find_issues
+        cutoff: Rows with date > cutoff are replaced (older rows are kept)
+        symbols: Limit the replacement to these symbols (None = all)
+        db_engine: Optional engine (defaults to the application engine)
+    
+    Returns:
+        Number of rows written
+    """
+    issues = issues[pd.to_datetime(issues['date']) > pd.Timestamp(cutoff)]
+    
+    delete = "DELETE FROM market_data_quarantine WHERE date > :cutoff"
+    if symbols:
+        delete += " AND symbol IN :symbols"
+    delete = text(delete)
+    if symbols:
+        delete = delete.bindparams(bindparam('symbols', expanding=True))
+    
+    detected_at = datetime.now()
+    records = [
+        {'symbol': row.symbol, 'date': row.date.to_pydatetime(), 'rule': row.rule,
+         'severity': row.severity, 'value': None if pd.isna(row.value) else float(row.value),
+         'detected_at': detected_at}
+        for row in issues.assign(date=pd.to_datetime(issues['date'])).itertuples(index=False)
+    ]
+    
+    with (db_engine or engine).begin() as conn:
+        conn.execute(delete, {'cutoff': cutoff, **({'symbols': list(symbols)} if symbols else {})})
+        if records:
+            # Through the model's column types, so dates are stored exactly like market_data.date
+            conn.execute(insert(MarketDataQuarantine), records)
+    
+    return len(records)
+
+
+def run_quality_checks(days: int = HISTORY_DAYS, symbols: Optional[List[str]] = None,
+                       db_engine=None) -> Dict[str, Any]:
+    """
+    Check the last `days` calendar days of market data and refresh the quarantine.
+    
+    Args:
+        days: Calendar days to check
+        symbols: Optional list of symbols (None = whole market)
+        db_engine: Optional engine (defaults to the application engine)
+    
+    Returns:
+        {'bars', 'symbols', 'errors', 'warnings', 'rules': {rule: count}}
+    """
+    from backend.modules.market_data.corporate_actions import apply_adjustments
+    
+    db_engine = db_engine or engine
+    cutoff = datetime.now() - timedelta(days=days)
+    bars = load_bars(days, symbols, db_engine)
+    # Confirmed splits and bonus issues would otherwise show up as price spikes
+    issues = find_issues(apply_adjustments(bars, db_engine=db_engine))
+    save_quarantine(issues, cutoff, symbols, db_engine)
+    
+    # Scan results were computed with the previous quarantine
+    get_cache().bump('scan')
+    
+    return {
+        'bars': len(bars),
+        'symbols': int(bars['symbol'].nunique()),
+        'errors': int((issues['severity'] == ERROR).sum()),
+        'warnings': int((issues['severity'] == WARNING).sum()),
+        'rules': {rule: int(n) for rule, n in issues['rule'].value_counts().items()}
+    }
+
+
+def get_quarantine(days: int = 30, symbol: Optional[str] = None,
+                   severity: Optional[str] = None, limit: int = 500) -> List[Dict[str, Any]]:
+    """
+    Read quarantine rows, newest first.
+    
+    Args:
+        days: Calendar days to return
+        symbol: Optional symbol filter
+        severity: Optional 'error' / 'warning' filter
+        limit: Maximum rows
+    
+    Returns:
+        List of row dicts
+    """
+    query = """
+        SELECT symbol, date, rule, severity, value, detected_at
+        FROM market_data_quarantine
+        WHERE date > :cutoff
+    """
+    params: Dict[str, Any] = {'cutoff': datetime.now() - timedelta(days=days), 'limit': limit}
+    if symbol:
+        query += " AND symbol = :symbol"
+        params['symbol'] = symbol
+    if severity:
+        query += " AND severity = :severity"
+        params['severity'] = severity
+    query += " ORDER BY date DESC, symbol, rule LIMIT :limit"
+    
+    with engine.connect() as conn:
+        rows = conn.execute(text(query), params).fetchall()
+    
+    return [
+        {**row._mapping, 'date': str(row.date)[:10], 'detected_at': str(row.detected_at)}
+        for row in rows
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check market data quality and refresh the quarantine')
+    parser.add_argument('--days', type=int, default=HISTORY_DAYS,
+                        help=f'Calendar days to check (default: {HISTORY_DAYS})')
+    parser.add_argument('--symbols', type=str, nargs='+', default=None, help='Only these symbols')
+    args = parser.parse_args()
+    
+    summary = run_quality_checks(args.days, args.symbols)
+    print(f"✓ {summary['bars']} bars / {summary['symbols']} symbols checked: "
+          f"{summary['errors']} quarantined, {summary['warnings']} warnings")
+    for rule, n in summary['rules'].items():
+        print(f"  {rule:<20} {n:>6}  ({SEVERITY[rule]})")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,12 +2,33 @@
 REST API routes for market data module.
 """
 from flask import Blueprint, jsonify, request
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, List, Optional
+from sqlalchemy import text
+from pydantic import BaseModel, Field, ValidationError
 import traceback
 
-from backend.core.database import get_db_session, engine
-from backend.modules.market_data.models import Ticker, MarketData
-import pandas as pd
+from backend.core.cache import cached_json
+from backend.core.database import engine
+from backend.modules.market_data.models import MarketData
+from backend.modules.market_data import snapshot
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# ============================================================================
+# REQUEST/RESPONSE MODELS (Pydantic)
+# ============================================================================
+
+MAX_BATCH_SYMBOLS = 200
+
+
+class OHLCVBatchRequest(BaseModel):
+    """Request model for POST /api/market-data/ohlcv/batch"""
+    symbols: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_SYMBOLS, description="Symbols to fetch")
+    days: int = Field(default=90, ge=1, le=365, description="Number of calendar days to fetch")
+    points: Optional[int] = Field(default=None, ge=2, le=365, description="Downsample each series to this many points")
 
 # Create blueprint
 market_data_bp = Blueprint('market_data', __name__, url_prefix='/api/market-data')
@@ -29,24 +50,7 @@ def get_stats():
         }
     """
     try:
-        with get_db_session() as session:
-            # Count tickers
-            tickers_count = session.query(Ticker).count()
-            active_tickers = session.query(Ticker).filter(Ticker.is_active == True).count()
-            
-            # Get latest data date
-            query = "SELECT MAX(date) as latest_date, COUNT(*) as data_points FROM market_data"
-            result = pd.read_sql(query, engine)
-            
-            latest_date = result.iloc[0]['latest_date']
-            data_points = int(result.iloc[0]['data_points'])
-            
-            return jsonify({
-                'tickers_count': tickers_count,
-                'active_tickers': active_tickers,
-                'latest_data_date': str(latest_date)[:10] if latest_date else None,
-                'data_points': data_points
-            }), 200
+        return jsonify(snapshot.get_stats()), 200
     
     except Exception as e:
         return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
@@ -77,36 +81,275 @@ def get_tickers():
         limit = request.args.get('limit', 100, type=int)
         offset = request.args.get('offset', 0, type=int)
         
-        with get_db_session() as session:
-            query = session.query(Ticker)
-            
-            if active_only:
-                query = query.filter(Ticker.is_active == True)
-            
-            total = query.count()
-            tickers = query.order_by(Ticker.symbol).limit(limit).offset(offset).all()
-            
-            result = []
-            for ticker in tickers:
-                result.append({
-                    'symbol': ticker.symbol,
-                    'name': ticker.name,
-                    'type': ticker.type,
-                    'is_active': ticker.is_active
-                })
-            
-            return jsonify({
-                'tickers': result,
-                'total': total,
-                'limit': limit,
-                'offset': offset
-            }), 200
+        tickers = snapshot.get_tickers()
+        
+        if active_only:
+            tickers = [t for t in tickers if t['is_active']]
+        
+        return jsonify({
+            'tickers': tickers[offset:offset + limit],
+            'total': len(tickers),
+            'limit': limit,
+            'offset': offset
+        }), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
+
+
+@market_data_bp.route('/tickers/changes', methods=['GET'])
+def get_ticker_changes():
+    """
+    Get universe changes recorded by the weekly ticker sync.
+    
+    GET /api/market-data/tickers/changes?days=90&symbol=THYAO&type=delisted
+    
+    Query params:
+        days: Number of days to return (default: 90, max: 730)
+        symbol: Optional symbol filter
+        type: Optional 'added', 'updated', 'reactivated' or 'delisted'
+    
+    Returns:
+        {
+            "changes": [
+                {"symbol": "XYZ", "change_type": "delisted", "name": "XYZ",
+                 "type": "stock", "detail": null, "changed_at": "..."}
+            ],
+            "count": 1
+        }
+    """
+    try:
+        from backend.modules.market_data import fetch_tickers
+        
+        days = min(request.args.get('days', 90, type=int), 730)
+        symbol = request.args.get('symbol', type=str)
+        change_type = request.args.get('type', type=str)
+        if change_type and change_type not in fetch_tickers.CHANGE_TYPES:
+            return jsonify({'error': f"type must be one of {', '.join(fetch_tickers.CHANGE_TYPES)}"}), 400
+        
+        changes = fetch_tickers.get_ticker_changes(days, symbol.upper() if symbol else None, change_type)
+        return jsonify({'changes': changes, 'count': len(changes)}), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
+
+
+@market_data_bp.route('/universe', methods=['GET'])
+def get_universe():
+    """
+    Get the point-in-time universe (symbols listed on a date).
+    
+    GET /api/market-data/universe?date=2021-06-01
+    
+    Query params:
+        date: YYYY-MM-DD (default: today)
+    
+    Returns:
+        {
+            "date": "2021-06-01",
+            "symbols": ["ACSEL", "ADEL", ...],
+            "count": 512,
+            "point_in_time": true  // false until universe_membership is built (active tickers)
+        }
+    """
+    try:
+        from backend.modules.market_data.universe import get_membership
+        
+        try:
+            day = date.fromisoformat(request.args.get('date', date.today().isoformat()))
+        except ValueError:
+            return jsonify({'error': 'date must be YYYY-MM-DD'}), 400
+        
+        index = get_membership()
+        if len(index.symbols):
+            symbols = index.members(day)
+        else:
+            symbols = [t['symbol'] for t in snapshot.get_tickers() if t['is_active']]
+        
+        return jsonify({
+            'date': day.isoformat(),
+            'symbols': symbols,
+            'count': len(symbols),
+            'point_in_time': bool(len(index.symbols))
+        }), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
+
+
+@market_data_bp.route('/latest', methods=['GET'])
+def get_latest_bars():
+    """
+    Get the latest bar for each symbol (served from the in-process snapshot).
+    
+    GET /api/market-data/latest?symbols=THYAO,ASELS
+    
+    Query params:
+        symbols: Comma-separated symbols (default: all)
+    
+    Returns:
+        {
+            "bars": {
+                "THYAO": {"date": "2025-12-07", "open": 188.0, ..., "volume": 1500000},
+                ...
+            },
+            "count": 2
+        }
+    """
+    try:
+        latest = snapshot.get_latest_bars()
+        symbols_arg = request.args.get('symbols', type=str)
+        
+        if symbols_arg:
+            symbols = [s.strip().upper() for s in symbols_arg.split(',') if s.strip()]
+            bars = {s: latest[s] for s in symbols if s in latest}
+        else:
+            bars = latest
+        
+        return jsonify({
+            'bars': bars,
+            'count': len(bars)
+        }), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
+
+
+@market_data_bp.route('/breadth', methods=['GET'])
+@cached_json('breadth')
+def get_breadth():
+    """
+    Get market-wide breadth time series for the dashboard.
+    
+    GET /api/market-data/breadth?days=90
+    
+    Query params:
+        days: Number of days to return (default: 90, max: 730)
+    
+    Returns:
+        {
+            "latest": {
+                "date": "2025-12-07",
+                "symbols": 590,
+                "advancing": 312,
+                "declining": 251,
+                "unchanged": 27,
+                "ad_line": 1480,
+                "above_ema50": 301,
+                "pct_above_ema50": 51.02,
+                "new_highs": 18,
+                "new_lows": 6,
+                "avg_adx": 21.4,
+                "avg_rsi": 52.3
+            },
+            "series": [...],
+            "count": 62
+        }
+    """
+    try:
+        from backend.modules.market_data import breadth
+        
+        days = min(request.args.get('days', 90, type=int), 730)
+        series = breadth.get_breadth_series(days)
+        
+        return jsonify({
+            'latest': series[-1] if series else None,
+            'series': series,
+            'count': len(series)
+        }), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
+
+
+@market_data_bp.route('/quarantine', methods=['GET'])
+def get_quarantine():
+    """
+    Get bars flagged by the data quality checks.
+    
+    GET /api/market-data/quarantine?days=30&symbol=THYAO&severity=error
+    
+    Query params:
+        days: Number of days to return (default: 30, max: 365)
+        symbol: Optional symbol filter
+        severity: Optional 'error' (skipped by scans) or 'warning'
+    
+    Returns:
+        {
+            "issues": [
+                {"symbol": "THYAO", "date": "2025-12-05", "rule": "bad_print",
+                 "severity": "error", "value": 9.4, "detected_at": "..."}
+            ],
+            "rules": {"bad_print": 1},
+            "count": 1
+        }
+    """
+    try:
+        from backend.modules.market_data import quality
+        
+        days = min(request.args.get('days', 30, type=int), 365)
+        symbol = request.args.get('symbol', type=str)
+        severity = request.args.get('severity', type=str)
+        if severity and severity not in (quality.ERROR, quality.WARNING):
+            return jsonify({'error': "severity must be 'error' or 'warning'"}), 400
+        
+        issues = quality.get_quarantine(days, symbol.upper() if symbol else None, severity)
+        rules = {}
+        for issue in issues:
+            rules[issue['rule']] = rules.get(issue['rule'], 0) + 1
+        
+        return jsonify({'issues': issues, 'rules': rules, 'count': len(issues)}), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
+
+
+@market_data_bp.route('/<symbol>/indicators', methods=['GET'])
+@cached_json('indicators', symbol_arg='symbol')
+def get_indicators(symbol: str):
+    """
+    Get precomputed indicator series for chart overlays.
+    
+    GET /api/market-data/:symbol/indicators?spec=ema:length=50&spec=rsi:period=14&days=90
+    
+    Query params:
+        spec: Indicator spec key, repeatable (default: XTUMY V27 indicator set)
+        days: Number of days (default: 90, max: 365)
+    
+    Returns:
+        {
+            "symbol": "THYAO",
+            "indicators": {
+                "ema:length=50,source=close": {
+                    "date": ["2025-12-05", "2025-12-06", ...],
+                    "value": [185.2, 185.7, ...]
+                },
+                ...
+            }
+        }
+    """
+    try:
+        from backend.modules.market_data import indicator_store
+        
+        days = min(request.args.get('days', 90, type=int), 365)
+        spec_keys = request.args.getlist('spec')
+        
+        try:
+            specs = [indicator_store.IndicatorSpec.parse(k) for k in spec_keys]
+        except (KeyError, ValueError) as e:
+            return jsonify({'error': 'Invalid indicator spec', 'details': str(e)}), 400
+        
+        return jsonify({
+            'symbol': symbol.upper(),
+            'indicators': indicator_store.get_symbol_indicators(symbol.upper(), specs, days)
+        }), 200
     
     except Exception as e:
         return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
 
 
 @market_data_bp.route('/tickers/<symbol>/data', methods=['GET'])
+@cached_json('ohlcv', symbol_arg='symbol')
 def get_ticker_data(symbol: str):
     """
     Get OHLCV data for a ticker.
@@ -150,6 +393,7 @@ def get_ticker_data(symbol: str):
             ORDER BY date ASC
         """
         
+        import pandas as pd
         df = pd.read_sql(query, engine)
         
         if df.empty:
@@ -207,3 +451,123 @@ def get_ohlcv(symbol: str):
     """
     # Call the existing get_ticker_data function
     return get_ticker_data(symbol)
+
+
+@market_data_bp.route('/ohlcv/batch', methods=['POST'])
+@cached_json('ohlcv')
+def get_ohlcv_batch():
+    """
+    Get OHLCV data for many symbols in a single request (watchlists, sparklines).
+    
+    POST /api/market-data/ohlcv/batch
+    
+    Body:
+        {
+            "symbols": ["THYAO", "ASELS", "GARAN"],
+            "days": 90,
+            "points": 30  // optional - downsample each series to N bars
+        }
+    
+    Returns:
+        {
+            "days": 90,
+            "points": 30,
+            "data": {
+                "THYAO": {
+                    "date": ["2025-09-08", ...],
+                    "open": [...],
+                    "high": [...],
+                    "low": [...],
+                    "close": [...],
+                    "volume": [...]
+                },
+                ...
+            },
+            "missing": ["XXXXX"]
+        }
+    """
+    try:
+        data = request.get_json()
+        
+        # Validate request with Pydantic
+        try:
+            batch_request = OHLCVBatchRequest(**(data or {}))
+        except ValidationError as e:
+            return jsonify({
+                'error': 'Invalid request data',
+                'details': e.errors()
+            }), 400
+        
+        # Preserve request order, drop duplicates
+        symbols = list(dict.fromkeys(s.strip().upper() for s in batch_request.symbols if s.strip()))
+        
+        end_date = datetime.now().date()
+        start_date = end_date - timedelta(days=batch_request.days)
+        
+        # Single round trip for the whole watchlist
+        query = text("""
+            SELECT symbol, date, open, high, low, close, volume
+            FROM market_data
+            WHERE symbol = ANY(:symbols)
+              AND date >= :start_date
+              AND date <= :end_date
+            ORDER BY symbol, date ASC
+        """)
+        
+        import pandas as pd
+        df = pd.read_sql(query, engine, params={
+            'symbols': symbols,
+            'start_date': start_date,
+            'end_date': end_date
+        })
+        
+        result = {}
+        for symbol, group_df in df.groupby('symbol', sort=False):
+            if batch_request.points and len(group_df) > batch_request.points:
+                group_df = _downsample_ohlcv(group_df, batch_request.points)
+            
+            result[symbol] = {
+                'date': group_df['date'].astype(str).str[:10].tolist(),
+                'open': group_df['open'].astype(float).tolist(),
+                'high': group_df['high'].astype(float).tolist(),
+                'low': group_df['low'].astype(float).tolist(),
+                'close': group_df['close'].astype(float).tolist(),
+                'volume': group_df['volume'].fillna(0).astype('int64').tolist()
+            }
+        
+        return jsonify({
+            'days': batch_request.days,
+            'points': batch_request.points,
+            'data': result,
+            'missing': [s for s in symbols if s not in result]
+        }), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
+
+
+def _downsample_ohlcv(df: 'pd.DataFrame', points: int) -> 'pd.DataFrame':
+    """
+    Aggregate consecutive bars into `points` buckets.
+    
+    Each bucket keeps candle semantics: first open, max high, min low,
+    last close, summed volume, and the date of its last bar.
+    
+    Args:
+        df: OHLCV rows for a single symbol, sorted by date ascending
+        points: Number of output bars
+    
+    Returns:
+        Downsampled DataFrame with the same columns
+    """
+    import numpy as np
+    
+    bucket = (np.arange(len(df)) * points) // len(df)
+    return df.groupby(bucket).agg({
+        'date': 'last',
+        'open': 'first',
+        'high': 'max',
+        'low': 'min',
+        'close': 'last',
+        'volume': 'sum'
+    })
@@ -0,0 +1,198 @@
+"""
+Hot in-process snapshot of ticker metadata, latest bars and table statistics.
+
+Readers (API routes) serve from memory. Writers (updater, ticker sync) call
+record_ingest() / bump_version() which update the market_data_stats row; the
+API notices the new version on its next check and reloads lazily.
+"""
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+
+from backend.core.cache import TTLCache
+from backend.core.database import engine
+
+# How long cached data is trusted before re-checking the stats version
+VERSION_CHECK_INTERVAL = 15.0
+# Hard upper bound for any entry, even if the version never changes
+SNAPSHOT_TTL = 3600.0
+
+_cache = TTLCache(default_ttl=SNAPSHOT_TTL)
+_last_version_check = 0.0
+
+
+def _read_stats_row(conn) -> Optional[Dict[str, Any]]:
+    """Read the market_data_stats row (None if the table is not migrated yet)."""
+    try:
+        row = conn.execute(text(
+            "SELECT data_points, latest_date, version FROM market_data_stats WHERE id = 1"
+        )).fetchone()
+    except Exception:
+        conn.rollback()
+        return None
+    
+    if row is None:
+        return None
+    
+    return {
+        'data_points': int(row.data_points),
+        'latest_date': row.latest_date,
+        'version': int(row.version)
+    }
+
+
+def _sync_version() -> None:
+    """Invalidate the cache if writers bumped the version since the last check."""
+    global _last_version_check
+    
+    now = time.monotonic()
+    if now - _last_version_check < VERSION_CHECK_INTERVAL:
+        return
+    _last_version_check = now
+    
+    with engine.connect() as conn:
+        stats = _read_stats_row(conn)
+    
+    if stats is not None:
+        _cache.set_version(stats['version'])
+
+
+def _load_tickers() -> List[Dict[str, Any]]:
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT symbol, name, type, is_active FROM tickers ORDER BY symbol"
+        )).fetchall()
+    
+    return [
+        {'symbol': r.symbol, 'name': r.name, 'type': r.type, 'is_active': r.is_active}
+        for r in rows
+    ]
+
+
+def _load_latest_bars() -> Dict[str, Dict[str, Any]]:
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT DISTINCT ON (symbol) symbol, date, open, high, low, close, volume
+            FROM market_data
+            ORDER BY symbol, date DESC
+        """)).fetchall()
+    
+    return {
+        r.symbol: {
+            'date': str(r.date)[:10],
+            'open': float(r.open) if r.open is not None else None,
+            'high': float(r.high) if r.high is not None else None,
+            'low': float(r.low) if r.low is not None else None,
+            'close': float(r.close) if r.close is not None else None,
+            'volume': int(r.volume) if r.volume is not None else None
+        }
+        for r in rows
+    }
+
+
+def _load_table_stats() -> Dict[str, Any]:
+    with engine.connect() as conn:
+        stats = _read_stats_row(conn)
+        if stats is None:
+            # Fallback before the migration is applied
+            row = conn.execute(text(
+                "SELECT MAX(date) AS latest_date, COUNT(*) AS data_points FROM market_data"
+            )).fetchone()
+            stats = {'data_points': int(row.data_points), 'latest_date': row.latest_date}
+    
+    return {
+        'data_points': stats['data_points'],
+        'latest_data_date': str(stats['latest_date'])[:10] if stats['latest_date'] else None
+    }
+
+
+def get_tickers() -> List[Dict[str, Any]]:
+    """All tickers ordered by symbol."""
+    _sync_version()
+    return _cache.get_or_load('tickers', _load_tickers)
+
+
+def get_latest_bars() -> Dict[str, Dict[str, Any]]:
+    """Latest OHLCV bar keyed by symbol."""
+    _sync_version()
+    return _cache.get_or_load('latest_bars', _load_latest_bars)
+
+
+def get_stats() -> Dict[str, Any]:
+    """Ticker counts plus market_data size and latest date."""
+    _sync_version()
+    tickers = get_tickers()
+    table_stats = _cache.get_or_load('table_stats', _load_table_stats)
+    
+    return {
+        'tickers_count': len(tickers),
+        'active_tickers': sum(1 for t in tickers if t['is_active']),
+        'latest_data_date': table_stats['latest_data_date'],
+        'data_points': table_stats['data_points']
+    }
+
+
+def invalidate() -> None:
+    """Drop everything held in this process."""
+    global _last_version_check
+    _cache.invalidate()
+    _last_version_check = 0.0
+
+
+# ============================================================================
+# WRITER SIDE
+# ============================================================================
+
+def record_ingest(db_engine, rows_added: int, latest_date: Optional[datetime]) -> None:
+    """
+    Incrementally maintain market_data_stats after inserting bars.
+    
+    Args:
+        db_engine: SQLAlchemy engine used by the writer
+        rows_added: Number of market_data rows just inserted
+        latest_date: Newest bar date among inserted rows
+    """
+    with db_engine.connect() as conn:
+        conn.execute(text("""
+            UPDATE market_data_stats
+            SET data_points = data_points + :rows,
+                latest_date = GREATEST(COALESCE(latest_date, :latest), :latest),
+                version = version + 1,
+                updated_at = NOW()
+            WHERE id = 1
+        """), {'rows': rows_added, 'latest': latest_date})
+        conn.commit()
+
+
+def bump_version(db_engine) -> None:
+    """
+    Signal readers that ticker metadata changed.
+    
+    Args:
+        db_engine: SQLAlchemy engine used by the writer
+    """
+    with db_engine.connect() as conn:
+        conn.execute(text(
+            "UPDATE market_data_stats SET version = version + 1, updated_at = NOW() WHERE id = 1"
+        ))
+        conn.commit()
+
+
+def resync_stats(db_engine) -> None:
+    """
+    Recount market_data from scratch (after bulk deletes such as TRUNCATE).
+    
+    Args:
+        db_engine: SQLAlchemy engine used by the writer
+    """
+    with db_engine.connect() as conn:
+        conn.execute(text("""
+            UPDATE market_data_stats
+            SET (data_points, latest_date) = (SELECT COUNT(*), MAX(date) FROM market_data),
+                version = version + 1,
+                updated_at = NOW()
+            WHERE id = 1
+        """))
+        conn.commit()
@@ -0,0 +1,158 @@
+"""
+Streaming quote sources for the intraday scanner.
+
+A source yields micro-batches of BarUpdate: each update is the forming
+daily bar of one symbol so far (session open, high, low, last price,
+cumulative volume). Live feeds plug in by subclassing StreamSource; the
+replay file source stands in for them in tests and dry runs.
+
+Replay files are CSV or NDJSON (by extension), sorted by time, with either
+bar snapshots or raw ticks (aggregated into the day's bar):
+
+    time,symbol,open,high,low,close,volume
+    2025-12-08T10:00:01,THYAO,301.0,302.5,300.0,302.25,125000
+    
+    time,symbol,price,volume
+    2025-12-08T10:00:01,THYAO,302.25,500
+"""
+import csv
+import json
+import time
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from importlib import import_module
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# Source name -> "module:attribute"
+SOURCES = {
+    'replay': 'backend.modules.market_data.stream:ReplayFileSource',
+}
+
+
+class BarUpdate(NamedTuple):
+    """Forming daily bar of one symbol at `time`."""
+    symbol: str
+    time: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    
+    @property
+    def session(self) -> date:
+        return self.time.date()
+
+
+class StreamSource(ABC):
+    """
+    Base class for quote sources.
+    
+    Subclasses implement batches(); the scanner processes each yielded list
+    as one micro-batch, so a source should group updates that arrive together.
+    """
+    
+    @abstractmethod
+    def batches(self) -> Iterator[List[BarUpdate]]:
+        """Yield lists of updates until the stream ends (or forever)."""
+        pass
+    
+    def close(self) -> None:
+        """Release connections (optional)."""
+        pass
+
+
+class ReplayFileSource(StreamSource):
+    """
+    Replays a recorded file as a stream.
+    
+    Args:
+        path: CSV or NDJSON replay file
+        speed: 0 = as fast as possible, 1 = recorded pace, N = N times faster
+        batch_window: Updates within this many seconds (event time) form one batch
+    """
+    
+    def __init__(self, path: str, speed: float = 0.0, batch_window: float = 1.0):
+        self.path = Path(path)
+        self.speed = speed
+        self.batch_window = batch_window
+    
+    def _records(self) -> Iterator[Dict[str, Any]]:
+        with open(self.path, newline='') as f:
+            if self.path.suffix in ('.ndjson', '.jsonl'):
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+            else:
+                yield from csv.DictReader(f)
+    
+    def updates(self) -> Iterator[BarUpdate]:
+        """Every record as a BarUpdate, aggregating ticks into the day's bar."""
+        bars: Dict[Tuple[str, date], List[float]] = {}
+        
+        for record in self._records():
+            symbol = record['symbol'].strip().upper()
+            ts = record['time']
+            ts = ts if isinstance(ts, datetime) else datetime.fromisoformat(str(ts))
+            
+            if record.get('close') not in (None, ''):
+                yield BarUpdate(symbol, ts, float(record['open']), float(record['high']),
+                                float(record['low']), float(record['close']), float(record['volume']))
+                continue
+            
+            price = float(record['price'])
+            size = float(record.get('volume') or 0)
+            bar = bars.get((symbol, ts.date()))
+            if bar is None:
+                bar = bars[(symbol, ts.date())] = [price, price, price, price, 0.0]
+            bar[1] = max(bar[1], price)
+            bar[2] = min(bar[2], price)
+            bar[3] = price
+            bar[4] += size
+            yield BarUpdate(symbol, ts, *bar)
+    
+    def batches(self) -> Iterator[List[BarUpdate]]:
+        batch: List[BarUpdate] = []
+        batch_start: Optional[datetime] = None
+        previous: Optional[datetime] = None
+        
+        for update in self.updates():
+            if batch and (update.time - batch_start).total_seconds() >= self.batch_window:
+                yield batch
+                batch = []
+            
+            if self.speed > 0 and previous is not None:
+                delay = (update.time - previous).total_seconds() / self.speed
+                if delay > 0:
+                    time.sleep(delay)
+            previous = update.time
+            
+            if not batch:
+                batch_start = update.time
+            batch.append(update)
+        
+        if batch:
+            yield batch
+
+
+def load_source(name: str, **kwargs) -> StreamSource:
+    """
+    Create a source by name ("replay") or "module:attribute".
+    
+    Args:
+        name: Key of SOURCES or import path of a StreamSource subclass
+        **kwargs: Source constructor arguments
+    
+    Returns:
+        StreamSource instance
+    """
+    target = SOURCES.get(name, name)
+    module_name, _, attribute = target.partition(':')
+    if not attribute:
+        raise KeyError(f"Unknown stream source '{name}'. Available: {sorted(SOURCES)} or module:Class")
+    
+    source_class = getattr(import_module(module_name), attribute)
+    if not issubclass(source_class, StreamSource):
+        raise TypeError(f"{source_class.__name__} must inherit from StreamSource")
+    return source_class(**kwargs)
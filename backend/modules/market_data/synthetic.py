@@ -0,0 +1,98 @@
+"""
+Synthetic OHLCV generator for benchmarks and offline runs.
+
+Prices follow a geometric random walk whose drift and volatility switch
+between regimes, so trend-following strategies see trends, pullbacks and
+ranges. Output has the market_data layout (symbol, date, open, high, low,
+close, volume), sorted by symbol and date, and never touches the database:
+
+    bars = generate_ohlcv(n_symbols=600, years=2, seed=7)
+    panel = SymbolPanel.from_long(bars)
+"""
+from datetime import date
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+SESSIONS_PER_YEAR = 250
+
+# (daily drift, daily volatility) per regime: uptrend, range, downtrend, volatile
+REGIMES = np.array([
+    (0.0020, 0.015),
+    (0.0000, 0.010),
+    (-0.0015, 0.018),
+    (0.0005, 0.035),
+])
+MEAN_REGIME_LENGTH = 40
+
+
+def synthetic_symbols(n_symbols: int) -> list:
+    """Ticker-like names: SYN0000, SYN0001, ..."""
+    return [f"SYN{i:04d}" for i in range(n_symbols)]
+
+
+def generate_ohlcv(
+    n_symbols: int = 600,
+    years: float = 2.0,
+    seed: int = 0,
+    end: Optional[date] = None,
+    ragged: bool = True
+) -> pd.DataFrame:
+    """
+    Generate daily bars for a synthetic market.
+    
+    Args:
+        n_symbols: Number of symbols
+        years: History length (250 sessions per year)
+        seed: Random seed; the same arguments always give the same bars
+        end: Last session (default: the latest weekday up to today)
+        ragged: Let a third of the symbols list later (shorter history), like IPOs
+    
+    Returns:
+        Long DataFrame with symbol, date, open, high, low, close, volume
+    """
+    rng = np.random.default_rng(seed)
+    n_bars = max(int(round(years * SESSIONS_PER_YEAR)), 1)
+    end = end or np.busday_offset(np.datetime64(date.today(), 'D'), 0, roll='backward').item()
+    dates = pd.bdate_range(end=end, periods=n_bars)
+    shape = (n_symbols, n_bars)
+    
+    # Regime path per symbol: switch with probability 1/MEAN_REGIME_LENGTH each session
+    switches = rng.random(shape) < 1.0 / MEAN_REGIME_LENGTH
+    switches[:, 0] = True
+    draws = rng.integers(0, len(REGIMES), shape)
+    last_switch = np.maximum.accumulate(np.where(switches, np.arange(n_bars), 0), axis=1)
+    regime = np.take_along_axis(draws, last_switch, axis=1)
+    drift, vol = REGIMES[regime, 0], REGIMES[regime, 1]
+    
+    returns = drift + vol * rng.standard_normal(shape)
+    start_price = np.exp(rng.uniform(np.log(2.0), np.log(400.0), (n_symbols, 1)))
+    close = start_price * np.exp(np.cumsum(returns, axis=1))
+    
+    prev_close = np.concatenate([start_price, close[:, :-1]], axis=1)
+    open_ = prev_close * (1 + rng.normal(0, 0.3, shape) * vol)
+    wick = np.abs(rng.normal(0, 0.5, shape)) * vol
+    high = np.maximum(open_, close) * (1 + wick)
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.5, shape)) * vol)
+    
+    # Volume rises with the size of the move, around a per-symbol base level
+    base_volume = np.exp(rng.uniform(np.log(1e5), np.log(5e7), (n_symbols, 1)))
+    volume = base_volume * np.exp(rng.normal(0, 0.4, shape)) * (1 + 20 * np.abs(returns))
+    
+    first_bar = np.zeros(n_symbols, dtype=int)
+    if ragged:
+        late = rng.random(n_symbols) < 1 / 3
+        first_bar[late] = rng.integers(0, max(n_bars // 2, 1), late.sum())
+    mask = np.arange(n_bars) >= first_bar[:, None]
+    
+    symbol_idx, bar_idx = np.nonzero(mask)
+    return pd.DataFrame({
+        'symbol': np.array(synthetic_symbols(n_symbols))[symbol_idx],
+        'date': dates.values[bar_idx],
+        'open': open_[mask].round(2),
+        'high': high[mask].round(2),
+        'low': low[mask].round(2),
+        'close': close[mask].round(2),
+        'volume': volume[mask].astype(np.int64)
+    })
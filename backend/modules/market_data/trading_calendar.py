@@ -0,0 +1,207 @@
+"""
+In-memory BIST trading calendar.
+
+bist_holidays is read once per process into a sorted datetime64[D] array of
+sessions (weekdays minus closed days), so calendar questions are binary
+searches instead of SQL round trips:
+
+    calendar = get_trading_calendar()
+    calendar.is_session(date(2025, 3, 31))          # False (Ramazan Bayramı)
+    calendar.next_session(date(2025, 3, 28))        # 2025-04-02
+    calendar.sessions_between(last_date, today)     # sessions in (last_date, today]
+    calendar.closing_time(date(2025, 3, 28))        # 18:10, or 13:00 on half days
+
+Used by the updater, the performance tracker, the scheduler and
+BISTCalendar.is_market_open.
+"""
+import logging
+import threading
+from datetime import date, datetime, time
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NORMAL_CLOSE = time(18, 10)
+HALF_DAY_CLOSE = time(13, 0)
+
+# Sessions are materialized from FIRST_YEAR to YEARS_AHEAD years past today
+FIRST_YEAR = 2010
+YEARS_AHEAD = 2
+
+DateLike = Union[date, datetime, np.datetime64, str]
+
+
+def _day(value: DateLike) -> np.datetime64:
+    if isinstance(value, datetime):
+        value = value.date()
+    return np.datetime64(value, 'D')
+
+
+class TradingCalendar:
+    """
+    Sorted array of trading sessions plus half-day closing times.
+    
+    Args:
+        closed: Weekdays the market is closed
+        half_days: {date: closing time} for shortened sessions
+        start: First calendar day covered
+        end: Last calendar day covered
+    
+    Dates outside [start, end] are treated as plain weekdays. `fallback`
+    is True for the weekdays-only calendar from_db() returns when
+    bist_holidays cannot be read.
+    """
+    
+    fallback = False
+    
+    def __init__(self, closed: Iterable[date] = (), half_days: Optional[Dict[date, time]] = None,
+                 start: date = date(FIRST_YEAR, 1, 1), end: Optional[date] = None):
+        end = end or date(date.today().year + YEARS_AHEAD, 12, 31)
+        days = np.arange(_day(start), _day(end) + 1, dtype='datetime64[D]')
+        holidays = np.array(sorted({_day(d) for d in closed}), dtype='datetime64[D]')
+        
+        self.start = _day(start)
+        self.end = _day(end)
+        self.holidays = holidays
+        self.sessions = days[np.is_busday(days, holidays=holidays)]
+        self.half_days = {_day(d): t for d, t in (half_days or {}).items()}
+    
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[date, str, Optional[time]]], **kwargs) -> 'TradingCalendar':
+        """Build from (holiday_date, status, closing_time) rows of bist_holidays."""
+        closed, half_days = [], {}
+        for holiday_date, status, closing_time in rows:
+            if status == 'KAPALI':
+                closed.append(holiday_date)
+            elif status == 'YARIM_GUN':
+                half_days[holiday_date] = closing_time or HALF_DAY_CLOSE
+        return cls(closed, half_days, **kwargs)
+    
+    @classmethod
+    def from_db(cls, engine=None) -> 'TradingCalendar':
+        """Load bist_holidays; falls back to a weekdays-only calendar if unavailable."""
+        from sqlalchemy import text
+        
+        if engine is None:
+            from backend.core.database import engine
+        
+        try:
+            with engine.connect() as conn:
+                rows = conn.execute(text(
+                    "SELECT holiday_date, status, closing_time FROM bist_holidays ORDER BY holiday_date"
+                )).fetchall()
+        except Exception as e:
+            logger.warning(f"bist_holidays could not be loaded, using weekdays only: {e}")
+            calendar = cls.from_rows([])
+            calendar.fallback = True
+            return calendar
+        
+        return cls.from_rows(rows)
+    
+    def _index(self, day: DateLike, side: str = 'left') -> int:
+        return int(np.searchsorted(self.sessions, _day(day), side=side))
+    
+    def _covered(self, day: np.datetime64) -> bool:
+        return self.start <= day <= self.end
+    
+    def is_session(self, day: DateLike) -> bool:
+        day = _day(day)
+        if not self._covered(day):
+            return bool(np.is_busday(day))
+        i = self._index(day)
+        return i < len(self.sessions) and self.sessions[i] == day
+    
+    def session_mask(self, days: np.ndarray) -> np.ndarray:
+        """is_session for a whole datetime64 array."""
+        days = np.asarray(days, dtype='datetime64[D]')
+        if not len(self.sessions):
+            return np.is_busday(days)
+        i = np.minimum(np.searchsorted(self.sessions, days), len(self.sessions) - 1)
+        covered = (days >= self.start) & (days <= self.end)
+        return np.where(covered, self.sessions[i] == days, np.is_busday(days))
+    
+    def next_session(self, day: DateLike, inclusive: bool = False) -> date:
+        """First session after `day` (or on it, if inclusive)."""
+        first = _day(day) if inclusive else _day(day) + 1
+        i = self._index(first)
+        if self._covered(first) and i < len(self.sessions):
+            return self.sessions[i].item()
+        return np.busday_offset(first, 0, roll='forward').item()
+    
+    def previous_session(self, day: DateLike, inclusive: bool = False) -> date:
+        """Last session before `day` (or on it, if inclusive)."""
+        last = _day(day) if inclusive else _day(day) - 1
+        i = self._index(last, 'right') - 1
+        if self._covered(last) and i >= 0:
+            return self.sessions[i].item()
+        return np.busday_offset(last, 0, roll='backward').item()
+    
+    def sessions_in_range(self, start: DateLike, end: DateLike) -> np.ndarray:
+        """Sessions with start <= session <= end (datetime64[D] array)."""
+        return self.sessions[self._index(start, 'left'):self._index(end, 'right')]
+    
+    def sessions_between(self, after: DateLike, until: DateLike) -> int:
+        """Number of sessions with after < session <= until."""
+        return max(self._index(until, 'right') - self._index(after, 'right'), 0)
+    
+    def offset(self, day: DateLike, n: int) -> date:
+        """The n-th session after `day` (n > 0) or before it (n < 0)."""
+        if n > 0:
+            i = self._index(day, 'right') + n - 1
+        else:
+            i = self._index(day, 'left') + n
+        if not 0 <= i < len(self.sessions):
+            raise IndexError(f"{day} {n:+d} sessions is outside the calendar")
+        return self.sessions[i].item()
+    
+    def closing_time(self, day: DateLike) -> Optional[time]:
+        """Closing time of the session, or None if the market is closed."""
+        day = _day(day)
+        if not self.is_session(day):
+            return None
+        return self.half_days.get(day, NORMAL_CLOSE)
+    
+    def is_half_day(self, day: DateLike) -> bool:
+        return self.is_session(day) and _day(day) in self.half_days
+    
+    def is_market_open(self, check_date: Optional[DateLike] = None) -> Tuple[bool, Optional[time]]:
+        """BISTCalendar.is_market_open contract: (is_open, closing_time)."""
+        closing = self.closing_time(check_date if check_date is not None else date.today())
+        return closing is not None, closing
+    
+    def to_list(self, start: DateLike, end: DateLike) -> List[date]:
+        return [d.item() for d in self.sessions_in_range(start, end)]
+
+
+_calendar: Optional[TradingCalendar] = None
+_lock = threading.Lock()
+
+
+def get_trading_calendar(refresh: bool = False) -> TradingCalendar:
+    """
+    Process-wide calendar, loaded from bist_holidays on first use.
+    
+    A weekdays-only fallback (database unavailable) is returned but not
+    kept, so the next call retries the load.
+    
+    Args:
+        refresh: Reload from the database (e.g. after holidays were updated)
+    """
+    global _calendar
+    if _calendar is None or refresh:
+        with _lock:
+            if _calendar is None or refresh:
+                calendar = TradingCalendar.from_db()
+                if calendar.fallback:
+                    return calendar
+                _calendar = calendar
+    return _calendar
+
+
+def reset_trading_calendar() -> None:
+    """Drop the cached calendar; the next get_trading_calendar() reloads it."""
+    global _calendar
+    with _lock:
+        _calendar = None
@@ -0,0 +1,290 @@
+"""
+Point-in-time universe membership.
+
+universe_membership holds half-open listing intervals [start_date, end_date)
+per symbol, rebuilt from the first/last bar in market_data and the
+added/delisted/reactivated rows of ticker_changes. MembershipIndex turns
+them into sorted boundary dates plus one membership row per segment, so
+"which symbols were listed on day d" is a single binary search:
+
+    index = get_membership()
+    index.members(date(2021, 6, 1))                 # survivorship-free universe
+    index.is_member('THYAO', date(2021, 6, 1))
+    bars = index.filter_bars(bars)                   # drop bars outside listings
+
+Symbols without any interval (membership not built yet) count as members,
+so readers behave as before until the first rebuild. Long-running readers
+(API workers) pick up rebuilds made by other processes through the
+market_data_stats version, the same way snapshot.py does.
+
+Usage:
+    python -m backend.modules.market_data.universe --rebuild
+"""
+import argparse
+import logging
+import threading
+import time
+from datetime import date, timedelta
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert, text
+
+from backend.modules.market_data.models import UniverseMembership
+from backend.modules.market_data.snapshot import _read_stats_row, bump_version
+from backend.modules.market_data.trading_calendar import DateLike
+
+logger = logging.getLogger(__name__)
+
+OPENS = ('added', 'reactivated')
+
+# Seconds between checks of the market_data_stats version
+VERSION_CHECK_INTERVAL = 15.0
+
+
+def _day(value: DateLike) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(value).date(), 'D')
+
+
+class MembershipIndex:
+    """
+    Interval index over listing periods.
+    
+    Attributes:
+        symbols: Symbols with at least one interval (sorted)
+        boundaries: Sorted datetime64[D] dates where membership changes
+        matrix: Boolean (len(boundaries) + 1) × len(symbols); row k covers
+            boundaries[k-1] <= day < boundaries[k]
+    """
+    
+    def __init__(self, symbols: List[str], boundaries: np.ndarray, matrix: np.ndarray):
+        self.symbols = np.asarray(symbols, dtype=object)
+        self.boundaries = boundaries
+        self.matrix = matrix
+        self._columns = {s: i for i, s in enumerate(symbols)}
+    
+    @classmethod
+    def from_intervals(cls, intervals: pd.DataFrame) -> 'MembershipIndex':
+        """
+        Build from rows of symbol, start_date, end_date (None = still listed).
+        """
+        if intervals.empty:
+            return cls([], np.empty(0, dtype='datetime64[D]'), np.zeros((1, 0), dtype=bool))
+        
+        starts = pd.to_datetime(intervals['start_date']).to_numpy(dtype='datetime64[D]')
+        ends = pd.to_datetime(intervals['end_date']).to_numpy(dtype='datetime64[D]')
+        codes, symbols = pd.factorize(intervals['symbol'], sort=True)
+        boundaries = np.unique(np.concatenate([starts, ends[~np.isnat(ends)]]))
+        
+        # +1 where an interval opens, -1 where it closes, then a running sum per symbol
+        delta = np.zeros((len(boundaries) + 2, len(symbols)), dtype=np.int32)
+        np.add.at(delta, (np.searchsorted(boundaries, starts, 'right'), codes), 1)
+        end_rows = np.where(np.isnat(ends), len(boundaries) + 1, np.searchsorted(boundaries, ends, 'right'))
+        np.add.at(delta, (end_rows, codes), -1)
+        
+        return cls(list(symbols), boundaries, np.cumsum(delta, axis=0)[:-1] > 0)
+    
+    @classmethod
+    def from_db(cls, db_engine=None) -> 'MembershipIndex':
+        """Load universe_membership; an empty index if the table is unavailable."""
+        if db_engine is None:
+            from backend.core.database import engine as db_engine
+        
+        try:
+            intervals = pd.read_sql(text("SELECT symbol, start_date, end_date FROM universe_membership"), db_engine)
+        except Exception as e:
+            logger.warning(f"universe_membership could not be loaded, treating every symbol as listed: {e}")
+            intervals = pd.DataFrame(columns=['symbol', 'start_date', 'end_date'])
+        return cls.from_intervals(intervals)
+    
+    def _rows(self, days) -> np.ndarray:
+        return np.searchsorted(self.boundaries, np.asarray(days, dtype='datetime64[D]'), 'right')
+    
+    def members(self, day: DateLike) -> List[str]:
+        """Symbols listed on `day`."""
+        return self.symbols[self.matrix[self._rows(_day(day))]].tolist()
+    
+    def is_member(self, symbol: str, day: DateLike) -> bool:
+        col = self._columns.get(symbol)
+        return col is None or bool(self.matrix[self._rows(_day(day)), col])
+    
+    def mask(self, symbols: Iterable[str], days: Iterable) -> np.ndarray:
+        """Elementwise is_member for aligned symbol and date arrays."""
+        cols = pd.Series(np.asarray(symbols, dtype=object)).map(self._columns).to_numpy()
+        known = ~pd.isna(cols)
+        out = np.ones(len(cols), dtype=bool)
+        if known.any():
+            rows = self._rows(pd.to_datetime(np.asarray(days)[known]).to_numpy(dtype='datetime64[D]'))
+            out[known] = self.matrix[rows, cols[known].astype(np.int64)]
+        return out
+    
+    def filter_bars(self, bars: pd.DataFrame) -> pd.DataFrame:
+        """Drop long-format rows dated outside their symbol's listing intervals."""
+        if bars.empty or not len(self.symbols):
+            return bars
+        keep = self.mask(bars['symbol'].to_numpy(), bars['date'].to_numpy())
+        return bars if keep.all() else bars[keep]
+
+
+def build_intervals(bounds: pd.DataFrame, tickers: pd.DataFrame, events: pd.DataFrame) -> pd.DataFrame:
+    """
+    Derive listing intervals.
+    
+    Args:
+        bounds: symbol, first_bar, last_bar from market_data
+        tickers: symbol, is_active
+        events: symbol, change_type, changed_at from ticker_changes (oldest first)
+    
+    Returns:
+        DataFrame of symbol, start_date, end_date (None = still listed)
+    
+    A symbol is listed from its first bar (or its 'added' date if it has no
+    bars yet). 'delisted' closes the open interval, 'reactivated' opens a new
+    one. Symbols that went inactive before ticker_changes existed close the
+    day after their last bar.
+    """
+    bounds = bounds.set_index('symbol')
+    events = events.assign(day=pd.to_datetime(events['changed_at']).dt.date)
+    by_symbol = {s: g for s, g in events.groupby('symbol', sort=False)}
+    no_events = events.iloc[:0]
+    first_bars = pd.to_datetime(bounds['first_bar']).dt.date
+    last_bars = pd.to_datetime(bounds['last_bar']).dt.date
+    rows = []
+    
+    for symbol, is_active in zip(tickers['symbol'], tickers['is_active'].astype(bool)):
+        history = by_symbol.get(symbol, no_events)
+        last_bar = last_bars.get(symbol)
+        
+        start = first_bars.get(symbol)
+        added = history.loc[history['change_type'] == 'added', 'day']
+        if not added.empty and (start is None or added.iloc[0] < start):
+            start = added.iloc[0]
+        if start is None:
+            continue
+        
+        closed = False
+        for change_type, day in zip(history['change_type'], history['day']):
+            if change_type == 'delisted' and not closed:
+                rows.append((symbol, start, max(day, start)))
+                closed = True
+            elif change_type in OPENS and closed:
+                start, closed = day, False
+        
+        if not closed:
+            end = None
+            if not is_active and last_bar is not None:
+                end = max(last_bar + timedelta(days=1), start)
+            rows.append((symbol, start, end))
+    
+    return pd.DataFrame(rows, columns=['symbol', 'start_date', 'end_date'])
+
+
+def rebuild_membership(db_engine=None) -> int:
+    """
+    Recompute universe_membership from market_data, tickers and ticker_changes.
+    
+    Args:
+        db_engine: Optional engine (defaults to the application engine)
+    
+    Returns:
+        Number of intervals written
+    """
+    if db_engine is None:
+        from backend.core.database import engine as db_engine
+    
+    bounds = pd.read_sql(text(
+        "SELECT symbol, MIN(date) AS first_bar, MAX(date) AS last_bar FROM market_data GROUP BY symbol"
+    ), db_engine)
+    tickers = pd.read_sql(text("SELECT symbol, is_active FROM tickers"), db_engine)
+    events = pd.read_sql(text("""
+        SELECT symbol, change_type, changed_at
+        FROM ticker_changes
+        WHERE change_type IN ('added', 'reactivated', 'delisted')
+        ORDER BY changed_at, id
+    """), db_engine)
+    
+    intervals = build_intervals(bounds, tickers, events)
+    records = intervals.astype(object).where(intervals.notna(), None).to_dict('records')
+    
+    with db_engine.begin() as conn:
+        conn.execute(text("DELETE FROM universe_membership"))
+        if records:
+            conn.execute(insert(UniverseMembership), records)
+    
+    reset_membership()
+    bump_version(db_engine)
+    return len(records)
+
+
+_index: Optional[MembershipIndex] = None
+_index_version: Optional[int] = None
+_last_version_check = 0.0
+_lock = threading.Lock()
+
+
+def _stats_version(db_engine=None) -> Optional[int]:
+    """market_data_stats.version (None if unavailable)."""
+    if db_engine is None:
+        from backend.core.database import engine as db_engine
+    
+    try:
+        with db_engine.connect() as conn:
+            stats = _read_stats_row(conn)
+    except Exception:
+        return None
+    return stats['version'] if stats else None
+
+
+def get_membership(refresh: bool = False, db_engine=None) -> MembershipIndex:
+    """
+    Process-wide membership index, loaded from universe_membership on first use.
+    
+    At most every VERSION_CHECK_INTERVAL seconds the market_data_stats
+    version is compared with the one seen at load time, and the index is
+    reloaded when writers (ingest, rebuild_membership, ticker sync) bumped it.
+    
+    Args:
+        refresh: Reload from the database (e.g. after another process rebuilt it)
+        db_engine: Optional engine (defaults to the application engine)
+    """
+    global _index, _index_version, _last_version_check
+    
+    if _index is not None and not refresh and time.monotonic() - _last_version_check >= VERSION_CHECK_INTERVAL:
+        _last_version_check = time.monotonic()
+        version = _stats_version(db_engine)
+        refresh = version is not None and version != _index_version
+    
+    if _index is None or refresh:
+        with _lock:
+            if _index is None or refresh:
+                _index_version = _stats_version(db_engine)
+                _index = MembershipIndex.from_db(db_engine)
+                _last_version_check = time.monotonic()
+    return _index
+
+
+def reset_membership() -> None:
+    """Drop the cached index; the next get_membership() reloads it."""
+    global _index
+    with _lock:
+        _index = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Point-in-time universe membership')
+    parser.add_argument('--rebuild', action='store_true', help='Recompute universe_membership')
+    parser.add_argument('--date', type=date.fromisoformat, default=None,
+                        help='Print the universe on this date (YYYY-MM-DD)')
+    args = parser.parse_args()
+    
+    if args.rebuild:
+        print(f"✓ {rebuild_membership()} listing intervals written")
+    if args.date:
+        members = get_membership().members(args.date)
+        print(f"{args.date}: {len(members)} symbols")
+        print(' '.join(members))
+
+
+if __name__ == '__main__':
+    main()
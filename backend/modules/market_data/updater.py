@@ -1,6 +1,5 @@
 import pandas as pd
 from sqlalchemy import create_engine, text
-from tvDatafeed import TvDatafeed, Interval
 import sys
 from pathlib import Path
 
@@ -8,13 +7,20 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from backend.core.config import DB_CONNECTION_STR, LOG_DIR, TV_USERNAME, TV_PASSWORD
+from backend.core.config import DB_CONNECTION_STR, LOG_DIR, PANEL_FILE, TV_USERNAME, TV_PASSWORD
+from backend.core.cache import get_cache
+from backend.core.metrics import record_update
+from backend.core.timing import count, recording, span
+from backend.modules.market_data.snapshot import record_ingest
+from backend.modules.market_data.trading_calendar import get_trading_calendar
 import logging
+import os
 import time
 
-# Log Ayarları
-logging.basicConfig(filename=f'{LOG_DIR}/data_update.log', level=logging.INFO, 
-                    format='%(asctime)s - %(message)s')
+def setup_logging():
+    """Log ayarları (import anında değil, rutin başlarken uygulanır)"""
+    logging.basicConfig(filename=f'{LOG_DIR}/data_update.log', level=logging.INFO, 
+                        format='%(asctime)s - %(message)s')
 
 def get_last_date(engine, symbol):
     """Veritabanında bir hisse için en son hangi tarihli veri var?"""
@@ -28,7 +34,7 @@ def get_missing_days_count(engine, symbol):
     Veritabanındaki son tarih ile bugün arasında kaç gün eksik?
     Hafta sonları ve tatil günleri hariç iş günü sayısı
     """
-    from datetime import datetime, timedelta
+    from datetime import datetime
     
     last_date = get_last_date(engine, symbol)
     if last_date is None:
@@ -42,21 +48,33 @@ def get_missing_days_count(engine, symbol):
     if last_date >= today:
         return 0
     
-    # Aradaki iş günü sayısını hesapla (basit: hafta sonları hariç)
-    days_diff = (today - last_date).days
-    
-    # Hafta içi günleri say (yaklaşık)
-    business_days = 0
-    current_date = last_date + timedelta(days=1)
-    while current_date <= today:
-        # Hafta sonu değilse say (0=Pazartesi, 6=Pazar)
-        if current_date.weekday() < 5:  # 0-4 = Pazartesi-Cuma
-            business_days += 1
-        current_date += timedelta(days=1)
+    # Aradaki seans sayısı (hafta sonları ve bist_holidays tatilleri hariç)
+    return get_trading_calendar().sessions_between(last_date, today)
+
+def run_daily_update(post_update=True):
+    """
+    Eksik günleri TradingView'dan çekip market_data'ya yazar.
+    post_update=False ise breadth/indikatör hesapları çağırana (pipeline) bırakılır.
+    Aşama süreleri (tickers, fetch, write, membership, quality, breadth, indicators, panel_file, hisse başına) /metrics'e yayınlanır.
+    Döner: {'updated', 'skipped', 'errors'} veya ticker listesi alınamazsa None
+    """
+    with recording() as recorder:
+        try:
+            stats = _run_daily_update(post_update)
+        except Exception:
+            record_update(recorder, None, status='error')
+            raise
     
-    return business_days
+    record_update(recorder, stats, status='ok' if stats is not None else 'error')
+    timings = ', '.join(f"{name} {s['total_ms'] / 1000:.1f}s" for name, s in recorder.summary()['stages'].items())
+    logging.info(f"Aşama süreleri: {timings}")
+    return stats
 
-def run_daily_update():
+def _run_daily_update(post_update):
+    # tvDatafeed yalnızca güncelleme rutininde gerekli; import maliyeti burada ödenir
+    from tvDatafeed import TvDatafeed, Interval
+    
+    setup_logging()
     engine = create_engine(DB_CONNECTION_STR)
     
     # TradingView credentials from environment variables
@@ -69,7 +87,9 @@ def run_daily_update():
     
     # 1. Ticker Listesini Veritabanından Çek
     try:
-        tickers_df = pd.read_sql("SELECT symbol FROM tickers", engine)
+        with span('tickers'):
+            # Listeden düşen (is_active = FALSE) semboller güncellenmez, geçmişleri korunur
+            tickers_df = pd.read_sql("SELECT symbol FROM tickers WHERE is_active", engine)
         ticker_list = tickers_df['symbol'].tolist()
         print(f"Toplam {len(ticker_list)} adet hisse/fon güncellenecek.")
     except Exception as e:
@@ -83,68 +103,147 @@ def run_daily_update():
     
     for symbol in ticker_list:
         try:
-            # Son tarihi kontrol et
-            last_date = get_last_date(engine, symbol)
-            missing_days = get_missing_days_count(engine, symbol)
-            
-            # Ne kadar veri çekilecek?
-            if last_date is None:
-                # İlk defa çekiliyorsa 1 yıllık (veya 250 bar)
-                print(f"[{symbol}] İlk veri çekimi...")
-                df = tv.get_hist(symbol=symbol, exchange='BIST', interval=Interval.in_daily, n_bars=250)
-            elif missing_days and missing_days > 0:
-                # Eksik günler var, onları çek
-                # Güvenlik payı ekle: eksik gün sayısı + 5 (tatil günleri için)
-                bars_to_fetch = min(missing_days + 5, 20)
-                print(f"[{symbol}] {missing_days} eksik gün tespit edildi, {bars_to_fetch} bar çekiliyor...")
-                df = tv.get_hist(symbol=symbol, exchange='BIST', interval=Interval.in_daily, n_bars=bars_to_fetch)
-                if df is not None and not df.empty:
-                    df = df[df.index > last_date]
-            elif missing_days == 0:
-                # Veri güncel, atla
-                skipped_count += 1
-                continue
-            else:
-                # missing_days None ise (hiç veri yok), 250 bar çek
-                print(f"[{symbol}] Veri yok, ilk çekim...")
-                df = tv.get_hist(symbol=symbol, exchange='BIST', interval=Interval.in_daily, n_bars=250)
-            
-            # Veritabanına Yazma
-            if df is not None and not df.empty:
-                df = df.reset_index()  # Tarih index'ten kolona
+            with span('symbol', item=symbol):
+                # Son tarihi kontrol et
+                last_date = get_last_date(engine, symbol)
+                missing_days = get_missing_days_count(engine, symbol)
                 
-                # Kolon isimlerini küçük harfe çevir ve eşleştir
-                # tvDatafeed: symbol, datetime, open, high, low, close, volume
-                df.columns = [c.lower() for c in df.columns]
-                
-                # Eğer tvDatafeed 'symbol' kolonu göndermiyorsa manuel ekle
-                if 'symbol' not in df.columns:
-                    df['symbol'] = symbol
+                # Ne kadar veri çekilecek?
+                if last_date is None:
+                    # İlk defa çekiliyorsa 1 yıllık (veya 250 bar)
+                    print(f"[{symbol}] İlk veri çekimi...")
+                    with span('fetch'):
+                        df = tv.get_hist(symbol=symbol, exchange='BIST', interval=Interval.in_daily, n_bars=250)
+                elif missing_days and missing_days > 0:
+                    # Eksik günler var, onları çek
+                    # Güvenlik payı ekle: eksik gün sayısı + 5 (tatil günleri için)
+                    bars_to_fetch = min(missing_days + 5, 20)
+                    print(f"[{symbol}] {missing_days} eksik gün tespit edildi, {bars_to_fetch} bar çekiliyor...")
+                    with span('fetch'):
+                        df = tv.get_hist(symbol=symbol, exchange='BIST', interval=Interval.in_daily, n_bars=bars_to_fetch)
+                    if df is not None and not df.empty:
+                        df = df[df.index > last_date]
+                elif missing_days == 0:
+                    # Veri güncel, atla
+                    skipped_count += 1
+                    continue
                 else:
-                    # tvDatafeed "BIST:SYMBOL" formatında döner, sadece "SYMBOL" yapalım
-                    df['symbol'] = df['symbol'].str.replace('BIST:', '', regex=False)
-                
-                # DB şemasına uygun dataframe
-                df_to_write = df[['symbol', 'datetime', 'open', 'high', 'low', 'close', 'volume']].rename(
-                    columns={'datetime': 'date'}
-                )
+                    # missing_days None ise (hiç veri yok), 250 bar çek
+                    print(f"[{symbol}] Veri yok, ilk çekim...")
+                    with span('fetch'):
+                        df = tv.get_hist(symbol=symbol, exchange='BIST', interval=Interval.in_daily, n_bars=250)
                 
-                df_to_write.to_sql('market_data', engine, if_exists='append', index=False)
-                updated_count += 1
-                print(f"[{symbol}] Güncellendi. (+{len(df_to_write)} satır)")
+                # Veritabanına Yazma
+                if df is not None and not df.empty:
+                    df = df.reset_index()  # Tarih index'ten kolona
+                    
+                    # Kolon isimlerini küçük harfe çevir ve eşleştir
+                    # tvDatafeed: symbol, datetime, open, high, low, close, volume
+                    df.columns = [c.lower() for c in df.columns]
+                    
+                    # Eğer tvDatafeed 'symbol' kolonu göndermiyorsa manuel ekle
+                    if 'symbol' not in df.columns:
+                        df['symbol'] = symbol
+                    else:
+                        # tvDatafeed "BIST:SYMBOL" formatında döner, sadece "SYMBOL" yapalım
+                        df['symbol'] = df['symbol'].str.replace('BIST:', '', regex=False)
+                    
+                    # DB şemasına uygun dataframe
+                    df_to_write = df[['symbol', 'datetime', 'open', 'high', 'low', 'close', 'volume']].rename(
+                        columns={'datetime': 'date'}
+                    )
+                    
+                    with span('write'):
+                        df_to_write.to_sql('market_data', engine, if_exists='append', index=False)
+                        # API snapshot'ının COUNT(*) yapmaması için istatistikleri artımlı güncelle
+                        record_ingest(engine, len(df_to_write), df_to_write['date'].max())
+                    count('rows', len(df_to_write))
+                    updated_count += 1
+                    print(f"[{symbol}] Güncellendi. (+{len(df_to_write)} satır)")
             
             # Rate Limit yememek için kısa bekleme (opsiyonel)
             time.sleep(0.1)
-            
+        
         except Exception as e:
             logging.error(f"[{symbol}] Hata: {e}")
             print(f"[{symbol}] Hata: {e}")
             error_count += 1
             continue
     
+    if updated_count > 0:
+        # Yeni barlar: paylaşılan cache'teki OHLCV pencereleri ve tarama sonuçları eskidi
+        cache = get_cache()
+        cache.bump('ohlcv')
+        cache.bump('scan')
+    
+    if updated_count > 0 and post_update:
+        from backend.modules.market_data.breadth import update_breadth
+        from backend.modules.market_data.corporate_actions import refresh_due_actions, suggest_actions
+        from backend.modules.market_data.indicator_store import update_indicator_store
+        from backend.modules.market_data.quality import run_quality_checks
+        from backend.modules.market_data.universe import rebuild_membership
+        
+        # Listeleme aralıkları (ilk bar / delist) yeni barlarla güncellenir: breadth ve indikatörler bunu kullanır
+        try:
+            with span('membership'):
+                rebuild_membership(engine)
+        except Exception as e:
+            logging.error(f"Evren üyeliği hatası: {e}")
+        
+        # Veri kalitesi: hatalı barlar karantinaya alınır, breadth/indikatör/tarama onları atlar
+        try:
+            with span('quality'):
+                quality = run_quality_checks(db_engine=engine)
+            print(f"Veri kalitesi: {quality['errors']} bar karantinada, {quality['warnings']} uyarı.")
+        except Exception as e:
+            logging.error(f"Veri kalitesi kontrol hatası: {e}")
+        
+        # Bölünme/bedelsiz şüphesi taşıyan boşluklar onay için öneri olarak kaydedilir
+        try:
+            suggested = suggest_actions(db_engine=engine)
+            if suggested:
+                print(f"{len(suggested)} olası bölünme/bedelsiz onay bekliyor.")
+        except Exception as e:
+            logging.error(f"Sermaye artırımı tespiti hatası: {e}")
+        
+        # Bugün hak kullanım tarihine ulaşan onaylı işlemler: faktör artık uygulanır, indikatörler yeniden hesaplanır
+        try:
+            refreshed = refresh_due_actions(db_engine=engine)
+            if refreshed:
+                print(f"Hak kullanımı başlayan hisseler yenilendi: {', '.join(refreshed)}")
+        except Exception as e:
+            logging.error(f"Sermaye artırımı yenileme hatası: {e}")
+        
+        # Piyasa genişliği (breadth) metriklerini yeni günler için yeniden hesapla
+        try:
+            with span('breadth'):
+                update_breadth(days=10, db_engine=engine)
+        except Exception as e:
+            logging.error(f"Breadth hesaplama hatası: {e}")
+        
+        # Grafik ve stratejilerin paylaştığı indikatörleri bir kez hesapla
+        try:
+            with span('indicators'):
+                inserted = update_indicator_store(db_engine=engine)
+            print(f"İndikatör deposu güncellendi (+{inserted} değer).")
+        except Exception as e:
+            logging.error(f"İndikatör deposu hatası: {e}")
+        
+        # Araştırma/backtest panel dosyası (varsa) yeni seanslarla yerinde büyütülür
+        if os.path.exists(PANEL_FILE):
+            from backend.modules.market_data.panel_file import append_sessions
+            
+            try:
+                with span('panel_file'):
+                    result = append_sessions(PANEL_FILE, db_engine=engine)
+                print(f"Panel dosyası güncellendi: {result}")
+            except Exception as e:
+                logging.error(f"Panel dosyası hatası: {e}")
+    
     msg = f"Güncelleme tamamlandı. {updated_count} hisse güncellendi, {skipped_count} atlandı (güncel), {error_count} hata."
     print(msg)
     logging.info(msg)
+    return {'updated': updated_count, 'skipped': skipped_count, 'errors': error_count}
 
 if __name__ == "__main__":
     run_daily_update()
@@ -0,0 +1,342 @@
+"""
+Async Telegram dispatcher.
+
+Sends messages to many chats concurrently over one pooled HTTP client while
+staying inside Telegram's limits:
+
+- global: ~30 messages/second per bot
+- per chat: 1 message/second (groups: 20 messages/minute)
+- 429 responses: every worker pauses for `retry_after`, then retries
+- messages longer than 4096 characters are split on line boundaries
+
+Each chat has its own queue and worker, so parts of a long message (and
+consecutive messages) arrive in order while chats are served in parallel.
+
+The API base URL is configurable (TELEGRAM_API_URL), so the dispatcher can
+be pointed at scripts/fake_telegram_server.py in tests and dry runs.
+
+Usage:
+    async with TelegramDispatcher(token, chat_ids) as dispatcher:
+        results = await dispatcher.send(message)
+    
+    results = dispatch(token, chat_ids, [scan_message, breadth_message])
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL', 'https://api.telegram.org')
+
+# Telegram Bot API limits
+MAX_MESSAGE_LENGTH = 4096
+GLOBAL_RATE = (30, 1.0)
+CHAT_RATE = (1, 1.0)
+GROUP_RATE = (20, 60.0)
+
+
+def split_message(text: str, limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """
+    Split a message into parts of at most `limit` characters.
+    
+    Cuts at blank lines first, then at line breaks, so HTML tags opened and
+    closed on the same line (as in the scan formatters) stay intact. A single
+    line longer than the limit is cut hard.
+    
+    Args:
+        text: Message text
+        limit: Maximum part length
+    
+    Returns:
+        Non-empty list of parts
+    """
+    parts: List[str] = []
+    rest = text
+    while len(rest) > limit:
+        cut = rest.rfind('\n\n', 0, limit)
+        if cut <= 0:
+            cut = rest.rfind('\n', 0, limit)
+        if cut <= 0:
+            cut = limit
+        parts.append(rest[:cut].rstrip('\n'))
+        rest = rest[cut:].lstrip('\n')
+    if rest or not parts:
+        parts.append(rest)
+    return parts
+
+
+class RateLimiter:
+    """
+    Sliding-window limiter: at most `max_calls` per `period` seconds.
+    
+    Usage:
+        limiter = RateLimiter(30, 1.0)
+        await limiter.acquire()
+    """
+    
+    def __init__(self, max_calls: int, period: float):
+        self.max_calls = max_calls
+        self.period = period
+        self._calls: Deque[float] = deque()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= self.period:
+                    self._calls.popleft()
+                if len(self._calls) < self.max_calls:
+                    self._calls.append(now)
+                    return
+                await asyncio.sleep(self.period - (now - self._calls[0]))
+
+
+@dataclass
+class DeliveryResult:
+    """Outcome of one message part to one chat."""
+    chat_id: str
+    ok: bool
+    attempts: int
+    status: Optional[int] = None
+    error: Optional[str] = None
+    latency_ms: float = 0.0
+
+
+@dataclass
+class _Job:
+    text: str
+    parse_mode: Optional[str]
+    done: Optional[asyncio.Future]
+    results: List[DeliveryResult] = field(default_factory=list)
+
+
+class TelegramDispatcher:
+    """
+    Concurrent, rate-limited sendMessage client.
+    
+    Args:
+        token: Bot token
+        chat_ids: Default recipients
+        api_url: API base URL (default: TELEGRAM_API_URL)
+        max_retries: Attempts after the first for 429/5xx/network errors
+        timeout: Per-request timeout in seconds
+        max_connections: HTTP connection pool size
+        global_rate: (messages, seconds) for the whole bot
+        chat_rate: (messages, seconds) per private chat
+        group_rate: (messages, seconds) per group chat (negative chat id)
+    """
+    
+    def __init__(
+        self,
+        token: str,
+        chat_ids: Sequence[Union[str, int]] = (),
+        api_url: Optional[str] = None,
+        max_retries: int = 3,
+        timeout: float = 10.0,
+        max_connections: int = 20,
+        global_rate=GLOBAL_RATE,
+        chat_rate=CHAT_RATE,
+        group_rate=GROUP_RATE
+    ):
+        self.token = token
+        self.chat_ids = [str(chat_id) for chat_id in chat_ids]
+        self.api_url = (api_url or TELEGRAM_API_URL).rstrip('/')
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        
+        self._global = RateLimiter(*global_rate)
+        self._chat_limits: Dict[str, RateLimiter] = {}
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._paused_until = 0.0
+        self._client = None
+    
+    async def __aenter__(self) -> 'TelegramDispatcher':
+        await self.start()
+        return self
+    
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+    
+    async def start(self) -> None:
+        # Optional dependency, only needed for sending notifications
+        import httpx
+        
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=f"{self.api_url}/bot{self.token}",
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections)
+            )
+    
+    async def close(self) -> None:
+        """Wait for queued messages, stop the workers and release connections."""
+        for queue in self._queues.values():
+            await queue.join()
+        for worker in self._workers.values():
+            worker.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        self._workers.clear()
+        self._queues.clear()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def enqueue(
+        self,
+        text: str,
+        chat_ids: Optional[Iterable[Union[str, int]]] = None,
+        parse_mode: Optional[str] = 'HTML'
+    ) -> List[asyncio.Future]:
+        """
+        Queue a message (split if needed) for each chat without waiting.
+        
+        Returns:
+            One future per chat, resolving to that chat's List[DeliveryResult]
+        """
+        loop = asyncio.get_running_loop()
+        parts = split_message(text)
+        futures = []
+        
+        for chat_id in [str(c) for c in chat_ids] if chat_ids is not None else self.chat_ids:
+            queue = self._queue(chat_id)
+            done = loop.create_future()
+            results: List[DeliveryResult] = []
+            for i, part in enumerate(parts):
+                # Only the last part resolves the future; parts share one result list
+                queue.put_nowait(_Job(part, parse_mode, done if i == len(parts) - 1 else None, results))
+            futures.append(done)
+        
+        return futures
+    
+    async def send(
+        self,
+        text: str,
+        chat_ids: Optional[Iterable[Union[str, int]]] = None,
+        parse_mode: Optional[str] = 'HTML'
+    ) -> List[DeliveryResult]:
+        """
+        Send a message to every chat concurrently and wait for delivery.
+        
+        Returns:
+            DeliveryResult per chat and message part
+        """
+        per_chat = await asyncio.gather(*self.enqueue(text, chat_ids, parse_mode))
+        return [result for results in per_chat for result in results]
+    
+    def _queue(self, chat_id: str) -> asyncio.Queue:
+        queue = self._queues.get(chat_id)
+        if queue is None:
+            queue = self._queues[chat_id] = asyncio.Queue()
+            rate = self.group_rate if chat_id.startswith('-') else self.chat_rate
+            self._chat_limits[chat_id] = RateLimiter(*rate)
+            self._workers[chat_id] = asyncio.create_task(self._worker(chat_id, queue))
+        return queue
+    
+    async def _worker(self, chat_id: str, queue: asyncio.Queue) -> None:
+        while True:
+            job: _Job = await queue.get()
+            try:
+                job.results.append(await self._deliver(chat_id, job.text, job.parse_mode))
+            except Exception as e:
+                job.results.append(DeliveryResult(chat_id, False, 0, error=str(e)))
+            finally:
+                if job.done is not None and not job.done.done():
+                    job.done.set_result(job.results)
+                queue.task_done()
+    
+    async def _deliver(self, chat_id: str, text: str, parse_mode: Optional[str]) -> DeliveryResult:
+        if self._client is None:
+            await self.start()
+        
+        payload = {'chat_id': chat_id, 'text': text, 'disable_web_page_preview': False}
+        if parse_mode:
+            payload['parse_mode'] = parse_mode
+        
+        started = time.perf_counter()
+        status, error = None, None
+        for attempt in range(1, self.max_retries + 2):
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            await self._chat_limits[chat_id].acquire()
+            await self._global.acquire()
+            
+            delay = min(2 ** (attempt - 1), 30)
+            try:
+                response = await self._client.post('/sendMessage', json=payload)
+                status = response.status_code
+                if status == 200:
+                    return DeliveryResult(chat_id, True, attempt, status,
+                                          latency_ms=(time.perf_counter() - started) * 1000)
+                
+                body = _json(response)
+                error = body.get('description') or response.text[:200]
+                if status == 429:
+                    retry_after = (body.get('parameters') or {}).get('retry_after')
+                    delay = float(retry_after or response.headers.get('Retry-After', delay))
+                    # Flood control applies to the whole bot
+                    self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                    logger.warning(f"Telegram rate limited (chat_id: {chat_id}), retry after {delay}s")
+                    delay = 0
+                elif status < 500:
+                    break
+            except Exception as e:
+                status, error = None, f"{type(e).__name__}: {e}"
+            
+            if attempt <= self.max_retries and delay:
+                await asyncio.sleep(delay)
+        
+        logger.error(f"Telegram send error (chat_id: {chat_id}): {error}")
+        return DeliveryResult(chat_id, False, attempt, status, error,
+                              latency_ms=(time.perf_counter() - started) * 1000)
+
+
+def _json(response) -> dict:
+    try:
+        body = response.json()
+        return body if isinstance(body, dict) else {}
+    except ValueError:
+        return {}
+
+
+def dispatch(
+    token: str,
+    chat_ids: Sequence[Union[str, int]],
+    messages: Union[str, Sequence[str]],
+    parse_mode: Optional[str] = 'HTML',
+    **kwargs
+) -> List[DeliveryResult]:
+    """
+    Blocking helper for scripts: send messages (in order) to every chat.
+    
+    Args:
+        token: Bot token
+        chat_ids: Recipients
+        messages: One message or a list, delivered in order per chat
+        parse_mode: Telegram parse mode
+        **kwargs: TelegramDispatcher options
+    
+    Returns:
+        DeliveryResult per chat, message and part
+    """
+    if isinstance(messages, str):
+        messages = [messages]
+    
+    async def run() -> List[DeliveryResult]:
+        async with TelegramDispatcher(token, chat_ids, **kwargs) as dispatcher:
+            futures = [f for message in messages for f in dispatcher.enqueue(message, parse_mode=parse_mode)]
+            per_chat = await asyncio.gather(*futures)
+        return [result for results in per_chat for result in results]
+    
+    return asyncio.run(run())
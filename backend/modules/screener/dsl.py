@@ -0,0 +1,442 @@
+"""
+Strategy expression DSL.
+
+Signals are written as Pine-like expressions over price fields, strategy
+parameters and named variables, e.g.
+
+    crossover(close, ema(close, emaLongLen)) and volume > sma(volume, 20) * volMult
+
+Expressions are parsed with Python's ast module (a restricted subset), lowered
+to a DAG of primitive nodes and compiled into a Program: a flat list of NumPy
+kernels evaluated over the wide (bar × symbol) arrays of a SymbolPanel.
+Structurally identical subexpressions are interned to one node, so
+`ref(close, 1)` or `ema(close, 50)` used by several conditions is computed
+once (common-subexpression elimination), and parameters are folded in as
+constants at compile time.
+
+Functions:
+    ema(x, n), sma(x, n), rma(x, n), rsi(x, n=14)
+    adx(n=14), diplus(n=14), diminus(n=14)
+    highest(x, n), lowest(x, n)       window includes the current bar
+    rolling(x, n, "mean"|"sum"|"max"|"min"|"std")
+    ref(x, n)                         value n bars ago
+    crossover(a, b), crossunder(a, b)
+    barssince(cond)                   bars since cond was last true (NaN if never)
+    abs(x), max(a, b), min(a, b)
+
+Operators: + - * /, comparisons (chained too), and/or/not (also & | ~).
+"""
+import ast
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.modules.screener import indicators
+from backend.modules.screener.indicators import IndicatorContext, IndicatorSpec
+
+PRICE_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+ROLLING_FUNCTIONS = ('mean', 'sum', 'max', 'min', 'std')
+
+# Operators whose operands can be reordered without changing the result
+_COMMUTATIVE = {'add', 'mul', 'and', 'or', 'eq', 'ne', 'max', 'min'}
+
+_BINOPS = {ast.Add: 'add', ast.Sub: 'sub', ast.Mult: 'mul', ast.Div: 'div',
+           ast.BitAnd: 'and', ast.BitOr: 'or'}
+
+# a < b is stored as b > a so both spellings share one node
+_COMPARE = {ast.Gt: ('gt', False), ast.Lt: ('gt', True), ast.GtE: ('ge', False),
+            ast.LtE: ('ge', True), ast.Eq: ('eq', False), ast.NotEq: ('ne', False)}
+
+_CONST_OPS = {
+    'add': lambda a, b: a + b, 'sub': lambda a, b: a - b,
+    'mul': lambda a, b: a * b, 'div': lambda a, b: a / b,
+    'neg': lambda a: -a,
+}
+
+
+class DSLError(ValueError):
+    """Invalid strategy expression."""
+
+
+class Node(tuple):
+    """
+    Interned expression node: (op, args, attrs).
+    
+    args are node ids (ints) into the owning Program; attrs are hashable
+    compile-time constants (window length, indicator spec, ...).
+    """
+    
+    @property
+    def op(self) -> str:
+        return self[0]
+    
+    @property
+    def args(self) -> Tuple[int, ...]:
+        return self[1]
+    
+    @property
+    def attrs(self) -> Tuple[Any, ...]:
+        return self[2]
+
+
+class Program:
+    """
+    Compiled set of named expressions sharing one node DAG.
+    
+    Attributes:
+        nodes: Interned nodes in evaluation (topological) order
+        outputs: Output name -> node id
+    """
+    
+    def __init__(self):
+        self.nodes: List[Node] = []
+        self.outputs: Dict[str, int] = {}
+        self._ids: Dict[Node, int] = {}
+    
+    def intern(self, op: str, args: Tuple[int, ...] = (), attrs: Tuple[Any, ...] = ()) -> int:
+        """Return the id of an existing identical node or append a new one."""
+        if op in _COMMUTATIVE:
+            args = tuple(sorted(args))
+        node = Node((op, tuple(args), tuple(attrs)))
+        if node not in self._ids:
+            self._ids[node] = len(self.nodes)
+            self.nodes.append(node)
+        return self._ids[node]
+    
+    def const_value(self, node_id: int) -> Optional[float]:
+        node = self.nodes[node_id]
+        return node.attrs[0] if node.op == 'const' else None
+    
+    def evaluate(self, frames: Dict[str, pd.DataFrame], ctx: Optional[IndicatorContext] = None) -> Dict[str, np.ndarray]:
+        """
+        Run the program over wide price frames.
+        
+        Args:
+            frames: open/high/low/close/volume as wide DataFrames (bars × symbols)
+            ctx: Optional IndicatorContext over the same frames, to share
+                 indicator results with other consumers
+        
+        Returns:
+            Output name -> ndarray (bars × symbols)
+        """
+        ctx = ctx or IndicatorContext(frames)
+        shape = frames['close'].shape
+        
+        # Free intermediates after their last use to bound memory on large panels
+        last_use = {}
+        for i, node in enumerate(self.nodes):
+            for arg in node.args:
+                last_use[arg] = i
+        keep = set(self.outputs.values())
+        
+        values: Dict[int, Any] = {}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for i, node in enumerate(self.nodes):
+                values[i] = _KERNELS[node.op](node, [values[a] for a in node.args], frames, ctx, shape)
+                for arg in node.args:
+                    if last_use.get(arg) == i and arg not in keep:
+                        values.pop(arg, None)
+        
+        out = {}
+        for name, node_id in self.outputs.items():
+            value = values[node_id]
+            if np.isscalar(value):
+                value = np.full(shape, value)
+            out[name] = value
+        return out
+    
+    def describe(self) -> List[str]:
+        """Human-readable node listing (for debugging / EXPLAIN-style output)."""
+        lines = []
+        for i, node in enumerate(self.nodes):
+            args = ', '.join(f'%{a}' for a in node.args)
+            attrs = ', '.join(str(a) for a in node.attrs)
+            lines.append(f"%{i} = {node.op}({', '.join(filter(None, [args, attrs]))})")
+        return lines
+    
+    def indicator_specs(self) -> List[IndicatorSpec]:
+        """Indicator specs read through the IndicatorContext."""
+        return [node.attrs[0] for node in self.nodes if node.op == 'indicator']
+    
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+
+class Compiler:
+    """
+    Lowers expressions into a Program.
+    
+    Names resolve to, in order: price fields, variables (compiled on first
+    use), parameters (folded as constants).
+    """
+    
+    def __init__(self, variables: Optional[Dict[str, str]] = None, params: Optional[Dict[str, Any]] = None,
+                 program: Optional[Program] = None):
+        self.variables = dict(variables or {})
+        self.params = dict(params or {})
+        self.program = program if program is not None else Program()
+        self._resolved: Dict[str, int] = {}
+        self._resolving: List[str] = []
+    
+    def add_output(self, name: str, expr: str) -> int:
+        node_id = self.compile(expr)
+        self.program.outputs[name] = node_id
+        return node_id
+    
+    def compile(self, expr: str) -> int:
+        try:
+            tree = ast.parse(expr.strip(), mode='eval')
+        except SyntaxError as e:
+            raise DSLError(f"Syntax error in '{expr}': {e.msg}") from None
+        return self._visit(tree.body, expr)
+    
+    # ------------------------------------------------------------------
+    # AST lowering
+    # ------------------------------------------------------------------
+    
+    def _visit(self, node: ast.AST, expr: str) -> int:
+        p = self.program
+        
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                raise DSLError(f"Unsupported constant {node.value!r} in '{expr}'")
+            return p.intern('const', attrs=(float(node.value),))
+        
+        if isinstance(node, ast.Name):
+            return self._name(node.id, expr)
+        
+        if isinstance(node, ast.UnaryOp):
+            operand = self._visit(node.operand, expr)
+            if isinstance(node.op, (ast.Not, ast.Invert)):
+                return p.intern('not', (operand,))
+            if isinstance(node.op, ast.USub):
+                return self._arith('neg', operand, expr=expr)
+            if isinstance(node.op, ast.UAdd):
+                return operand
+        
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINOPS:
+            return self._arith(_BINOPS[type(node.op)], self._visit(node.left, expr), self._visit(node.right, expr),
+                               expr=expr)
+        
+        if isinstance(node, ast.BoolOp):
+            op = 'and' if isinstance(node.op, ast.And) else 'or'
+            result = self._visit(node.values[0], expr)
+            for value in node.values[1:]:
+                result = p.intern(op, (result, self._visit(value, expr)))
+            return result
+        
+        if isinstance(node, ast.Compare):
+            # a < b < c  ->  (a < b) and (b < c)
+            terms = [self._visit(node.left, expr)] + [self._visit(c, expr) for c in node.comparators]
+            result = None
+            for i, cmp_op in enumerate(node.ops):
+                if type(cmp_op) not in _COMPARE:
+                    raise DSLError(f"Unsupported comparison in '{expr}'")
+                op, swap = _COMPARE[type(cmp_op)]
+                left, right = terms[i], terms[i + 1]
+                cmp = p.intern(op, (right, left) if swap else (left, right))
+                result = cmp if result is None else p.intern('and', (result, cmp))
+            return result
+        
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+            return self._call(node, expr)
+        
+        raise DSLError(f"Unsupported syntax '{ast.unparse(node)}' in '{expr}'")
+    
+    def _name(self, name: str, expr: str) -> int:
+        p = self.program
+        if name in PRICE_FIELDS:
+            return p.intern('field', attrs=(name,))
+        if name in self.variables:
+            if name not in self._resolved:
+                if name in self._resolving:
+                    raise DSLError(f"Circular variable reference: {' -> '.join(self._resolving + [name])}")
+                self._resolving.append(name)
+                self._resolved[name] = self.compile(self.variables[name])
+                self._resolving.pop()
+            return self._resolved[name]
+        if name in self.params:
+            value = self.params[name]
+            if isinstance(value, bool):
+                value = float(value)
+            if not isinstance(value, (int, float)):
+                raise DSLError(f"Parameter '{name}' is not numeric")
+            return p.intern('const', attrs=(float(value),))
+        raise DSLError(f"Unknown name '{name}' in '{expr}'")
+    
+    def _arith(self, op: str, *args: int, expr: str = '') -> int:
+        consts = [self.program.const_value(a) for a in args]
+        if op in _CONST_OPS and all(c is not None for c in consts):
+            try:
+                value = float(_CONST_OPS[op](*consts))
+            except (ZeroDivisionError, OverflowError, ValueError) as e:
+                raise DSLError(f"Invalid constant arithmetic in '{expr}': {e}") from None
+            return self.program.intern('const', attrs=(value,))
+        return self.program.intern(op, args)
+    
+    def _int_arg(self, node: ast.AST, fn: str, expr: str) -> int:
+        value = self.program.const_value(self._visit(node, expr))
+        if value is None or value != int(value) or value < 0:
+            raise DSLError(f"{fn}() window must be a non-negative integer constant in '{expr}'")
+        return int(value)
+    
+    def _call(self, node: ast.Call, expr: str) -> int:
+        p = self.program
+        fn = node.func.id
+        args = list(node.args)
+        kwargs = {kw.arg: kw.value for kw in node.keywords}
+        
+        def arg(i, name, default=None):
+            if i < len(args):
+                return args[i]
+            if name in kwargs:
+                return kwargs[name]
+            if default is None:
+                raise DSLError(f"{fn}() missing argument '{name}' in '{expr}'")
+            return ast.Constant(default)
+        
+        if fn in ('ema', 'sma', 'rma', 'rsi'):
+            source = self._visit(arg(0, 'x'), expr)
+            length = self._int_arg(arg(1, 'n', 14 if fn == 'rsi' else None), fn, expr)
+            if length < 1:
+                raise DSLError(f"{fn}() window must be positive in '{expr}'")
+            source_node = p.nodes[source]
+            # On a raw field, reuse the shared indicator implementation (and its memo)
+            if fn != 'rma' and source_node.op == 'field':
+                if fn == 'rsi':
+                    if source_node.attrs[0] == 'close':
+                        return p.intern('indicator', attrs=(IndicatorSpec.of('rsi', period=length),))
+                else:
+                    spec = IndicatorSpec.of(fn, length=length, source=source_node.attrs[0])
+                    return p.intern('indicator', attrs=(spec,))
+            return p.intern(fn, (source,), (length,))
+        
+        if fn in ('adx', 'diplus', 'diminus'):
+            period = self._int_arg(arg(0, 'n', 14), fn, expr)
+            return p.intern('indicator', attrs=(IndicatorSpec.of(fn, period=period),))
+        
+        if fn in ('highest', 'lowest'):
+            return p.intern('rolling', (self._visit(arg(0, 'x'), expr),),
+                            (self._int_arg(arg(1, 'n'), fn, expr), 'max' if fn == 'highest' else 'min'))
+        
+        if fn == 'rolling':
+            how = arg(2, 'fn', 'mean')
+            if not isinstance(how, ast.Constant) or how.value not in ROLLING_FUNCTIONS:
+                raise DSLError(f"rolling() fn must be one of {ROLLING_FUNCTIONS} in '{expr}'")
+            return p.intern('rolling', (self._visit(arg(0, 'x'), expr),),
+                            (self._int_arg(arg(1, 'n'), fn, expr), how.value))
+        
+        if fn == 'ref':
+            source = self._visit(arg(0, 'x'), expr)
+            n = self._int_arg(arg(1, 'n', 1), fn, expr)
+            return source if n == 0 else p.intern('ref', (source,), (n,))
+        
+        if fn in ('crossover', 'crossunder'):
+            a = self._visit(arg(0, 'a'), expr)
+            b = self._visit(arg(1, 'b'), expr)
+            prev_a = p.intern('ref', (a,), (1,))
+            prev_b = p.intern('ref', (b,), (1,))
+            # crossover: a > b now and a <= b one bar ago (Pine ta.crossover)
+            if fn == 'crossover':
+                return p.intern('and', (p.intern('gt', (a, b)), p.intern('ge', (prev_b, prev_a))))
+            return p.intern('and', (p.intern('gt', (b, a)), p.intern('ge', (prev_a, prev_b))))
+        
+        if fn == 'barssince':
+            return p.intern('barssince', (self._visit(arg(0, 'cond'), expr),))
+        
+        if fn == 'abs':
+            return p.intern('abs', (self._visit(arg(0, 'x'), expr),))
+        
+        if fn in ('max', 'min'):
+            return p.intern(fn, (self._visit(arg(0, 'a'), expr), self._visit(arg(1, 'b'), expr)))
+        
+        raise DSLError(f"Unknown function '{fn}' in '{expr}'")
+
+
+def compile_expressions(outputs: Dict[str, str], variables: Optional[Dict[str, str]] = None,
+                        params: Optional[Dict[str, Any]] = None, program: Optional[Program] = None) -> Program:
+    """
+    Compile named expressions into one Program.
+    
+    Args:
+        outputs: Output name -> expression
+        variables: Named helper expressions usable in outputs and each other
+        params: Parameter values folded in as constants
+        program: Existing Program to extend; nodes identical to ones already
+                 there (e.g. from another strategy) are shared
+    
+    Returns:
+        Program whose outputs are keyed like `outputs`
+    
+    Raises:
+        DSLError: If an expression is invalid
+    """
+    compiler = Compiler(variables, params, program)
+    for name, expr in outputs.items():
+        compiler.add_output(name, expr)
+    return compiler.program
+
+
+# ============================================================================
+# KERNELS
+# ============================================================================
+
+def _num(x):
+    """Booleans take part in arithmetic as 0/1."""
+    return x.astype(float) if isinstance(x, np.ndarray) and x.dtype == bool else x
+
+
+def _wide(x, shape) -> pd.DataFrame:
+    return pd.DataFrame(np.broadcast_to(_num(x), shape).astype(float))
+
+
+def _ref(node, args, frames, ctx, shape):
+    x = np.broadcast_to(args[0], shape)
+    n = node.attrs[0]
+    out = np.full(shape, False if x.dtype == bool else np.nan, dtype=x.dtype if x.dtype == bool else float)
+    if n < shape[0]:
+        out[n:] = x[:shape[0] - n]
+    return out
+
+
+def _rolling(node, args, frames, ctx, shape):
+    length, how = node.attrs
+    return getattr(_wide(args[0], shape).rolling(length), how)().to_numpy()
+
+
+def _barssince(node, args, frames, ctx, shape):
+    cond = np.broadcast_to(np.asarray(args[0], dtype=bool), shape)
+    rows = np.arange(shape[0])[:, None]
+    last = np.maximum.accumulate(np.where(cond, rows, -1), axis=0)
+    return np.where(last >= 0, rows - last, np.nan)
+
+
+_KERNELS = {
+    'const': lambda node, args, frames, ctx, shape: node.attrs[0],
+    'field': lambda node, args, frames, ctx, shape: frames[node.attrs[0]].to_numpy(dtype=float),
+    'indicator': lambda node, args, frames, ctx, shape: ctx.get(node.attrs[0]).to_numpy(dtype=float),
+    'ema': lambda node, args, frames, ctx, shape: indicators.ema(_wide(args[0], shape), node.attrs[0]).to_numpy(),
+    'sma': lambda node, args, frames, ctx, shape: indicators.sma(_wide(args[0], shape), node.attrs[0]).to_numpy(),
+    'rma': lambda node, args, frames, ctx, shape: indicators.rma(_wide(args[0], shape), node.attrs[0]).to_numpy(),
+    'rsi': lambda node, args, frames, ctx, shape: indicators.rsi(_wide(args[0], shape), node.attrs[0]).to_numpy(),
+    'rolling': _rolling,
+    'ref': _ref,
+    'barssince': _barssince,
+    'add': lambda node, args, *_: _num(args[0]) + _num(args[1]),
+    'sub': lambda node, args, *_: _num(args[0]) - _num(args[1]),
+    'mul': lambda node, args, *_: _num(args[0]) * _num(args[1]),
+    'div': lambda node, args, *_: _num(args[0]) / _num(args[1]),
+    'neg': lambda node, args, *_: -_num(args[0]),
+    'abs': lambda node, args, *_: np.abs(_num(args[0])),
+    'max': lambda node, args, *_: np.maximum(_num(args[0]), _num(args[1])),
+    'min': lambda node, args, *_: np.minimum(_num(args[0]), _num(args[1])),
+    'gt': lambda node, args, *_: np.greater(args[0], args[1]),
+    'ge': lambda node, args, *_: np.greater_equal(args[0], args[1]),
+    'eq': lambda node, args, *_: np.equal(args[0], args[1]),
+    'ne': lambda node, args, *_: np.not_equal(args[0], args[1]),
+    'and': lambda node, args, *_: np.logical_and(args[0], args[1]),
+    'or': lambda node, args, *_: np.logical_or(args[0], args[1]),
+    'not': lambda node, args, *_: np.logical_not(args[0]),
+}
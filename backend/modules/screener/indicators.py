@@ -0,0 +1,273 @@
+"""
+Vectorized technical indicators.
+
+Every function accepts either a Series (one symbol) or a wide DataFrame
+(bars × symbols, see SymbolPanel) and returns the same type, so strategies
+and market-wide engines share one implementation.
+"""
+import inspect
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Set, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+Frame = Union[pd.Series, pd.DataFrame]
+
+
+def ema(x: Frame, length: int) -> Frame:
+    """Exponential moving average (Pine ta.ema)."""
+    return x.ewm(span=length, adjust=False).mean()
+
+
+def sma(x: Frame, length: int) -> Frame:
+    """Simple moving average (Pine ta.sma)."""
+    return x.rolling(length).mean()
+
+
+def rma(x: Frame, length: int) -> Frame:
+    """Wilder's moving average (Pine ta.rma)."""
+    return x.ewm(alpha=1/length, adjust=False).mean()
+
+
+def rsi(close: Frame, period: int = 14) -> Frame:
+    """RSI using Wilder's method."""
+    delta = close.diff()
+    gain = rma(delta.where(delta > 0, 0), period)
+    loss = rma(-delta.where(delta < 0, 0), period)
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+
+def true_range(high: Frame, low: Frame, close: Frame) -> Frame:
+    """True range; the first bar falls back to high - low."""
+    prev_close = close.shift()
+    # fmax skips NaN, matching concat(...).max(axis=1) on the first bar
+    return np.fmax(np.fmax(high - low, (high - prev_close).abs()), (low - prev_close).abs())
+
+
+def adx(high: Frame, low: Frame, close: Frame, period: int = 14) -> Tuple[Frame, Frame, Frame]:
+    """
+    ADX and directional indicators.
+    
+    Returns:
+        (plus_di, minus_di, adx)
+    """
+    atr = rma(true_range(high, low, close), period)
+    
+    up_move = high - high.shift()
+    down_move = low.shift() - low
+    
+    plus_dm = up_move.where((up_move > down_move) & (up_move > 0), 0)
+    minus_dm = down_move.where((down_move > up_move) & (down_move > 0), 0)
+    
+    plus_di = 100 * rma(plus_dm, period) / atr
+    minus_di = 100 * rma(minus_dm, period) / atr
+    
+    dx = 100 * (plus_di - minus_di).abs() / (plus_di + minus_di)
+    return plus_di, minus_di, rma(dx, period)
+
+
+def xtumy_indicators(open_: Frame, high: Frame, low: Frame, close: Frame, volume: Frame,
+                     params, ctx: 'IndicatorContext' = None) -> Dict[str, Frame]:
+    """
+    All indicators used by XTUMY V27.
+    
+    Args:
+        open_, high, low, close, volume: Price/volume Series or wide DataFrames
+        params: XTUMYV27Parameters
+        ctx: Optional IndicatorContext over the same frames, to share
+             results with other consumers
+    
+    Returns:
+        Dict keyed by the column names XTUMYV27Strategy uses (EMA50, rsi, wall_top, ...)
+    """
+    if ctx is None:
+        ctx = IndicatorContext({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume})
+    
+    # EMAs, RSI, volume average, ADX/DI and Fibonacci walls
+    out = {name: ctx.get(spec) for name, spec in xtumy_specs(params).items()}
+    
+    # EMA Slope
+    ema_prev = out['EMA50'].shift(1)
+    out['emaSlope'] = (out['EMA50'] - ema_prev) / ema_prev * 100
+    out['isSlopePositive'] = out['emaSlope'] > 0
+    out['isSlopeStrong'] = out['emaSlope'] > params.slopeTh
+    out['isTrendStrong'] = out['adx'] > params.adxThresh
+    
+    # Fibonacci levels
+    out['wall_diff'] = out['wall_top'] - out['wall_low']
+    out['wall_gold'] = out['wall_low'] + (out['wall_diff'] * 0.618)
+    
+    return out
+
+
+# ============================================================================
+# INDICATOR SPECS
+# ============================================================================
+
+class IndicatorSpec(NamedTuple):
+    """
+    Identity of a computed indicator: function name plus parameters.
+    
+    The canonical key ("ema:length=50,source=close") includes defaults,
+    so two consumers asking for the same thing always share one result.
+    """
+    name: str
+    params: Tuple[Tuple[str, Any], ...] = ()
+    
+    @classmethod
+    def of(cls, name: str, **params) -> 'IndicatorSpec':
+        """Build a spec, filling in the function's default parameters."""
+        if name not in INDICATOR_FUNCTIONS:
+            raise KeyError(f"Unknown indicator '{name}'. Available: {sorted(INDICATOR_FUNCTIONS)}")
+        signature = inspect.signature(INDICATOR_FUNCTIONS[name])
+        full = {}
+        for param in list(signature.parameters.values())[1:]:
+            if param.name in params:
+                full[param.name] = params.pop(param.name)
+            elif param.default is not inspect.Parameter.empty:
+                full[param.name] = param.default
+            else:
+                raise ValueError(f"Indicator '{name}' requires parameter '{param.name}'")
+        if params:
+            raise ValueError(f"Unknown parameters for '{name}': {sorted(params)}")
+        return cls(name, tuple(sorted(full.items())))
+    
+    @classmethod
+    def parse(cls, key: str) -> 'IndicatorSpec':
+        """Parse "name:k=v,k=v" (values are converted to int/float when possible)."""
+        name, _, arg_str = key.strip().partition(':')
+        params = {}
+        for item in filter(None, arg_str.split(',')):
+            k, _, v = item.partition('=')
+            params[k.strip()] = _parse_value(v.strip())
+        return cls.of(name, **params)
+    
+    @property
+    def key(self) -> str:
+        return f"{self.name}:" + ','.join(f"{k}={v}" for k, v in self.params)
+    
+    def __str__(self) -> str:
+        return self.key
+
+
+def _parse_value(value: str) -> Any:
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            continue
+    return value
+
+
+class IndicatorContext:
+    """
+    Memoized indicator evaluation over one set of price frames.
+    
+    Indicators requested through the same context are computed once, and
+    indicators that depend on others (rsi_ma -> rsi, diplus -> adx bundle)
+    reuse the shared intermediate result. The dependency graph discovered
+    while computing is kept in `dependencies`.
+    """
+    
+    def __init__(self, frames: Dict[str, Frame]):
+        """
+        Args:
+            frames: Price frames keyed by open/high/low/close/volume
+        """
+        self.frames = frames
+        self.dependencies: Dict[Any, Set[Any]] = {}
+        self._results: Dict[Any, Any] = {}
+        self._computing: List[Any] = []
+    
+    def get(self, spec: Union[IndicatorSpec, str]) -> Frame:
+        """Value of a spec (parsed from its key if given as a string)."""
+        if isinstance(spec, str):
+            spec = IndicatorSpec.parse(spec)
+        return self._resolve(spec, lambda: INDICATOR_FUNCTIONS[spec.name](self, **dict(spec.params)))
+    
+    def _resolve(self, key: Any, compute: Callable[[], Any]) -> Any:
+        if self._computing:
+            self.dependencies.setdefault(self._computing[-1], set()).add(key)
+        if key not in self._results:
+            self._computing.append(key)
+            try:
+                self._results[key] = compute()
+            finally:
+                self._computing.pop()
+        return self._results[key]
+    
+    def source(self, name: str) -> Frame:
+        """A raw price field or another indicator's key."""
+        if name in self.frames:
+            return self.frames[name]
+        return self.get(name)
+    
+    def has(self, spec: Union[IndicatorSpec, str]) -> bool:
+        """Whether a spec's value is already available."""
+        return (IndicatorSpec.parse(spec) if isinstance(spec, str) else spec) in self._results
+    
+    def preload(self, values: Dict[Union[IndicatorSpec, str], Frame]) -> None:
+        """Seed results computed elsewhere (e.g. the indicator store); get() returns them as is."""
+        for spec, frame in values.items():
+            self._results[IndicatorSpec.parse(spec) if isinstance(spec, str) else spec] = frame
+    
+    def memo(self, key: Any, compute: Callable[[], Any]) -> Any:
+        """Cache an intermediate result that is not itself a spec."""
+        return self._resolve(key, compute)
+    
+    @property
+    def computed(self) -> int:
+        """Number of distinct indicators and intermediates evaluated so far."""
+        return len(self._results)
+    
+    def compute(self, specs: Iterable[Union[IndicatorSpec, str]]) -> Dict[str, Frame]:
+        """Evaluate many specs, returning results keyed by spec key."""
+        out = {}
+        for spec in specs:
+            if isinstance(spec, str):
+                spec = IndicatorSpec.parse(spec)
+            out[spec.key] = self.get(spec)
+        return out
+
+
+def _adx_bundle(ctx: IndicatorContext, period: int):
+    f = ctx.frames
+    return ctx.memo(('adx_bundle', period), lambda: adx(f['high'], f['low'], f['close'], period))
+
+
+INDICATOR_FUNCTIONS: Dict[str, Callable[..., Frame]] = {
+    'ema': lambda ctx, length, source='close': ema(ctx.source(source), length),
+    'sma': lambda ctx, length, source='close': sma(ctx.source(source), length),
+    'rsi': lambda ctx, period=14: rsi(ctx.frames['close'], period),
+    'rsi_ma': lambda ctx, period=14, length=14: sma(ctx.get(IndicatorSpec.of('rsi', period=period)), length),
+    'diplus': lambda ctx, period=14: _adx_bundle(ctx, period)[0],
+    'diminus': lambda ctx, period=14: _adx_bundle(ctx, period)[1],
+    'adx': lambda ctx, period=14: _adx_bundle(ctx, period)[2],
+    'highest': lambda ctx, length, source='high', offset=1: ctx.source(source).rolling(length).max().shift(offset),
+    'lowest': lambda ctx, length, source='low', offset=1: ctx.source(source).rolling(length).min().shift(offset),
+}
+
+
+def xtumy_specs(params) -> Dict[str, IndicatorSpec]:
+    """
+    Specs behind XTUMY V27's base indicators for a parameter set.
+    
+    Args:
+        params: XTUMYV27Parameters
+    
+    Returns:
+        Dict keyed by the XTUMY column name (EMA50, rsi, wall_top, ...)
+    """
+    return {
+        'EMA50': IndicatorSpec.of('ema', length=params.emaLongLen),
+        'EMA20': IndicatorSpec.of('ema', length=params.emaShortLen),
+        'rsi': IndicatorSpec.of('rsi', period=params.rsiPeriod),
+        'rsiMA': IndicatorSpec.of('rsi_ma', period=params.rsiPeriod, length=params.rsiPeriod),
+        'avgVol': IndicatorSpec.of('sma', length=20, source='volume'),
+        'diplus': IndicatorSpec.of('diplus', period=params.adxPeriod),
+        'diminus': IndicatorSpec.of('diminus', period=params.adxPeriod),
+        'adx': IndicatorSpec.of('adx', period=params.adxPeriod),
+        'wall_top': IndicatorSpec.of('highest', length=params.fibLen),
+        'wall_low': IndicatorSpec.of('lowest', length=params.fibLen),
+    }
@@ -6,6 +6,7 @@ from backend.core.database import get_db_session
 from backend.modules.screener.models import Strategy, StrategyParameter
 from backend.modules.screener.strategies.registry import StrategyRegistry
 from backend.modules.screener.strategies.xtumy_v27 import XTUMYV27Strategy
+from backend.modules.screener.strategies.ema_cross import EMACrossStrategy
 
 # Parameter metadata for XTUMY V27
 XTUMY_V27_PARAM_METADATA = {
@@ -87,6 +88,50 @@ XTUMY_V27_PARAM_METADATA = {
     },
 }
 
+# Parameter metadata for EMA Cross (declarative DSL strategy)
+EMA_CROSS_PARAM_METADATA = {
+    'fastLen': {
+        'display_name': 'Hızlı EMA Periyodu',
+        'display_group': 'EMA AYARLARI',
+        'display_order': 1
+    },
+    'slowLen': {
+        'display_name': 'Yavaş EMA Periyodu',
+        'display_group': 'EMA AYARLARI',
+        'display_order': 2
+    },
+    'rsiPeriod': {
+        'display_name': 'RSI Periyodu',
+        'display_group': 'GÜÇ VE YÖN FİLTRELERİ',
+        'display_order': 3
+    },
+    'rsiMin': {
+        'display_name': 'Minimum RSI (AL için)',
+        'display_group': 'GÜÇ VE YÖN FİLTRELERİ',
+        'display_order': 4
+    },
+    'adxThresh': {
+        'display_name': 'ADX Eşiği (Trend Gücü)',
+        'display_group': 'GÜÇ VE YÖN FİLTRELERİ',
+        'display_order': 5
+    },
+    'volMult': {
+        'display_name': 'Hacim Çarpanı (Kırılım için)',
+        'display_group': 'KIRILIM AYARLARI',
+        'display_order': 6
+    },
+    'breakoutLen': {
+        'display_name': 'Kırılım Penceresi (Bar)',
+        'display_group': 'KIRILIM AYARLARI',
+        'display_order': 7
+    },
+    'pbWaitBars': {
+        'display_name': 'Trend Oturma Süresi (Bar)',
+        'display_group': 'KIRILIM AYARLARI',
+        'display_order': 8
+    },
+}
+
 
 def init_strategy_in_db(strategy_class, param_metadata: dict):
     """
@@ -108,7 +153,7 @@ def init_strategy_in_db(strategy_class, param_metadata: dict):
                 name=strategy_name,
                 display_name=strategy_class.get_display_name(),
                 description=strategy_class.get_description(),
-                python_class=f"backend.modules.screener.strategies.xtumy_v27.{strategy_name}",
+                python_class=f"{strategy_class.__module__}.{strategy_class.__name__}",
                 is_active=True
             )
             session.add(strategy)
@@ -173,6 +218,9 @@ def init_all_strategies():
     # Initialize XTUMY V27
     init_strategy_in_db(XTUMYV27Strategy, XTUMY_V27_PARAM_METADATA)
     
+    # Initialize EMA Cross
+    init_strategy_in_db(EMACrossStrategy, EMA_CROSS_PARAM_METADATA)
+    
     print("=" * 60)
     print("✅ All strategies initialized!")
     print("=" * 60)
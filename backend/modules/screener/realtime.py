@@ -0,0 +1,330 @@
+"""
+Intraday XTUMY V27 scanner on the forming daily bar.
+
+The scanner warms up once from daily history (the whole market as a
+SymbolPanel) and keeps every XTUMY indicator as (bars + 1) × symbols
+arrays whose last row is today's forming bar. Each quote update only
+advances the recursive indicator state of the updated symbols by one step
+(EMA/RMA recurrences, running window sums), then the strategy's own
+vectorized last-bar conditions run on those columns. Alerts are published
+as a SignalBatch with a per-symbol, per-signal debounce.
+
+Usage:
+    scanner = IntradayScanner(history_df)
+    scanner.run(ReplayFileSource('ticks.csv'), on_alert=print)
+"""
+import time
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.modules.market_data.panel import SymbolPanel
+from backend.modules.market_data.stream import BarUpdate, StreamSource
+from backend.modules.screener import indicators
+from backend.modules.screener.signals import SignalBatch
+from backend.modules.screener.strategies.xtumy_v27 import XTUMYV27Parameters, XTUMYV27Strategy
+
+# Bars XTUMY needs before a symbol is scanned (same as validate_dataframe)
+MIN_BARS = 60
+
+
+class IntradayScanner:
+    """
+    Incremental XTUMY V27 evaluation for the whole market.
+    
+    Attributes:
+        symbols: Column labels (symbols with daily history)
+        session: Date of the forming bar (None before the first update)
+        stats: Counters and latency samples (ms) of processed batches
+    """
+    
+    STATE = ('gain', 'loss', 'atr', 'pdm', 'mdm')
+    
+    def __init__(self, history: pd.DataFrame, params: Optional[XTUMYV27Parameters] = None,
+                 debounce: float = 900.0):
+        """
+        Args:
+            history: Daily OHLCV rows [symbol, date, open, high, low, close, volume]
+            params: Strategy parameters (default: XTUMY V27 defaults)
+            debounce: Seconds (event time) before the same symbol/signal alerts again
+        """
+        self.params = params or XTUMYV27Parameters()
+        self.debounce = debounce
+        self.session: Optional[date] = None
+        self.stats: Dict[str, list] = {'batches': 0, 'updates': 0, 'alerts': 0, 'latency_ms': []}
+        self._last_alert: Dict[Tuple[str, str], datetime] = {}
+        self.warm_up(history)
+    
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+    
+    def warm_up(self, history: pd.DataFrame) -> None:
+        """Compute indicators and recursive state from daily history."""
+        panel = SymbolPanel.from_long(history)
+        p = self.params
+        self.symbols = panel.symbols
+        self.columns = {symbol: col for col, symbol in enumerate(self.symbols)}
+        
+        def with_forming_row(values: np.ndarray) -> np.ndarray:
+            return np.vstack([values, np.full((1, values.shape[1]), np.nan)])
+        
+        self.f = {field: with_forming_row(panel.fields[field]) for field in SymbolPanel.FIELDS}
+        self.dates = np.vstack([panel.dates, np.full((1, panel.n_symbols), np.datetime64('NaT'), dtype='datetime64[ns]')])
+        
+        ctx = indicators.IndicatorContext(panel.frames())
+        self.ind = {
+            name: with_forming_row(ctx.get(spec).to_numpy(dtype=float))
+            for name, spec in indicators.xtumy_specs(p).items()
+        }
+        
+        # Internal RMA values behind RSI and ADX (not exposed as indicators)
+        frames = ctx.frames
+        close, high, low = frames['close'], frames['high'], frames['low']
+        delta = close.diff()
+        up_move = high - high.shift()
+        down_move = low.shift() - low
+        
+        def last(frame: pd.DataFrame) -> np.ndarray:
+            return frame.to_numpy(dtype=float)[-1].copy() if len(frame) else np.full(panel.n_symbols, np.nan)
+        
+        self._prev = {
+            'gain': last(indicators.rma(delta.where(delta > 0, 0), p.rsiPeriod)),
+            'loss': last(indicators.rma(-delta.where(delta < 0, 0), p.rsiPeriod)),
+            'atr': last(indicators.rma(indicators.true_range(high, low, close), p.adxPeriod)),
+            'pdm': last(indicators.rma(up_move.where((up_move > down_move) & (up_move > 0), 0), p.adxPeriod)),
+            'mdm': last(indicators.rma(down_move.where((down_move > up_move) & (down_move > 0), 0), p.adxPeriod)),
+        }
+        self._forming = {name: values.copy() for name, values in self._prev.items()}
+        
+        valid = panel.valid
+        self.bar_count = valid.sum(axis=0)
+        # Same rule as validate_dataframe: no NaN in critical columns
+        self.clean = np.ones(panel.n_symbols, dtype=bool)
+        for field in ('close', 'high', 'low', 'volume'):
+            self.clean &= ~(np.isnan(panel.fields[field]) & valid).any(axis=0)
+        
+        self.has_bar = np.zeros(panel.n_symbols, dtype=bool)
+        self._start_session()
+    
+    def _start_session(self) -> None:
+        """Values that stay fixed while today's bar forms (walls, window sums)."""
+        p = self.params
+        history = slice(None, -1)
+        n_hist = self.f['close'].shape[0] - 1
+        
+        def window(values: np.ndarray, length: int, reduce) -> np.ndarray:
+            if length == 0:
+                return np.zeros(values.shape[1])
+            if n_hist < length:
+                return np.full(values.shape[1], np.nan)
+            return reduce(values[history][-length:], axis=0)
+        
+        # highest/lowest use offset=1: the forming bar sees the previous fibLen bars
+        self.ind['wall_top'][-1] = window(self.f['high'], p.fibLen, np.max)
+        self.ind['wall_low'][-1] = window(self.f['low'], p.fibLen, np.min)
+        self._rsi_sum = window(self.ind['rsi'], p.rsiPeriod - 1, np.sum)
+        self._vol_sum = window(self.f['volume'], 19, np.sum)
+    
+    def _roll(self, session: date) -> None:
+        """Commit the forming bars and open a new session."""
+        cols = np.flatnonzero(self.has_bar)
+        if len(cols):
+            for arrays in (self.f, self.ind, {'dates': self.dates}):
+                for values in arrays.values():
+                    values[:-2, cols] = values[1:-1, cols]
+                    values[-2, cols] = values[-1, cols]
+            for name in self.STATE:
+                self._prev[name][cols] = self._forming[name][cols]
+            self.bar_count[cols] = np.minimum(self.bar_count[cols] + 1, self.f['close'].shape[0] - 1)
+        
+        for values in list(self.f.values()) + list(self.ind.values()):
+            values[-1] = np.nan
+        self.dates[-1] = np.datetime64('NaT')
+        self.has_bar[:] = False
+        self.session = session
+        self._start_session()
+    
+    def _advance(self, cols: np.ndarray, bars: np.ndarray, session: date) -> None:
+        """Write forming bars (cols × OHLCV) and step every indicator once."""
+        p = self.params
+        f, ind, prev = self.f, self.ind, self._prev
+        
+        for i, field in enumerate(SymbolPanel.FIELDS):
+            f[field][-1, cols] = bars[:, i]
+        self.dates[-1, cols] = np.datetime64(session, 'ns')
+        self.has_bar[cols] = True
+        
+        o, h, l, c, v = (f[field][-1, cols] for field in SymbolPanel.FIELDS)
+        pc, ph, pl = f['close'][-2, cols], f['high'][-2, cols], f['low'][-2, cols]
+        rsi_alpha = _alpha(alpha=1 / p.rsiPeriod)
+        adx_alpha = _alpha(alpha=1 / p.adxPeriod)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ind['EMA50'][-1, cols] = _ewm_step(ind['EMA50'][-2, cols], c, _alpha(span=p.emaLongLen))
+            ind['EMA20'][-1, cols] = _ewm_step(ind['EMA20'][-2, cols], c, _alpha(span=p.emaShortLen))
+            
+            # RSI (Wilder); NaN deltas count as 0 like delta.where(...)
+            delta = c - pc
+            gain = _ewm_step(prev['gain'][cols], np.where(delta > 0, delta, 0.0), rsi_alpha)
+            loss = _ewm_step(prev['loss'][cols], np.where(delta < 0, -delta, 0.0), rsi_alpha)
+            rsi = 100 - (100 / (1 + gain / loss))
+            ind['rsi'][-1, cols] = rsi
+            ind['rsiMA'][-1, cols] = (self._rsi_sum[cols] + rsi) / p.rsiPeriod
+            ind['avgVol'][-1, cols] = (self._vol_sum[cols] + v) / 20
+            
+            # ADX / DI
+            tr = np.fmax(np.fmax(h - l, np.abs(h - pc)), np.abs(l - pc))
+            up_move = h - ph
+            down_move = pl - l
+            atr = _ewm_step(prev['atr'][cols], tr, adx_alpha)
+            pdm = _ewm_step(prev['pdm'][cols], np.where((up_move > down_move) & (up_move > 0), up_move, 0.0), adx_alpha)
+            mdm = _ewm_step(prev['mdm'][cols], np.where((down_move > up_move) & (down_move > 0), down_move, 0.0), adx_alpha)
+            plus_di = 100 * pdm / atr
+            minus_di = 100 * mdm / atr
+            dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+            ind['diplus'][-1, cols] = plus_di
+            ind['diminus'][-1, cols] = minus_di
+            ind['adx'][-1, cols] = _ewm_step(ind['adx'][-2, cols], dx, adx_alpha)
+        
+        for name, values in (('gain', gain), ('loss', loss), ('atr', atr), ('pdm', pdm), ('mdm', mdm)):
+            self._forming[name][cols] = values
+    
+    # ------------------------------------------------------------------
+    # Evaluation
+    # ------------------------------------------------------------------
+    
+    def evaluate(self, cols: np.ndarray) -> SignalBatch:
+        """XTUMY signals on the forming bar of the given columns."""
+        cols = cols[self.has_bar[cols]]
+        if not len(cols):
+            return SignalBatch.empty()
+        
+        f = {name: values[:, cols] for name, values in self.f.items()}
+        ind = {name: values[:, cols] for name, values in self.ind.items()}
+        
+        eligible = self.clean[cols] & (self.bar_count[cols] + 1 >= MIN_BARS)
+        ready = eligible & ~np.isnan(np.stack([
+            ind['EMA50'][-1], ind['EMA20'][-1], ind['rsi'][-1], ind['rsiMA'][-1]
+        ])).any(axis=0)
+        
+        fired = XTUMYV27Strategy._batch_conditions(f, ind, [self.params])
+        fired = {name: mask[0] & ready for name, mask in fired.items()}
+        
+        panel = SymbolPanel([self.symbols[col] for col in cols], self.dates[:, cols], f)
+        return XTUMYV27Strategy._build_batch(panel, f, ind, fired)
+    
+    def on_batch(self, updates: List[BarUpdate]) -> SignalBatch:
+        """
+        Apply a micro-batch of updates and return the alerts it triggers.
+        
+        Args:
+            updates: Forming-bar updates (any order, repeated symbols allowed)
+        
+        Returns:
+            SignalBatch of new (debounced) alerts
+        """
+        alerts = []
+        for session, latest in _by_session(updates):
+            if self.session is None or session > self.session:
+                self._roll(session)
+            elif session < self.session:
+                continue  # stale update from a finished session
+            
+            cols, bars = [], []
+            for symbol, update in latest.items():
+                col = self.columns.get(symbol)
+                # Unknown symbols have no history; bars already in history are stale
+                if col is None or self.dates[-2, col] >= np.datetime64(session, 'ns'):
+                    continue
+                cols.append(col)
+                bars.append(update[2:])
+            
+            if not cols:
+                continue
+            
+            cols = np.array(cols)
+            self._advance(cols, np.array(bars, dtype=float), session)
+            now = max(update.time for update in latest.values())
+            alerts.append(self._debounce(self.evaluate(cols), now))
+        
+        return SignalBatch.concat(alerts)
+    
+    def _debounce(self, signals: SignalBatch, now: datetime) -> SignalBatch:
+        if not len(signals):
+            return signals
+        
+        keep = np.zeros(len(signals), dtype=bool)
+        for i, key in enumerate(zip(signals.symbol.tolist(), signals.signal_type.tolist())):
+            last = self._last_alert.get(key)
+            if last is None or (now - last).total_seconds() >= self.debounce:
+                self._last_alert[key] = now
+                keep[i] = True
+        return signals.select(keep)
+    
+    def run(self, source: StreamSource, on_alert: Optional[Callable[[SignalBatch], None]] = None,
+            max_batches: Optional[int] = None) -> Dict[str, float]:
+        """
+        Consume a source until it ends, publishing alerts.
+        
+        Args:
+            source: Quote source
+            on_alert: Called with each non-empty SignalBatch of alerts
+            max_batches: Stop after this many batches (None = until the source ends)
+        
+        Returns:
+            Summary: batches, updates, alerts, latency p50/p99/max (ms)
+        """
+        try:
+            for batch in source.batches():
+                started = time.perf_counter()
+                alerts = self.on_batch(batch)
+                if len(alerts) and on_alert:
+                    on_alert(alerts)
+                
+                self.stats['latency_ms'].append((time.perf_counter() - started) * 1000)
+                self.stats['batches'] += 1
+                self.stats['updates'] += len(batch)
+                self.stats['alerts'] += len(alerts)
+                
+                if max_batches and self.stats['batches'] >= max_batches:
+                    break
+        finally:
+            source.close()
+        
+        return self.summary()
+    
+    def summary(self) -> Dict[str, float]:
+        latency = np.array(self.stats['latency_ms']) if self.stats['latency_ms'] else np.zeros(1)
+        return {
+            'symbols': len(self.symbols),
+            'batches': self.stats['batches'],
+            'updates': self.stats['updates'],
+            'alerts': self.stats['alerts'],
+            'latency_p50_ms': round(float(np.percentile(latency, 50)), 2),
+            'latency_p99_ms': round(float(np.percentile(latency, 99)), 2),
+            'latency_max_ms': round(float(latency.max()), 2),
+        }
+
+
+def _alpha(span: Optional[float] = None, alpha: Optional[float] = None) -> float:
+    """Smoothing factor exactly as pandas derives it (through the center of mass)."""
+    com = (span - 1) / 2.0 if span is not None else 1.0 / alpha - 1
+    return 1.0 / (1.0 + com)
+
+
+def _ewm_step(prev: np.ndarray, x: np.ndarray, alpha: float) -> np.ndarray:
+    """One ewm(adjust=False) step in pandas' arithmetic; starts at x where prev is NaN."""
+    step = ((1 - alpha) * prev + alpha * x) / ((1 - alpha) + alpha)
+    step = np.where(prev == x, prev, step)
+    return np.where(np.isnan(prev), x, np.where(np.isnan(x), prev, step))
+
+
+def _by_session(updates: List[BarUpdate]) -> List[Tuple[date, Dict[str, BarUpdate]]]:
+    """Latest update per symbol, grouped by session in time order."""
+    sessions: Dict[date, Dict[str, BarUpdate]] = {}
+    for update in sorted(updates, key=lambda u: u.time):
+        sessions.setdefault(update.session, {})[update.symbol] = update
+    return sorted(sessions.items())
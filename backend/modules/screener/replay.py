@@ -0,0 +1,245 @@
+"""
+Historical market replay harness.
+
+Streams recorded data through the production code paths and records
+per-stage latency histograms and throughput:
+
+- replay_sessions(): daily market_data bars, one session at a time, through
+  ScanEngine._scan -> ScanEngine._save_signals -> Telegram formatting/sending
+- replay_ticks(): an intraday replay file through IntradayScanner, with
+  the same save and notify stages for its alerts
+
+Telegram is replaced by RecordingTelegramBot (formats messages with the
+real TelegramBot code, keeps them instead of sending), so a run needs
+neither TradingView nor Telegram.
+"""
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import text
+
+from backend.core.database import engine
+from backend.core.timing import StageRecorder
+from backend.modules.market_data.corporate_actions import apply_adjustments
+from backend.modules.market_data.quality import clean_bars_clause
+from backend.modules.market_data.stream import ReplayFileSource
+from backend.modules.market_data.universe import get_membership
+from backend.modules.screener.realtime import IntradayScanner
+from backend.modules.screener.scanner import ScanEngine
+from backend.modules.screener.signals import SignalBatch
+
+# Same history window ScanEngine._load_market_data uses
+HISTORY_DAYS = 250
+
+SignalCallback = Callable[[Any, SignalBatch], None]
+
+
+class RecordingTelegramBot:
+    """TelegramBot stand-in: real message formatting, messages kept in memory."""
+    
+    def __init__(self):
+        from scripts.telegram_bot import TelegramBot
+        
+        self.messages: List[str] = []
+        self.bot = TelegramBot()
+        self.bot.send_message = self._record
+    
+    def _record(self, text: str, parse_mode: str = 'HTML') -> bool:
+        self.messages.append(text)
+        return True
+    
+    def __call__(self, signals: SignalBatch) -> None:
+        self.bot.send_scan_results(pd.DataFrame(signals.to_dicts()))
+
+
+def load_bars(start: date, end: date, symbols: Optional[List[str]] = None, db_engine=None) -> pd.DataFrame:
+    """
+    Daily bars between two dates (inclusive), as ScanEngine sees them.
+    
+    Quarantined bars are skipped, prices are split/dividend-adjusted and
+    bars outside a symbol's listing intervals are dropped, so sessions see
+    the universe as it was (delisted symbols included).
+    
+    Args:
+        start: First date
+        end: Last date
+        symbols: Optional symbol filter
+        db_engine: Optional engine (defaults to the application engine)
+    
+    Returns:
+        DataFrame [symbol, date, open, high, low, close, volume]
+    """
+    query = f"""
+        SELECT symbol, date, open, high, low, close, volume
+        FROM market_data
+        WHERE date >= :start AND date <= :end
+          AND {clean_bars_clause()}
+    """
+    params: Dict[str, Any] = {'start': start, 'end': end}
+    if symbols:
+        query += " AND symbol = ANY(:symbols)"
+        params['symbols'] = list(symbols)
+    
+    bars = pd.read_sql(text(query + " ORDER BY symbol, date ASC"), db_engine or engine, params=params)
+    bars = get_membership(db_engine=db_engine).filter_bars(bars)
+    return apply_adjustments(bars, db_engine=db_engine)
+
+
+def _pace(started: float, interval: float) -> None:
+    if interval > 0:
+        remaining = interval - (time.perf_counter() - started)
+        if remaining > 0:
+            time.sleep(remaining)
+
+
+def _deliver(scan_engine: ScanEngine, signals: SignalBatch, recorder: StageRecorder,
+             save_to_db: bool, notify: Optional[Callable[[SignalBatch], None]]) -> None:
+    """Save and notify stages, shared by both replay modes."""
+    if not len(signals):
+        return
+    if save_to_db:
+        with recorder.stage('save'):
+            scan_engine._save_signals(signals)
+    if notify:
+        with recorder.stage('notify'):
+            notify(signals)
+        recorder.count('notifications')
+
+
+def replay_sessions(
+    strategy_name: str,
+    start: date,
+    end: date,
+    user_id: int = 1,
+    speed: float = 0.0,
+    save_to_db: bool = False,
+    notify: Optional[Callable[[SignalBatch], None]] = None,
+    on_signals: Optional[SignalCallback] = None,
+    bars: Optional[pd.DataFrame] = None,
+    params: Optional[Any] = None,
+    recorder: Optional[StageRecorder] = None
+) -> Dict[str, Any]:
+    """
+    Replay daily sessions through scan -> save -> notify.
+    
+    Each session sees exactly what a live end-of-day scan would have seen:
+    the HISTORY_DAYS window of bars up to and including that session.
+    
+    Args:
+        strategy_name: Registered strategy
+        start: First session to replay
+        end: Last session to replay
+        user_id: User whose parameters (and signal rows) are used
+        speed: Sessions per second (0 = as fast as possible)
+        save_to_db: Run the save stage against the database
+        notify: Notify stage (e.g. RecordingTelegramBot())
+        on_signals: Called with (session, SignalBatch) for correctness checks
+        bars: Preloaded bars covering start - HISTORY_DAYS .. end (default: load from DB)
+        params: Strategy parameters (default: the user's parameters from DB)
+        recorder: StageRecorder to fill (default: new one)
+    
+    Returns:
+        StageRecorder report
+    """
+    recorder = recorder or StageRecorder()
+    scan_engine = ScanEngine(strategy_name, user_id)
+    strategy = scan_engine.strategy_class(params or scan_engine._load_parameters())
+    
+    if bars is None:
+        with recorder.stage('load'):
+            bars = load_bars(start - timedelta(days=HISTORY_DAYS), end)
+    
+    dates = pd.to_datetime(bars['date'])
+    sessions = sorted(d for d in dates.dt.normalize().unique() if start <= d.date() <= end)
+    
+    for session in sessions:
+        started = time.perf_counter()
+        
+        with recorder.stage('slice'):
+            window = bars[(dates > session - timedelta(days=HISTORY_DAYS)) & (dates <= session)]
+        with recorder.stage('scan'):
+            signals = scan_engine._scan(strategy, window)
+        
+        _deliver(scan_engine, signals, recorder, save_to_db, notify)
+        
+        recorder.record('session', (time.perf_counter() - started) * 1000)
+        recorder.count('sessions')
+        recorder.count('bars', len(window))
+        recorder.count('signals', len(signals))
+        if on_signals:
+            on_signals(session.date(), signals)
+        
+        _pace(started, 1 / speed if speed > 0 else 0)
+    
+    return recorder.report()
+
+
+def replay_ticks(
+    path: str,
+    user_id: int = 1,
+    speed: float = 0.0,
+    batch_window: float = 1.0,
+    debounce: float = 900.0,
+    save_to_db: bool = False,
+    notify: Optional[Callable[[SignalBatch], None]] = None,
+    on_signals: Optional[SignalCallback] = None,
+    history: Optional[pd.DataFrame] = None,
+    params: Optional[Any] = None,
+    recorder: Optional[StageRecorder] = None
+) -> Dict[str, Any]:
+    """
+    Replay an intraday tick/bar file through the intraday scanner.
+    
+    Args:
+        path: Replay file (see market_data.stream)
+        user_id: User whose XTUMY parameters (and signal rows) are used
+        speed: Replay speed (0 = as fast as possible, 1 = recorded pace)
+        batch_window: Seconds of updates per micro-batch
+        debounce: Alert debounce in seconds
+        save_to_db: Run the save stage against the database
+        notify: Notify stage (e.g. RecordingTelegramBot())
+        on_signals: Called with (batch end time, SignalBatch) for each alert batch
+        history: Daily bars before the replayed session (default: load from DB)
+        params: XTUMY parameters (default: the user's parameters from DB)
+        recorder: StageRecorder to fill (default: new one)
+    
+    Returns:
+        StageRecorder report
+    """
+    recorder = recorder or StageRecorder()
+    scan_engine = ScanEngine('XTUMYV27Strategy', user_id)
+    source = ReplayFileSource(path, speed=speed, batch_window=batch_window)
+    
+    if history is None:
+        first = next(source.updates(), None)
+        if first is None:
+            return recorder.report()
+        with recorder.stage('load'):
+            history = load_bars(first.session - timedelta(days=HISTORY_DAYS), first.session - timedelta(days=1))
+    
+    with recorder.stage('warm_up'):
+        scanner = IntradayScanner(history, params or scan_engine._load_parameters(), debounce=debounce)
+    
+    batches = source.batches()
+    while True:
+        with recorder.stage('ingest'):
+            batch = next(batches, None)
+        if batch is None:
+            break
+        
+        started = time.perf_counter()
+        with recorder.stage('scan'):
+            alerts = scanner.on_batch(batch)
+        
+        _deliver(scan_engine, alerts, recorder, save_to_db, notify)
+        
+        recorder.record('batch', (time.perf_counter() - started) * 1000)
+        recorder.count('batches')
+        recorder.count('updates', len(batch))
+        recorder.count('signals', len(alerts))
+        if on_signals and len(alerts):
+            on_signals(max(update.time for update in batch), alerts)
+    
+    return recorder.report()
@@ -1,16 +1,17 @@
 """
 REST API routes for screener module.
 """
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 from datetime import datetime, date, timedelta
 from typing import Optional, List
 from sqlalchemy import text, func
-from pydantic import BaseModel, Field, ValidationError
+from pydantic import BaseModel, Field, ValidationError, model_validator
+import json
 import traceback
 
+from backend.core.cache import cached_json, get_cache
 from backend.core.database import get_db_session
 from backend.modules.screener.models import Strategy, StrategyParameter, SignalHistory, SignalPerformance
-from backend.modules.screener.scanner import ScanEngine
 from backend.modules.screener.strategies.registry import StrategyRegistry
 
 
@@ -20,11 +21,37 @@ from backend.modules.screener.strategies.registry import StrategyRegistry
 
 class ScanRequest(BaseModel):
     """Request model for POST /api/screener/scan"""
+    strategy_name: Optional[str] = Field(default=None, description="Name of registered strategy (e.g., XTUMYV27Strategy)")
+    strategies: Optional[List[str]] = Field(default=None, min_length=1, description="Several strategies scanned in one fused pass")
+    user_id: int = Field(default=1, ge=1, description="User ID")
+    save_to_db: bool = Field(default=True, description="Whether to save signals to database")
+    symbols: Optional[List[str]] = Field(default=None, description="Optional list of symbols to scan")
+    signal_types: Optional[List[str]] = Field(default=None, description="Optional list of signal types to filter")
+    
+    @model_validator(mode='after')
+    def check_strategy(self):
+        if not self.strategy_name and not self.strategies:
+            raise ValueError("Either 'strategy_name' or 'strategies' is required")
+        return self
+
+
+class MultiUserScanRequest(BaseModel):
+    """Request model for POST /api/screener/scan/users"""
+    strategy_name: str = Field(..., description="Name of registered strategy (e.g., XTUMYV27Strategy)")
+    user_ids: Optional[List[int]] = Field(default=None, description="Users to scan (default: every user with saved parameters)")
+    save_to_db: bool = Field(default=True, description="Whether to save signals to database (per user)")
+    symbols: Optional[List[str]] = Field(default=None, description="Optional list of symbols to scan")
+    signal_types: Optional[List[str]] = Field(default=None, description="Optional list of signal types to filter")
+
+
+class StreamScanRequest(BaseModel):
+    """Request model for POST /api/screener/scan/stream"""
     strategy_name: str = Field(..., description="Name of registered strategy (e.g., XTUMYV27Strategy)")
     user_id: int = Field(default=1, ge=1, description="User ID")
     save_to_db: bool = Field(default=True, description="Whether to save signals to database")
     symbols: Optional[List[str]] = Field(default=None, description="Optional list of symbols to scan")
     signal_types: Optional[List[str]] = Field(default=None, description="Optional list of signal types to filter")
+    shard_size: int = Field(default=100, ge=1, le=1000, description="Maximum symbols per shard")
 
 
 class UpdateParametersRequest(BaseModel):
@@ -201,7 +228,7 @@ def update_strategy_parameters(strategy_name: str):
             if not strategy:
                 return jsonify({
                     'error': f'Strategy "{strategy_name}" not found',
-                    'available_strategies': list(StrategyRegistry._strategies.keys())
+                    'available_strategies': StrategyRegistry.names()
                 }), 404
             
             strategy_id = strategy.id
@@ -247,6 +274,9 @@ def update_strategy_parameters(strategy_name: str):
             
             session.commit()
             
+            # Cached scan results were produced with the old parameters
+            get_cache().bump('scan')
+            
             return jsonify({
                 'message': 'Parameters updated successfully',
                 'strategy_id': strategy_id,
@@ -263,16 +293,24 @@ def update_strategy_parameters(strategy_name: str):
         }), 500
 
 
+def _saves_signals() -> bool:
+    """True when a scan request writes signals (save_to_db defaults to true)."""
+    body = request.get_json(silent=True) or {}
+    return body.get('save_to_db', True) is not False
+
+
 @screener_bp.route('/scan', methods=['POST'])
+@cached_json('scan', unless=_saves_signals)
 def run_scan():
     """
-    Run a scan with a strategy.
+    Run a scan with one strategy or several strategies fused.
     
     POST /api/screener/scan
     
     Body:
         {
             "strategy_name": "XTUMYV27Strategy",
+            // or: "strategies": ["XTUMYV27Strategy", "EMACrossStrategy"]
             "user_id": 1,
             "save_to_db": true,
             "symbols": ["THYAO", "ASELS"],  // optional
@@ -284,8 +322,14 @@ def run_scan():
             "message": "Scan completed",
             "strategy": "XTUMYV27Strategy",
             "signals_found": 38,
+            "timing": {"elapsed_ms": ..., "stages": {"load": {...}, "indicators": {...}, ...},
+                       "counters": {"symbols": 590}, "slowest": {...}},
             "signals": [...]
         }
+        
+        With "strategies", data is loaded once and shared indicators are
+        computed once; each signal carries its "strategy" and the response adds
+        "strategies", "by_strategy" (signal counts) and "indicators" (sharing stats).
     """
     try:
         data = request.get_json()
@@ -296,16 +340,22 @@ def run_scan():
         except ValidationError as e:
             return jsonify({
                 'error': 'Invalid request data',
-                'details': e.errors()
+                'details': e.errors(include_context=False)
             }), 400
         
+        if scan_request.strategies:
+            return _run_multi_scan(scan_request)
+        
+        # Deferred: the scan engine pulls in pandas/numpy and the strategy modules
+        from backend.modules.screener.scanner import ScanEngine
+        
         # Create scan engine
         try:
             scan_engine = ScanEngine(scan_request.strategy_name, scan_request.user_id)
         except KeyError:
             return jsonify({
                 'error': f'Strategy "{scan_request.strategy_name}" not found',
-                'available_strategies': list(StrategyRegistry._strategies.keys())
+                'available_strategies': StrategyRegistry.names()
             }), 404
         
         # Run scan with signal type filter
@@ -320,6 +370,7 @@ def run_scan():
             'strategy': scan_request.strategy_name,
             'user_id': scan_request.user_id,
             'signals_found': len(signals),
+            'timing': scan_engine.timing,
             'signals': signals
         }), 200
     
@@ -331,6 +382,195 @@ def run_scan():
         }), 500
 
 
+def _run_multi_scan(scan_request: ScanRequest):
+    """Fused multi-strategy branch of POST /api/screener/scan."""
+    from backend.modules.screener.scanner import MultiScanEngine
+    
+    try:
+        scan_engine = MultiScanEngine(scan_request.strategies, scan_request.user_id)
+    except KeyError as e:
+        return jsonify({
+            'error': str(e).strip('"'),
+            'available_strategies': StrategyRegistry.names()
+        }), 404
+    
+    results = scan_engine.run_scan(
+        save_to_db=scan_request.save_to_db,
+        symbols=scan_request.symbols,
+        signal_types=scan_request.signal_types
+    )
+    
+    signals = [
+        {**signal, 'strategy': name}
+        for name, strategy_signals in results.items()
+        for signal in strategy_signals
+    ]
+    
+    return jsonify({
+        'message': 'Scan completed',
+        'strategies': list(results.keys()),
+        'user_id': scan_request.user_id,
+        'signals_found': len(signals),
+        'by_strategy': {name: len(strategy_signals) for name, strategy_signals in results.items()},
+        'indicators': scan_engine.stats,
+        'timing': scan_engine.timing,
+        'signals': signals
+    }), 200
+
+
+@screener_bp.route('/scan/users', methods=['POST'])
+def run_multi_user_scan():
+    """
+    Scan one strategy for many users in a single batched pass.
+    
+    POST /api/screener/scan/users
+    
+    Body:
+        {
+            "strategy_name": "XTUMYV27Strategy",
+            "user_ids": [1, 2, 3],  // optional - default: every user with saved parameters
+            "save_to_db": true,
+            "symbols": ["THYAO", "ASELS"],  // optional
+            "signal_types": ["PULLBACK AL"]  // optional
+        }
+    
+    Returns:
+        {
+            "message": "Scan completed",
+            "strategy": "XTUMYV27Strategy",
+            "users": 120,
+            "parameter_sets": 7,
+            "signals_found": 2150,
+            "results": {"1": [...], "2": [...]}
+        }
+    """
+    try:
+        data = request.get_json()
+        
+        try:
+            scan_request = MultiUserScanRequest(**data)
+        except ValidationError as e:
+            return jsonify({
+                'error': 'Invalid request data',
+                'details': e.errors(include_context=False)
+            }), 400
+        
+        from backend.modules.screener.scanner import MultiUserScanEngine
+        
+        try:
+            scan_engine = MultiUserScanEngine(scan_request.strategy_name, scan_request.user_ids)
+        except KeyError:
+            return jsonify({
+                'error': f'Strategy "{scan_request.strategy_name}" not found',
+                'available_strategies': StrategyRegistry.names()
+            }), 404
+        
+        results = scan_engine.run_scan(
+            save_to_db=scan_request.save_to_db,
+            symbols=scan_request.symbols,
+            signal_types=scan_request.signal_types
+        )
+        
+        return jsonify({
+            'message': 'Scan completed',
+            'strategy': scan_request.strategy_name,
+            'users': len(results),
+            'parameter_sets': scan_engine.stats.get('parameter_sets', 0),
+            'signals_found': sum(len(signals) for signals in results.values()),
+            'stats': scan_engine.stats,
+            'results': {str(user_id): signals for user_id, signals in results.items()}
+        }), 200
+    
+    except Exception as e:
+        return jsonify({
+            'error': 'Internal server error',
+            'details': str(e),
+            'traceback': traceback.format_exc()
+        }), 500
+
+
+@screener_bp.route('/scan/stream', methods=['POST'])
+def stream_scan():
+    """
+    Run a scan and stream results as symbol shards complete.
+    
+    POST /api/screener/scan/stream
+    POST /api/screener/scan/stream?format=ndjson
+    
+    Body: same as /scan for a single strategy, plus optional "shard_size".
+    
+    Returns:
+        text/event-stream (default) or application/x-ndjson
+        (?format=ndjson or Accept: application/x-ndjson) with events:
+            start     {"strategy": ..., "symbols_total": 612, "shards": 9}
+            signals   {"shard": 0, "signals": [...]}
+            progress  {"shard": 0, "symbols_done": 10, "symbols_total": 612,
+                       "signals_found": 2, "elapsed_ms": 85.3}
+            done      {"signals_found": 38, "symbols_scanned": 612, "elapsed_ms": 2140.7}
+            error     {"error": ..., "details": ...}
+        NDJSON lines carry the event name in "event".
+    """
+    try:
+        data = request.get_json()
+        
+        try:
+            scan_request = StreamScanRequest(**data)
+        except ValidationError as e:
+            return jsonify({
+                'error': 'Invalid request data',
+                'details': e.errors(include_context=False)
+            }), 400
+        
+        from backend.modules.screener.scanner import ScanEngine
+        
+        try:
+            scan_engine = ScanEngine(scan_request.strategy_name, scan_request.user_id)
+        except KeyError:
+            return jsonify({
+                'error': f'Strategy "{scan_request.strategy_name}" not found',
+                'available_strategies': StrategyRegistry.names()
+            }), 404
+        
+        ndjson = (
+            request.args.get('format') == 'ndjson'
+            or 'application/x-ndjson' in request.headers.get('Accept', '')
+        )
+        
+        def format_event(event: str, payload: dict) -> str:
+            if ndjson:
+                return json.dumps({'event': event, **payload}) + '\n'
+            return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+        
+        def generate():
+            try:
+                for event, payload in scan_engine.iter_scan(
+                    save_to_db=scan_request.save_to_db,
+                    symbols=scan_request.symbols,
+                    signal_types=scan_request.signal_types,
+                    shard_size=scan_request.shard_size
+                ):
+                    yield format_event(event, payload)
+            except Exception as e:
+                yield format_event('error', {'error': 'Internal server error', 'details': str(e)})
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='application/x-ndjson' if ndjson else 'text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                # Tell nginx not to buffer the stream
+                'X-Accel-Buffering': 'no'
+            }
+        )
+    
+    except Exception as e:
+        return jsonify({
+            'error': 'Internal server error',
+            'details': str(e),
+            'traceback': traceback.format_exc()
+        }), 500
+
+
 @screener_bp.route('/signals', methods=['GET'])
 def get_signals():
     """
@@ -481,6 +721,7 @@ def get_signal(signal_id: int):
 # ============================================================================
 
 @screener_bp.route('/performance/summary', methods=['GET'])
+@cached_json('performance')
 def get_performance_summary():
     """
     Get performance summary for all signal types.
@@ -615,6 +856,7 @@ def get_performance_summary():
 
 
 @screener_bp.route('/performance/top-performers', methods=['GET'])
+@cached_json('performance')
 def get_top_performers():
     """
     Get top and worst performing signals.
@@ -795,6 +1037,7 @@ def get_signal_performance(signal_id: int):
 
 
 @screener_bp.route('/performance/by-symbol', methods=['GET'])
+@cached_json('performance')
 def get_performance_by_symbol():
     """
     Get performance statistics grouped by symbol.
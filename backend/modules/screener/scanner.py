@@ -1,14 +1,29 @@
 """
 Scan engine for executing strategy scans on market data.
 """
+import time
 import pandas as pd
-from typing import List, Optional, Dict, Any
-from datetime import datetime, date
+from typing import List, Optional, Dict, Any, Iterator, Tuple
+from datetime import datetime, date, timedelta
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
+from backend.core.cache import get_cache
+from backend.core.config import SCAN_USE_INDICATOR_STORE
 from backend.core.database import get_db_session, engine
+from backend.core.metrics import record_scan
+from backend.core.timing import StageRecorder, count, recording, span
+from backend.modules.market_data.corporate_actions import apply_adjustments
+from backend.modules.market_data.indicator_store import preload_context
+from backend.modules.market_data.panel import SymbolPanel
+from backend.modules.market_data.quality import clean_bars_clause
+from backend.modules.screener.dsl import Program
+from backend.modules.screener.indicators import IndicatorContext
+from backend.modules.screener.signals import SignalBatch
 from backend.modules.screener.strategies.registry import StrategyRegistry
-from backend.modules.screener.strategies.base import SignalResult
+from backend.modules.screener.strategies.declarative import DeclarativeStrategy
 from backend.modules.screener.models import Strategy, StrategyParameter, SignalHistory
 
 
@@ -35,7 +50,8 @@ class ScanEngine:
         self.strategy_name = strategy_name
         self.user_id = user_id
         self.strategy_class = StrategyRegistry.get_strategy(strategy_name)
-        
+        self.timing: Dict[str, Any] = {}
+    
     def run_scan(
         self, 
         save_to_db: bool = True, 
@@ -53,40 +69,189 @@ class ScanEngine:
         Returns:
             List of signal dictionaries
         """
+        return self.run_scan_batch(save_to_db, symbols, signal_types).to_dicts()
+    
+    def run_scan_batch(
+        self,
+        save_to_db: bool = True,
+        symbols: Optional[List[str]] = None,
+        signal_types: Optional[List[str]] = None
+    ) -> SignalBatch:
+        """
+        Run scan on market data, keeping signals columnar.
+        
+        Same as run_scan, without building one dict per signal. Stage
+        timings (parameters, load, panel, indicators, signals, save and
+        per-symbol spans) are kept in self.timing and exported as metrics.
+        
+        Returns:
+            SignalBatch
+        """
+        with recording() as recorder:
+            try:
+                all_signals = self._run(save_to_db, symbols, signal_types)
+            except Exception:
+                self.timing = recorder.summary()
+                record_scan(self.strategy_name, recorder, [], status='error')
+                raise
+        
+        self.timing = recorder.summary()
+        record_scan(self.strategy_name, recorder, all_signals.signal_type)
+        return all_signals
+    
+    def _run(self, save_to_db: bool, symbols: Optional[List[str]],
+             signal_types: Optional[List[str]]) -> SignalBatch:
         # Load parameters
-        params = self._load_parameters()
+        with span('parameters'):
+            params = self._load_parameters()
         
         # Create strategy instance
         strategy = self.strategy_class(params)
         
         # Load market data
-        df_all = self._load_market_data(symbols)
+        with span('load'):
+            df_all = self._load_market_data(symbols)
         
         if df_all.empty:
             print("❌ No market data found")
-            return []
+            return SignalBatch.empty()
+        
+        all_signals = self._scan(strategy, df_all)
+        
+        # Filter by signal types if specified
+        if signal_types:
+            all_signals = all_signals.filter(signal_types)
+            print(f"🔍 Filtered to {len(all_signals)} signals matching types: {signal_types}")
+        
+        # Save to database if requested
+        if save_to_db and len(all_signals):
+            with span('save'):
+                self._save_signals(all_signals)
+        
+        return all_signals
+    
+    def iter_scan(
+        self,
+        save_to_db: bool = False,
+        symbols: Optional[List[str]] = None,
+        signal_types: Optional[List[str]] = None,
+        shard_size: int = 100,
+        first_shard: int = 10
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Run scan shard by shard, yielding results as each shard completes.
+        
+        Indicators are computed per symbol column, so sharding the universe
+        gives the same signals as run_scan. Shards start small (first_shard
+        symbols) and double up to shard_size, so the first results arrive
+        after a short load instead of the whole-market one.
+        
+        Args:
+            save_to_db: Whether to save each shard's signals to database
+            symbols: Optional list of symbols to scan (None = scan all)
+            signal_types: Optional list of signal types to filter (None = all types)
+            shard_size: Maximum symbols per shard
+            first_shard: Symbols in the first shard
+        
+        Yields:
+            (event, payload) tuples: "start" once, "signals" (shards with signals)
+            and "progress" per shard, "done" at the end
+        
+        Per-shard load/signals/save spans are kept in self.timing and
+        exported as metrics once the stream ends. The recorder is only
+        active while a shard is processed, never across a yield.
+        """
+        started = time.perf_counter()
+        recorder = StageRecorder()
+        signal_types_found: List[str] = []
+        
+        def elapsed_ms() -> float:
+            return round((time.perf_counter() - started) * 1000, 1)
+        
+        try:
+            with recording(recorder):
+                with span('parameters'):
+                    strategy = self.strategy_class(self._load_parameters())
+                universe = list(dict.fromkeys(symbols)) if symbols else self._load_symbols()
+            shards = _shards(universe, first_shard, shard_size)
+            
+            yield 'start', {
+                'strategy': self.strategy_name,
+                'symbols_total': len(universe),
+                'shards': len(shards)
+            }
+            
+            scanned = 0
+            found = 0
+            for index, shard in enumerate(shards):
+                with recording(recorder):
+                    with span('load'):
+                        df_shard = self._load_market_data(shard)
+                    with span('signals'):
+                        signals = SignalBatch.empty()
+                        if not df_shard.empty:
+                            signals = self._scan(strategy, df_shard).filter(signal_types)
+                    
+                    if save_to_db and len(signals):
+                        with span('save'):
+                            self._save_signals(signals)
+                
+                scanned += len(shard)
+                found += len(signals)
+                signal_types_found.extend(signals.signal_type)
+                
+                if len(signals):
+                    yield 'signals', {'shard': index, 'signals': signals.to_dicts()}
+                yield 'progress', {
+                    'shard': index,
+                    'symbols_done': scanned,
+                    'symbols_total': len(universe),
+                    'signals_found': found,
+                    'elapsed_ms': elapsed_ms()
+                }
+        except Exception:
+            self.timing = recorder.summary()
+            record_scan(self.strategy_name, recorder, [], status='error')
+            raise
+        
+        self.timing = recorder.summary()
+        record_scan(self.strategy_name, recorder, signal_types_found)
+        yield 'done', {'signals_found': found, 'symbols_scanned': scanned, 'elapsed_ms': elapsed_ms()}
+    
+    @staticmethod
+    def _scan(strategy, df_all: pd.DataFrame, panel: Optional[SymbolPanel] = None,
+              ctx: Optional[IndicatorContext] = None) -> SignalBatch:
+        """
+        Run one strategy over loaded market data.
+        
+        Strategies with scan_batch/scan_panel evaluate the whole market at once
+        (sharing indicators through ctx, seeded from the indicator store);
+        others are called symbol by symbol.
+        """
+        if hasattr(strategy, 'scan_batch') or hasattr(strategy, 'scan_panel'):
+            if panel is None:
+                with span('panel'):
+                    panel = SymbolPanel.from_long(df_all)
+            if ctx is None:
+                ctx = indicator_context(panel, strategy.get_indicator_specs())
+            count('symbols', panel.n_symbols)
+            if hasattr(strategy, 'scan_batch'):
+                return strategy.scan_batch(panel, ctx)
+            return SignalBatch.from_signals(strategy.scan_panel(panel, ctx))
         
         # Run scan on each symbol
         all_signals = []
         for symbol, group_df in df_all.groupby('symbol'):
             try:
-                signals = strategy.calculate_signals(group_df)
+                with span('symbol', item=symbol):
+                    signals = strategy.calculate_signals(group_df)
                 all_signals.extend(signals)
             except Exception as e:
                 print(f"⚠️  Error scanning {symbol}: {e}")
+                count('symbol_errors')
                 continue
-        
-        # Filter by signal types if specified
-        if signal_types:
-            all_signals = [s for s in all_signals if s.signal_type in signal_types]
-            print(f"🔍 Filtered to {len(all_signals)} signals matching types: {signal_types}")
-        
-        # Save to database if requested
-        if save_to_db and all_signals:
-            self._save_signals(all_signals)
-        
-        # Convert to dict format
-        return [signal.model_dump() for signal in all_signals]
+            count('symbols')
+        return SignalBatch.from_signals(all_signals)
     
     def _load_parameters(self):
         """Load strategy parameters from database or use defaults."""
@@ -121,6 +286,18 @@ class ScanEngine:
             params = params_class(**param_dict)
             return params
     
+    def _load_symbols(self) -> List[str]:
+        """Symbols with data in the scan window (same universe as _load_market_data)."""
+        with engine.connect() as conn:
+            rows = conn.execute(text("""
+                SELECT DISTINCT symbol
+                FROM market_data
+                WHERE date > :cutoff
+                  AND EXISTS (SELECT 1 FROM tickers t WHERE t.symbol = market_data.symbol AND t.is_active)
+                ORDER BY symbol
+            """), {'cutoff': _window_start()}).fetchall()
+        return [row.symbol for row in rows]
+    
     def _load_market_data(self, symbols: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Load market data from database.
@@ -132,10 +309,14 @@ class ScanEngine:
             DataFrame with OHLCV data
         """
         # Build query
-        query = """
+        # Bars quarantined by the data quality checks are skipped, not whole symbols;
+        # delisted tickers (is_active = FALSE) keep their history but are not scanned
+        query = f"""
             SELECT symbol, date, open, high, low, close, volume
             FROM market_data
-            WHERE date > NOW() - INTERVAL '250 days'
+            WHERE date > :cutoff
+              AND {clean_bars_clause()}
+              AND EXISTS (SELECT 1 FROM tickers t WHERE t.symbol = market_data.symbol AND t.is_active)
         """
         
         if symbols:
@@ -145,16 +326,19 @@ class ScanEngine:
         query += " ORDER BY symbol, date ASC"
         
         # Execute query
-        df = pd.read_sql(query, engine)
-        return df
+        df = pd.read_sql(text(query), engine, params={'cutoff': _window_start()})
+        # Split/dividend-adjusted on read; raw history is never rewritten
+        return apply_adjustments(df)
     
-    def _save_signals(self, signals: List[SignalResult]) -> None:
+    def _save_signals(self, signals: SignalBatch) -> None:
         """
-        Save signals to database.
+        Save signals to database in one statement, skipping duplicates.
         
         Args:
-            signals: List of SignalResult objects
+            signals: SignalBatch (or list of SignalResult objects)
         """
+        signals = SignalBatch.from_signals(signals)
+        
         with get_db_session() as session:
             # Get strategy ID
             strategy_db = session.query(Strategy).filter(
@@ -165,37 +349,13 @@ class ScanEngine:
                 print(f"⚠️  Strategy '{self.strategy_name}' not found in database")
                 return
             
-            saved_count = 0
-            for signal in signals:
-                # Check if signal already exists
-                existing = session.query(SignalHistory).filter(
-                    SignalHistory.user_id == self.user_id,
-                    SignalHistory.strategy_id == strategy_db.id,
-                    SignalHistory.symbol == signal.symbol,
-                    SignalHistory.signal_date == signal.signal_date,
-                    SignalHistory.signal_type == signal.signal_type
-                ).first()
-                
-                if existing:
-                    continue  # Skip duplicates
-                
-                # Create new signal
-                signal_db = SignalHistory(
-                    user_id=self.user_id,
-                    strategy_id=strategy_db.id,
-                    symbol=signal.symbol,
-                    signal_type=signal.signal_type,
-                    signal_date=signal.signal_date,
-                    price_at_signal=signal.price,
-                    rsi=signal.rsi,
-                    adx=signal.adx,
-                    signal_metadata=signal.metadata
-                )
-                session.add(signal_db)
-                saved_count += 1
-            
+            saved_count = _insert_signal_rows(session, signals.to_db_rows(self.user_id, strategy_db.id))
             session.commit()
             print(f"✓ Saved {saved_count} new signals to database")
+        
+        if saved_count:
+            # Performance aggregates include the new signals now
+            get_cache().bump('performance')
     
     @staticmethod
     def ensure_strategy_in_db(strategy_name: str) -> None:
@@ -226,3 +386,379 @@ class ScanEngine:
             session.add(strategy_db)
             session.commit()
             print(f"✓ Registered strategy '{strategy_name}' in database")
+
+
+class MultiScanEngine:
+    """
+    Fused scan over several strategies.
+    
+    Market data is loaded once into a SymbolPanel, the union of every
+    strategy's indicator specs is computed once in a shared IndicatorContext,
+    and declarative strategies are compiled into one shared DSL Program, so
+    common expressions (crossovers, volume filters, ...) are evaluated once too.
+    """
+    
+    def __init__(self, strategy_names: List[str], user_id: int = 1):
+        """
+        Initialize multi-strategy scan.
+        
+        Args:
+            strategy_names: Names of registered strategies (duplicates ignored)
+            user_id: User ID for multi-user support
+            
+        Raises:
+            KeyError: If a strategy is not registered
+        """
+        self.user_id = user_id
+        self.engines = [ScanEngine(name, user_id) for name in dict.fromkeys(strategy_names)]
+        self.stats: Dict[str, Any] = {}
+        self.timing: Dict[str, Any] = {}
+    
+    @staticmethod
+    def build_indicator_plan(strategies: Dict[str, Any]) -> Dict[str, List[str]]:
+        """
+        Map every distinct indicator spec to the strategies that read it.
+        
+        Args:
+            strategies: Strategy name -> strategy instance
+            
+        Returns:
+            Spec key -> list of strategy names
+        """
+        plan: Dict[str, List[str]] = {}
+        for name, strategy in strategies.items():
+            for spec in dict.fromkeys(strategy.get_indicator_specs()):
+                plan.setdefault(spec.key, []).append(name)
+        return plan
+    
+    def run_scan(
+        self,
+        save_to_db: bool = True,
+        symbols: Optional[List[str]] = None,
+        signal_types: Optional[List[str]] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Run all strategies on one load of market data.
+        
+        Args:
+            save_to_db: Whether to save results to database
+            symbols: Optional list of symbols to scan (None = scan all)
+            signal_types: Optional list of signal types to filter (None = all types)
+            
+        Returns:
+            Strategy name -> list of signal dictionaries
+        """
+        with recording() as recorder:
+            try:
+                results = self._run(save_to_db, symbols, signal_types)
+            except Exception:
+                self.timing = recorder.summary()
+                record_scan('multi', recorder, [], status='error', publish=False)
+                raise
+        
+        self.timing = recorder.summary()
+        record_scan('multi', recorder, [s['signal_type'] for signals in results.values() for s in signals],
+                    publish=False)
+        return results
+    
+    def _run(self, save_to_db: bool, symbols: Optional[List[str]],
+             signal_types: Optional[List[str]]) -> Dict[str, List[Dict[str, Any]]]:
+        with span('parameters'):
+            strategies = {
+                scan_engine.strategy_name: scan_engine.strategy_class(scan_engine._load_parameters())
+                for scan_engine in self.engines
+            }
+        
+        with span('load'):
+            df_all = self.engines[0]._load_market_data(symbols)
+        
+        if df_all.empty:
+            print("❌ No market data found")
+            return {name: [] for name in strategies}
+        
+        with span('panel'):
+            panel = SymbolPanel.from_long(df_all)
+        
+        # Each distinct indicator once, fanned out to every consumer
+        plan = self.build_indicator_plan(strategies)
+        ctx = indicator_context(panel, list(plan))
+        with span('indicators'):
+            ctx.compute(plan.keys())
+        
+        # One DSL program for all declarative strategies
+        program = Program()
+        prefixes = {}
+        for name, strategy in strategies.items():
+            if isinstance(strategy, DeclarativeStrategy):
+                prefixes[name] = f'{name}/'
+                strategy.compile(strategy.params, program, prefixes[name])
+        with span('signals'):
+            values = program.evaluate(ctx.frames, ctx) if prefixes else {}
+        
+        results = {}
+        for scan_engine in self.engines:
+            strategy = strategies[scan_engine.strategy_name]
+            
+            with span(f'strategy:{scan_engine.strategy_name}'):
+                if scan_engine.strategy_name in prefixes:
+                    signals = strategy.collect_batch(panel, values, prefixes[scan_engine.strategy_name])
+                else:
+                    signals = scan_engine._scan(strategy, df_all, panel, ctx)
+            
+            signals = signals.filter(signal_types)
+            
+            if save_to_db and len(signals):
+                with span('save'):
+                    scan_engine._save_signals(signals)
+            
+            results[scan_engine.strategy_name] = signals.to_dicts()
+        
+        self.stats = {
+            'strategies': len(strategies),
+            'symbols': panel.n_symbols,
+            'indicators_requested': sum(len(users) for users in plan.values()),
+            'indicators_computed': len(plan),
+            'shared_indicators': sum(1 for users in plan.values() if len(users) > 1),
+            'dsl_nodes': len(program)
+        }
+        
+        return results
+
+
+class MultiUserScanEngine:
+    """
+    One strategy scanned for many users in a single batched pass.
+    
+    Users with identical parameters share one evaluation. Parameter sets
+    that need the same indicators share one indicator computation, and
+    strategies that support it (scan_panel_batch) evaluate all thresholds
+    as (parameter sets × symbols) arrays. Scan cost therefore grows with the
+    number of distinct parameter sets, not with the number of users.
+    """
+    
+    def __init__(self, strategy_name: str, user_ids: Optional[List[int]] = None):
+        """
+        Initialize multi-user scan.
+        
+        Args:
+            strategy_name: Name of registered strategy
+            user_ids: Users to scan (None = every user with saved parameters)
+            
+        Raises:
+            KeyError: If strategy not found
+        """
+        self.strategy_name = strategy_name
+        self.user_ids = user_ids
+        self.strategy_class = StrategyRegistry.get_strategy(strategy_name)
+        self.stats: Dict[str, Any] = {}
+        self.timing: Dict[str, Any] = {}
+    
+    def _load_user_parameters(self) -> Dict[int, Any]:
+        """Validated parameters per user, loaded with a single query."""
+        params_class = self.strategy_class.get_default_parameters().__class__
+        raw: Dict[int, Dict[str, Any]] = {user_id: {} for user_id in self.user_ids or []}
+        
+        with get_db_session() as session:
+            strategy_db = session.query(Strategy).filter(
+                Strategy.name == self.strategy_name
+            ).first()
+            
+            if strategy_db:
+                query = session.query(StrategyParameter).filter(
+                    StrategyParameter.strategy_id == strategy_db.id
+                )
+                if self.user_ids:
+                    query = query.filter(StrategyParameter.user_id.in_(self.user_ids))
+                
+                for param in query.all():
+                    raw.setdefault(param.user_id, {})[param.parameter_name] = param.parameter_value
+        
+        # Users without saved parameters scan with the defaults
+        return {user_id: params_class(**values) for user_id, values in raw.items()}
+    
+    def run_scan(
+        self,
+        save_to_db: bool = True,
+        symbols: Optional[List[str]] = None,
+        signal_types: Optional[List[str]] = None
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Run the strategy for every user on one load of market data.
+        
+        Args:
+            save_to_db: Whether to save results to database (per user)
+            symbols: Optional list of symbols to scan (None = scan all)
+            signal_types: Optional list of signal types to filter (None = all types)
+            
+        Returns:
+            User ID -> list of signal dictionaries
+        """
+        with recording() as recorder:
+            try:
+                results = self._run(save_to_db, symbols, signal_types)
+            except Exception:
+                self.timing = recorder.summary()
+                record_scan(self.strategy_name, recorder, [], status='error', publish=False)
+                raise
+        
+        self.timing = recorder.summary()
+        record_scan(self.strategy_name, recorder, [s['signal_type'] for signals in results.values() for s in signals],
+                    publish=False)
+        return results
+    
+    def _run(self, save_to_db: bool, symbols: Optional[List[str]],
+             signal_types: Optional[List[str]]) -> Dict[int, List[Dict[str, Any]]]:
+        with span('parameters'):
+            user_params = self._load_user_parameters()
+        if not user_params:
+            return {}
+        
+        # Users with identical parameters share one evaluation
+        param_sets: Dict[str, Any] = {}
+        users_by_set: Dict[str, List[int]] = {}
+        for user_id, params in user_params.items():
+            key = params.model_dump_json()
+            param_sets.setdefault(key, params)
+            users_by_set.setdefault(key, []).append(user_id)
+        
+        with span('load'):
+            df_all = ScanEngine(self.strategy_name)._load_market_data(symbols)
+        if df_all.empty:
+            print("❌ No market data found")
+            return {user_id: [] for user_id in user_params}
+        
+        with span('panel'):
+            panel = SymbolPanel.from_long(df_all)
+        keys = list(param_sets)
+        ctx = indicator_context(panel, [
+            spec for k in keys for spec in self.strategy_class(param_sets[k]).get_indicator_specs()
+        ])
+        count('symbols', panel.n_symbols)
+        
+        with span('signals'):
+            if hasattr(self.strategy_class, 'scan_panel_batch'):
+                batches = self.strategy_class.scan_panel_batch(panel, [param_sets[k] for k in keys], ctx)
+            elif issubclass(self.strategy_class, DeclarativeStrategy):
+                # One shared Program: nodes that do not depend on thresholds are evaluated once
+                program = Program()
+                strategies = [self.strategy_class(param_sets[k]) for k in keys]
+                for i, strategy in enumerate(strategies):
+                    strategy.compile(strategy.params, program, f'{i}/')
+                values = program.evaluate(ctx.frames, ctx)
+                batches = [s.collect_batch(panel, values, f'{i}/') for i, s in enumerate(strategies)]
+            else:
+                batches = [ScanEngine._scan(self.strategy_class(param_sets[k]), df_all, panel, ctx) for k in keys]
+        
+        results: Dict[int, List[Dict[str, Any]]] = {}
+        user_batches: Dict[int, SignalBatch] = {}
+        for key, signals in zip(keys, batches):
+            signals = signals.filter(signal_types)
+            dumped = signals.to_dicts()
+            for user_id in users_by_set[key]:
+                results[user_id] = dumped
+                user_batches[user_id] = signals
+        
+        saved = 0
+        if save_to_db:
+            with span('save'):
+                saved = self._save_user_signals(user_batches)
+        
+        self.stats = {
+            'users': len(user_params),
+            'parameter_sets': len(param_sets),
+            'indicators_computed': ctx.computed,
+            'signals_saved': saved
+        }
+        
+        return results
+    
+    def _save_user_signals(self, batches: Dict[int, SignalBatch]) -> int:
+        """
+        Save every user's signals in one statement, skipping duplicates.
+        
+        Args:
+            batches: User ID -> SignalBatch
+            
+        Returns:
+            Number of new rows
+        """
+        with get_db_session() as session:
+            strategy_db = session.query(Strategy).filter(
+                Strategy.name == self.strategy_name
+            ).first()
+            
+            if not strategy_db:
+                print(f"⚠️  Strategy '{self.strategy_name}' not found in database")
+                return 0
+            
+            rows = [
+                row
+                for user_id, signals in batches.items()
+                for row in signals.to_db_rows(user_id, strategy_db.id)
+            ]
+            if not rows:
+                return 0
+            
+            saved_count = _insert_signal_rows(session, rows)
+            session.commit()
+            print(f"✓ Saved {saved_count} new signals for {len(batches)} users")
+        
+        if saved_count:
+            get_cache().bump('performance')
+        return saved_count
+
+
+def indicator_context(panel: SymbolPanel, specs: List[Any]) -> IndicatorContext:
+    """
+    IndicatorContext over a scan panel, seeded from the indicator store.
+    
+    Only the specs (and symbols) the store does not cover are computed;
+    SCAN_USE_INDICATOR_STORE=false computes everything in process.
+    """
+    ctx = IndicatorContext(panel.frames())
+    if SCAN_USE_INDICATOR_STORE and specs:
+        with span('indicator_store'):
+            stats = preload_context(ctx, panel, specs)
+        count('indicators_stored', stats['stored'])
+        count('indicators_computed', stats['computed'])
+    return ctx
+
+
+def _window_start() -> datetime:
+    """Start of the scan window (250 calendar days back), bound as a parameter so any dialect works."""
+    return datetime.now() - timedelta(days=250)
+
+
+def _shards(symbols: List[str], first: int, size: int) -> List[List[str]]:
+    """Split symbols into shards of first, 2*first, 4*first, ... capped at size."""
+    shards = []
+    start = 0
+    step = max(1, min(first, size))
+    while start < len(symbols):
+        shards.append(symbols[start:start + step])
+        start += step
+        step = min(step * 2, max(size, 1))
+    return shards
+
+
+def _insert_signal_rows(session: Session, rows: List[Dict[str, Any]], chunk_size: int = 1000) -> int:
+    """
+    Insert signal_history rows, skipping duplicates.
+    
+    Args:
+        session: Open session (caller commits)
+        rows: Dicts from SignalBatch.to_db_rows
+        chunk_size: Rows per INSERT statement
+        
+    Returns:
+        Number of new rows
+    """
+    # idx_signals_unique covers (user, strategy, symbol, date, type)
+    insert = sqlite_insert if session.get_bind().dialect.name == 'sqlite' else pg_insert
+    saved_count = 0
+    for start in range(0, len(rows), chunk_size):
+        stmt = insert(SignalHistory).values(rows[start:start + chunk_size]).on_conflict_do_nothing(
+            index_elements=['user_id', 'strategy_id', 'symbol', 'signal_date', 'signal_type']
+        )
+        saved_count += session.execute(stmt).rowcount
+    return saved_count
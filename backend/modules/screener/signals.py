@@ -0,0 +1,306 @@
+"""
+Columnar signal batches.
+
+Scan engines emit signals as a SignalBatch (one array per SignalResult
+field) instead of one validated Pydantic model per signal. The batch is
+validated once with vectorized checks and serializes straight to API
+dicts, JSON, Arrow or signal_history rows. Iterating or indexing a batch
+yields SignalResult objects built without re-validation, so code written
+against List[SignalResult] keeps working.
+"""
+import json
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from backend.modules.screener.strategies.base import SignalResult
+
+
+class SignalBatch:
+    """
+    Struct-of-arrays signal container.
+    
+    Attributes:
+        symbol, signal_type, signal_date: object arrays of str
+        price: float64 array
+        rsi, adx: float64 arrays, NaN where the value is missing (None)
+        metadata: object array of dicts
+    """
+    
+    __slots__ = ('symbol', 'signal_type', 'signal_date', 'price', 'rsi', 'adx', 'metadata', 'validated')
+    
+    FIELDS = ('symbol', 'signal_type', 'signal_date', 'price', 'rsi', 'adx', 'metadata')
+    
+    def __init__(self, symbol: Sequence[str], signal_type: Sequence[str], signal_date: Sequence[str],
+                 price: Sequence[float], rsi: Optional[Sequence[Optional[float]]] = None,
+                 adx: Optional[Sequence[Optional[float]]] = None,
+                 metadata: Optional[Sequence[Dict[str, Any]]] = None):
+        n = len(symbol)
+        self.symbol = _objects(symbol)
+        self.signal_type = _objects(signal_type)
+        self.signal_date = _objects(signal_date)
+        self.price = np.asarray(price, dtype=float)
+        self.rsi = _floats(rsi, n)
+        self.adx = _floats(adx, n)
+        self.metadata = _objects(metadata if metadata is not None else [{} for _ in range(n)])
+        self.validated = False
+        
+        lengths = {len(getattr(self, name)) for name in self.FIELDS}
+        if lengths != {n}:
+            raise ValueError(f"SignalBatch columns have different lengths: {sorted(lengths)}")
+    
+    @classmethod
+    def empty(cls) -> 'SignalBatch':
+        batch = cls([], [], [], [])
+        batch.validated = True
+        return batch
+    
+    @classmethod
+    def from_signals(cls, signals: Iterable[SignalResult]) -> 'SignalBatch':
+        """
+        Columnar copy of already validated SignalResult objects.
+        
+        Args:
+            signals: SignalResults (or a SignalBatch, returned unchanged)
+        
+        Returns:
+            SignalBatch
+        """
+        if isinstance(signals, SignalBatch):
+            return signals
+        signals = list(signals)
+        batch = cls(
+            [s.symbol for s in signals],
+            [s.signal_type for s in signals],
+            [s.signal_date for s in signals],
+            [s.price for s in signals],
+            [s.rsi for s in signals],
+            [s.adx for s in signals],
+            [s.metadata for s in signals]
+        )
+        batch.validated = True
+        return batch
+    
+    @classmethod
+    def concat(cls, batches: Iterable['SignalBatch']) -> 'SignalBatch':
+        batches = [b for b in batches if len(b)]
+        if not batches:
+            return cls.empty()
+        if len(batches) == 1:
+            return batches[0]
+        
+        batch = cls(*(np.concatenate([getattr(b, name) for b in batches]) for name in cls.FIELDS))
+        batch.validated = all(b.validated for b in batches)
+        return batch
+    
+    # ------------------------------------------------------------------
+    # Validation
+    # ------------------------------------------------------------------
+    
+    def invalid_rows(self) -> np.ndarray:
+        """
+        Rows breaking SignalResult's field constraints, checked column-wise.
+        
+        Returns:
+            Boolean array (True = invalid)
+        """
+        invalid = ~(self.price > 0)
+        for values in (self.rsi, self.adx):
+            invalid |= (values < 0) | (values > 100)
+        
+        # String columns repeat a handful of values; check each distinct one once
+        for column in (self.symbol, self.signal_type, self.signal_date):
+            bad = {v for v in set(column.tolist()) if not isinstance(v, str) or not v}
+            if bad:
+                invalid |= np.isin(column, list(bad))
+        return invalid
+    
+    def validate(self, drop_invalid: bool = False) -> 'SignalBatch':
+        """
+        Validate the whole batch at once.
+        
+        Args:
+            drop_invalid: Drop offending rows (with a warning per symbol) instead of raising
+        
+        Returns:
+            The validated batch (self, or a filtered copy when rows were dropped)
+        
+        Raises:
+            ValueError: If a row is invalid and drop_invalid is False
+        """
+        if self.validated:
+            return self
+        
+        invalid = self.invalid_rows()
+        if not invalid.any():
+            self.validated = True
+            return self
+        
+        first = int(np.flatnonzero(invalid)[0])
+        if not drop_invalid:
+            raise ValueError(
+                f"{int(invalid.sum())} invalid signals, first at row {first}: "
+                f"{self.symbol[first]} {self.signal_type[first]} price={self.price[first]} "
+                f"rsi={self.rsi[first]} adx={self.adx[first]}"
+            )
+        
+        for symbol in dict.fromkeys(self.symbol[invalid].tolist()):
+            print(f"⚠️  Error scanning {symbol}: invalid signal values")
+        batch = self.select(~invalid)
+        batch.validated = True
+        return batch
+    
+    # ------------------------------------------------------------------
+    # Sequence interface (SignalResult views)
+    # ------------------------------------------------------------------
+    
+    def __len__(self) -> int:
+        return len(self.symbol)
+    
+    def __iter__(self) -> Iterator[SignalResult]:
+        for row in self._rows():
+            yield SignalResult.model_construct(**row)
+    
+    def __getitem__(self, index: Union[int, slice, np.ndarray]) -> Union[SignalResult, 'SignalBatch']:
+        if isinstance(index, (int, np.integer)):
+            return SignalResult.model_construct(**self.select(np.array([index]))._rows()[0])
+        return self.select(index)
+    
+    def __repr__(self) -> str:
+        return f"SignalBatch({len(self)} signals)"
+    
+    def select(self, index: Union[slice, np.ndarray]) -> 'SignalBatch':
+        """Rows by slice, integer positions or boolean mask."""
+        batch = SignalBatch.__new__(SignalBatch)
+        for name in self.FIELDS:
+            setattr(batch, name, getattr(self, name)[index])
+        batch.validated = self.validated
+        return batch
+    
+    def filter(self, signal_types: Optional[List[str]] = None) -> 'SignalBatch':
+        """Keep only the given signal types (None = all)."""
+        if not signal_types:
+            return self
+        return self.select(np.isin(self.signal_type, list(signal_types)))
+    
+    # ------------------------------------------------------------------
+    # Serialization
+    # ------------------------------------------------------------------
+    
+    def _optional(self, values: np.ndarray) -> List[Optional[float]]:
+        result = values.astype(object)
+        result[np.isnan(values)] = None
+        return result.tolist()
+    
+    def to_columns(self) -> Dict[str, list]:
+        """Column name -> list of JSON-ready values."""
+        return {
+            'symbol': self.symbol.tolist(),
+            'signal_type': self.signal_type.tolist(),
+            'signal_date': self.signal_date.tolist(),
+            'price': self.price.tolist(),
+            'rsi': self._optional(self.rsi),
+            'adx': self._optional(self.adx),
+            'metadata': [dict(m) for m in self.metadata]
+        }
+    
+    def _rows(self) -> List[Dict[str, Any]]:
+        columns = self.to_columns()
+        return [dict(zip(self.FIELDS, values)) for values in zip(*(columns[name] for name in self.FIELDS))]
+    
+    def to_dicts(self, **extra: Any) -> List[Dict[str, Any]]:
+        """
+        Signal dictionaries, identical to SignalResult.model_dump().
+        
+        Args:
+            **extra: Constant keys added to every row (e.g. strategy=name)
+        
+        Returns:
+            List of dicts
+        """
+        rows = self._rows()
+        if extra:
+            for row in rows:
+                row.update(extra)
+        return rows
+    
+    def to_json(self, orient: str = 'records') -> str:
+        """
+        JSON text of the batch.
+        
+        Args:
+            orient: 'records' (list of signal objects) or 'columns' (one array per field)
+        
+        Returns:
+            JSON string
+        """
+        if orient == 'records':
+            return json.dumps(self._rows())
+        if orient == 'columns':
+            return json.dumps(self.to_columns())
+        raise ValueError(f"Unknown orient '{orient}' (use 'records' or 'columns')")
+    
+    def to_arrow(self):
+        """
+        Arrow table of the batch (metadata as JSON text).
+        
+        Returns:
+            pyarrow.Table
+        """
+        import pyarrow as pa  # Optional dependency, only needed for Arrow export
+        
+        return pa.table({
+            'symbol': pa.array(self.symbol.tolist(), pa.string()),
+            'signal_type': pa.array(self.signal_type.tolist(), pa.string()),
+            'signal_date': pa.array(self.signal_date.tolist(), pa.string()),
+            'price': pa.array(self.price, pa.float64()),
+            'rsi': pa.array(self.rsi, pa.float64(), mask=np.isnan(self.rsi)),
+            'adx': pa.array(self.adx, pa.float64(), mask=np.isnan(self.adx)),
+            'metadata': pa.array([json.dumps(m) for m in self.metadata], pa.string())
+        })
+    
+    def to_db_rows(self, user_id: int, strategy_id: int) -> List[Dict[str, Any]]:
+        """
+        signal_history rows for one user and strategy.
+        
+        Args:
+            user_id: User ID
+            strategy_id: Strategy ID
+        
+        Returns:
+            List of dicts keyed by SignalHistory column names
+        """
+        columns = self.to_columns()
+        return [
+            {
+                'user_id': user_id,
+                'strategy_id': strategy_id,
+                'symbol': symbol,
+                'signal_type': signal_type,
+                'signal_date': date.fromisoformat(str(signal_date)[:10]),  # Date objects bind on every dialect
+                'price_at_signal': price,
+                'rsi': rsi,
+                'adx': adx,
+                'signal_metadata': metadata
+            }
+            for symbol, signal_type, signal_date, price, rsi, adx, metadata in zip(
+                *(columns[name] for name in self.FIELDS)
+            )
+        ]
+
+
+def _objects(values: Sequence[Any]) -> np.ndarray:
+    if isinstance(values, np.ndarray) and values.dtype == object:
+        return values
+    result = np.empty(len(values), dtype=object)
+    result[:] = list(values)
+    return result
+
+
+def _floats(values: Optional[Sequence[Optional[float]]], n: int) -> np.ndarray:
+    if values is None:
+        return np.full(n, np.nan)
+    if isinstance(values, np.ndarray):
+        return values.astype(float, copy=False)
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
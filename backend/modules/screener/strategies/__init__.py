@@ -1,8 +1,23 @@
 # Strategies package initialization
-from backend.modules.screener.strategies.base import BaseStrategy, StrategyParameters, SignalResult
+#
+# Kept import-light: strategy modules (and pandas/numpy) load on first use
+# through StrategyRegistry, and the base classes below resolve lazily.
+from importlib import import_module
+
 from backend.modules.screener.strategies.registry import StrategyRegistry
 
-# Import all strategies to trigger @register decorators
-from backend.modules.screener.strategies import xtumy_v27
+_LAZY_ATTRIBUTES = {
+    'BaseStrategy': 'backend.modules.screener.strategies.base',
+    'StrategyParameters': 'backend.modules.screener.strategies.base',
+    'SignalResult': 'backend.modules.screener.strategies.base',
+    'DeclarativeStrategy': 'backend.modules.screener.strategies.declarative',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(import_module(_LAZY_ATTRIBUTES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-__all__ = ['BaseStrategy', 'StrategyParameters', 'SignalResult', 'StrategyRegistry']
+__all__ = ['BaseStrategy', 'StrategyParameters', 'SignalResult', 'StrategyRegistry', 'DeclarativeStrategy']
@@ -83,6 +83,18 @@ class BaseStrategy(ABC):
         """
         pass
     
+    def get_indicator_specs(self) -> List[Any]:
+        """
+        Indicator specs this strategy reads (can be overridden).
+        
+        Multi-strategy scans compute the union of all strategies' specs once
+        and share the results.
+        
+        Returns:
+            List of IndicatorSpec objects (empty if not declared).
+        """
+        return []
+    
     @classmethod
     @abstractmethod
     def get_default_parameters(cls) -> StrategyParameters:
@@ -0,0 +1,176 @@
+"""
+Declarative strategies built on the expression DSL.
+
+A strategy is declared with class attributes instead of hand-written
+curr/prev comparisons:
+
+    @StrategyRegistry.register
+    class MyStrategy(DeclarativeStrategy):
+        parameters_class = MyParameters
+        variables = {'trend': 'ema(close, emaLen)'}
+        signals = {'TREND AL': 'crossover(close, trend) and rsi(close) > rsiMin'}
+
+All signals (plus the reported RSI/ADX) compile into one Program, so a
+whole-market scan is a single vectorized evaluation over the SymbolPanel.
+"""
+from typing import Any, Dict, List, Optional, Type
+
+import numpy as np
+import pandas as pd
+
+from backend.core.timing import span
+from backend.modules.market_data.panel import SymbolPanel
+from backend.modules.screener.dsl import Program, compile_expressions
+from backend.modules.screener.indicators import IndicatorContext, IndicatorSpec
+from backend.modules.screener.signals import SignalBatch
+from backend.modules.screener.strategies.base import BaseStrategy, StrategyParameters, SignalResult
+
+
+class DeclarativeStrategy(BaseStrategy):
+    """
+    Base class for strategies defined by DSL expressions.
+    
+    Class attributes:
+        parameters_class: StrategyParameters subclass (fields usable by name in expressions)
+        variables: Named helper expressions
+        signals: Signal type -> boolean expression (insertion order = output order)
+        metadata: Signal type -> static metadata dict stored with the signal
+        outputs: Reported values; 'rsi' and 'adx' fill SignalResult fields
+        display_name: UI name (defaults to class name)
+        min_bars: Symbols with fewer bars are not scanned
+    """
+    
+    parameters_class: Type[StrategyParameters] = StrategyParameters
+    variables: Dict[str, str] = {}
+    signals: Dict[str, str] = {}
+    metadata: Dict[str, Dict[str, Any]] = {}
+    outputs: Dict[str, str] = {'rsi': 'rsi(close, 14)', 'adx': 'adx(14)'}
+    display_name: Optional[str] = None
+    min_bars: int = 60
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.signals:
+            # Fail at import time on a broken definition, not at the first scan
+            cls.compile(cls.parameters_class())
+    
+    def __init__(self, params: StrategyParameters):
+        super().__init__(params)
+        self.program = self.compile(self.params)
+    
+    @classmethod
+    def compile(cls, params: StrategyParameters, program: Optional[Program] = None, prefix: str = '') -> Program:
+        """
+        Compile signals and outputs for a parameter set.
+        
+        Args:
+            params: Strategy parameters
+            program: Optional Program shared with other strategies (fused scans)
+            prefix: Output name prefix, keeping strategies apart in a shared Program
+        
+        Returns:
+            The Program holding this strategy's outputs
+        """
+        expressions = {f'{prefix}signal:{name}': expr for name, expr in cls.signals.items()}
+        expressions.update({f'{prefix}output:{name}': expr for name, expr in cls.outputs.items()})
+        return compile_expressions(expressions, cls.variables, params.model_dump(), program)
+    
+    def get_indicator_specs(self) -> List[IndicatorSpec]:
+        """Indicator specs referenced by the compiled expressions."""
+        return self.program.indicator_specs()
+    
+    def evaluate(self, panel: SymbolPanel, ctx: Optional[IndicatorContext] = None) -> Dict[str, np.ndarray]:
+        """
+        Evaluate every signal and output on every bar of the panel.
+        
+        Args:
+            panel: Market panel
+            ctx: Optional IndicatorContext over panel.frames() to share indicators
+        
+        Returns:
+            Output name ('signal:<type>' / 'output:<name>') -> ndarray (bars × symbols)
+        """
+        return self.program.evaluate(ctx.frames if ctx else panel.frames(), ctx)
+    
+    def scan_batch(self, panel: SymbolPanel, ctx: Optional[IndicatorContext] = None) -> SignalBatch:
+        """
+        Signals on each symbol's latest bar, for the whole panel at once.
+        
+        Args:
+            panel: Market panel (right-aligned, last row = latest bar)
+            ctx: Optional IndicatorContext over panel.frames() to share indicators
+        
+        Returns:
+            SignalBatch
+        """
+        if panel.n_symbols == 0 or panel.n_bars == 0:
+            return SignalBatch.empty()
+        with span('evaluate'):
+            values = self.evaluate(panel, ctx)
+        with span('signals'):
+            return self.collect_batch(panel, values)
+    
+    def scan_panel(self, panel: SymbolPanel, ctx: Optional[IndicatorContext] = None) -> List[SignalResult]:
+        """Same as scan_batch, as a list of SignalResult objects."""
+        return list(self.scan_batch(panel, ctx))
+    
+    def collect_batch(self, panel: SymbolPanel, values: Dict[str, np.ndarray], prefix: str = '') -> SignalBatch:
+        """
+        Turn evaluated outputs into a SignalBatch for each symbol's latest bar.
+        
+        Args:
+            panel: Panel the values were evaluated on
+            values: Program outputs (see evaluate)
+            prefix: Output name prefix used when compiling into a shared Program
+        
+        Returns:
+            SignalBatch ordered by symbol, then signal type
+        """
+        if panel.n_symbols == 0 or panel.n_bars == 0 or not self.signals:
+            return SignalBatch.empty()
+        
+        close = panel.fields['close'][-1]
+        eligible = (panel.valid.sum(axis=0) >= self.min_bars) & (close > 0)
+        types = list(self.signals)
+        
+        # (symbols × signal types); row-major nonzero keeps symbol-then-type order
+        fired = np.stack([values[f'{prefix}signal:{t}'][-1].astype(bool) for t in types], axis=1)
+        cols, kinds = np.nonzero(fired & eligible[:, None])
+        
+        missing = np.full(panel.dates.shape, np.nan)
+        rsi = values.get(f'{prefix}output:rsi', missing)[-1, cols]
+        adx = values.get(f'{prefix}output:adx', missing)[-1, cols]
+        
+        return SignalBatch(
+            symbol=[panel.symbols[col] for col in cols],
+            signal_type=[types[kind] for kind in kinds],
+            signal_date=pd.DatetimeIndex(panel.dates[-1, cols]).strftime('%Y-%m-%d'),
+            price=close[cols],
+            rsi=[_round(v) for v in rsi],
+            adx=[_round(v) for v in adx],
+            metadata=[self.metadata.get(types[kind], {}) for kind in kinds]
+        ).validate()
+    
+    def collect_signals(self, panel: SymbolPanel, values: Dict[str, np.ndarray], prefix: str = '') -> List[SignalResult]:
+        """Same as collect_batch, as a list of SignalResult objects."""
+        return list(self.collect_batch(panel, values, prefix))
+    
+    def calculate_signals(self, df: pd.DataFrame) -> List[SignalResult]:
+        """Calculate signals for one symbol (same kernels as the panel scan)."""
+        self.validate_dataframe(df, min_rows=self.min_bars)
+        return self.scan_panel(SymbolPanel.from_long(df))
+    
+    @classmethod
+    def get_default_parameters(cls) -> StrategyParameters:
+        return cls.parameters_class()
+    
+    @classmethod
+    def get_display_name(cls) -> str:
+        return cls.display_name or cls.get_name()
+
+
+def _round(value: float) -> Optional[float]:
+    if np.isnan(value):
+        return None
+    # SignalResult bounds RSI/ADX to 0-100
+    return round(float(min(max(value, 0.0), 100.0)), 2)
@@ -0,0 +1,64 @@
+"""
+EMA Cross Strategy - declarative (DSL) strategy.
+
+Trend-following signals on a fast/slow EMA pair with RSI, ADX and volume
+confirmation. Written with the expression DSL, see strategies/declarative.py.
+"""
+from pydantic import Field
+
+from backend.modules.screener.strategies.base import StrategyParameters
+from backend.modules.screener.strategies.declarative import DeclarativeStrategy
+from backend.modules.screener.strategies.registry import StrategyRegistry
+
+
+class EMACrossParameters(StrategyParameters):
+    """Parameters for EMA Cross strategy."""
+    fastLen: int = Field(20, ge=5, le=100, description="Hızlı EMA periyodu")
+    slowLen: int = Field(50, ge=10, le=250, description="Yavaş EMA periyodu")
+    rsiPeriod: int = Field(14, ge=7, le=21, description="RSI periyodu")
+    rsiMin: int = Field(50, ge=30, le=70, description="Minimum RSI değeri")
+    adxThresh: int = Field(20, ge=15, le=30, description="ADX eşik değeri")
+    volMult: float = Field(1.5, ge=0.5, le=3.0, description="Hacim çarpanı")
+    breakoutLen: int = Field(20, ge=5, le=144, description="Kırılım penceresi (bar)")
+    pbWaitBars: int = Field(3, ge=1, le=10, description="Trend oturma süresi (bar)")
+
+
+@StrategyRegistry.register
+class EMACrossStrategy(DeclarativeStrategy):
+    """
+    EMA Cross Strategy
+    
+    Identifies 4 types of signals:
+    1. EMA KESİŞİM AL - Fast EMA crosses above slow EMA with RSI confirmation
+    2. TREND DEVAM - Price reclaims the fast EMA in an established, strong trend
+    3. HACİMLİ KIRILIM - Close above the prior N-bar high on high volume
+    4. EMA KESİŞİM SAT - Fast EMA crosses below slow EMA (warning)
+    """
+    
+    parameters_class = EMACrossParameters
+    display_name = "EMA Kesişim"
+    
+    variables = {
+        'fast': 'ema(close, fastLen)',
+        'slow': 'ema(close, slowLen)',
+        'golden': 'crossover(fast, slow)',
+        'strongVolume': 'volume > sma(volume, 20) * volMult',
+        'greenCandle': 'close > open',
+    }
+    
+    signals = {
+        'EMA KESİŞİM AL': 'golden and rsi(close, rsiPeriod) > rsiMin and greenCandle',
+        'TREND DEVAM': ('fast > slow and barssince(golden) >= pbWaitBars '
+                        'and crossover(close, fast) and adx(14) > adxThresh and diplus(14) > diminus(14)'),
+        'HACİMLİ KIRILIM': 'close > ref(highest(high, breakoutLen), 1) and strongVolume and greenCandle',
+        'EMA KESİŞİM SAT': 'crossunder(fast, slow)',
+    }
+    
+    metadata = {
+        'EMA KESİŞİM AL': {'trend': 'Hızlı EMA Yavaş EMA Üzerinde'},
+        'TREND DEVAM': {'trend': 'Trend İçinde EMA Geri Alımı'},
+        'HACİMLİ KIRILIM': {'trend': 'Hacimli Zirve Kırılımı'},
+        'EMA KESİŞİM SAT': {'warning': 'Ölüm Kesişimi'},
+    }
+    
+    outputs = {'rsi': 'rsi(close, rsiPeriod)', 'adx': 'adx(14)'}
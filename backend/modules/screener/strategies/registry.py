@@ -1,21 +1,45 @@
 """
 Strategy registry for dynamic strategy discovery and loading.
+
+Strategies are known by name before their modules are imported: built-in
+strategies are listed in BUILTIN_STRATEGIES and third-party packages can
+advertise more through the `bist_analyst.strategies` entry point group, e.g.
+
+    [project.entry-points."bist_analyst.strategies"]
+    MyStrategy = "my_package.strategies:MyStrategy"
+
+A strategy module (and the pandas/numpy stack it needs) is imported only the
+first time the strategy is requested.
 """
-from typing import Dict, Type, Optional
-from backend.modules.screener.strategies.base import BaseStrategy
+from importlib import import_module
+from typing import TYPE_CHECKING, Dict, List, Optional, Type
+
+if TYPE_CHECKING:
+    from backend.modules.screener.strategies.base import BaseStrategy
+
+ENTRY_POINT_GROUP = 'bist_analyst.strategies'
+
+# Strategy name -> "module:attribute"
+BUILTIN_STRATEGIES = {
+    'XTUMYV27Strategy': 'backend.modules.screener.strategies.xtumy_v27:XTUMYV27Strategy',
+    'EMACrossStrategy': 'backend.modules.screener.strategies.ema_cross:EMACrossStrategy',
+}
 
 
 class StrategyRegistry:
     """
     Registry for managing trading strategies.
     
-    Strategies can be registered using the @register decorator or manually.
+    Strategies can be registered using the @register decorator or manually,
+    or declared lazily (register_lazy / entry points) and imported on first use.
     """
     
-    _strategies: Dict[str, Type[BaseStrategy]] = {}
+    _strategies: Dict[str, Type['BaseStrategy']] = {}
+    _lazy: Dict[str, str] = dict(BUILTIN_STRATEGIES)
+    _discovered: bool = False
     
     @classmethod
-    def register(cls, strategy_class: Type[BaseStrategy], name: Optional[str] = None) -> Type[BaseStrategy]:
+    def register(cls, strategy_class: Type['BaseStrategy'], name: Optional[str] = None) -> Type['BaseStrategy']:
         """
         Register a strategy class.
         
@@ -30,10 +54,12 @@ class StrategyRegistry:
         Args:
             strategy_class: Strategy class to register
             name: Optional custom name (defaults to strategy_class.get_name())
-            
+        
         Returns:
             The strategy class (for decorator usage)
         """
+        from backend.modules.screener.strategies.base import BaseStrategy
+        
         strategy_name = name or strategy_class.get_name()
         
         if strategy_name in cls._strategies:
@@ -43,32 +69,90 @@ class StrategyRegistry:
             raise TypeError(f"{strategy_class.__name__} must inherit from BaseStrategy")
         
         cls._strategies[strategy_name] = strategy_class
+        cls._lazy.pop(strategy_name, None)
         return strategy_class
     
     @classmethod
-    def get_strategy(cls, name: str) -> Type[BaseStrategy]:
+    def register_lazy(cls, name: str, target: str) -> None:
         """
-        Get a registered strategy by name.
+        Declare a strategy without importing it.
         
         Args:
             name: Strategy name
-            
+            target: "module:attribute" of the strategy class
+        """
+        if name in cls._strategies or name in cls._lazy:
+            raise ValueError(f"Strategy '{name}' is already registered")
+        cls._lazy[name] = target
+    
+    @classmethod
+    def _discover(cls) -> None:
+        """Collect strategies advertised through entry points (once)."""
+        if cls._discovered:
+            return
+        cls._discovered = True
+        
+        from importlib.metadata import entry_points
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            if entry_point.name not in cls._strategies:
+                cls._lazy.setdefault(entry_point.name, entry_point.value)
+    
+    @classmethod
+    def _load(cls, name: str) -> Type['BaseStrategy']:
+        """Import a lazily declared strategy and register it."""
+        module_name, _, attribute = cls._lazy[name].partition(':')
+        module = import_module(module_name)
+        
+        # Importing usually registers the class through its decorator
+        if name not in cls._strategies:
+            strategy_class = module
+            for part in attribute.split('.'):
+                strategy_class = getattr(strategy_class, part)
+            cls.register(strategy_class, name)
+        
+        return cls._strategies[name]
+    
+    @classmethod
+    def get_strategy(cls, name: str) -> Type['BaseStrategy']:
+        """
+        Get a registered strategy by name, importing it on first use.
+        
+        Args:
+            name: Strategy name
+        
         Returns:
             Strategy class
-            
+        
         Raises:
             KeyError: If strategy not found
         """
-        if name not in cls._strategies:
-            raise KeyError(f"Strategy '{name}' not found. Available strategies: {list(cls._strategies.keys())}")
+        if name in cls._strategies:
+            return cls._strategies[name]
         
-        return cls._strategies[name]
+        cls._discover()
+        if name not in cls._lazy:
+            raise KeyError(f"Strategy '{name}' not found. Available strategies: {cls.names()}")
+        
+        return cls._load(name)
+    
+    @classmethod
+    def names(cls) -> List[str]:
+        """
+        Names of all known strategies, without importing them.
+        
+        Returns:
+            List of strategy names
+        """
+        cls._discover()
+        return list(cls._strategies) + [name for name in cls._lazy if name not in cls._strategies]
     
     @classmethod
     def list_strategies(cls) -> Dict[str, Dict[str, str]]:
         """
         List all registered strategies with metadata.
         
+        Imports every lazily declared strategy (metadata lives on the class).
+        
         Returns:
             Dictionary mapping strategy names to metadata:
             {
@@ -79,27 +163,28 @@ class StrategyRegistry:
                 }
             }
         """
+        strategies = {name: cls.get_strategy(name) for name in cls.names()}
         return {
             name: {
                 "display_name": strategy.get_display_name(),
                 "description": strategy.get_description(),
                 "python_class": f"{strategy.__module__}.{strategy.__name__}"
             }
-            for name, strategy in cls._strategies.items()
+            for name, strategy in strategies.items()
         }
     
     @classmethod
     def is_registered(cls, name: str) -> bool:
         """
-        Check if a strategy is registered.
+        Check if a strategy is registered (imported or declared).
         
         Args:
             name: Strategy name
-            
+        
         Returns:
             True if registered, False otherwise
         """
-        return name in cls._strategies
+        return name in cls.names()
     
     @classmethod
     def clear(cls) -> None:
@@ -107,3 +192,5 @@ class StrategyRegistry:
         Clear all registered strategies (mainly for testing).
         """
         cls._strategies.clear()
+        cls._lazy.clear()
+        cls._discovered = True
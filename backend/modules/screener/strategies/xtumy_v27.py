@@ -6,9 +6,13 @@ RSI momentum, volume analysis, and Fibonacci levels.
 """
 import pandas as pd
 import numpy as np
-from typing import List
+from typing import Dict, List, Optional
 from pydantic import Field
 
+from backend.core.timing import span
+from backend.modules.market_data.panel import SymbolPanel
+from backend.modules.screener import indicators
+from backend.modules.screener.signals import SignalBatch
 from backend.modules.screener.strategies.base import BaseStrategy, StrategyParameters, SignalResult
 from backend.modules.screener.strategies.registry import StrategyRegistry
 
@@ -52,6 +56,13 @@ class XTUMYV27Parameters(StrategyParameters):
     }
 
 
+# Signal types in the order they are checked (signal_history kinds index this)
+SIGNAL_TYPES = (
+    'KURUMSAL DİP', 'TREND BAŞLANGIÇ', 'PULLBACK AL', 'DİP AL',
+    'ALTIN KIRILIM', 'ZİRVE KIRILIMI', 'DİRENÇ REDDİ'
+)
+
+
 @StrategyRegistry.register
 class XTUMYV27Strategy(BaseStrategy):
     """
@@ -76,8 +87,344 @@ class XTUMYV27Strategy(BaseStrategy):
         df = df.copy()
         
         # Calculate indicators
-        df = self._calculate_indicators(df)
+        with span('indicators'):
+            df = self._calculate_indicators(df)
+        
+        with span('signals'):
+            return self._detect_signals(df)
+    
+    def scan_panel(self, panel: SymbolPanel, ctx: Optional[indicators.IndicatorContext] = None) -> List[SignalResult]:
+        """Same as scan_batch, as a list of SignalResult objects."""
+        return list(self.scan_batch(panel, ctx))
+    
+    def scan_batch(self, panel: SymbolPanel, ctx: Optional[indicators.IndicatorContext] = None) -> SignalBatch:
+        """
+        Calculate signals for every symbol of a panel.
+        
+        Indicators are computed once over the whole panel (shared through
+        ctx with other strategies) and the last-bar checks are vectorized
+        across symbols; results equal calculate_signals per symbol.
+        
+        Args:
+            panel: Market panel
+            ctx: Optional IndicatorContext over panel.frames()
         
+        Returns:
+            SignalBatch
+        """
+        return self.scan_panel_batch(panel, [self.params], ctx)[0]
+    
+    @classmethod
+    def scan_panel_batch(cls, panel: SymbolPanel, params_list: List[XTUMYV27Parameters],
+                         ctx: Optional[indicators.IndicatorContext] = None) -> List[SignalBatch]:
+        """
+        Calculate signals for many parameter sets in one pass.
+        
+        Parameter sets are grouped by the indicators they need (EMA/RSI/ADX
+        periods, fibLen), so indicators are computed once per distinct group;
+        thresholds (pbWaitBars, pullPct, volMult, rsiMin, cooldown, adxThresh)
+        are evaluated as (parameter sets × symbols) arrays.
+        
+        Args:
+            panel: Market panel
+            params_list: Parameter sets to evaluate
+            ctx: Optional IndicatorContext over panel.frames()
+        
+        Returns:
+            One SignalBatch per entry of params_list
+        """
+        results: List[SignalBatch] = [SignalBatch.empty() for _ in params_list]
+        if panel.n_symbols == 0 or panel.n_bars < 3 or not params_list:
+            return results
+        
+        ctx = ctx or indicators.IndicatorContext(panel.frames())
+        f = {name: frame.to_numpy(dtype=float) for name, frame in ctx.frames.items()}
+        valid = panel.valid
+        
+        # Same rules as validate_dataframe: 60+ bars and no NaN in critical columns
+        eligible = valid.sum(axis=0) >= 60
+        for field in ('close', 'high', 'low', 'volume'):
+            eligible &= ~(np.isnan(f[field]) & valid).any(axis=0)
+        
+        groups: Dict[tuple, List[int]] = {}
+        for i, params in enumerate(params_list):
+            specs = tuple(spec.key for spec in indicators.xtumy_specs(params).values())
+            groups.setdefault(specs, []).append(i)
+        
+        for members in groups.values():
+            batch = [params_list[i] for i in members]
+            with span('indicators'):
+                ind = {
+                    name: ctx.get(spec).to_numpy(dtype=float)
+                    for name, spec in indicators.xtumy_specs(batch[0]).items()
+                }
+            
+            with span('signals'):
+                fired = cls._batch_conditions(f, ind, batch)
+                
+                ready = eligible & ~np.isnan(np.stack([
+                    ind['EMA50'][-1], ind['EMA20'][-1], ind['rsi'][-1], ind['rsiMA'][-1]
+                ])).any(axis=0)
+                
+                for row, i in enumerate(members):
+                    results[i] = cls._build_batch(panel, f, ind, {k: v[row] & ready for k, v in fired.items()})
+        
+        return results
+    
+    @staticmethod
+    def _batch_conditions(f: Dict[str, np.ndarray], ind: Dict[str, np.ndarray],
+                          batch: List[XTUMYV27Parameters]) -> Dict[str, np.ndarray]:
+        """Last-bar signal conditions as (parameter sets × symbols) boolean arrays."""
+        def thresholds(name):
+            return np.array([getattr(p, name) for p in batch], dtype=float)[:, None]
+        
+        pbWaitBars, pullPct, volMult = thresholds('pbWaitBars'), thresholds('pullPct'), thresholds('volMult')
+        rsiMin, adxThresh = thresholds('rsiMin'), thresholds('adxThresh')
+        cooldown = np.array([p.cooldown for p in batch])
+        
+        close, open_, high, low, volume = f['close'], f['open'], f['high'], f['low'], f['volume']
+        ema50, ema20, rsi, avgVol = ind['EMA50'], ind['EMA20'], ind['rsi'], ind['avgVol']
+        green = close > open_
+        dirUp = ind['diplus'] > ind['diminus']
+        c, p, p2 = -1, -2, -3
+        
+        with np.errstate(invalid='ignore'):
+            # KURUMSAL DİP
+            kurumsal = ((ema20[c] < ema50[c]) &
+                        (close[p] <= ema20[p]) & (close[c] > ema20[c]) &
+                        (rsi[c] > ind['rsiMA'][c]) & (rsi[c] > rsi[p]) &
+                        (volume[c] > avgVol[c] * 0.3) & (volume[c] < avgVol[c] * 1.5) &
+                        green[c])
+            
+            # TREND BAŞLANGIÇ
+            trend = ((close[p2] <= ema50[p2]) & (close[p] > ema50[p]) &
+                     (volume[p] > avgVol[p]) & green[p] &
+                     (close[c] >= ema50[c]) & green[c] & dirUp[c])
+            
+            # PULLBACK AL
+            barsSinceUp = _bars_since_last(_crossover(close, ema50))
+            barsSinceDown = _bars_since_last(_crossover(ema50, close))
+            isInUptrend = ~np.isnan(barsSinceUp) & (np.isnan(barsSinceDown) | (barsSinceUp < barsSinceDown))
+            isTrendMature = isInUptrend & (barsSinceUp >= pbWaitBars)
+            
+            touch = 1 + pullPct / 100
+            isValidContact = ((low[c] <= ema50[c] * touch) |
+                              ((low[p] <= ema50[p] * touch) & (close[p] < close[p2])))
+            emaSlope = (ema50[c] - ema50[p]) / ema50[p] * 100
+            pullback = (isTrendMature & isValidContact &
+                        (close[c] > ema50[c]) & green[c] & (emaSlope > 0) &
+                        (ind['adx'][c] > adxThresh) & (rsi[c] > rsiMin) &
+                        (volume[c] > avgVol[c] * volMult) &
+                        (close[c] > low[p]) & dirUp[c] & ~trend)
+            
+            # DİP AL
+            dip = ((low[c] <= ind['wall_low'][c] * 1.02) & green[c] &
+                   (rsi[c] > rsi[p]) & dirUp[c] & ~pullback)
+            
+            # ALTIN KIRILIM / ZİRVE KIRILIMI with cooldown over past valid breaks
+            wall_gold = ind['wall_low'] + (ind['wall_top'] - ind['wall_low']) * 0.618
+            max_cooldown = min(int(cooldown.max()), close.shape[0] - 2)
+            in_window = np.arange(1, max_cooldown + 1)[None, :, None] <= cooldown[:, None, None]
+            
+            def breakout(level):
+                # cross/base/vol rows line up with bars 1..n-1; past bars i = 1..cooldown back
+                cross = _crossover(close, level) & green[1:] & dirUp[1:]
+                strongVol = volume[1:, None] > avgVol[1:, None] * volMult[None]
+                now = cross[-1] & strongVol[-1]
+                past = slice(-2, -2 - max_cooldown, -1)
+                pastValid = cross[past][None] & strongVol[past].transpose(1, 0, 2)
+                return now & ~(pastValid & in_window).any(axis=1)
+            
+            gold = breakout(wall_gold)
+            top = breakout(ind['wall_top'])
+            
+            # DİRENÇ REDDİ
+            reject = (high[c] >= ind['wall_top'][c]) & (close[c] < ind['wall_top'][c])
+        
+        n = len(batch)
+        return {
+            'KURUMSAL DİP': np.broadcast_to(kurumsal, (n,) + kurumsal.shape),
+            'TREND BAŞLANGIÇ': np.broadcast_to(trend, (n,) + trend.shape),
+            'PULLBACK AL': pullback,
+            'DİP AL': dip,
+            'ALTIN KIRILIM': gold,
+            'ZİRVE KIRILIMI': top,
+            'DİRENÇ REDDİ': np.broadcast_to(reject, (n,) + reject.shape),
+        }
+    
+    @classmethod
+    def signal_history(cls, panel: SymbolPanel, params_list: List[XTUMYV27Parameters],
+                       ctx: Optional[indicators.IndicatorContext] = None) -> List[Dict[str, np.ndarray]]:
+        """
+        Signals every bar of the panel would have produced (backtests).
+        
+        Row t is checked exactly as scan_panel_batch checks the last bar of
+        the panel cut after row t (every indicator is causal), so a single
+        indicator pass over the full history serves every date.
+        
+        Args:
+            panel: Market panel
+            params_list: Parameter sets to evaluate
+            ctx: Optional IndicatorContext over panel.frames()
+        
+        Returns:
+            Per parameter set, {'row', 'col', 'kind'} int arrays of fired
+            cells (kind indexes SIGNAL_TYPES), sorted by row, col, kind
+        """
+        empty = {key: np.empty(0, dtype=np.int64) for key in ('row', 'col', 'kind')}
+        results = [empty for _ in params_list]
+        if panel.n_symbols == 0 or panel.n_bars < 3 or not params_list:
+            return results
+        
+        ctx = ctx or indicators.IndicatorContext(panel.frames())
+        f = {name: frame.to_numpy(dtype=float) for name, frame in ctx.frames.items()}
+        valid = panel.valid
+        
+        # validate_dataframe as of each row: 60+ bars so far, no NaN in critical columns so far
+        eligible = valid & (np.cumsum(valid, axis=0) >= 60)
+        for field in ('close', 'high', 'low', 'volume'):
+            eligible &= ~np.logical_or.accumulate(np.isnan(f[field]) & valid, axis=0)
+        eligible[:2] = False
+        
+        groups: Dict[tuple, List[int]] = {}
+        for i, params in enumerate(params_list):
+            specs = tuple(spec.key for spec in indicators.xtumy_specs(params).values())
+            groups.setdefault(specs, []).append(i)
+        
+        for members in groups.values():
+            ind = {
+                name: ctx.get(spec).to_numpy(dtype=float)
+                for name, spec in indicators.xtumy_specs(params_list[members[0]]).items()
+            }
+            # _build_batch drops signals with a missing RSI/ADX
+            ready = eligible & ~np.isnan(np.stack([
+                ind['EMA50'], ind['EMA20'], ind['rsi'], ind['rsiMA'], ind['adx']
+            ])).any(axis=0)
+            
+            for i in members:
+                fired = cls._history_conditions(f, ind, params_list[i])
+                kind, row, col = np.nonzero(np.stack([fired[t] & ready for t in SIGNAL_TYPES]))
+                order = np.lexsort((kind, col, row))
+                results[i] = {'row': row[order], 'col': col[order], 'kind': kind[order]}
+        
+        return results
+    
+    @staticmethod
+    def _history_conditions(f: Dict[str, np.ndarray], ind: Dict[str, np.ndarray],
+                            params: XTUMYV27Parameters) -> Dict[str, np.ndarray]:
+        """_batch_conditions for one parameter set at every row, as (bars × symbols) arrays."""
+        close, open_, high, low, volume = f['close'], f['open'], f['high'], f['low'], f['volume']
+        ema50, ema20, rsi, avgVol = ind['EMA50'], ind['EMA20'], ind['rsi'], ind['avgVol']
+        green = close > open_
+        dirUp = ind['diplus'] > ind['diminus']
+        
+        def prev(a, n=1):
+            return _shift(a, n, False if a.dtype == bool else np.nan)
+        
+        with np.errstate(invalid='ignore'):
+            # KURUMSAL DİP
+            kurumsal = ((ema20 < ema50) &
+                        (prev(close) <= prev(ema20)) & (close > ema20) &
+                        (rsi > ind['rsiMA']) & (rsi > prev(rsi)) &
+                        (volume > avgVol * 0.3) & (volume < avgVol * 1.5) &
+                        green)
+            
+            # TREND BAŞLANGIÇ
+            trend = ((prev(close, 2) <= prev(ema50, 2)) & (prev(close) > prev(ema50)) &
+                     (prev(volume) > prev(avgVol)) & prev(green) &
+                     (close >= ema50) & green & dirUp)
+            
+            # PULLBACK AL
+            barsSinceUp = _bars_since_each(_crossover_rows(close, ema50))
+            barsSinceDown = _bars_since_each(_crossover_rows(ema50, close))
+            isInUptrend = ~np.isnan(barsSinceUp) & (np.isnan(barsSinceDown) | (barsSinceUp < barsSinceDown))
+            isTrendMature = isInUptrend & (barsSinceUp >= params.pbWaitBars)
+            
+            touch = 1 + params.pullPct / 100
+            isValidContact = ((low <= ema50 * touch) |
+                              ((prev(low) <= prev(ema50) * touch) & (prev(close) < prev(close, 2))))
+            emaSlope = (ema50 - prev(ema50)) / prev(ema50) * 100
+            pullback = (isTrendMature & isValidContact &
+                        (close > ema50) & green & (emaSlope > 0) &
+                        (ind['adx'] > params.adxThresh) & (rsi > params.rsiMin) &
+                        (volume > avgVol * params.volMult) &
+                        (close > prev(low)) & dirUp & ~trend)
+            
+            # DİP AL
+            dip = ((low <= ind['wall_low'] * 1.02) & green &
+                   (rsi > prev(rsi)) & dirUp & ~pullback)
+            
+            # ALTIN KIRILIM / ZİRVE KIRILIMI: no valid break in the previous `cooldown` bars
+            wall_gold = ind['wall_low'] + (ind['wall_top'] - ind['wall_low']) * 0.618
+            
+            def breakout(level):
+                valid = _crossover_rows(close, level) & green & dirUp & (volume > avgVol * params.volMult)
+                breaks = np.cumsum(valid, axis=0)
+                recent = _shift(breaks, 1, 0) - _shift(breaks, params.cooldown + 1, 0)
+                return valid & (recent == 0)
+            
+            gold = breakout(wall_gold)
+            top = breakout(ind['wall_top'])
+            
+            # DİRENÇ REDDİ
+            reject = (high >= ind['wall_top']) & (close < ind['wall_top'])
+        
+        return {
+            'KURUMSAL DİP': kurumsal,
+            'TREND BAŞLANGIÇ': trend,
+            'PULLBACK AL': pullback,
+            'DİP AL': dip,
+            'ALTIN KIRILIM': gold,
+            'ZİRVE KIRILIMI': top,
+            'DİRENÇ REDDİ': reject,
+        }
+    
+    @staticmethod
+    def _build_batch(panel: SymbolPanel, f: Dict[str, np.ndarray], ind: Dict[str, np.ndarray],
+                     fired: Dict[str, np.ndarray]) -> SignalBatch:
+        """Signals for one parameter set, ordered by symbol then signal type."""
+        types = list(fired)
+        cols, kinds = np.nonzero(np.stack([fired[t] for t in types], axis=1))
+        
+        rsi = ind['rsi'][-1, cols]
+        adx = ind['adx'][-1, cols]
+        
+        # A missing ADX fails SignalResult validation (NaN is out of 0-100)
+        missing = np.isnan(rsi) | np.isnan(adx)
+        if missing.any():
+            for symbol in dict.fromkeys(panel.symbols[col] for col in cols[missing]):
+                print(f"⚠️  Error scanning {symbol}: missing RSI/ADX")
+            cols, kinds, rsi, adx = cols[~missing], kinds[~missing], rsi[~missing], adx[~missing]
+        
+        wall_low = ind['wall_low'][-1]
+        wall_top = ind['wall_top'][-1]
+        wall_gold = wall_low + (wall_top - wall_low) * 0.618
+        metadata = {
+            'KURUMSAL DİP': lambda col: {'trend': 'Ayı Yapısında Sessiz Toplama'},
+            'TREND BAŞLANGIÇ': lambda col: {'trend': 'EMA50 Kırılımı (1 Bar Önce)'},
+            'PULLBACK AL': lambda col: {'trend': 'EMA50 Retesti'},
+            'DİP AL': lambda col: {'trend': f'Fibonacci Dibi ({wall_low[col]:.2f})'},
+            'ALTIN KIRILIM': lambda col: {'trend': f'0.618 Kırıldı ({wall_gold[col]:.2f})'},
+            'ZİRVE KIRILIMI': lambda col: {'trend': f'Direnç Aşıldı ({wall_top[col]:.2f})'},
+            'DİRENÇ REDDİ': lambda col: {'warning': f'Direnç Reddi ({wall_top[col]:.2f})'},
+        }
+        
+        return SignalBatch(
+            symbol=[panel.symbols[col] for col in cols],
+            signal_type=[types[kind] for kind in kinds],
+            signal_date=pd.DatetimeIndex(panel.dates[-1, cols]).strftime('%Y-%m-%d'),
+            price=f['close'][-1, cols],
+            rsi=[round(float(v), 2) for v in rsi],
+            adx=[round(float(v), 2) for v in adx],
+            metadata=[metadata[types[kind]](col) for col, kind in zip(cols, kinds)]
+        ).validate(drop_invalid=True)
+    
+    def get_indicator_specs(self) -> List[indicators.IndicatorSpec]:
+        """Indicator specs behind the current parameters."""
+        return list(indicators.xtumy_specs(self.params).values())
+    
+    def _detect_signals(self, df: pd.DataFrame) -> List[SignalResult]:
+        """Check all signal types on the last bar of an indicator-enriched frame."""
         # Check signals on last bar only
         signals = []
         
@@ -130,73 +477,23 @@ class XTUMYV27Strategy(BaseStrategy):
     
     def _calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """Calculate all required technical indicators."""
-        params = self.params
-        
-        # EMAs
-        df['EMA50'] = df['close'].ewm(span=params.emaLongLen, adjust=False).mean()
-        df['EMA20'] = df['close'].ewm(span=params.emaShortLen, adjust=False).mean()
-        
-        # RSI
-        df['rsi'] = self._calculate_rsi(df['close'], params.rsiPeriod)
-        df['rsiMA'] = df['rsi'].rolling(params.rsiPeriod).mean()
-        
-        # Volume
-        df['avgVol'] = df['volume'].rolling(20).mean()
-        
-        # ADX and Directional Indicators
-        df['diplus'], df['diminus'], df['adx'] = self._calculate_adx(df, params.adxPeriod)
-        
-        # EMA Slope
-        df['emaSlope'] = (df['EMA50'] - df['EMA50'].shift(1)) / df['EMA50'].shift(1) * 100
-        df['isSlopePositive'] = df['emaSlope'] > 0
-        df['isSlopeStrong'] = df['emaSlope'] > params.slopeTh
-        df['isTrendStrong'] = df['adx'] > params.adxThresh
-        
-        # Fibonacci Walls
-        df['wall_top'] = df['high'].rolling(params.fibLen).max().shift(1)
-        df['wall_low'] = df['low'].rolling(params.fibLen).min().shift(1)
-        df['wall_diff'] = df['wall_top'] - df['wall_low']
-        df['wall_gold'] = df['wall_low'] + (df['wall_diff'] * 0.618)
+        columns = indicators.xtumy_indicators(
+            df['open'], df['high'], df['low'], df['close'], df['volume'], self.params
+        )
+        for name, values in columns.items():
+            df[name] = values
         
         return df
     
     @staticmethod
     def _calculate_rsi(series: pd.Series, period: int = 14) -> pd.Series:
         """Calculate RSI using Wilder's method."""
-        delta = series.diff()
-        gain = (delta.where(delta > 0, 0)).ewm(alpha=1/period, adjust=False).mean()
-        loss = (-delta.where(delta < 0, 0)).ewm(alpha=1/period, adjust=False).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        return indicators.rsi(series, period)
     
     @staticmethod
     def _calculate_adx(df: pd.DataFrame, period: int = 14) -> tuple:
         """Calculate ADX and Directional Indicators."""
-        high, low, close = df['high'], df['low'], df['close']
-        
-        # True Range
-        tr = pd.concat([
-            high - low,
-            abs(high - close.shift()),
-            abs(low - close.shift())
-        ], axis=1).max(axis=1)
-        atr = tr.ewm(alpha=1/period, adjust=False).mean()
-        
-        # Directional Movement
-        up_move = high - high.shift()
-        down_move = low.shift() - low
-        
-        plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0)
-        minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0)
-        
-        plus_di = 100 * pd.Series(plus_dm, index=df.index).ewm(alpha=1/period, adjust=False).mean() / atr
-        minus_di = 100 * pd.Series(minus_dm, index=df.index).ewm(alpha=1/period, adjust=False).mean() / atr
-        
-        dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
-        adx = dx.ewm(alpha=1/period, adjust=False).mean()
-        
-        return plus_di, minus_di, adx
+        return indicators.adx(df['high'], df['low'], df['close'], period)
     
     def _check_kurumsal_dip(self, df: pd.DataFrame, curr: pd.Series, prev: pd.Series) -> SignalResult:
         """Check for KURUMSAL DİP signal."""
@@ -270,16 +567,12 @@ class XTUMYV27Strategy(BaseStrategy):
         params = self.params
         
         # Calculate bars since last EMA50 crossover
-        barsSinceUp, barsSinceDown = None, None
-        for i in range(len(df) - 1, 0, -1):
-            if barsSinceUp is None:
-                if df.iloc[i-1]['close'] <= df.iloc[i-1]['EMA50'] and df.iloc[i]['close'] > df.iloc[i]['EMA50']:
-                    barsSinceUp = len(df) - 1 - i
-            if barsSinceDown is None:
-                if df.iloc[i-1]['close'] >= df.iloc[i-1]['EMA50'] and df.iloc[i]['close'] < df.iloc[i]['EMA50']:
-                    barsSinceDown = len(df) - 1 - i
-            if barsSinceUp is not None and barsSinceDown is not None:
-                break
+        close = df['close'].to_numpy(dtype=float)
+        ema50 = df['EMA50'].to_numpy(dtype=float)
+        crossUp = (close[:-1] <= ema50[:-1]) & (close[1:] > ema50[1:])
+        crossDown = (close[:-1] >= ema50[:-1]) & (close[1:] < ema50[1:])
+        barsSinceUp = self._bars_since_last(crossUp)
+        barsSinceDown = self._bars_since_last(crossDown)
         
         # In uptrend?
         isInUptrend = (barsSinceUp is not None) and (barsSinceDown is None or barsSinceUp < barsSinceDown)
@@ -330,6 +623,12 @@ class XTUMYV27Strategy(BaseStrategy):
             )
         return None
     
+    @staticmethod
+    def _bars_since_last(cond: np.ndarray):
+        """Bars from the last True in cond to the end (None if never True)."""
+        hits = np.flatnonzero(cond)
+        return int(len(cond) - 1 - hits[-1]) if len(hits) else None
+    
     def _check_dip_al(self, df: pd.DataFrame, curr: pd.Series, prev: pd.Series,
                      existing_signals: List[SignalResult]) -> SignalResult:
         """Check for DİP AL signal."""
@@ -498,3 +797,36 @@ class XTUMYV27Strategy(BaseStrategy):
 Identifies 6 types of buy signals based on EMA trends, RSI momentum, 
 volume analysis, and Fibonacci levels. 100% mathematically compatible 
 with TradingView Pine Script implementation."""
+
+
+def _crossover(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Rows 1..n-1 where a crosses above b (Pine ta.crossover)."""
+    with np.errstate(invalid='ignore'):
+        return (a[:-1] <= b[:-1]) & (a[1:] > b[1:])
+
+
+def _bars_since_last(cond: np.ndarray) -> np.ndarray:
+    """Per column, rows from the last True to the end (NaN if never True)."""
+    return np.where(cond.any(axis=0), np.argmax(cond[::-1], axis=0).astype(float), np.nan)
+
+
+def _crossover_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """_crossover aligned with the input rows (row 0 is never a cross)."""
+    out = np.zeros(a.shape, dtype=bool)
+    out[1:] = _crossover(a, b)
+    return out
+
+
+def _bars_since_each(cond: np.ndarray) -> np.ndarray:
+    """_bars_since_last as of every row: rows since the last True at or before it."""
+    rows = np.arange(cond.shape[0])[:, None]
+    last = np.maximum.accumulate(np.where(cond, rows, -1), axis=0)
+    return np.where(last >= 0, rows - last, np.nan)
+
+
+def _shift(a: np.ndarray, n: int, fill) -> np.ndarray:
+    """Rows shifted down by n (row t holds row t - n), the first n rows set to fill."""
+    out = np.empty_like(a)
+    out[:n] = fill
+    out[n:] = a[:len(a) - n] if n < len(a) else a[:0]
+    return out
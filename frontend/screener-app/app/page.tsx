@@ -32,6 +32,7 @@ export default function ScreenerPage() {
   const [signals, setSignals] = useState<Signal[]>([]);
   const [filteredSignals, setFilteredSignals] = useState<Signal[]>([]);
   const [loading, setLoading] = useState(false);
+  const [scanProgress, setScanProgress] = useState<number | null>(null);
   const [paramModalOpen, setParamModalOpen] = useState(false);
   const [advancedFilters, setAdvancedFilters] = useState<FilterValues>({
     rsiMin: 0,
@@ -80,21 +81,38 @@ export default function ScreenerPage() {
 
   const handleScan = async () => {
     setLoading(true);
+    setScanProgress(0);
+    setSignals([]);
+    setFilteredSignals([]);
+
+    // Signals are shown as each shard of symbols completes
+    let resultSignals: Signal[] = [];
     try {
-      const result = await api.runScan({
-        strategy_name: strategy,
-        user_id: 1,
-        save_to_db: false,
-        signal_types: activeSignalTypes.length > 0 ? activeSignalTypes : undefined,
-      });
-      const resultSignals = result.signals || [];
-      setSignals(resultSignals);
-      applyFilters(resultSignals, advancedFilters);
+      await api.streamScan(
+        {
+          strategy_name: strategy,
+          user_id: 1,
+          save_to_db: false,
+          signal_types: activeSignalTypes.length > 0 ? activeSignalTypes : undefined,
+        },
+        (event) => {
+          if (event.event === 'signals') {
+            resultSignals = [...resultSignals, ...event.signals];
+            setSignals(resultSignals);
+            applyFilters(resultSignals, advancedFilters);
+          } else if (event.event === 'progress') {
+            setScanProgress(event.symbols_total ? event.symbols_done / event.symbols_total : null);
+          } else if (event.event === 'error') {
+            throw new Error(event.details || event.error);
+          }
+        }
+      );
     } catch (error) {
       console.error('Scan failed:', error);
       alert('Tarama başarısız oldu. Lütfen tekrar deneyin.');
     } finally {
       setLoading(false);
+      setScanProgress(null);
     }
   };
 
@@ -196,7 +214,7 @@ export default function ScreenerPage() {
               </button>
 
               <div className="ml-auto">
-                <ScanButton onClick={handleScan} loading={loading} />
+                <ScanButton onClick={handleScan} loading={loading} progress={scanProgress} />
               </div>
             </div>
 
@@ -6,9 +6,10 @@ interface ScanButtonProps {
   onClick: () => void;
   loading: boolean;
   disabled?: boolean;
+  progress?: number | null;
 }
 
-export default function ScanButton({ onClick, loading, disabled }: ScanButtonProps) {
+export default function ScanButton({ onClick, loading, disabled, progress }: ScanButtonProps) {
   return (
     <button
       onClick={onClick}
@@ -20,7 +21,9 @@ export default function ScanButton({ onClick, loading, disabled }: ScanButtonPro
       {loading ? (
         <>
           <Loader2 className="w-5 h-5 animate-spin relative z-10" />
-          <span className="relative z-10">Piyasa Taranıyor...</span>
+          <span className="relative z-10">
+            Piyasa Taranıyor...{progress != null && ` %${Math.round(progress * 100)}`}
+          </span>
         </>
       ) : (
         <>
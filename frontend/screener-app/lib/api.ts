@@ -76,6 +76,15 @@ export interface OHLCVData {
   volume: number;
 }
 
+export interface OHLCVSeries {
+  date: string[];
+  open: number[];
+  high: number[];
+  low: number[];
+  close: number[];
+  volume: number[];
+}
+
 export interface ScanResult {
   strategy_name: string;
   total_tickers_scanned: number;
@@ -85,6 +94,20 @@ export interface ScanResult {
   saved_to_db: boolean;
 }
 
+export type ScanStreamEvent =
+  | { event: 'start'; strategy: string; symbols_total: number; shards: number }
+  | { event: 'signals'; shard: number; signals: Signal[] }
+  | {
+      event: 'progress';
+      shard: number;
+      symbols_done: number;
+      symbols_total: number;
+      signals_found: number;
+      elapsed_ms: number;
+    }
+  | { event: 'done'; signals_found: number; symbols_scanned: number; elapsed_ms: number }
+  | { event: 'error'; error: string; details?: string };
+
 // Performance Types
 export interface PerformanceData {
   price_1d: number | null;
@@ -197,6 +220,44 @@ export const api = {
     return response.data;
   },
 
+  /**
+   * Get OHLCV data for many symbols in one request (signal lists, sparklines)
+   * @param symbols - Ticker symbols
+   * @param days - Number of days (default: 90)
+   * @param points - Optional downsample target per symbol
+   * @returns Columnar OHLCV series keyed by symbol
+   */
+  getOHLCVBatch: async (
+    symbols: string[],
+    days: number = 90,
+    points?: number
+  ): Promise<{ data: Record<string, OHLCVSeries>; missing: string[] }> => {
+    const response = await apiClient.post('/api/market-data/ohlcv/batch', {
+      symbols,
+      days,
+      points,
+    });
+    return response.data;
+  },
+
+  /**
+   * Get precomputed indicator series for chart overlays
+   * @param symbol - Ticker symbol
+   * @param specs - Indicator spec keys, e.g. ['ema:length=50', 'rsi:period=14']
+   * @param days - Number of days (default: 90)
+   * @returns Series keyed by canonical spec key
+   */
+  getIndicators: async (
+    symbol: string,
+    specs: string[] = [],
+    days: number = 90
+  ): Promise<{ symbol: string; indicators: Record<string, { date: string[]; value: number[] }> }> => {
+    const params = new URLSearchParams({ days: String(days) });
+    specs.forEach((spec) => params.append('spec', spec));
+    const response = await apiClient.get(`/api/market-data/${symbol}/indicators`, { params });
+    return response.data;
+  },
+
   // ========================================================================
   // SCREENER & STRATEGIES
   // ========================================================================
@@ -248,7 +309,8 @@ export const api = {
   },
 
   runScan: async (data: {
-    strategy_name: string;
+    strategy_name?: string;
+    strategies?: string[];
     user_id?: number;
     save_to_db?: boolean;
     symbols?: string[];
@@ -258,6 +320,53 @@ export const api = {
     return response.data;
   },
 
+  /**
+   * Run a scan and receive results shard by shard (NDJSON stream)
+   * @param data - Same body as runScan (single strategy) plus optional shard_size
+   * @param onEvent - Called for every start/signals/progress/done/error event
+   */
+  streamScan: async (
+    data: {
+      strategy_name: string;
+      user_id?: number;
+      save_to_db?: boolean;
+      symbols?: string[];
+      signal_types?: string[];
+      shard_size?: number;
+    },
+    onEvent: (event: ScanStreamEvent) => void,
+    signal?: AbortSignal
+  ): Promise<void> => {
+    // axios buffers the whole body in the browser, so use fetch for streaming
+    const response = await fetch(`${API_BASE_URL}/api/screener/scan/stream?format=ndjson`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', Accept: 'application/x-ndjson' },
+      body: JSON.stringify(data),
+      signal,
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Scan stream failed: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      buffer += decoder.decode(value, { stream: !done });
+
+      const lines = buffer.split('\n');
+      buffer = lines.pop() ?? '';
+      for (const line of lines) {
+        if (line.trim()) onEvent(JSON.parse(line));
+      }
+
+      if (done) break;
+    }
+    if (buffer.trim()) onEvent(JSON.parse(buffer));
+  },
+
   // ========================================================================
   // PERFORMANCE TRACKING
   // ========================================================================
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the scanner, loader and API hot paths.
+
+Bars come from the synthetic generator (600 symbols x 2 years by default)
+and are loaded into a throwaway SQLite database that stands in for
+Postgres, so the suite runs anywhere without TradingView or a server.
+Each benchmark reports median/min/max wall time (and throughput where
+there is a natural item count) as JSON; --compare checks a previous run
+and exits 1 if any benchmark slowed down beyond --threshold.
+
+Benchmarks:
+    calculate_signals   XTUMYV27Strategy.calculate_signals, symbol by symbol
+    scan_memory         ScanEngine._scan over the in-memory bars (whole market)
+    load_market_data    ScanEngine._load_market_data (DB -> DataFrame)
+    run_scan            ScanEngine.run_scan end to end (load + scan, no save)
+    save_signals        ScanEngine._save_signals, fresh rows and all-duplicate rows
+    track_performance   track_performance.update_performance over seeded signals
+    api                 Flask endpoints through the test client (cold and warm cache)
+
+Usage:
+    python scripts/benchmark.py --output bench/$(git rev-parse --short HEAD).json
+    python scripts/benchmark.py --symbols 1000 --years 3 --repeats 5
+    python scripts/benchmark.py --only run_scan api --compare bench/main.json --threshold 0.2
+    python scripts/benchmark.py --database-url postgresql://localhost/bench_db  # disposable DB only
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import subprocess
+import tempfile
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+BENCHMARKS = ['calculate_signals', 'scan_memory', 'load_market_data', 'run_scan',
+              'save_signals', 'track_performance', 'api']
+
+STRATEGY = 'XTUMYV27Strategy'
+USER_ID = 1
+TRACKED_SIGNAL_TYPE = 'BENCH TRACK'
+SAVED_SIGNAL_TYPE = 'BENCH SAVE'
+
+
+def timed(func: Callable[[], Any], repeats: int, setup: Optional[Callable[[], None]] = None,
+          items: Optional[int] = None, warmup: bool = False) -> Dict[str, Any]:
+    """
+    Time func() `repeats` times (setup() runs untimed before each call).
+    
+    Returns:
+        {'median_ms', 'min_ms', 'max_ms', 'repeats'} plus items/items_per_s
+    """
+    if warmup:
+        if setup:
+            setup()
+        func()
+    
+    timings = []
+    for _ in range(repeats):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    
+    median = statistics.median(timings)
+    result = {
+        'median_ms': round(median, 2),
+        'min_ms': round(min(timings), 2),
+        'max_ms': round(max(timings), 2),
+        'repeats': repeats
+    }
+    if items:
+        result['items'] = items
+        result['items_per_s'] = round(items / (median / 1000), 1) if median else None
+    return result
+
+
+def _sqlite_compat() -> None:
+    """Let the Postgres models create on SQLite (JSONB columns become JSON)."""
+    from sqlalchemy.dialects.postgresql import JSONB
+    from sqlalchemy.ext.compiler import compiles
+    
+    @compiles(JSONB, 'sqlite')
+    def _jsonb_as_json(type_, compiler, **kw):
+        return 'JSON'
+
+
+def seed_database(engine, bars, tracked_signals: int, seed: int) -> Dict[str, Any]:
+    """Create the schema and load users, strategies, tickers, bars and signals to track."""
+    import numpy as np
+    import pandas as pd
+    from sqlalchemy import text
+    from backend.core.database import Base, get_db_session
+    from backend.modules.market_data import models as _market_models  # noqa: F401 (registers tables)
+    from backend.modules.screener.models import Strategy, User
+    from backend.modules.screener.scanner import ScanEngine
+    
+    started = time.perf_counter()
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        # Synthetic sessions are plain weekdays: an empty holiday table is the matching calendar
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS bist_holidays (holiday_date DATE, status VARCHAR(50), closing_time TIME)"
+        ))
+    
+    with get_db_session() as session:
+        if not session.get(User, USER_ID):
+            session.add(User(id=USER_ID, username='bench', email='bench@localhost'))
+    ScanEngine.ensure_strategy_in_db(STRATEGY)
+    
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM signal_performance"))
+        conn.execute(text("DELETE FROM signal_history"))
+        conn.execute(text("DELETE FROM market_data_quarantine"))
+        conn.execute(text("DELETE FROM market_data"))
+        conn.execute(text("DELETE FROM tickers"))
+    
+    symbols = bars['symbol'].unique()
+    pd.DataFrame({'symbol': symbols, 'name': symbols, 'type': 'stock', 'user_id': USER_ID,
+                  'is_active': True}).to_sql('tickers', engine, if_exists='append', index=False)
+    bars.to_sql('market_data', engine, if_exists='append', index=False, chunksize=50_000)
+    
+    # Signals 8-25 sessions old, so the tracker has +1d/+3d/+7d prices to fill in
+    dates = np.sort(bars['date'].unique())
+    candidates = bars[bars['date'].isin(dates[-25:-8])]
+    picked = candidates.sample(n=min(tracked_signals, len(candidates)), random_state=seed)
+    
+    with get_db_session() as session:
+        strategy_id = session.query(Strategy.id).filter(Strategy.name == STRATEGY).scalar()
+    
+    pd.DataFrame({
+        'user_id': USER_ID,
+        'strategy_id': strategy_id,
+        'symbol': picked['symbol'].values,
+        'signal_type': TRACKED_SIGNAL_TYPE,
+        'signal_date': pd.to_datetime(picked['date']).dt.date.values,
+        'price_at_signal': picked['close'].values,
+        'created_at': datetime.now()
+    }).to_sql('signal_history', engine, if_exists='append', index=False)
+    
+    return {
+        'seconds': round(time.perf_counter() - started, 2),
+        'tickers': len(symbols),
+        'bars': len(bars),
+        'tracked_signals': len(picked),
+        'strategy_id': strategy_id
+    }
+
+
+def bench_calculate_signals(bars, strategy, repeats: int, limit: int) -> Dict[str, Any]:
+    groups = [group for _, group in bars.groupby('symbol')][:limit]
+    
+    def run():
+        for group in groups:
+            strategy.calculate_signals(group)
+    
+    return timed(run, repeats, items=len(groups))
+
+
+def bench_scan_memory(bars, strategy, repeats: int) -> Dict[str, Any]:
+    from backend.modules.screener.scanner import ScanEngine
+    
+    return timed(lambda: ScanEngine._scan(strategy, bars), repeats,
+                 items=bars['symbol'].nunique(), warmup=True)
+
+
+def bench_load_market_data(repeats: int) -> Dict[str, Any]:
+    from backend.modules.screener.scanner import ScanEngine
+    
+    scan_engine = ScanEngine(STRATEGY, USER_ID)
+    rows = {}
+    
+    def run():
+        rows['n'] = len(scan_engine._load_market_data())
+    
+    result = timed(run, repeats)
+    result['rows'] = rows['n']
+    return result
+
+
+def bench_run_scan(repeats: int) -> Dict[str, Any]:
+    from backend.modules.screener.scanner import ScanEngine
+    
+    scan_engine = ScanEngine(STRATEGY, USER_ID)
+    found = {}
+    
+    def run():
+        found['n'] = len(scan_engine.run_scan_batch(save_to_db=False))
+    
+    result = timed(run, repeats, items=len(scan_engine._load_symbols()))
+    result['signals'] = found['n']
+    return result
+
+
+def bench_save_signals(bars, repeats: int, rows: int) -> Dict[str, Dict[str, Any]]:
+    """One batch of `rows` signals (latest sessions x symbols), saved fresh and again as duplicates."""
+    from sqlalchemy import text
+    from backend.core.database import engine
+    from backend.modules.screener.scanner import ScanEngine
+    from backend.modules.screener.signals import SignalBatch
+    
+    latest = bars.sort_values('date').groupby('symbol').tail(max(rows // bars['symbol'].nunique(), 1))
+    latest = latest.head(rows)
+    batch = SignalBatch(
+        symbol=latest['symbol'].tolist(),
+        signal_type=[SAVED_SIGNAL_TYPE] * len(latest),
+        signal_date=latest['date'].dt.strftime('%Y-%m-%d').tolist(),
+        price=latest['close'].tolist(),
+        rsi=[55.0] * len(latest),
+        adx=[25.0] * len(latest),
+        metadata=[{'source': 'benchmark'}] * len(latest)
+    )
+    scan_engine = ScanEngine(STRATEGY, USER_ID)
+    
+    def clear():
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM signal_history WHERE signal_type = :t"), {'t': SAVED_SIGNAL_TYPE})
+    
+    def save():
+        scan_engine._save_signals(batch)
+    
+    fresh = timed(save, repeats, setup=clear, items=len(batch))
+    duplicate = timed(save, repeats, items=len(batch))
+    clear()
+    return {'save_signals_fresh': fresh, 'save_signals_duplicate': duplicate}
+
+
+def bench_track_performance(repeats: int) -> Dict[str, Any]:
+    from sqlalchemy import text
+    from backend.core.database import engine
+    from scripts.track_performance import update_performance
+    
+    stats = {}
+    
+    def reset():
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM signal_performance"))
+    
+    def run():
+        stats.update(update_performance(days_back=60))
+    
+    result = timed(run, repeats, setup=reset)
+    result.update(items=stats.get('tracked'), updated=stats.get('updated'), errors=stats.get('errors'))
+    if stats.get('tracked'):
+        result['items_per_s'] = round(stats['tracked'] / (result['median_ms'] / 1000), 1)
+    return result
+
+
+def bench_api(repeats: int, sample_symbol: str) -> Dict[str, Dict[str, Any]]:
+    """Endpoints through the Flask test client; cold runs bump the cache namespace first."""
+    from backend.core.cache import get_cache
+    from backend.main import create_app
+    
+    client = create_app().test_client()
+    scan_body = {'strategy_name': STRATEGY, 'user_id': USER_ID, 'save_to_db': False}
+    
+    # name -> (method, path, json body, namespace bumped before each cold run)
+    endpoints = {
+        'health': ('GET', '/api/health', None, None),
+        'strategies': ('GET', '/api/screener/strategies', None, None),
+        'strategy_parameters': ('GET', f'/api/screener/strategies/{STRATEGY}/parameters', None, None),
+        'scan_cold': ('POST', '/api/screener/scan', scan_body, 'scan'),
+        'scan_warm': ('POST', '/api/screener/scan', scan_body, None),
+        'signals': ('GET', '/api/screener/signals?limit=50', None, None),
+        'performance_summary_cold': ('GET', '/api/screener/performance/summary?days=60', None, 'performance'),
+        'performance_summary_warm': ('GET', '/api/screener/performance/summary?days=60', None, None),
+        'tickers': ('GET', '/api/market-data/tickers', None, None),
+        'ticker_data': ('GET', f'/api/market-data/tickers/{sample_symbol}/data', None, 'ohlcv'),
+    }
+    
+    results = {}
+    for name, (method, path, body, namespace) in endpoints.items():
+        response = {}
+        
+        def call():
+            response['r'] = client.open(path, method=method, json=body)
+        
+        setup = (lambda ns=namespace: get_cache().bump(ns)) if namespace else None
+        result = timed(call, repeats, setup=setup, warmup=True)
+        status = response['r'].status_code
+        result['status'] = status
+        if status != 200:
+            payload = response['r'].get_json(silent=True) or {}
+            result['error'] = str(payload.get('details') or payload.get('error') or '')[:300]
+        results[f'api_{name}'] = result
+    return results
+
+
+def run_benchmark(name: str, results: Dict[str, Any], bars, strategy, args) -> None:
+    if name == 'calculate_signals':
+        results[name] = bench_calculate_signals(bars, strategy, args.repeats, args.calc_symbols)
+    elif name == 'scan_memory':
+        results[name] = bench_scan_memory(bars, strategy, args.repeats)
+    elif name == 'load_market_data':
+        results[name] = bench_load_market_data(args.repeats)
+    elif name == 'run_scan':
+        results[name] = bench_run_scan(args.repeats)
+    elif name == 'save_signals':
+        results.update(bench_save_signals(bars, args.repeats, args.save_rows))
+    elif name == 'track_performance':
+        results[name] = bench_track_performance(args.repeats)
+    elif name == 'api':
+        results.update(bench_api(args.repeats, bars['symbol'].iloc[0]))
+
+
+def git_revision() -> Dict[str, Any]:
+    def git(*args):
+        proc = subprocess.run(['git', *args], cwd=project_root, capture_output=True, text=True)
+        return proc.stdout.strip() if proc.returncode == 0 else None
+    
+    return {'commit': git('rev-parse', '--short', 'HEAD'), 'dirty': bool(git('status', '--porcelain', '-uno'))}
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float,
+            min_delta_ms: float = 1.0) -> List[str]:
+    """
+    Print median changes against a baseline run.
+    
+    A benchmark regresses when its median is more than `threshold` slower
+    and at least `min_delta_ms` slower (sub-millisecond timings are noise).
+    
+    Returns:
+        Names of the benchmarks that regressed
+    """
+    regressions = []
+    print(f"\n{'benchmark':<32} {'baseline ms':>12} {'current ms':>12} {'change':>9}")
+    for name, current in results.items():
+        before = baseline.get('results', {}).get(name)
+        if not before or 'error' in current or 'error' in before:
+            continue
+        change = current['median_ms'] / before['median_ms'] - 1 if before['median_ms'] else 0.0
+        flag = ''
+        if change > threshold and current['median_ms'] - before['median_ms'] >= min_delta_ms:
+            regressions.append(name)
+            flag = '  ⚠️'
+        print(f"{name:<32} {before['median_ms']:>12.2f} {current['median_ms']:>12.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the scanner, loader and API on synthetic data')
+    parser.add_argument('--symbols', type=int, default=600, help='Synthetic symbols (default: 600)')
+    parser.add_argument('--years', type=float, default=2.0, help='Years of daily bars (default: 2)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed runs per benchmark (default: 3)')
+    parser.add_argument('--only', type=str, nargs='+', choices=BENCHMARKS, help='Benchmarks to run (default: all)')
+    parser.add_argument('--calc-symbols', type=int, default=100,
+                        help='Symbols for the per-symbol calculate_signals loop (default: 100)')
+    parser.add_argument('--save-rows', type=int, default=5000, help='Signals per save_signals batch (default: 5000)')
+    parser.add_argument('--track-signals', type=int, default=300, help='Signals seeded for tracking (default: 300)')
+    parser.add_argument('--database-url', type=str,
+                        help='Database to seed and query; its tables are emptied (default: temporary SQLite file)')
+    parser.add_argument('--output', type=str, help='Write JSON results to this file')
+    parser.add_argument('--compare', type=str, help='Baseline JSON from an earlier run')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='Allowed median slowdown before --compare fails (default: 0.15)')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                        help='Ignore slowdowns smaller than this many ms (default: 1.0)')
+    args = parser.parse_args()
+    
+    selected = args.only or BENCHMARKS
+    tmp_dir = None
+    if not args.database_url:
+        tmp_dir = tempfile.TemporaryDirectory(prefix='bist-bench-')
+        args.database_url = f"sqlite:///{tmp_dir.name}/bench.db"
+    
+    # Must be set before backend.core.database creates its engine
+    os.environ['DATABASE_URL'] = args.database_url
+    os.environ.setdefault('CACHE_BACKEND', 'memory')
+    
+    import numpy as np
+    import pandas as pd
+    from backend.core.database import engine
+    from backend.modules.market_data.synthetic import generate_ohlcv
+    from backend.modules.screener.strategies import StrategyRegistry
+    
+    if engine.dialect.name == 'sqlite':
+        _sqlite_compat()
+    
+    started = time.perf_counter()
+    bars = generate_ohlcv(args.symbols, args.years, args.seed)
+    generate_s = time.perf_counter() - started
+    
+    strategy_class = StrategyRegistry.get_strategy(STRATEGY)
+    strategy = strategy_class(strategy_class.get_default_parameters())
+    
+    needs_db = set(selected) - {'calculate_signals', 'scan_memory'}
+    seeded = None
+    if needs_db:
+        with redirect_stdout(sys.stderr):
+            seeded = seed_database(engine, bars, args.track_signals, args.seed)
+    
+    results: Dict[str, Any] = {}
+    for name in selected:
+        print(f"⏱️  {name}...", file=sys.stderr)
+        # Progress prints of the code under test go to stderr; stdout carries the JSON report
+        with redirect_stdout(sys.stderr):
+            run_benchmark(name, results, bars, strategy, args)
+    
+    report = {
+        'meta': {
+            **git_revision(),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'dialect': engine.dialect.name,
+            'symbols': args.symbols,
+            'years': args.years,
+            'seed': args.seed,
+            'bars': len(bars),
+            'repeats': args.repeats,
+            'generate_s': round(generate_s, 2),
+            'seed_db': seeded
+        },
+        'results': results
+    }
+    
+    output = json.dumps(report, indent=2, default=str)
+    print(output)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(output + '\n')
+    
+    if tmp_dir:
+        engine.dispose()
+        tmp_dir.cleanup()
+    
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if baseline.get('meta', {}).get('bars') != len(bars):
+            print("⚠️  Baseline was run on a different dataset; comparison is not like for like", file=sys.stderr)
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+        print(f"\n✅ No regression over {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
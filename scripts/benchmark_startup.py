@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the API, CLI and scheduler entry points.
+
+Each scenario runs in a fresh interpreter several times; the median and
+minimum wall time are reported as JSON, together with the heavy modules
+(pandas, numpy, tvDatafeed, strategy modules) the scenario ended up importing.
+
+Usage:
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py --runs 10 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+
+HEAVY_MODULES = [
+    'pandas',
+    'numpy',
+    'tvDatafeed',
+    'backend.modules.screener.scanner',
+    'backend.modules.screener.strategies.xtumy_v27',
+    'backend.modules.screener.strategies.ema_cross',
+]
+
+# Scenario name -> code run in a fresh interpreter
+SCENARIOS = {
+    'import_app': "import backend.main",
+    'health_request': (
+        "from backend.main import create_app\n"
+        "create_app().test_client().get('/api/health')"
+    ),
+    'list_strategy_names': (
+        "from backend.modules.screener.strategies import StrategyRegistry\n"
+        "StrategyRegistry.names()"
+    ),
+    'load_strategy': (
+        "from backend.modules.screener.strategies import StrategyRegistry\n"
+        "StrategyRegistry.get_strategy('XTUMYV27Strategy')"
+    ),
+    'run_scan_help': (
+        "import sys, runpy\n"
+        "sys.argv = ['run_scan.py', '--help']\n"
+        "try:\n"
+        "    runpy.run_path('scripts/run_scan.py', run_name='__main__')\n"
+        "except SystemExit:\n"
+        "    pass"
+    ),
+    # Module-level cost of the cron scheduler (SmartScheduler() itself reads the holiday table)
+    'import_scheduler': (
+        "import runpy\n"
+        "runpy.run_path('scripts/smart_scheduler.py', run_name='smart_scheduler')"
+    ),
+}
+
+_PROBE = (
+    "\nimport json, sys\n"
+    "print('\\n' + json.dumps([m for m in {modules!r} if m in sys.modules]))"
+)
+
+
+def run_scenario(code: str, runs: int) -> dict:
+    """Time `code` in `runs` fresh interpreters."""
+    timings = []
+    loaded = []
+    env = dict(os.environ, PYTHONPATH=str(project_root), PYTHONDONTWRITEBYTECODE='1')
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, '-c', code + _PROBE.format(modules=HEAVY_MODULES)],
+            cwd=project_root, env=env, capture_output=True, text=True
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+
+        if proc.returncode != 0:
+            return {'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'failed'}
+        loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    return {
+        'median_ms': round(statistics.median(timings), 1),
+        'min_ms': round(min(timings), 1),
+        'runs': runs,
+        'heavy_modules': loaded,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure cold-start time of entry points')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per scenario (default: 5)')
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='Scenario to run (repeatable, default: all)')
+    parser.add_argument('--output', type=str, help='Write JSON results to this file')
+    args = parser.parse_args()
+
+    baseline = run_scenario('pass', args.runs)
+    results = {
+        'python': sys.version.split()[0],
+        'interpreter_ms': baseline.get('median_ms'),
+        'scenarios': {
+            name: run_scenario(SCENARIOS[name], args.runs)
+            for name in (args.scenario or SCENARIOS)
+        },
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Local fake of the Telegram Bot API sendMessage endpoint.
+
+Records every message and can simulate latency, flood control (429 with
+retry_after) and server errors, so the dispatcher can be exercised
+without Telegram.
+
+Usage:
+    python scripts/fake_telegram_server.py --port 8081 --latency 0.2 --flood-every 10
+    TELEGRAM_API_URL=http://127.0.0.1:8081 python scripts/run_scan.py --telegram
+    
+    GET /messages returns everything received so far as JSON.
+"""
+import sys
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeTelegramServer(ThreadingHTTPServer):
+    """
+    Threaded fake API server.
+    
+    Args:
+        address: (host, port); port 0 picks a free port
+        latency: Seconds to wait before answering each request
+        flood_every: Answer every N-th request with 429 (0 = never)
+        retry_after: retry_after seconds sent with 429
+        error_every: Answer every N-th request with 500 (0 = never)
+    """
+    
+    daemon_threads = True
+    
+    def __init__(self, address=('127.0.0.1', 0), latency: float = 0.0, flood_every: int = 0,
+                 retry_after: int = 1, error_every: int = 0):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.flood_every = flood_every
+        self.retry_after = retry_after
+        self.error_every = error_every
+        self.messages = []
+        self.requests = 0
+        self.lock = threading.Lock()
+    
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeTelegramServer
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _reply(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def do_GET(self):
+        if self.path == '/messages':
+            with self.server.lock:
+                return self._reply(200, self.server.messages)
+        self._reply(404, {'ok': False, 'error_code': 404, 'description': 'Not Found'})
+    
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        
+        with self.server.lock:
+            self.server.requests += 1
+            n = self.server.requests
+        
+        if not self.path.endswith('/sendMessage'):
+            return self._reply(404, {'ok': False, 'error_code': 404, 'description': 'Not Found'})
+        if self.server.flood_every and n % self.server.flood_every == 0:
+            return self._reply(429, {
+                'ok': False, 'error_code': 429,
+                'description': f'Too Many Requests: retry after {self.server.retry_after}',
+                'parameters': {'retry_after': self.server.retry_after}
+            })
+        if self.server.error_every and n % self.server.error_every == 0:
+            return self._reply(500, {'ok': False, 'error_code': 500, 'description': 'Internal Server Error'})
+        if len(payload.get('text', '')) > 4096:
+            return self._reply(400, {'ok': False, 'error_code': 400, 'description': 'Bad Request: message is too long'})
+        
+        with self.server.lock:
+            message = {'message_id': len(self.server.messages) + 1, 'time': time.time(), **payload}
+            self.server.messages.append(message)
+        self._reply(200, {'ok': True, 'result': message})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local fake Telegram Bot API')
+    parser.add_argument('--port', type=int, default=8081, help='Port (default: 8081)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Response delay in seconds')
+    parser.add_argument('--flood-every', type=int, default=0, help='Every N-th request gets 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='retry_after seconds for 429')
+    parser.add_argument('--error-every', type=int, default=0, help='Every N-th request gets 500')
+    
+    args = parser.parse_args()
+    
+    server = FakeTelegramServer(('127.0.0.1', args.port), args.latency, args.flood_every,
+                                args.retry_after, args.error_every)
+    print(f"🚀 Fake Telegram API on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Replay recorded market data through scan -> save -> Telegram and report
+per-stage latency histograms and throughput as JSON.
+
+Daily mode replays market_data sessions (from the DB, or a CSV export with
+--bars); tick mode replays an intraday file through the intraday scanner.
+Telegram is never contacted: --notify formats messages and keeps them.
+
+Usage:
+    python scripts/replay_market.py --from 2025-06-01 --to 2025-12-01 --notify
+    python scripts/replay_market.py --from 2025-06-01 --to 2025-12-01 --bars bars.csv --speed 5
+    python scripts/replay_market.py --ticks data/replay/2025-12-08.csv --history bars.csv
+    python scripts/replay_market.py --from 2025-06-01 --to 2025-12-01 --signals-out run.ndjson
+"""
+import sys
+import json
+import argparse
+from datetime import date
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded market data through the scan pipeline')
+    parser.add_argument('--from', dest='start', type=date.fromisoformat,
+                       help='First session to replay (YYYY-MM-DD, daily mode)')
+    parser.add_argument('--to', dest='end', type=date.fromisoformat,
+                       help='Last session to replay (YYYY-MM-DD, daily mode)')
+    parser.add_argument('--strategy', type=str, default='XTUMYV27Strategy',
+                       help='Strategy name (daily mode, default: XTUMYV27Strategy)')
+    parser.add_argument('--bars', type=str,
+                       help='CSV export of market_data used instead of the DB (daily mode)')
+    parser.add_argument('--ticks', type=str,
+                       help='Intraday replay file (CSV/NDJSON); switches to tick mode')
+    parser.add_argument('--history', type=str,
+                       help='CSV export of daily bars before the tick session (tick mode)')
+    parser.add_argument('--speed', type=float, default=0.0,
+                       help='Daily: sessions per second; ticks: times recorded pace (0 = as fast as possible)')
+    parser.add_argument('--batch-window', type=float, default=1.0,
+                       help='Seconds of ticks processed as one batch (default: 1.0)')
+    parser.add_argument('--user-id', type=int, default=1,
+                       help='User whose parameters are used (default: 1)')
+    parser.add_argument('--save-db', action='store_true',
+                       help='Run the save stage against the database')
+    parser.add_argument('--notify', action='store_true',
+                       help='Run the Telegram stage with a recording (offline) bot')
+    parser.add_argument('--signals-out', type=str,
+                       help='Write every signal as NDJSON for correctness diffs')
+    parser.add_argument('--output', type=str,
+                       help='Write the JSON report to this file')
+    
+    args = parser.parse_args()
+    if not args.ticks and not (args.start and args.end):
+        parser.error('--from and --to are required unless --ticks is given')
+    
+    import pandas as pd
+    from backend.modules.screener.replay import RecordingTelegramBot, replay_sessions, replay_ticks
+    from backend.modules.screener.strategies import StrategyRegistry
+    
+    notifier = RecordingTelegramBot() if args.notify else None
+    signals_out = open(args.signals_out, 'w') if args.signals_out else None
+    
+    def on_signals(at, signals):
+        if signals_out:
+            for row in signals.to_dicts(replayed_at=str(at)):
+                signals_out.write(json.dumps(row, default=str) + '\n')
+    
+    def read_bars(path):
+        # Offline run: default parameters, so no DB is touched
+        bars = pd.read_csv(path, parse_dates=['date'])
+        return bars, StrategyRegistry.get_strategy(strategy_name).get_default_parameters()
+    
+    try:
+        if args.ticks:
+            strategy_name = 'XTUMYV27Strategy'
+            history, params = read_bars(args.history) if args.history else (None, None)
+            report = replay_ticks(args.ticks, user_id=args.user_id, speed=args.speed,
+                                  batch_window=args.batch_window, save_to_db=args.save_db,
+                                  notify=notifier, on_signals=on_signals, history=history, params=params)
+        else:
+            strategy_name = args.strategy
+            bars, params = read_bars(args.bars) if args.bars else (None, None)
+            report = replay_sessions(strategy_name, args.start, args.end, user_id=args.user_id,
+                                     speed=args.speed, save_to_db=args.save_db, notify=notifier,
+                                     on_signals=on_signals, bars=bars, params=params)
+    finally:
+        if signals_out:
+            signals_out.close()
+    
+    if notifier:
+        report['telegram_messages'] = len(notifier.messages)
+    
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
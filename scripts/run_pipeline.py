@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Daily end-of-session pipeline.
+
+    ingest -> membership -> validate -> actions -> indicators -> scan -> notify
+                                                -> panel_file
+                                     -> breadth ------------------------>
+                                     -> track -------------------------->
+
+Each stage starts as soon as its upstream stages finish; breadth,
+indicators and track run in parallel. Stages are checkpointed per session
+under logs/pipeline/, so a rerun only repeats what failed or never ran.
+membership rebuilds the point-in-time listing intervals
+(market_data/universe.py) that load_panel filters on, so every later stage
+sees the session's additions and delistings.
+validate runs the data quality checks (market_data/quality.py): bad bars
+are quarantined, so indicators and scans skip them. Persistent gaps beyond
+the price band are stored as suggested corporate actions for review.
+actions recomputes symbols whose confirmed ex-date arrived with the session:
+their factors start applying now, so stored indicators are rebuilt before
+scans read them.
+panel_file keeps the memory-mapped panel (market_data/panel_file.py) in
+step with the validated bars, when the file has been built.
+
+With --wait the pipeline sleeps until the session's close (13:00 on half
+days, 18:10 otherwise) plus a settle delay, instead of relying on fixed
+cron windows; ingest retries until the session's bars have landed.
+
+Usage:
+    python scripts/run_pipeline.py --wait                  # cron: once per weekday
+    python scripts/run_pipeline.py --date 2025-12-08       # rerun unfinished stages
+    python scripts/run_pipeline.py --force scan            # rerun scan and notify
+    python scripts/run_pipeline.py --only track notify --no-telegram
+"""
+import sys
+import json
+import time
+import argparse
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.core.pipeline import Pipeline, Stage, SUCCESS
+
+# Ingest retries while TradingView has not published the session yet
+INGEST_RETRIES = 3
+INGEST_RETRY_DELAY = 300.0
+
+
+def _session_bounds(ctx):
+    session = ctx.params['session']
+    return {'start': session, 'end': session + timedelta(days=1)}
+
+
+def ingest(ctx):
+    """Fetch missing bars and require the session to be present for most tickers."""
+    from sqlalchemy import text
+    from backend.core.database import engine
+    from backend.modules.market_data.updater import run_daily_update
+    
+    stats = run_daily_update(post_update=False)
+    if stats is None:
+        raise RuntimeError("Ticker listesi alınamadı")
+    
+    with engine.connect() as conn:
+        # Delisted tickers stay in the table (is_active = FALSE) but are never fetched
+        tickers = conn.execute(text("SELECT COUNT(*) FROM tickers WHERE is_active")).scalar() or 0
+        landed = conn.execute(text(
+            "SELECT COUNT(DISTINCT symbol) FROM market_data WHERE date >= :start AND date < :end"
+        ), _session_bounds(ctx)).scalar() or 0
+    
+    coverage = landed / tickers if tickers else 0.0
+    if coverage < ctx.params['min_coverage']:
+        raise RuntimeError(f"Seans verisi eksik: {landed}/{tickers} hisse (%{coverage * 100:.1f})")
+    
+    return {**stats, 'symbols': landed, 'tickers': tickers, 'coverage': round(coverage, 4)}
+
+
+def membership(ctx):
+    from backend.modules.market_data.universe import rebuild_membership
+    
+    return {'intervals': rebuild_membership()}
+
+
+def validate(ctx):
+    """Quarantine bad bars and suggest splits; reject the session if too many of its bars are bad."""
+    from sqlalchemy import text
+    from backend.core.database import engine
+    from backend.modules.market_data.corporate_actions import suggest_actions
+    from backend.modules.market_data.quality import run_quality_checks
+    
+    summary = run_quality_checks()
+    suggested = suggest_actions()
+    
+    with engine.connect() as conn:
+        row = conn.execute(text("""
+            SELECT (SELECT COUNT(*) FROM market_data WHERE date >= :start AND date < :end) AS bars,
+                   (SELECT COUNT(DISTINCT symbol) FROM market_data_quarantine
+                    WHERE severity = 'error' AND date >= :start AND date < :end) AS invalid
+        """), _session_bounds(ctx)).fetchone()
+    
+    if not row.bars:
+        raise RuntimeError("Seans için bar bulunamadı")
+    if row.invalid / row.bars > ctx.params['max_invalid']:
+        raise RuntimeError(f"{row.invalid}/{row.bars} bar tutarsız")
+    
+    return {'bars': row.bars, 'invalid': row.invalid, 'quarantine': summary, 'suggested_actions': suggested}
+
+
+def actions(ctx):
+    from backend.modules.market_data.corporate_actions import refresh_due_actions
+    
+    return {'refreshed': refresh_due_actions(until=ctx.params['session'])}
+
+
+def panel_file(ctx):
+    import os
+    from backend.core.config import PANEL_FILE
+    from backend.modules.market_data.panel_file import append_sessions
+    
+    if not os.path.exists(PANEL_FILE):
+        return {'skipped': 'no panel file'}
+    return append_sessions(PANEL_FILE)
+
+
+def breadth(ctx):
+    from backend.modules.market_data.breadth import update_breadth
+    
+    update_breadth(days=10)
+    return None
+
+
+def indicators(ctx):
+    from backend.modules.market_data.indicator_store import update_indicator_store
+    
+    return {'inserted': update_indicator_store()}
+
+
+def track(ctx):
+    from scripts.track_performance import update_performance
+    
+    return update_performance()
+
+
+def scan(ctx):
+    from backend.modules.screener.scanner import ScanEngine
+    
+    results = {}
+    for strategy_name in ctx.params['strategies']:
+        signals = ScanEngine(strategy_name, ctx.params['user_id']).run_scan_batch(save_to_db=True)
+        results[strategy_name] = signals.to_dicts()
+    return results
+
+
+def notify(ctx):
+    """Scan results and breadth to Telegram; performance summary on the last session of the week."""
+    if not ctx.params['telegram']:
+        return {'sent': 0}
+    
+    import pandas as pd
+    from backend.modules.market_data.breadth import get_latest_breadth
+    from backend.modules.market_data.trading_calendar import get_trading_calendar
+    from scripts.telegram_bot import TelegramBot
+    
+    bot = TelegramBot()
+    messages = [bot.format_scan_results(pd.DataFrame(signals)) for signals in (ctx.results['scan'] or {}).values()]
+    
+    summary = bot.format_breadth_summary(get_latest_breadth())
+    if summary:
+        messages.append(summary)
+    
+    session = ctx.params['session']
+    if get_trading_calendar().next_session(session).isocalendar()[1] != session.isocalendar()[1]:
+        from scripts.track_performance import format_telegram_message, get_performance_summary
+        messages.append(format_telegram_message(get_performance_summary()))
+    
+    sent = sum(bool(bot.send_message(message)) for message in messages)
+    return {'sent': sent, 'messages': len(messages)}
+
+
+STAGES = [
+    Stage('ingest', ingest, retries=INGEST_RETRIES, retry_delay=INGEST_RETRY_DELAY),
+    Stage('membership', membership, depends=('ingest',)),
+    Stage('validate', validate, depends=('membership',)),
+    Stage('breadth', breadth, depends=('validate',)),
+    Stage('actions', actions, depends=('validate',)),
+    Stage('indicators', indicators, depends=('actions',)),
+    Stage('track', track, depends=('validate',)),
+    Stage('panel_file', panel_file, depends=('actions',)),
+    Stage('scan', scan, depends=('indicators',)),
+    Stage('notify', notify, depends=('scan', 'breadth', 'track')),
+]
+
+
+def wait_for_close(session: date, settle_minutes: float) -> bool:
+    """Sleep until the session close plus settle time; False if the market is closed."""
+    from backend.modules.market_data.trading_calendar import get_trading_calendar
+    
+    closing = get_trading_calendar().closing_time(session)
+    if closing is None:
+        return False
+    
+    start_at = datetime.combine(session, closing) + timedelta(minutes=settle_minutes)
+    delay = (start_at - datetime.now()).total_seconds()
+    if delay > 0:
+        print(f"⏰ Kapanış {closing.strftime('%H:%M')}, pipeline {start_at.strftime('%H:%M')} başlayacak")
+        time.sleep(delay)
+    return True
+
+
+def main():
+    from backend.core.config import LOG_DIR
+    
+    parser = argparse.ArgumentParser(description='Run the daily ingest -> scan -> notify pipeline')
+    parser.add_argument('--date', type=date.fromisoformat, default=None,
+                       help='Session to process (YYYY-MM-DD, default: today)')
+    parser.add_argument('--wait', action='store_true',
+                       help='Sleep until the session close plus --settle-minutes before starting')
+    parser.add_argument('--settle-minutes', type=float, default=10.0,
+                       help='Minutes after the close before ingesting (default: 10)')
+    parser.add_argument('--strategy', type=str, nargs='+', default=['XTUMYV27Strategy'],
+                       help='Strategies to scan (default: XTUMYV27Strategy)')
+    parser.add_argument('--user-id', type=int, default=1,
+                       help='User whose parameters are used (default: 1)')
+    parser.add_argument('--force', type=str, nargs='+', default=[],
+                       help='Rerun these stages (and their downstream) even if checkpointed')
+    parser.add_argument('--only', type=str, nargs='+', default=None,
+                       help='Run only these stages')
+    parser.add_argument('--min-coverage', type=float, default=0.9,
+                       help='Share of tickers that must have the session bar (default: 0.9)')
+    parser.add_argument('--max-invalid', type=float, default=0.01,
+                       help='Share of quarantined session bars tolerated (default: 0.01)')
+    parser.add_argument('--no-telegram', action='store_true',
+                       help='Skip sending Telegram messages')
+    parser.add_argument('--workers', type=int, default=3,
+                       help='Stages run in parallel (default: 3)')
+    
+    args = parser.parse_args()
+    
+    session = args.date or date.today()
+    if args.wait and not wait_for_close(session, args.settle_minutes):
+        print(f"⏸️  {session} işlem günü değil, pipeline atlandı")
+        return 0
+    
+    pipeline = Pipeline(STAGES, checkpoint_dir=str(Path(LOG_DIR) / 'pipeline'), max_workers=args.workers)
+    params = {
+        'session': session,
+        'strategies': args.strategy,
+        'user_id': args.user_id,
+        'min_coverage': args.min_coverage,
+        'max_invalid': args.max_invalid,
+        'telegram': not args.no_telegram
+    }
+    
+    try:
+        report = pipeline.run(session.isoformat(), params, force=args.force, only=args.only)
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    
+    for name, record in report['stages'].items():
+        if record.get('cached'):
+            print(f"⏭️  {name}: checkpoint'ten")
+        elif record['status'] == SUCCESS:
+            print(f"✅ {name}: {record['duration_s']:.1f}s")
+        else:
+            print(f"❌ {name}: {record.get('error') or record.get('reason')}")
+    
+    print(json.dumps({k: v for k, v in report.items() if k != 'stages'}, indent=2))
+    return 0 if report['status'] == SUCCESS else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Long-running intraday XTUMY V27 scanner.
+
+Warms up from the daily history in the database, then consumes a quote
+stream and prints (optionally sends to Telegram) intrabar alerts.
+
+Usage:
+    python scripts/run_realtime_scanner.py --replay data/replay/2025-12-08.csv
+    python scripts/run_realtime_scanner.py --replay ticks.ndjson --speed 10 --telegram
+    python scripts/run_realtime_scanner.py --source my_feeds.bist:LiveSource
+"""
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the intraday XTUMY V27 scanner on a quote stream')
+    parser.add_argument('--replay', type=str,
+                       help='Replay file (CSV/NDJSON) used as the stream source')
+    parser.add_argument('--source', type=str, default='replay',
+                       help='Stream source name or module:Class (default: replay)')
+    parser.add_argument('--speed', type=float, default=0.0,
+                       help='Replay speed: 0 = as fast as possible, 1 = recorded pace (default: 0)')
+    parser.add_argument('--batch-window', type=float, default=1.0,
+                       help='Seconds of updates processed as one batch (default: 1.0)')
+    parser.add_argument('--user-id', type=int, default=1,
+                       help='User whose XTUMY parameters are used (default: 1)')
+    parser.add_argument('--debounce', type=float, default=900.0,
+                       help='Seconds before the same symbol/signal alerts again (default: 900)')
+    parser.add_argument('--telegram', action='store_true',
+                       help='Send alerts to Telegram')
+    
+    args = parser.parse_args()
+    
+    import pandas as pd
+    from backend.modules.market_data.stream import load_source
+    from backend.modules.screener.realtime import IntradayScanner
+    from backend.modules.screener.scanner import ScanEngine
+    from scripts.run_scan import format_signals_for_display
+    
+    if args.source == 'replay':
+        if not args.replay:
+            parser.error('--replay is required for the replay source')
+        source = load_source('replay', path=args.replay, speed=args.speed, batch_window=args.batch_window)
+    else:
+        source = load_source(args.source)
+    
+    engine = ScanEngine('XTUMYV27Strategy', args.user_id)
+    history = engine._load_market_data()
+    if history.empty:
+        print("❌ No market data found")
+        return 1
+    
+    scanner = IntradayScanner(history, engine._load_parameters(), debounce=args.debounce)
+    print(f"🚀 Intraday scanner ready: {len(scanner.symbols)} symbols")
+    
+    bot = None
+    if args.telegram:
+        from scripts.telegram_bot import TelegramBot
+        bot = TelegramBot()
+    
+    def publish(alerts):
+        signals = alerts.to_dicts()
+        print(format_signals_for_display(signals))
+        if bot:
+            try:
+                bot.send_scan_results(pd.DataFrame(signals))
+            except Exception as e:
+                print(f"⚠️  Failed to send Telegram: {e}")
+    
+    try:
+        summary = scanner.run(source, on_alert=publish)
+    except KeyboardInterrupt:
+        summary = scanner.summary()
+    
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
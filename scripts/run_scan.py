@@ -5,6 +5,7 @@ CLI wrapper for running scans - backward compatible with cron jobs.
 Usage:
     python scripts/run_scan.py --strategy xtumy_v27 --telegram
     python scripts/run_scan.py --strategy XTUMYV27Strategy --save-db
+    python scripts/run_scan.py --strategy XTUMYV27Strategy --all-users
 """
 import sys
 import os
@@ -15,10 +16,7 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from backend.modules.screener.scanner import ScanEngine
-from backend.modules.screener.strategies.xtumy_v27 import XTUMYV27Strategy
-from scripts.telegram_bot import TelegramBot
-import pandas as pd
+from backend.modules.screener.strategies import StrategyRegistry
 
 
 def format_signals_for_display(signals: list) -> str:
@@ -26,6 +24,8 @@ def format_signals_for_display(signals: list) -> str:
     if not signals:
         return "❌ Sinyal bulunamadı."
     
+    import pandas as pd
+    
     # Group by signal type
     df = pd.DataFrame(signals)
     
@@ -56,6 +56,8 @@ def main():
                        help='Strategy name (default: XTUMYV27Strategy)')
     parser.add_argument('--user-id', type=int, default=1,
                        help='User ID (default: 1)')
+    parser.add_argument('--all-users', action='store_true',
+                       help='Scan for every user with saved parameters in one batched pass')
     parser.add_argument('--telegram', action='store_true',
                        help='Send results to Telegram')
     parser.add_argument('--save-db', action='store_true', default=True,
@@ -72,6 +74,9 @@ def main():
     if strategy_name.lower() == 'xtumy_v27':
         strategy_name = 'XTUMYV27Strategy'
     
+    # Heavy imports after argument parsing so --help stays instant
+    from backend.modules.screener.scanner import ScanEngine, MultiUserScanEngine
+    
     try:
         print(f"🚀 Starting scan with strategy: {strategy_name}")
         print(f"   User ID: {args.user_id}")
@@ -80,6 +85,15 @@ def main():
         # Ensure strategy is registered in database
         ScanEngine.ensure_strategy_in_db(strategy_name)
         
+        if args.all_users:
+            scan_engine = MultiUserScanEngine(strategy_name)
+            results = scan_engine.run_scan(save_to_db=args.save_db, symbols=args.symbols)
+            stats = scan_engine.stats
+            print(f"✓ {stats.get('users', 0)} kullanıcı, {stats.get('parameter_sets', 0)} farklı parametre seti tarandı")
+            for user_id, user_signals in results.items():
+                print(f"  Kullanıcı {user_id}: {len(user_signals)} sinyal")
+            return 0
+        
         # Create scan engine
         scan_engine = ScanEngine(strategy_name, args.user_id)
         
@@ -95,10 +109,17 @@ def main():
         # Send to Telegram if requested
         if args.telegram and signals:
             try:
+                import pandas as pd
+                from scripts.telegram_bot import TelegramBot
+                
                 bot = TelegramBot()
                 df_signals = pd.DataFrame(signals)
                 bot.send_scan_results(df_signals)
                 print("✓ Results sent to Telegram")
+                
+                from backend.modules.market_data.breadth import get_latest_breadth
+                if bot.send_breadth_summary(get_latest_breadth()):
+                    print("✓ Market breadth sent to Telegram")
             except Exception as e:
                 print(f"⚠️  Failed to send Telegram: {e}")
         
@@ -106,7 +127,7 @@ def main():
     
     except KeyError as e:
         print(f"❌ Strategy '{strategy_name}' not found")
-        print(f"   Available strategies: {list(strategy_name for strategy_name in ['XTUMYV27Strategy'])}")
+        print(f"   Available strategies: {StrategyRegistry.names()}")
         return 1
     
     except Exception as e:
@@ -3,7 +3,6 @@ Telegram Bot Integration for BIST Analyst
 Tarama sonuçlarını Telegram'a gönderir
 """
 import os
-import requests
 from datetime import datetime
 from dotenv import load_dotenv
 import logging
@@ -30,7 +29,8 @@ class TelegramBot:
         if not self.bot_token or not self.chat_ids:
             logging.warning("Telegram credentials eksik. .env dosyasını kontrol edin.")
         
-        self.api_url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
+        self.api_base = os.getenv('TELEGRAM_API_URL', 'https://api.telegram.org')
+        self.api_url = f"{self.api_base}/bot{self.bot_token}/sendMessage"
     
     def send_message(self, text, parse_mode='HTML'):
         """Telegram'a mesaj gönder (multiple chat IDs)"""
@@ -42,28 +42,27 @@ class TelegramBot:
             print("❌ Telegram credentials eksik!")
             return False
         
-        success_count = 0
-        fail_count = 0
-        
-        for chat_id in self.chat_ids:
-            try:
-                payload = {
-                    'chat_id': chat_id,
-                    'text': text,
-                    'parse_mode': parse_mode,
-                    'disable_web_page_preview': False
-                }
-                
-                response = requests.post(self.api_url, json=payload, timeout=10)
-                response.raise_for_status()
-                
-                success_count += 1
-                logging.info(f"Telegram message sent to {chat_id}")
-                
-            except Exception as e:
-                fail_count += 1
-                print(f"❌ Telegram gönderim hatası (chat_id: {chat_id}): {e}")
-                logging.error(f"Telegram send error (chat_id: {chat_id}): {e}")
+        from backend.modules.notifications.telegram import dispatch
+        
+        # Sohbetlere eşzamanlı gönderim; uzun mesajlar bölünür, rate limit'e uyulur
+        try:
+            results = dispatch(self.bot_token, self.chat_ids, text, parse_mode=parse_mode,
+                               api_url=self.api_base)
+        except Exception as e:
+            print(f"❌ Telegram gönderim hatası: {e}")
+            logging.error(f"Telegram send error: {e}")
+            return False
+        
+        failed = sorted({r.chat_id for r in results if not r.ok})
+        for result in results:
+            if result.ok:
+                logging.info(f"Telegram message sent to {result.chat_id}")
+            else:
+                print(f"❌ Telegram gönderim hatası (chat_id: {result.chat_id}): {result.error}")
+                logging.error(f"Telegram send error (chat_id: {result.chat_id}): {result.error}")
+        
+        success_count = len(self.chat_ids) - len(failed)
+        fail_count = len(failed)
         
         if success_count > 0:
             print(f"✅ Telegram mesajı {success_count} kişiye gönderildi!")
@@ -79,6 +78,11 @@ class TelegramBot:
         if signals_df is None or len(signals_df) == 0:
             return self._format_no_signals()
         
+        # Scanner sinyal sözlükleri snake_case anahtar kullanır
+        signals_df = signals_df.rename(columns={
+            'symbol': 'Symbol', 'signal_type': 'Signal', 'price': 'Close', 'rsi': 'RSI', 'adx': 'ADX'
+        })
+        
         # Başlık
         today = datetime.now().strftime('%d %B %Y')
         message = f"🚀 <b>XTUMY V27 Tarama Sonuçları</b>\n"
@@ -133,11 +137,41 @@ class TelegramBot:
         message += "💡 <i>BIST Analyst - Autonomous System</i>"
         return message
     
+    def format_breadth_summary(self, breadth):
+        """Piyasa genişliği (breadth) özetini Telegram formatında hazırla"""
+        if not breadth:
+            return None
+        
+        pct = breadth.get('pct_above_ema50')
+        avg_adx = breadth.get('avg_adx')
+        
+        message = f"🌍 <b>Piyasa Genişliği</b> ({breadth['date']})\n"
+        message += "─" * 30 + "\n"
+        message += f"🟢 Yükselen: {breadth['advancing']} | 🔴 Düşen: {breadth['declining']} | ⚪ Sabit: {breadth['unchanged']}\n"
+        if pct is not None:
+            message += f"📈 EMA50 Üstü: {breadth['above_ema50']} hisse (%{pct:.1f})\n"
+        message += f"⛰️ 144 Bar Zirve: {breadth['new_highs']} | 📉 144 Bar Dip: {breadth['new_lows']}\n"
+        if avg_adx is not None:
+            message += f"💪 Ortalama ADX: {avg_adx:.1f}\n"
+        
+        return message
+    
+    def send_breadth_summary(self, breadth):
+        """Piyasa genişliği özetini gönder"""
+        message = self.format_breadth_summary(breadth)
+        if message is None:
+            return False
+        return self.send_message(message)
+    
     def send_scan_results(self, signals_df):
         """Tarama sonuçlarını formatla ve gönder"""
         message = self.format_scan_results(signals_df)
         return self.send_message(message)
 
+def send_telegram_message(message):
+    """Tek bir mesajı yapılandırılmış sohbetlere gönder"""
+    return TelegramBot().send_message(message)
+
 def main():
     """Test için"""
     import pandas as pd
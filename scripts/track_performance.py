@@ -25,8 +25,12 @@ import argparse
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from sqlalchemy import text
+import pandas as pd
+from sqlalchemy import Date, text
+from backend.core.cache import get_cache
 from backend.core.database import get_db_session, engine
+from backend.modules.market_data.corporate_actions import load_factors, price_factor_between
+from backend.modules.market_data.trading_calendar import get_trading_calendar
 from backend.modules.screener.models import SignalHistory, SignalPerformance
 
 
@@ -66,7 +70,7 @@ def get_signals_to_track(days_back: int = 30) -> List[Dict[str, Any]]:
                   OR (sp.price_7d IS NULL AND sh.signal_date <= :date_7d_ago)
               )
             ORDER BY sh.signal_date DESC
-        """)
+        """).columns(signal_date=Date)  # Typed, so drivers without a native DATE still return dates
         
         today = date.today()
         result = session.execute(query, {
@@ -121,7 +125,7 @@ def get_price_on_date(symbol: str, target_date: date) -> Optional[float]:
         result = session.execute(query, {
             'symbol': symbol,
             'target_date': target_date,
-            'max_date': target_date + timedelta(days=5)  # Account for weekends
+            'max_date': get_trading_calendar().offset(target_date, 3)  # Skips weekends and holidays
         }).fetchone()
         
         if result:
@@ -146,12 +150,16 @@ def calculate_gain(price_at_signal: float, price_later: float) -> float:
     return round(((price_later - price_at_signal) / price_at_signal) * 100, 2)
 
 
-def update_signal_performance(signal: Dict[str, Any]) -> Dict[str, Any]:
+def update_signal_performance(signal: Dict[str, Any], factors: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
     """
     Update performance data for a single signal.
     
+    Prices are stored raw; gains are split/dividend-adjusted, so a bonus
+    issue between the signal and the later date is not counted as a loss.
+    
     Args:
         signal: Signal dictionary
+        factors: Adjustment factors from load_factors (loaded for the symbol when None)
         
     Returns:
         Updated performance data
@@ -160,6 +168,7 @@ def update_signal_performance(signal: Dict[str, Any]) -> Dict[str, Any]:
     symbol = signal['symbol']
     price_at_signal = signal['price_at_signal']
     today = date.today()
+    calendar = get_trading_calendar()
     
     updates = {
         'signal_id': signal['id'],
@@ -174,35 +183,41 @@ def update_signal_performance(signal: Dict[str, Any]) -> Dict[str, Any]:
     if not price_at_signal:
         return updates
     
+    if factors is None:
+        factors = load_factors([symbol])
+    
+    def gain(price: float, later: date) -> float:
+        return calculate_gain(price_at_signal * price_factor_between(factors, symbol, signal_date, later), price)
+    
     # Calculate +1 day performance
     date_1d = signal_date + timedelta(days=1)
-    if updates['price_1d'] is None and date_1d <= today:
+    if updates['price_1d'] is None and calendar.next_session(date_1d, inclusive=True) <= today:
         price = get_price_on_date(symbol, date_1d)
         if price:
             updates['price_1d'] = price
-            updates['gain_1d'] = calculate_gain(price_at_signal, price)
+            updates['gain_1d'] = gain(price, date_1d)
     elif updates['price_1d']:
-        updates['gain_1d'] = calculate_gain(price_at_signal, updates['price_1d'])
+        updates['gain_1d'] = gain(updates['price_1d'], date_1d)
     
     # Calculate +3 day performance
     date_3d = signal_date + timedelta(days=3)
-    if updates['price_3d'] is None and date_3d <= today:
+    if updates['price_3d'] is None and calendar.next_session(date_3d, inclusive=True) <= today:
         price = get_price_on_date(symbol, date_3d)
         if price:
             updates['price_3d'] = price
-            updates['gain_3d'] = calculate_gain(price_at_signal, price)
+            updates['gain_3d'] = gain(price, date_3d)
     elif updates['price_3d']:
-        updates['gain_3d'] = calculate_gain(price_at_signal, updates['price_3d'])
+        updates['gain_3d'] = gain(updates['price_3d'], date_3d)
     
     # Calculate +7 day performance
     date_7d = signal_date + timedelta(days=7)
-    if updates['price_7d'] is None and date_7d <= today:
+    if updates['price_7d'] is None and calendar.next_session(date_7d, inclusive=True) <= today:
         price = get_price_on_date(symbol, date_7d)
         if price:
             updates['price_7d'] = price
-            updates['gain_7d'] = calculate_gain(price_at_signal, price)
+            updates['gain_7d'] = gain(price, date_7d)
     elif updates['price_7d']:
-        updates['gain_7d'] = calculate_gain(price_at_signal, updates['price_7d'])
+        updates['gain_7d'] = gain(updates['price_7d'], date_7d)
     
     return updates
 
@@ -394,6 +409,69 @@ def send_telegram(message: str) -> bool:
         return False
 
 
+def update_performance(days_back: int = 30) -> Dict[str, int]:
+    """
+    Fill in missing +1d/+3d/+7d prices for recent signals.
+    
+    Args:
+        days_back: How many days back to look for signals
+        
+    Returns:
+        {'tracked', 'updated', 'errors'}
+    """
+    # Get signals to track
+    print(f"\n🔍 Finding signals from last {days_back} days...")
+    signals = get_signals_to_track(days_back)
+    print(f"   Found {len(signals)} signals to track")
+    
+    updated = 0
+    errors = 0
+    if signals:
+        factors = load_factors()
+
+        # Update performance for each signal
+        print("\n📈 Updating performance data...")
+        
+        for signal in signals:
+            try:
+                perf_data = update_signal_performance(signal, factors)
+                
+                # Only save if we have new data
+                has_new_data = (
+                    (perf_data['price_1d'] and not signal['price_1d']) or
+                    (perf_data['price_3d'] and not signal['price_3d']) or
+                    (perf_data['price_7d'] and not signal['price_7d'])
+                )
+                
+                if has_new_data:
+                    save_performance(signal, perf_data)
+                    updated += 1
+                    
+                    # Show progress
+                    gains = []
+                    if perf_data['gain_1d'] is not None:
+                        gains.append(f"+1d: {perf_data['gain_1d']:+.1f}%")
+                    if perf_data['gain_3d'] is not None:
+                        gains.append(f"+3d: {perf_data['gain_3d']:+.1f}%")
+                    if perf_data['gain_7d'] is not None:
+                        gains.append(f"+7d: {perf_data['gain_7d']:+.1f}%")
+                    
+                    if gains:
+                        print(f"   ✓ {signal['symbol']} ({signal['signal_type']}): {', '.join(gains)}")
+            
+            except Exception as e:
+                errors += 1
+                print(f"   ⚠️  Error updating {signal['symbol']}: {e}")
+        
+        print(f"\n✅ Updated {updated} signals, {errors} errors")
+        
+        if updated:
+            # API performance endpoints serve cached aggregates
+            get_cache().bump('performance')
+    
+    return {'tracked': len(signals), 'updated': updated, 'errors': errors}
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(description='Track signal performance')
@@ -408,49 +486,7 @@ def main():
     print("=" * 60)
     
     if not args.summary_only:
-        # Get signals to track
-        print(f"\n🔍 Finding signals from last {args.days} days...")
-        signals = get_signals_to_track(args.days)
-        print(f"   Found {len(signals)} signals to track")
-        
-        if signals:
-            # Update performance for each signal
-            print("\n📈 Updating performance data...")
-            updated = 0
-            errors = 0
-            
-            for signal in signals:
-                try:
-                    perf_data = update_signal_performance(signal)
-                    
-                    # Only save if we have new data
-                    has_new_data = (
-                        (perf_data['price_1d'] and not signal['price_1d']) or
-                        (perf_data['price_3d'] and not signal['price_3d']) or
-                        (perf_data['price_7d'] and not signal['price_7d'])
-                    )
-                    
-                    if has_new_data:
-                        save_performance(signal, perf_data)
-                        updated += 1
-                        
-                        # Show progress
-                        gains = []
-                        if perf_data['gain_1d'] is not None:
-                            gains.append(f"+1d: {perf_data['gain_1d']:+.1f}%")
-                        if perf_data['gain_3d'] is not None:
-                            gains.append(f"+3d: {perf_data['gain_3d']:+.1f}%")
-                        if perf_data['gain_7d'] is not None:
-                            gains.append(f"+7d: {perf_data['gain_7d']:+.1f}%")
-                        
-                        if gains:
-                            print(f"   ✓ {signal['symbol']} ({signal['signal_type']}): {', '.join(gains)}")
-                
-                except Exception as e:
-                    errors += 1
-                    print(f"   ⚠️  Error updating {signal['symbol']}: {e}")
-            
-            print(f"\n✅ Updated {updated} signals, {errors} errors")
+        update_performance(args.days)
     
     # Show summary
     print("\n" + "=" * 60)
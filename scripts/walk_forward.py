@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Walk-forward / purged k-fold evaluation of XTUMY V27 parameters.
+
+Each fold picks the grid entry with the best train-window gain and reports
+its out-of-sample statistics per signal type as JSON.
+
+Usage:
+    python scripts/walk_forward.py --grid pullPct=1,1.5,2 --grid volMult=0.5,0.8
+    python scripts/walk_forward.py --grid adxThresh=15,20,25 --train 250 --test 40 --anchored
+    python scripts/walk_forward.py --grid cooldown=5,10 --mode kfold --folds 5 --embargo 10
+    python scripts/walk_forward.py --grid pullPct=1,2 --bars bars.csv --output wf.json
+"""
+import sys
+import json
+import argparse
+from datetime import date
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def parse_grid(items):
+    """['pullPct=1,1.5'] -> {'pullPct': ['1', '1.5']} (pydantic converts the strings)"""
+    grid = {}
+    for item in items:
+        name, _, values = item.partition('=')
+        if not values:
+            raise argparse.ArgumentTypeError(f'--grid expects name=v1,v2,...: {item}')
+        grid[name.strip()] = [v.strip() for v in values.split(',') if v.strip()]
+    return grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Out-of-sample evaluation of XTUMY V27 parameters')
+    parser.add_argument('--grid', action='append', default=[],
+                       help='Parameter values to try, e.g. pullPct=1,1.5,2 (repeatable)')
+    parser.add_argument('--mode', choices=['walk_forward', 'kfold'], default='walk_forward',
+                       help='Split scheme (default: walk_forward)')
+    parser.add_argument('--train', type=int, default=500,
+                       help='Train sessions per fold (walk_forward, default: 500)')
+    parser.add_argument('--test', type=int, default=60,
+                       help='Test sessions per fold (walk_forward, default: 60)')
+    parser.add_argument('--step', type=int, default=None,
+                       help='Sessions between folds (walk_forward, default: --test)')
+    parser.add_argument('--anchored', action='store_true',
+                       help='Grow the train window from the first session (walk_forward)')
+    parser.add_argument('--folds', type=int, default=5,
+                       help='Number of folds (kfold, default: 5)')
+    parser.add_argument('--purge', type=int, default=None,
+                       help='Sessions dropped before each test window (default: longest horizon)')
+    parser.add_argument('--embargo', type=int, default=None,
+                       help='Sessions dropped after each test window (kfold, default: longest indicator lookback)')
+    parser.add_argument('--objective', choices=['1d', '3d', '7d'], default='7d',
+                       help='Horizon whose mean gain selects parameters (default: 7d)')
+    parser.add_argument('--min-signals', type=int, default=30,
+                       help='Train buy signals a parameter set needs (default: 30)')
+    parser.add_argument('--workers', type=int, default=4,
+                       help='Folds evaluated in parallel (default: 4)')
+    parser.add_argument('--days', type=int, default=365 * 6,
+                       help='Calendar days of history to load (default: 2190)')
+    parser.add_argument('--as-of', type=date.fromisoformat, default=None,
+                       help='Last day of history (YYYY-MM-DD, default: today)')
+    parser.add_argument('--bars', type=str,
+                       help='CSV export of market_data used instead of the DB')
+    parser.add_argument('--output', type=str,
+                       help='Write the JSON report to this file')
+    
+    args = parser.parse_args()
+    if not args.grid:
+        parser.error('at least one --grid is required')
+    
+    import pandas as pd
+    from backend.modules.backtest.walk_forward import (
+        HORIZONS, evaluate, max_lookback, parameter_grid, purged_kfold, sessions_of, walk_forward_folds
+    )
+    from backend.modules.market_data.panel import SymbolPanel, load_panel
+    
+    try:
+        grid = parameter_grid(parse_grid(args.grid))
+    except (argparse.ArgumentTypeError, ValueError) as e:
+        parser.error(str(e))
+    
+    if args.bars:
+        panel = SymbolPanel.from_long(pd.read_csv(args.bars, parse_dates=['date']))
+    else:
+        panel = load_panel(days=args.days, as_of=args.as_of)
+    
+    n_sessions = len(sessions_of(panel))
+    purge = max(HORIZONS.values()) if args.purge is None else args.purge
+    if args.mode == 'kfold':
+        embargo = max(purge, max_lookback(grid)) if args.embargo is None else args.embargo
+        folds = purged_kfold(n_sessions, args.folds, purge=purge, embargo=embargo)
+    else:
+        folds = walk_forward_folds(n_sessions, args.train, args.test, step=args.step,
+                                   anchored=args.anchored, purge=purge)
+    if not folds:
+        parser.error(f'{n_sessions} sessions loaded, too few for --train {args.train} + --test {args.test}')
+    
+    report = evaluate(panel, grid, folds, objective=args.objective,
+                      min_signals=args.min_signals, max_workers=args.workers)
+    report['mode'] = args.mode
+    
+    output = json.dumps(report, indent=2, default=str)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,7 +6,7 @@ doğru zamanda veri çekmeyi sağlar
 import sys
 import os
 from datetime import datetime, time
-from bist_calendar import BISTCalendar
+from backend.modules.market_data.trading_calendar import get_trading_calendar
 import logging
 from config import LOG_DIR
 
@@ -17,7 +17,8 @@ class SmartScheduler:
     """Akıllı görev zamanlayıcı"""
     
     def __init__(self):
-        self.calendar = BISTCalendar()
+        # bist_holidays bir kez yüklenir; sonraki kontroller bellekte
+        self.calendar = get_trading_calendar()
     
     def should_run_today(self):
         """